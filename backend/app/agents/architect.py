@@ -10,9 +10,9 @@ Responsável por:
 """
 
 from typing import Dict, Any, List, Optional
-from pathlib import Path
 from app.services.gemini_client import GeminiClient
-from app.core.data_manager import data_manager
+from app.core.content_store import content_store
+from app.core.ruleset_registry import ruleset_registry
 
 # Mapeamento de espécies para valores padrão
 SPECIES_DEFAULTS = {
@@ -72,29 +72,19 @@ ROLE_SCHEDULES = {
 class Architect:
     def __init__(self, gemini_client: GeminiClient):
         self.gemini_client = gemini_client
-        repo_root = Path(__file__).resolve().parents[3]
-        self.items_path = str((repo_root / "ruleset_source/mechanics/items.json").resolve())
-        self.loot_tables_path = str((repo_root / "ruleset_source/mechanics/loot_tables.json").resolve())
-        self.bestiary_path = str((repo_root / "lore_library/bestiary.json").resolve())
 
     def _ensure_item_exists(self, item_name: str):
-        """Verifica se um item existe e o cria se não existir."""
-        all_items = data_manager._read_json_file(self.items_path)
-        item_exists = any(item['name'] == item_name for item in all_items)
+        """Verifica se um item existe (base ou gerado) e o cria no content store se não existir."""
+        item = ruleset_registry.current.item(item_name)
+        if item is not None:
+            return item.id
 
-        if not item_exists:
-            print(f"Item dinâmico '{item_name}' não encontrado. Criando...")
-            new_item = {
-                "id": item_name.lower().replace(" ", "_"),
-                "name": item_name,
-                "type": "material",
-                "description": f"Um material raro dropado por uma criatura: {item_name}.",
-                "value": 100
-            }
-            data_manager.append_to_list_json(self.items_path, new_item)
-            return new_item["id"]
-        
-        return next(item['id'] for item in all_items if item['name'] == item_name)
+        print(f"Item dinâmico '{item_name}' não encontrado. Criando...")
+        return content_store.ensure_item(item_name, {
+            "type": "material",
+            "description": f"Um material raro dropado por uma criatura: {item_name}.",
+            "value": 100
+        })
 
     def _apply_species_defaults(self, npc_data: Dict[str, Any]) -> Dict[str, Any]:
         """Aplica valores padrão baseados na espécie."""
@@ -191,8 +181,7 @@ class Architect:
         monster_id = enemy_data["name"].lower().replace(" ", "_")
         
         # 1. Adicionar à loot_table
-        loot_table_entry = {monster_id: {"name": enemy_data["name"], "drops": processed_drops}}
-        data_manager.update_dict_json(self.loot_tables_path, "monsters", loot_table_entry)
+        content_store.put("loot_tables", monster_id, {"name": enemy_data["name"], "drops": processed_drops})
 
         # 2. Adicionar ao bestiário
         stats = enemy_data.get("stats", {})
@@ -214,7 +203,7 @@ class Architect:
             "aggression": enemy_data.get("aggression", 70),
             "courage": enemy_data.get("courage", 50)
         }
-        data_manager.append_to_list_json(self.bestiary_path, bestiary_entry)
+        content_store.put("bestiary", monster_id, bestiary_entry)
         
         print(f"✅ Inimigo '{enemy_data['name']}' ({species}) criado e salvo.")
         return {**bestiary_entry, "drops": processed_drops}
@@ -379,7 +368,7 @@ class Architect:
         )
         
         print(f"--- Gerando {'besta espiritual' if is_spiritual else 'besta selvagem'} Tier {tier} em {biome} ---")
-        beast_data = self.gemini_client.generate_json(prompt, task="story")
+        beast_data = self.gemini_client.generate_json(prompt, task="story", cache_task="beast")
         
         if "error" in beast_data:
             return beast_data
@@ -432,11 +421,10 @@ class Architect:
         }
         
         # Adicionar à loot_table
-        loot_table_entry = {monster_id: {"name": beast_data["name"], "drops": processed_drops}}
-        data_manager.update_dict_json(self.loot_tables_path, "monsters", loot_table_entry)
+        content_store.put("loot_tables", monster_id, {"name": beast_data["name"], "drops": processed_drops})
         
         # Adicionar ao bestiário
-        data_manager.append_to_list_json(self.bestiary_path, bestiary_entry)
+        content_store.put("bestiary", monster_id, bestiary_entry)
         
         print(f"✅ Besta '{beast_data['name']}' criada e salva.")
         return {**bestiary_entry, "drops": processed_drops}
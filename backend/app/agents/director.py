@@ -3,7 +3,9 @@ from app.agents.narrator import Narrator
 from app.agents.referee import Referee
 from app.core.combat_engine import CombatEngine
 from app.core.loot_manager import loot_manager
+from app.core.effect_scheduler import effect_scheduler
 from app.core.npc_population import npc_population_manager
+from app.services.npc_pool import npc_pool
 from app.database.repositories.player_repo import PlayerRepository
 from app.database.repositories.npc_repo import NpcRepository
 from app.database.repositories.gamelog_repo import GameLogRepository
@@ -14,6 +16,7 @@ from app.agents.scribe import Scribe
 from app.agents.architect import Architect
 from app.agents.villains.profiler import Profiler
 from app.core.chronos import world_clock
+from app.core.turn_snapshots import turn_snapshots
 
 class Director:
     def __init__(
@@ -88,13 +91,17 @@ class Director:
         
         for disposition, role in spawn_roles:
             try:
+                # Retira do pool pré-gerado; só chama o Architect na hora em caso de miss
+                npc_data = await npc_pool.acquire(
+                    self.architect,
+                    location=location,
+                    tier=player.rank,
+                    disposition=disposition,
+                    role=role
+                )
+                
                 if disposition == "hostile":
-                    # Gerar inimigo
-                    profile = npc_population_manager.get_location_profile(location)
-                    new_enemy_data = self.architect.generate_enemy(
-                        tier=player.rank, 
-                        biome=profile.location_type
-                    )
+                    new_enemy_data = npc_data
                     
                     if "error" not in new_enemy_data:
                         new_npc = NPC(
@@ -112,9 +119,6 @@ class Director:
                         spawn_messages.append(f"Um {created_npc.name} surge das sombras!")
                 
                 elif disposition == "friendly":
-                    # Gerar NPC amigável
-                    npc_data = self.architect.generate_friendly_npc(location, role)
-                    
                     if "error" not in npc_data:
                         new_npc = NPC(
                             name=npc_data["name"],
@@ -131,8 +135,6 @@ class Director:
                         spawn_messages.append(f"{created_npc.name} está por perto.")
                 
                 else:  # neutral
-                    npc_data = self.architect.generate_neutral_npc(location, role)
-                    
                     if "error" not in npc_data:
                         new_npc = NPC(
                             name=npc_data["name"],
@@ -152,6 +154,9 @@ class Director:
                 print(f"[NPC POPULATION] Erro ao spawnar NPC ({role}): {e}")
                 continue
         
+        # Reabastece em background o pool das chaves deste perfil de localização
+        npc_pool.top_up_location(self.architect, location, player.rank)
+        
         if spawn_messages:
             return " ".join(spawn_messages)
         return None
@@ -211,6 +216,9 @@ class Director:
         # CRITICAL: Força carregar todos os atributos agora (antes de qualquer lazy load)
         await self.player_repo.session.refresh(player)
         
+        # Estado do início do turno para o undo (diff reverso gravado no fim)
+        capture = turn_snapshots.begin(player)
+        
         turn_events = []
 
         # Processar efeitos de status do turno anterior
@@ -229,6 +237,9 @@ class Director:
         # ===== CHRONOS: ADVANCE TIME =====
         time_result = world_clock.advance_turn()
         current_time = world_clock.get_current_datetime()
+        
+        # ===== EFEITOS DE STATUS: DoT/regeneração de todos (fora da cena também) =====
+        await effect_scheduler.advance(self.player_repo.session)
         current_time_str = current_time.isoformat() if hasattr(current_time, 'isoformat') else str(current_time)
         
         # ===== WORLD TICK AUTOMÁTICO ÀS 6AM =====
@@ -240,9 +251,11 @@ class Director:
         # Localização e NPCs na cena (FILTRADOS por localização)
         current_location = player.current_location or "Floresta Assombrada"
         npcs_in_scene = await self.npc_repo.get_by_location(current_location)
+        capture.track_npcs(npcs_in_scene)
 
         # Lógica de Spawning JIT
         spawn_message = await self._spawn_enemy_if_needed(player, current_location, npcs_in_scene)
+        capture.mark_created(npc for npc in npcs_in_scene if not capture.is_tracked(npc))
         if spawn_message:
             turn_events.append(spawn_message)
 
@@ -518,10 +531,11 @@ class Director:
         full_action_result = ". ".join(turn_events + [action_result_message])
         
         # ===== GAMELOG: SAVE TURN TO DATABASE =====
+        game_log = None
         if self.gamelog_repo:
             turn_count = await self.gamelog_repo.get_turn_count(player_id)
             npc_ids = [npc.id for npc in npcs_in_scene]
-            await self.gamelog_repo.save_turn(
+            game_log = await self.gamelog_repo.save_turn(
                 player_id=player_id,
                 turn_number=turn_count + 1,
                 player_input=player_input,
@@ -545,6 +559,12 @@ class Director:
         
         # ===== SALVAR PLAYER NO BANCO (inventário, stats, etc) =====
         await self.player_repo.update(player)
+        
+        # ===== UNDO: diff reverso de Player/NPCs tocados neste turno =====
+        if game_log:
+            await turn_snapshots.record(
+                self.player_repo.session, capture, game_log.turn_number, game_log.id
+            )
             
         return {
             "scene_description": scene_description,
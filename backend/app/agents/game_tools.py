@@ -12,10 +12,16 @@ Coleção de ferramentas que os agentes podem usar para:
 from typing import Dict, List, Any, Optional, Callable, Awaitable
 from dataclasses import dataclass, field
 from datetime import datetime
-import json
 import random
 from pathlib import Path
 
+from app.core.dice_roller import DiceRoller
+from app.core.world_graph import world_graph
+from app.core.ruleset_registry import ruleset_registry
+
+# Limite de grupos de dados numa expressão do roll_dice (input do LLM)
+MAX_DICE_TERMS = 10
+
 
 @dataclass
 class Tool:
@@ -99,48 +105,38 @@ async def search_lore(query: str, category: str = "all") -> Dict[str, Any]:
 
 async def get_cultivation_ranks() -> Dict[str, Any]:
     """Retorna a lista de ranks de cultivo e seus requisitos."""
-    repo_root = Path(__file__).resolve().parents[3]
-    ranks_path = repo_root / "ruleset_source/mechanics/cultivation_ranks.json"
+    ranks = ruleset_registry.current.raw["cultivation_ranks.json"]
     
-    if ranks_path.exists():
-        with open(ranks_path, "r", encoding="utf-8") as f:
-            return {"ranks": json.load(f)}
+    if ranks:
+        return {"ranks": ranks}
     
     return {"error": "Arquivo de ranks não encontrado"}
 
 
 async def get_techniques_by_element(element: str) -> Dict[str, Any]:
     """Retorna técnicas de um elemento específico."""
-    repo_root = Path(__file__).resolve().parents[3]
-    tech_path = repo_root / "ruleset_source/mechanics/techniques.json"
+    ruleset = ruleset_registry.current
     
-    if tech_path.exists():
-        with open(tech_path, "r", encoding="utf-8") as f:
-            techniques = json.load(f)
-            filtered = [t for t in techniques if t.get("element", "").lower() == element.lower()]
-            return {"techniques": filtered, "count": len(filtered)}
+    if ruleset.techniques:
+        filtered = [t.raw for t in ruleset.techniques_for(element)]
+        return {"techniques": filtered, "count": len(filtered)}
     
     return {"error": "Arquivo de técnicas não encontrado"}
 
 
 async def get_item_info(item_name: str) -> Dict[str, Any]:
     """Busca informações sobre um item específico."""
-    repo_root = Path(__file__).resolve().parents[3]
-    items_path = repo_root / "ruleset_source/mechanics/items.json"
-    
-    if items_path.exists():
-        with open(items_path, "r", encoding="utf-8") as f:
-            items = json.load(f)
-            for item in items:
-                if item.get("name", "").lower() == item_name.lower():
-                    return {"found": True, "item": item}
-                if item.get("id", "").lower() == item_name.lower():
-                    return {"found": True, "item": item}
-            
-            # Busca parcial
-            matches = [i for i in items if item_name.lower() in i.get("name", "").lower()]
-            if matches:
-                return {"found": True, "partial_matches": matches[:5]}
+    ruleset = ruleset_registry.current
+    
+    item = ruleset.item(item_name)
+    if item:
+        return {"found": True, "item": item.raw}
+    
+    # Busca parcial
+    query = item_name.lower()
+    matches = [i.raw for i in ruleset.all_items() if query in i.name.lower()]
+    if matches:
+        return {"found": True, "partial_matches": matches[:5]}
     
     return {"found": False, "message": f"Item '{item_name}' não encontrado"}
 
@@ -149,38 +145,39 @@ async def get_item_info(item_name: str) -> Dict[str, Any]:
 
 async def roll_dice(dice: str, modifier: int = 0) -> Dict[str, Any]:
     """
-    Rola dados no formato XdY+Z.
+    Rola dados no formato XdY+Z (aceita toda a notação do DiceRoller:
+    vários termos, keep kh/kl e dados explosivos).
     
     Args:
-        dice: Formato "2d6", "1d20", etc
+        dice: Formato "2d6", "1d20", "4d6kh3", "1d20+5-1d4", etc
         modifier: Modificador a adicionar ao resultado
     """
     try:
-        # Parse do formato XdY
-        parts = dice.lower().split("d")
-        if len(parts) != 2:
-            return {"error": f"Formato inválido: {dice}. Use XdY (ex: 2d6)"}
-        
-        num_dice = int(parts[0])
-        num_sides = int(parts[1])
-        
-        if num_dice < 1 or num_dice > 100:
+        expression = DiceRoller.compile(dice)
+    except ValueError as e:
+        return {"error": f"{e}. Use XdY (ex: 2d6)"}
+    
+    if not expression.terms:
+        return {"error": f"Formato inválido: {dice}. Use XdY (ex: 2d6)"}
+    if len(expression.terms) > MAX_DICE_TERMS:
+        return {"error": f"Máximo de {MAX_DICE_TERMS} grupos de dados por rolagem"}
+    for term in expression.terms:
+        if term.count > 100:
             return {"error": "Número de dados deve ser entre 1 e 100"}
-        if num_sides < 2 or num_sides > 100:
+        if term.sides < 2 or term.sides > 100:
             return {"error": "Número de lados deve ser entre 2 e 100"}
-        
-        rolls = [random.randint(1, num_sides) for _ in range(num_dice)]
-        total = sum(rolls) + modifier
-        
-        return {
-            "dice": dice,
-            "rolls": rolls,
-            "modifier": modifier,
-            "total": total,
-            "formula": f"{dice}{'+' + str(modifier) if modifier > 0 else ''}"
-        }
-    except Exception as e:
-        return {"error": f"Erro ao rolar dados: {str(e)}"}
+    
+    total, rolls = expression.roll_detailed()
+    total += modifier
+    
+    return {
+        "dice": dice,
+        "rolls": rolls,
+        "modifier": modifier,
+        "total": total,
+        "formula": f"{dice}{'+' + str(modifier) if modifier > 0 else ''}",
+        "average": round(expression.quick_mean() + modifier, 2)
+    }
 
 
 async def calculate_damage(
@@ -277,9 +274,6 @@ async def check_cultivation_success(
 
 async def get_market_prices(location: str = "default") -> Dict[str, Any]:
     """Retorna preços do mercado em uma localização."""
-    repo_root = Path(__file__).resolve().parents[3]
-    items_path = repo_root / "ruleset_source/mechanics/items.json"
-    
     # Modificadores por localização
     location_mods = {
         "Initial Village": 1.0,
@@ -291,24 +285,26 @@ async def get_market_prices(location: str = "default") -> Dict[str, Any]:
     
     modifier = location_mods.get(location, 1.0)
     
-    if items_path.exists():
-        with open(items_path, "r", encoding="utf-8") as f:
-            items = json.load(f)
-            prices = []
-            for item in items[:20]:  # Limitar a 20 itens
-                if "value" in item:
-                    prices.append({
-                        "name": item["name"],
-                        "base_price": item["value"],
-                        "local_price": round(item["value"] * modifier, 1),
-                        "type": item.get("type", "misc")
-                    })
-            
-            return {
-                "location": location,
-                "modifier": modifier,
-                "prices": prices
-            }
+    ruleset = ruleset_registry.current
+    items = ruleset.items
+    if items:
+        # Limitar a 20 itens base + os 20 gerados mais recentes (content store)
+        generated = ruleset.all_items()[len(items):]
+        prices = []
+        for item in list(items[:20]) + generated[-20:]:
+            if item.value is not None:
+                prices.append({
+                    "name": item.name,
+                    "base_price": item.value,
+                    "local_price": round(item.value * modifier, 1),
+                    "type": item.type
+                })
+        
+        return {
+            "location": location,
+            "modifier": modifier,
+            "prices": prices
+        }
     
     return {"error": "Arquivo de itens não encontrado"}
 
@@ -440,32 +436,11 @@ async def get_location_info(location_name: str) -> Dict[str, Any]:
 
 async def get_travel_options(current_location: str) -> Dict[str, Any]:
     """Retorna opções de viagem a partir de uma localização."""
-    # Mapa de conexões simples
-    connections = {
-        "Initial Village": [
-            {"destination": "Misty Forest", "travel_time": "2 hours", "danger": "low"},
-            {"destination": "Merchant City", "travel_time": "1 day", "danger": "safe"},
-        ],
-        "Misty Forest": [
-            {"destination": "Initial Village", "travel_time": "2 hours", "danger": "low"},
-            {"destination": "Dragon Mountains", "travel_time": "6 hours", "danger": "moderate"},
-            {"destination": "Spirit Lake", "travel_time": "4 hours", "danger": "low"},
-        ],
-        "Dragon Mountains": [
-            {"destination": "Misty Forest", "travel_time": "6 hours", "danger": "moderate"},
-            {"destination": "Ancient Ruins", "travel_time": "1 day", "danger": "high"},
-        ],
-        "Merchant City": [
-            {"destination": "Initial Village", "travel_time": "1 day", "danger": "safe"},
-            {"destination": "Sword Sect", "travel_time": "8 hours", "danger": "safe"},
-            {"destination": "Poison Swamp", "travel_time": "2 days", "danger": "moderate"},
-        ],
-    }
-    
-    if current_location in connections:
+    destinations = world_graph.edges(current_location)
+    if destinations:
         return {
             "current": current_location,
-            "destinations": connections[current_location]
+            "destinations": destinations
         }
     
     return {"error": f"Não há conexões conhecidas de '{current_location}'"}
@@ -515,9 +490,9 @@ def get_mechanics_tools() -> List[Tool]:
     return [
         Tool(
             name="roll_dice",
-            description="Rola dados no formato XdY (ex: 2d6, 1d20)",
+            description="Rola dados no formato XdY (ex: 2d6, 1d20, 4d6kh3, 2d20kh1, 1d20+5-1d4)",
             parameters={
-                "dice": {"type": "string", "description": "Formato XdY"},
+                "dice": {"type": "string", "description": "Formato XdY (+/-Z, kh/kl, ! explosivo)"},
                 "modifier": {"type": "integer", "description": "Modificador a adicionar", "default": 0}
             },
             handler=roll_dice
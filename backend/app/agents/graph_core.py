@@ -27,6 +27,7 @@ Fluxo:
 
 Features:
 - PostgresSaver para checkpoints (time travel!)
+- Contexto do Narrator buscado em paralelo ao Planner (app/agents/prefetch.py)
 - Nós como funções Python puras
 - Routing condicional no Validator
 """
@@ -61,6 +62,10 @@ from app.agents.nodes.validator import validator_node, should_retry
 from app.agents.nodes.narrator import narrator_node
 
 from app.config import settings
+from app.core.chronos import world_clock
+from app.database.checkpoint_retention import checkpoint_pruner
+from app.core.turn_snapshots import turn_snapshots
+from app.agents.prefetch import context_prefetcher
 
 
 # ==================== GRAPH BUILDER ====================
@@ -109,7 +114,9 @@ class GameGraph:
             return await validator_node(state)
         
         async def narrator_wrapper(state: AgentState) -> Dict[str, Any]:
-            return await narrator_node(state, self.gemini_client)
+            # Contexto buscado em paralelo ao planner (o que não terminou é cancelado)
+            prefetched = await context_prefetcher.collect(state.get("run_id", ""))
+            return await narrator_node(state, self.gemini_client, prefetched)
         
         # Adicionar nós ao grafo
         builder.add_node("planner", planner_wrapper)
@@ -182,14 +189,32 @@ class GameGraph:
         )
         
         # Configurar thread para checkpoint
-        config = {
+        config = self._turn_config(session_id, turn_number)
+        
+        # Busca especulativa do contexto do narrador, em paralelo ao planner
+        context_prefetcher.start(initial_state)
+        
+        # Executar grafo com checkpointer apropriado
+        try:
+            return await self._run_with_checkpointer(initial_state, config, session_id, turn_number)
+        finally:
+            context_prefetcher.discard(initial_state["run_id"])
+    
+    @staticmethod
+    def _turn_config(session_id: str, turn_number: int) -> Dict[str, Any]:
+        """
+        Config do turno. O metadata vai para cada checkpoint gravado e é usado
+        pela política de retenção (últimos N turnos + âncora diária).
+        """
+        return {
             "configurable": {
                 "thread_id": session_id
+            },
+            "metadata": {
+                "turn_number": turn_number,
+                "game_day": world_clock.get_current_date()
             }
         }
-        
-        # Executar grafo com checkpointer apropriado
-        return await self._run_with_checkpointer(initial_state, config, session_id, turn_number)
     
     async def _run_with_checkpointer(
         self,
@@ -204,10 +229,12 @@ class GameGraph:
             # Linux/Mac: usar PostgresSaver
             async with AsyncPostgresSaver.from_conn_string(self.db_connection_string) as checkpointer:
                 await checkpointer.setup()
-                return await self._execute_graph(
+                result = await self._execute_graph(
                     self._graph.compile(checkpointer=checkpointer),
                     initial_state, config, session_id, turn_number
                 )
+            checkpoint_pruner.maybe_schedule(session_id, turn_number)
+            return result
         else:
             # Windows: usar MemorySaver (checkpoints não persistem entre reinícios)
             if not hasattr(self, '_memory_saver'):
@@ -304,28 +331,29 @@ class GameGraph:
             turn_number=turn_number
         )
         
-        config = {
-            "configurable": {
-                "thread_id": session_id
-            }
-        }
+        config = self._turn_config(session_id, turn_number)
         
-        # Compilar grafo
-        if USE_POSTGRES_SAVER:
-            async with AsyncPostgresSaver.from_conn_string(self.db_connection_string) as checkpointer:
-                await checkpointer.setup()
-                compiled_graph = self._graph.compile(checkpointer=checkpointer)
+        context_prefetcher.start(initial_state)
+        try:
+            # Compilar grafo
+            if USE_POSTGRES_SAVER:
+                async with AsyncPostgresSaver.from_conn_string(self.db_connection_string) as checkpointer:
+                    await checkpointer.setup()
+                    compiled_graph = self._graph.compile(checkpointer=checkpointer)
+                    
+                    async for event in self._stream_graph(compiled_graph, initial_state, config, session_id, turn_number):
+                        yield event
+                checkpoint_pruner.maybe_schedule(session_id, turn_number)
+            else:
+                if not hasattr(self, '_memory_saver'):
+                    self._memory_saver = MemorySaver()
+                
+                compiled_graph = self._graph.compile(checkpointer=self._memory_saver)
                 
                 async for event in self._stream_graph(compiled_graph, initial_state, config, session_id, turn_number):
                     yield event
-        else:
-            if not hasattr(self, '_memory_saver'):
-                self._memory_saver = MemorySaver()
-            
-            compiled_graph = self._graph.compile(checkpointer=self._memory_saver)
-            
-            async for event in self._stream_graph(compiled_graph, initial_state, config, session_id, turn_number):
-                yield event
+        finally:
+            context_prefetcher.discard(initial_state["run_id"])
     
     async def _stream_graph(
         self,
@@ -448,14 +476,19 @@ class GameGraph:
     async def restore_checkpoint(
         self,
         session_id: str,
-        checkpoint_id: str
+        checkpoint_id: str,
+        db_session=None
     ) -> Dict[str, Any]:
         """
         Restaura um checkpoint específico (time travel).
         
+        Com `db_session`, Player/NPCs também voltam ao estado daquele turno
+        (diffs reversos de app/core/turn_snapshots.py), na mesma chamada.
+        
         Args:
             session_id: ID da sessão
             checkpoint_id: ID do checkpoint a restaurar
+            db_session: Sessão do banco para desfazer o estado do mundo
             
         Returns:
             Estado restaurado
@@ -474,24 +507,14 @@ class GameGraph:
                     
                     if checkpoint_tuple:
                         state = checkpoint_tuple.checkpoint.get("channel_values", {})
-                        return {
-                            "success": True,
-                            "checkpoint_id": checkpoint_id,
-                            "narration": state.get("narration", ""),
-                            "turn_number": state.get("turn_number", 0)
-                        }
+                        return await self._restored(checkpoint_id, state, db_session)
             else:
                 # Windows: MemorySaver
                 if hasattr(self, '_memory_saver'):
                     checkpoint_tuple = self._memory_saver.get_tuple(config)
                     if checkpoint_tuple:
                         state = checkpoint_tuple.checkpoint.get("channel_values", {})
-                        return {
-                            "success": True,
-                            "checkpoint_id": checkpoint_id,
-                            "narration": state.get("narration", ""),
-                            "turn_number": state.get("turn_number", 0)
-                        }
+                        return await self._restored(checkpoint_id, state, db_session)
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -505,12 +528,44 @@ class GameGraph:
             "error": f"Checkpoint {checkpoint_id} não encontrado"
         }
     
-    async def undo_turn(self, session_id: str) -> Dict[str, Any]:
+    async def _restored(
+        self,
+        checkpoint_id: str,
+        state: Dict[str, Any],
+        db_session=None
+    ) -> Dict[str, Any]:
+        """Monta a resposta do restore e, com db_session, volta o mundo ao mesmo turno."""
+        turn_number = state.get("turn_number", 0)
+        restored = {
+            "success": True,
+            "checkpoint_id": checkpoint_id,
+            "narration": state.get("narration", ""),
+            "turn_number": turn_number
+        }
+        
+        player_id = state.get("player_id")
+        if db_session is not None and player_id:
+            # Checkpoint sem narração = turno ainda não concluído: volta ao fim do anterior
+            to_turn = turn_number if state.get("narration") else turn_number - 1
+            world = await turn_snapshots.rewind(db_session, player_id, to_turn)
+            if not world.get("success"):
+                return world
+            restored["world"] = world
+        
+        return restored
+    
+    async def undo_turn(self, session_id: str, db_session=None) -> Dict[str, Any]:
         """
         Desfaz o último turno (volta ao checkpoint anterior).
         
+        Com `db_session`, HP, inventário, ouro, localização e NPCs também
+        voltam (diff reverso do último turno, numa transação). O turno
+        desfeito é o do checkpoint mais recente da sessão; se ele não for o
+        último turno do jogador ou não tiver snapshot, nada é desfeito.
+        
         Args:
             session_id: ID da sessão
+            db_session: Sessão do banco para desfazer o estado do mundo
             
         Returns:
             Estado do turno anterior
@@ -526,10 +581,34 @@ class GameGraph:
         # Pegar penúltimo checkpoint
         previous_checkpoint = checkpoints[-2]
         
-        return await self.restore_checkpoint(
-            session_id,
-            previous_checkpoint["id"]
-        )
+        world = None
+        if db_session is not None:
+            state = await self._checkpoint_state(session_id)
+            player_id = state.get("player_id")
+            if not player_id:
+                return {"success": False, "error": "Checkpoint da sessão não tem jogador"}
+            world = await turn_snapshots.undo(db_session, player_id, turn_number=state.get("turn_number"))
+            if not world.get("success"):
+                return world
+        
+        result = await self.restore_checkpoint(session_id, previous_checkpoint["id"])
+        if result.get("success") and world is not None:
+            result["world"] = world
+        return result
+    
+    async def _checkpoint_state(self, session_id: str) -> Dict[str, Any]:
+        """Estado (channel_values) do checkpoint mais recente da sessão."""
+        config = {"configurable": {"thread_id": session_id}}
+        if USE_POSTGRES_SAVER:
+            async with AsyncPostgresSaver.from_conn_string(self.db_connection_string) as checkpointer:
+                checkpoint_tuple = await checkpointer.aget_tuple(config)
+        elif hasattr(self, '_memory_saver'):
+            checkpoint_tuple = self._memory_saver.get_tuple(config)
+        else:
+            checkpoint_tuple = None
+        if not checkpoint_tuple:
+            return {}
+        return checkpoint_tuple.checkpoint.get("channel_values", {})
 
 
 # ==================== FACTORY FUNCTION ====================
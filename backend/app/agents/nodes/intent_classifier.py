@@ -0,0 +1,555 @@
+"""
+Intent Classifier - Fast path local antes do Planner LLM
+GEM RPG ORBIS - LangGraph Architecture
+
+Todo turno o planner_node chamava o modelo mais pesado (task="combat")
+até para "descansar" ou "olhar ao redor". Este classificador decide a
+ActionIntent localmente e só deixa o LLM para os casos incertos:
+
+1. Camada de regras: encontra no input os NPCs da cena, locais conhecidos
+   (saídas, vizinhos no world_graph, todos os locais do grafo), itens do
+   inventário e skills, e os troca por marcadores (xnpcx, xlocalx...)
+2. Vizinho mais próximo: o texto mascarado é comparado com exemplos
+   rotulados (trigramas; + embeddings do EmbeddingService quando o modelo
+   real está carregado). Verbos inequívocos dão um bônus à intenção.
+3. Confiança = participação da melhor intenção entre as duas primeiras,
+   escalada pela similaridade absoluta. Acima do limiar, e com os slots
+   obrigatórios preenchidos (alvo, destino, item), o LLM é pulado.
+
+Negação, fingimento e modais ("não ataco", "finjo atacar", "talvez eu
+ataque", perguntas) invertem ou suspendem a ação sem mudar os trigramas:
+esses inputs sempre vão para o LLM. O mesmo vale para inputs compostos,
+que o plano de uma só ação não representa: fala relatada e orações
+subordinadas ("digo que vou...", "se o lobo atacar..."), mais de um verbo
+de ação ("fujo e ataco") ou mais de um NPC/local ("ataco o lobo e o
+bandido"). Alvo social precisa poder falar (can_speak).
+
+Benchmark de precisão/recall: benchmark_intent_classifier.py
+"""
+
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from app.agents.nodes.state import ActionIntent, AgentState, PlannedAction, ValidationStatus
+from app.core.location_index import normalize_name, trigrams
+from app.core.ruleset_registry import ruleset_registry
+from app.core.world_graph import world_graph
+
+
+# Marcadores das entidades extraídas pela camada de regras
+NPC, LOCATION, ITEM, SKILL = "xnpcx", "xlocalx", "xitemx", "xskillx"
+
+# Exemplos rotulados (já com marcadores no lugar das entidades)
+INTENT_EXAMPLES: Dict[ActionIntent, List[str]] = {
+    ActionIntent.ATTACK: [
+        "atacar xnpcx", "ataco xnpcx", "golpear xnpcx com a espada", "lutar contra xnpcx",
+        "matar xnpcx", "bater em xnpcx", "avanço sobre xnpcx", "dou um soco em xnpcx",
+        "corto xnpcx com minha lâmina", "attack xnpcx", "ataque", "atacar",
+    ],
+    ActionIntent.USE_SKILL: [
+        "usar xskillx em xnpcx", "uso xskillx contra xnpcx", "lanço xskillx",
+        "ativar a técnica xskillx", "ataco xnpcx com xskillx",
+    ],
+    ActionIntent.DEFEND: [
+        "defender", "me defendo", "bloquear o golpe", "levanto a guarda", "aparar o ataque",
+    ],
+    ActionIntent.FLEE: [
+        "fugir", "correr para longe", "escapar", "fujo do combate", "recuar", "bater em retirada",
+    ],
+    ActionIntent.TALK: [
+        "falar com xnpcx", "converso com xnpcx", "perguntar a xnpcx sobre o vale",
+        "cumprimentar xnpcx", "dizer olá para xnpcx", "pergunto a xnpcx sobre rumores",
+        "talk to xnpcx", "conversar",
+    ],
+    ActionIntent.PERSUADE: [
+        "convencer xnpcx", "persuadir xnpcx a me ajudar", "tento convencer xnpcx a me deixar passar",
+        "persuado xnpcx",
+    ],
+    ActionIntent.INTIMIDATE: [
+        "ameaçar xnpcx", "intimidar xnpcx", "ameaço xnpcx com a espada", "intimido xnpcx",
+    ],
+    ActionIntent.TRADE: [
+        "comprar xitemx", "vender xitemx", "negociar com o mercador", "quero comprar algo",
+        "ver as mercadorias de xnpcx", "trocar itens com xnpcx", "comprar de xnpcx",
+    ],
+    ActionIntent.MOVE: [
+        "ir para xlocalx", "viajar até xlocalx", "andar até xlocalx", "sigo para xlocalx",
+        "entrar em xlocalx", "voltar para xlocalx", "caminhar em direção a xlocalx",
+        "go to xlocalx", "vou para xlocalx",
+    ],
+    ActionIntent.EXPLORE: [
+        "explorar", "explorar a região", "explorar os arredores", "exploro a área desconhecida",
+    ],
+    ActionIntent.SEARCH: [
+        "procurar", "procurar pistas", "revistar o corpo", "buscar ervas", "vasculhar o local",
+    ],
+    ActionIntent.OBSERVE: [
+        "olhar ao redor", "observar", "examinar xnpcx", "olho em volta", "observar o ambiente",
+        "analisar a cena", "look around", "observo xnpcx",
+    ],
+    ActionIntent.REST: [
+        "descansar", "dormir", "deitar e descansar", "recuperar o fôlego", "acampar por aqui",
+    ],
+    ActionIntent.MEDITATE: [
+        "meditar", "medito", "sentar e meditar", "entrar em meditação", "meditar para recuperar qi",
+    ],
+    ActionIntent.CULTIVATE: [
+        "cultivar", "absorver o qi do ambiente", "circular o qi pelos meridianos",
+        "tentar avançar de reino", "refinar o qi",
+    ],
+    ActionIntent.TRAIN: [
+        "treinar", "treinar artes marciais", "praticar a técnica", "treino com a espada",
+    ],
+    ActionIntent.USE_ITEM: [
+        "usar xitemx", "beber xitemx", "comer xitemx", "tomar xitemx", "consumir xitemx",
+    ],
+    ActionIntent.EQUIP: [
+        "equipar xitemx", "empunhar xitemx", "vestir xitemx",
+    ],
+    ActionIntent.PICK_UP: [
+        "pegar xitemx", "apanhar o item do chão", "recolher o saque", "pegar o que caiu",
+    ],
+    ActionIntent.DROP: [
+        "largar xitemx", "jogar xitemx fora", "soltar xitemx", "descartar xitemx",
+    ],
+    ActionIntent.WAIT: [
+        "esperar", "aguardar", "ficar parado", "espero um pouco",
+    ],
+}
+
+# Radicais de verbos inequívocos (regra): bônus para a intenção.
+# Só radicais longos o bastante para não casar com outras palavras
+KEYWORD_STEMS: Dict[str, ActionIntent] = {
+    "atac": ActionIntent.ATTACK, "golpe": ActionIntent.ATTACK, "attack": ActionIntent.ATTACK,
+    "defend": ActionIntent.DEFEND, "bloque": ActionIntent.DEFEND,
+    "escap": ActionIntent.FLEE,
+    "cumpriment": ActionIntent.TALK, "convers": ActionIntent.TALK, "pergunt": ActionIntent.TALK,
+    "convenc": ActionIntent.PERSUADE, "persuad": ActionIntent.PERSUADE,
+    "ameac": ActionIntent.INTIMIDATE, "intimid": ActionIntent.INTIMIDATE,
+    "viaj": ActionIntent.MOVE,
+    "explor": ActionIntent.EXPLORE,
+    "procur": ActionIntent.SEARCH, "vasculh": ActionIntent.SEARCH, "revist": ActionIntent.SEARCH,
+    "observ": ActionIntent.OBSERVE, "examin": ActionIntent.OBSERVE,
+    "descans": ActionIntent.REST, "dormi": ActionIntent.REST, "durm": ActionIntent.REST,
+    "medit": ActionIntent.MEDITATE,
+    "cultiv": ActionIntent.CULTIVATE,
+    "trein": ActionIntent.TRAIN,
+    "consum": ActionIntent.USE_ITEM,
+    "equip": ActionIntent.EQUIP,
+    "descart": ActionIntent.DROP,
+    "aguard": ActionIntent.WAIT,
+}
+
+# Verbos curtos demais para radical ("mat" casa com "mata", "tom" com "tomo
+# coragem"): só as formas exatas
+KEYWORD_WORDS: Dict[str, ActionIntent] = {
+    **dict.fromkeys(("luto", "lutar", "lutando"), ActionIntent.ATTACK),
+    **dict.fromkeys(("mato", "matar", "matando"), ActionIntent.ATTACK),
+    **dict.fromkeys(("fujo", "fugir", "fugindo"), ActionIntent.FLEE),
+    **dict.fromkeys(("falo", "falar", "falando"), ActionIntent.TALK),
+    **dict.fromkeys(("digo", "dizer", "dizendo"), ActionIntent.TALK),
+    **dict.fromkeys(("compro", "comprar", "comprando"), ActionIntent.TRADE),
+    **dict.fromkeys(("vender", "vendendo"), ActionIntent.TRADE),
+    **dict.fromkeys(("olho", "olhar", "olhando"), ActionIntent.OBSERVE),
+    **dict.fromkeys(("bebo", "beber", "bebendo"), ActionIntent.USE_ITEM),
+    **dict.fromkeys(("tomo", "tomar", "tomando"), ActionIntent.USE_ITEM),
+    **dict.fromkeys(("largo", "largar"), ActionIntent.DROP),
+    **dict.fromkeys(("espero", "esperar", "esperando"), ActionIntent.WAIT),
+}
+KEYWORD_BONUS = 0.15
+
+# Intenções que o executor trata; as outras sempre vão para o LLM
+FAST_PATH_INTENTS = {
+    ActionIntent.ATTACK, ActionIntent.USE_SKILL, ActionIntent.TALK, ActionIntent.PERSUADE,
+    ActionIntent.INTIMIDATE, ActionIntent.MOVE, ActionIntent.EXPLORE, ActionIntent.FLEE,
+    ActionIntent.MEDITATE, ActionIntent.CULTIVATE, ActionIntent.TRAIN, ActionIntent.OBSERVE,
+    ActionIntent.SEARCH, ActionIntent.REST, ActionIntent.WAIT, ActionIntent.USE_ITEM,
+    ActionIntent.TRADE,
+}
+
+COMBAT_INTENTS = {ActionIntent.ATTACK, ActionIntent.USE_SKILL}
+SOCIAL_INTENTS = {ActionIntent.TALK, ActionIntent.PERSUADE, ActionIntent.INTIMIDATE}
+
+# Negação, fingimento e modais (normalizados, sem acento): a ação não é literal.
+# "quero" sozinho é declaração de intenção ("quero comprar..."); "não quero" cai em "nao".
+HEDGE_CUES = {
+    "nao", "nunca", "jamais", "nem",
+    "finjo", "finge", "fingir", "fingindo", "simulo", "simular", "imagino", "imaginar",
+    "talvez", "queria", "gostaria", "poderia", "deveria", "devo", "penso", "pensar",
+}
+
+# Fala relatada, orações subordinadas e sequências (normalizados): o input
+# descreve mais de uma ação, ou uma ação condicional, e o plano tem só uma
+CLAUSE_CUES = {"que", "se", "depois", "entao", "enquanto", "quando", "antes", "porque", "mas", "ou"}
+
+# Palavras que não servem de apelido para NPC/local
+STOPWORDS = {
+    "para", "com", "contra", "sobre", "ate", "em", "de", "do", "da", "dos", "das", "o", "a",
+    "os", "as", "um", "uma", "velho", "velha", "jovem", "mestre", "senhor", "senhora",
+}
+
+# Similaridade absoluta a partir da qual a confiança não é mais reduzida
+SIMILARITY_SATURATION = 0.6
+
+
+@dataclass
+class _Example:
+    intent: ActionIntent
+    text: str
+    grams: FrozenSet[str]
+    embedding: Optional[List[float]] = None
+
+
+@dataclass
+class ExtractedEntities:
+    masked: str
+    target: Optional[str] = None
+    destination: Optional[str] = None
+    item: Optional[str] = None
+    skill: Optional[str] = None
+    spoken_words: Optional[str] = None
+    hedge: Optional[str] = None
+    compound: Optional[str] = None  # Por que o input não cabe num plano de uma ação
+
+
+@dataclass
+class Classification:
+    action: PlannedAction
+    confidence: float
+    accepted: bool
+    reason: str                  # fast_path | low_confidence | missing_slot | unsupported_intent | hedged | compound | mute_target | retry
+    scores: Dict[str, float] = field(default_factory=dict)
+    elapsed_ms: float = 0.0
+
+
+def _keyword_intent(token: str) -> Optional[ActionIntent]:
+    """Intenção do verbo inequívoco no token (forma exata ou radical)."""
+    intent = KEYWORD_WORDS.get(token)
+    if intent is not None:
+        return intent
+    return next((intent for stem, intent in KEYWORD_STEMS.items() if token.startswith(stem)), None)
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    na = math.sqrt(sum(x * x for x in a))
+    nb = math.sqrt(sum(y * y for y in b))
+    return dot / (na * nb) if na and nb else 0.0
+
+
+class IntentClassifier:
+    """
+    Classificador kNN + regras. Sem estado por sessão: os exemplos são
+    compilados uma vez; as entidades vêm do AgentState de cada turno.
+    """
+
+    def __init__(self, threshold: float = 0.65, examples: Optional[Dict[ActionIntent, List[str]]] = None):
+        self.threshold = threshold
+        self._examples = [
+            _Example(intent, normalize_name(text), trigrams(normalize_name(text)))
+            for intent, texts in (examples or INTENT_EXAMPLES).items()
+            for text in texts
+        ]
+        self._dense_ready = False
+
+        # Métricas
+        self.total = 0
+        self.fast_path = 0
+        self.fallbacks: Dict[str, int] = {}
+        self.by_intent: Dict[str, int] = {}
+        self.total_ms = 0.0
+
+    # ==================== REGRAS (ENTIDADES) ====================
+
+    @staticmethod
+    def _aliases(
+        names: List[str],
+        kind: str,
+        allow_tokens: bool,
+        resolve: Optional[Dict[str, str]] = None
+    ) -> Dict[Tuple[str, ...], Tuple[str, str]]:
+        """
+        Frase normalizada -> (marcador, nome real). Tokens só se forem únicos.
+        `resolve` troca o apelido pelo valor do slot (ex: nome do item -> item_id).
+        """
+        phrases: Dict[Tuple[str, ...], Tuple[str, str]] = {}
+        token_owner: Dict[str, Optional[str]] = {}
+        for alias in names:
+            key = normalize_name(alias)
+            if not key:
+                continue
+            name = resolve.get(alias, alias) if resolve else alias
+            phrases[tuple(key.split())] = (kind, name)
+            if allow_tokens:
+                for token in key.split():
+                    if len(token) >= 4 and token not in STOPWORDS:
+                        owner = token_owner.get(token, name)
+                        token_owner[token] = name if owner == name else None
+        for token, owner in token_owner.items():
+            if owner is not None:
+                phrases.setdefault((token,), (kind, owner))
+        return phrases
+
+    def extract(self, state: AgentState) -> ExtractedEntities:
+        """Acha NPCs, locais, itens e skills no input e os troca por marcadores."""
+        user_input = state.get("user_input", "")
+        player = state.get("player", {}) or {}
+        world = state.get("world", {}) or {}
+
+        spoken = re.search(r"[\"“']([^\"”']+)[\"”']", user_input)
+        spoken_words = spoken.group(1).strip() if spoken else None
+        text = user_input.replace(spoken.group(0), " ") if spoken else user_input
+        tokens = normalize_name(text).split()
+
+        npcs = world.get("npcs_in_scene", []) or []
+        current = world.get("current_location", "")
+        nearby = list(world.get("available_exits", []) or []) + world_graph.neighbors(current)
+
+        phrases: Dict[Tuple[str, ...], Tuple[str, str]] = {}
+        phrases.update(self._aliases(world_graph.location_names(), LOCATION, allow_tokens=False))
+        phrases.update(self._aliases(nearby, LOCATION, allow_tokens=True))
+        phrases.update(self._aliases([n.get("name", "") for n in npcs], NPC, allow_tokens=True))
+        species = {}
+        for npc in npcs:
+            kind = normalize_name(npc.get("species", ""))
+            if kind and kind not in ("human", "humano"):
+                species[kind] = None if kind in species else npc.get("name")
+        for kind, owner in species.items():
+            if owner:
+                phrases.setdefault((kind,), (NPC, owner))
+        items = self._inventory_aliases(player.get("inventory", []) or [])
+        phrases.update(self._aliases(list(items), ITEM, allow_tokens=True, resolve=items))
+        skills = [s.replace("_", " ") for s in player.get("learned_skills", []) or []] + ["basic attack"]
+        phrases.update(self._aliases(skills, SKILL, allow_tokens=False))
+
+        max_len = max((len(p) for p in phrases), default=1)
+        found: Dict[str, str] = {}
+        distinct: Dict[str, set] = {}
+        masked: List[str] = []
+        i = 0
+        while i < len(tokens):
+            for size in range(min(max_len, len(tokens) - i), 0, -1):
+                match = phrases.get(tuple(tokens[i:i + size]))
+                if match:
+                    kind, name = match
+                    found.setdefault(kind, name)
+                    distinct.setdefault(kind, set()).add(name)
+                    masked.append(kind)
+                    i += size
+                    break
+            else:
+                masked.append(tokens[i])
+                i += 1
+
+        hedge = next((token for token in tokens if token in HEDGE_CUES), None)
+        if hedge is None and "?" in text:
+            hedge = "?"
+
+        compound = next((token for token in tokens if token in CLAUSE_CUES), None)
+        actions = {_keyword_intent(token) for token in masked} - {None}
+        if compound is None and len(actions) > 1:
+            compound = "+".join(sorted(intent.value for intent in actions))
+        if compound is None:
+            compound = next((kind for kind in (NPC, LOCATION, ITEM) if len(distinct.get(kind, ())) > 1), None)
+
+        skill = found.get(SKILL)
+        return ExtractedEntities(
+            masked=" ".join(masked),
+            target=found.get(NPC),
+            destination=found.get(LOCATION),
+            item=found.get(ITEM),
+            skill=skill.replace(" ", "_") if skill else None,
+            spoken_words=spoken_words,
+            hedge=hedge,
+            compound=compound,
+        )
+
+    @staticmethod
+    def _inventory_aliases(inventory: List[Any]) -> Dict[str, str]:
+        """
+        Apelido -> item_id dos itens do inventário ({"item_id", "quantity", ...}):
+        o próprio id ("pilula_de_cura" -> "pilula de cura") e o nome do ruleset.
+        """
+        aliases: Dict[str, str] = {}
+        ruleset = ruleset_registry.current
+        for entry in inventory:
+            if not isinstance(entry, dict) or not entry.get("item_id"):
+                continue
+            item_id = entry["item_id"]
+            aliases[item_id.replace("_", " ")] = item_id
+            rule = ruleset.item(item_id)
+            if rule is not None and rule.name:
+                aliases[rule.name] = item_id
+        return aliases
+
+    # ==================== KNN ====================
+
+    def _dense_available(self) -> bool:
+        """Só usa embeddings se o modelo real já estiver carregado (warmup)."""
+        from app.services.embedding_service import embedding_service
+        if not embedding_service.is_loaded() or embedding_service.dim <= 128:
+            return False
+        if not self._dense_ready:
+            for example in self._examples:
+                example.embedding = embedding_service.generate_embedding(example.text)
+            self._dense_ready = True
+        return True
+
+    def score(self, masked: str) -> Dict[ActionIntent, float]:
+        """Similaridade da melhor instância de cada intenção (+ bônus de regra)."""
+        grams = trigrams(masked)
+        dense = None
+        if self._dense_available():
+            from app.services.embedding_service import embedding_service
+            dense = embedding_service.generate_embedding(masked)
+
+        best: Dict[ActionIntent, float] = {}
+        for example in self._examples:
+            shared = len(grams & example.grams)
+            if not shared and dense is None:
+                continue
+            union = len(grams) + len(example.grams) - shared
+            jaccard = shared / union if union else 0.0
+            coverage = shared / len(example.grams) if example.grams else 0.0
+            sim = 0.5 * jaccard + 0.5 * coverage
+            if dense is not None and example.embedding is not None:
+                sim = 0.5 * sim + 0.5 * max(0.0, _cosine(dense, example.embedding))
+            if sim > best.get(example.intent, 0.0):
+                best[example.intent] = sim
+
+        for token in masked.split():
+            intent = _keyword_intent(token)
+            if intent in best:
+                best[intent] = min(1.0, best[intent] + KEYWORD_BONUS)
+        return best
+
+    # ==================== CLASSIFICAÇÃO ====================
+
+    def classify(self, state: AgentState) -> Classification:
+        start = time.perf_counter()
+        entities = self.extract(state)
+        scores = self.score(entities.masked)
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+
+        if ranked:
+            intent, top = ranked[0]
+            second = ranked[1][1] if len(ranked) > 1 else 0.0
+            share = top * top / (top * top + second * second) if top else 0.0
+            confidence = share * min(1.0, top / SIMILARITY_SATURATION)
+        else:
+            intent, confidence = ActionIntent.UNKNOWN, 0.0
+
+        action = self._fill_slots(intent, entities, state)
+        action.confidence = round(confidence, 3)
+
+        validation = state.get("validation") or {}
+        if validation.get("status") == ValidationStatus.NEEDS_RETRY.value:
+            reason = "retry"
+        elif entities.hedge is not None:
+            reason = "hedged"
+        elif entities.compound is not None:
+            reason = "compound"
+        elif intent not in FAST_PATH_INTENTS:
+            reason = "unsupported_intent"
+        elif confidence < self.threshold:
+            reason = "low_confidence"
+        elif not self._slots_ok(action):
+            reason = "missing_slot"
+        elif action.intent in SOCIAL_INTENTS and not self._can_speak(action.target_name, state):
+            reason = "mute_target"
+        else:
+            reason = "fast_path"
+
+        elapsed = (time.perf_counter() - start) * 1000
+        return Classification(
+            action=action,
+            confidence=action.confidence,
+            accepted=reason == "fast_path",
+            reason=reason,
+            scores={i.value: round(s, 3) for i, s in ranked[:3]},
+            elapsed_ms=round(elapsed, 3),
+        )
+
+    def _fill_slots(self, intent: ActionIntent, entities: ExtractedEntities, state: AgentState) -> PlannedAction:
+        npcs = (state.get("world", {}) or {}).get("npcs_in_scene", []) or []
+        target = entities.target
+
+        if intent == ActionIntent.ATTACK and entities.skill and entities.skill != "basic_attack":
+            intent = ActionIntent.USE_SKILL
+        if target is None and intent in COMBAT_INTENTS:
+            # Alvo implícito: único hostil (ou único NPC) na cena
+            hostile = [n for n in npcs if n.get("is_hostile")]
+            candidates = hostile if hostile else npcs
+            if len(candidates) == 1:
+                target = candidates[0].get("name")
+        elif target is None and intent in SOCIAL_INTENTS:
+            speakers = [n for n in npcs if n.get("can_speak")]
+            if len(speakers) == 1:
+                target = speakers[0].get("name")
+
+        return PlannedAction(
+            intent=intent,
+            target_name=target if intent in COMBAT_INTENTS | SOCIAL_INTENTS | {ActionIntent.OBSERVE, ActionIntent.TRADE} else None,
+            skill_name=entities.skill if intent in COMBAT_INTENTS else None,
+            destination=entities.destination if intent in (ActionIntent.MOVE, ActionIntent.EXPLORE) else None,
+            spoken_words=entities.spoken_words if intent in SOCIAL_INTENTS else None,
+            item_name=entities.item if intent in (ActionIntent.USE_ITEM, ActionIntent.TRADE) else None,
+            reasoning=f"Classificador local ({entities.masked})",
+        )
+
+    @staticmethod
+    def _slots_ok(action: PlannedAction) -> bool:
+        if action.intent in COMBAT_INTENTS:
+            return action.target_name is not None
+        if action.intent in SOCIAL_INTENTS:
+            return action.target_name is not None or action.spoken_words is not None
+        if action.intent == ActionIntent.MOVE:
+            return action.destination is not None
+        if action.intent == ActionIntent.USE_ITEM:
+            return action.item_name is not None
+        return True
+
+    @staticmethod
+    def _can_speak(target: Optional[str], state: AgentState) -> bool:
+        """Alvo social precisa falar (sem alvo, vale a fala direta)."""
+        if target is None:
+            return True
+        npcs = (state.get("world", {}) or {}).get("npcs_in_scene", []) or []
+        return any(n.get("name") == target and n.get("can_speak", True) for n in npcs)
+
+    def record(self, result: Classification) -> None:
+        """Conta o resultado (chamado pelo planner_node)."""
+        self.total += 1
+        self.total_ms += result.elapsed_ms
+        if result.accepted:
+            self.fast_path += 1
+            intent = result.action.intent.value
+            self.by_intent[intent] = self.by_intent.get(intent, 0) + 1
+        else:
+            self.fallbacks[result.reason] = self.fallbacks.get(result.reason, 0) + 1
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "total": self.total,
+            "fast_path": self.fast_path,
+            "skip_rate": round(self.fast_path / self.total, 3) if self.total else 0.0,
+            "llm_fallbacks": dict(self.fallbacks),
+            "fast_path_by_intent": dict(self.by_intent),
+            "avg_ms": round(self.total_ms / self.total, 3) if self.total else 0.0,
+            "dense_embeddings": self._dense_ready,
+        }
+
+
+def _create_classifier() -> IntentClassifier:
+    from app.config import settings
+    return IntentClassifier(threshold=settings.INTENT_CLASSIFIER_THRESHOLD)
+
+
+# Instância global
+intent_classifier = _create_classifier()
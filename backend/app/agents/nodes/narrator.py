@@ -14,7 +14,7 @@ Responsabilidades:
 Princípio: SANDBOX - o mundo existe, o jogador decide.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from app.agents.nodes.state import (
@@ -74,7 +74,32 @@ folhas em decomposição e algo mais... metálico."
 """
 
 
-def _build_narrator_prompt(state: AgentState) -> str:
+def _build_prefetched_context(prefetched: Optional[Dict[str, Any]]) -> str:
+    """Seção do prompt com o contexto buscado em paralelo ao Planner (memórias, lore, turno anterior)."""
+    if not prefetched:
+        return ""
+    
+    parts = []
+    previous = prefetched.get("previous_turn")
+    if previous:
+        parts.append(f"TURNO ANTERIOR: \"{previous.get('player_input', '')}\" -> {previous.get('summary', '')}")
+    
+    memories = prefetched.get("npc_memories", [])
+    if memories:
+        parts.append("MEMÓRIAS DOS NPCs (use para colorir reações):")
+        for memory in memories:
+            parts.append(f"[{memory.get('name')} | postura: {memory.get('stance', 'neutral')}]\n{memory.get('context')}")
+    
+    lore = prefetched.get("lore")
+    if lore:
+        parts.append(f"LORE DO LOCAL:\n{lore}")
+    
+    if not parts:
+        return ""
+    return "\n" + "\n\n".join(parts) + "\n"
+
+
+def _build_narrator_prompt(state: AgentState, prefetched: Optional[Dict[str, Any]] = None) -> str:
     """Constrói o prompt para o Narrator."""
     player = state.get("player", {})
     world = state.get("world", {})
@@ -158,7 +183,7 @@ CLIMA: {weather}
 
 NPCs PRESENTES:
 {npcs_text}
-
+{_build_prefetched_context(prefetched)}
 ═══════════════════════════════════════════════════════════════════
 AÇÃO DO JOGADOR
 ═══════════════════════════════════════════════════════════════════
@@ -225,7 +250,11 @@ O mundo ao redor continua em movimento, indiferente aos eventos que acabaram de
 
 # ==================== MAIN NARRATOR ====================
 
-async def narrator_node(state: AgentState, gemini_client) -> Dict[str, Any]:
+async def narrator_node(
+    state: AgentState,
+    gemini_client,
+    prefetched: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Node do Narrator - gera narrativa literária.
     
@@ -235,6 +264,7 @@ async def narrator_node(state: AgentState, gemini_client) -> Dict[str, Any]:
     Args:
         state: Estado atual do agente
         gemini_client: Cliente Gemini para LLM
+        prefetched: Contexto buscado em paralelo ao Planner (app/agents/prefetch.py)
         
     Returns:
         Atualizações parciais do estado incluindo narração
@@ -242,7 +272,7 @@ async def narrator_node(state: AgentState, gemini_client) -> Dict[str, Any]:
     print(f"[NARRATOR] Gerando narrativa...")
     
     # Construir prompt
-    prompt = _build_narrator_prompt(state)
+    prompt = _build_narrator_prompt(state, prefetched)
     
     # Chamar LLM
     try:
@@ -275,7 +305,7 @@ async def narrator_node(state: AgentState, gemini_client) -> Dict[str, Any]:
     return {
         "narration": narration,
         "action_summary": action_summary,
-        "messages": [new_message],  # Será concatenado pelo operator.add
+        "messages": [new_message],  # Será concatenado pelo bounded_messages
         "current_node": "narrator",
         "next_node": "end",
         "timestamp": datetime.utcnow().isoformat()
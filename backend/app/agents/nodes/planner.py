@@ -15,6 +15,7 @@ Responsabilidades:
 Princípio: Função PURA - recebe estado, retorna atualizações.
 """
 
+import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
@@ -24,6 +25,11 @@ from app.agents.nodes.state import (
     PlannedAction,
     ValidationStatus
 )
+from app.services.json_repair import parse_json, schema_from_dataclass
+
+
+# response_schema do generate_json: o LLM só consegue emitir intents do enum
+PLANNED_ACTION_SCHEMA = schema_from_dataclass(PlannedAction)
 
 
 # ==================== PROMPTS ====================
@@ -142,26 +148,19 @@ RETORNE O JSON DA AÇÃO
 
 def _parse_planner_response(response: str) -> PlannedAction:
     """Parseia a resposta do LLM em PlannedAction."""
-    import json
-    import re
-    
-    # Tentar extrair JSON da resposta
     try:
-        # Primeiro tenta parse direto
-        data = json.loads(response)
-    except json.JSONDecodeError:
-        # Tenta encontrar JSON no texto
-        json_match = re.search(r'\{[^{}]*\}', response, re.DOTALL)
-        if json_match:
-            try:
-                data = json.loads(json_match.group())
-            except:
-                data = {}
-        else:
-            data = {}
-    
+        data, _ = parse_json(response)
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    return _planned_action_from_dict(data)
+
+
+def _planned_action_from_dict(data: Dict[str, Any]) -> PlannedAction:
+    """Monta a PlannedAction a partir do dict do LLM (intents fora do enum viram UNKNOWN)."""
     # Mapear intent
-    intent_str = data.get("intent", "unknown").lower()
+    intent_str = str(data.get("intent") or "unknown").lower()
     intent_map = {
         "attack": ActionIntent.ATTACK,
         "defend": ActionIntent.DEFEND,
@@ -216,25 +215,38 @@ async def planner_node(state: AgentState, gemini_client) -> Dict[str, Any]:
     """
     print(f"[PLANNER] Analisando input: '{state.get('user_input', '')[:50]}...'")
     
+    # Fast path: intenção óbvia classificada localmente, sem chamar o LLM
+    fast = _classify_locally(state)
+    if fast is not None:
+        print(f"[PLANNER] Fast path ({fast.confidence:.2f}): {fast.intent.value} -> {fast.target_name or fast.destination or 'self'}")
+        return {
+            "planned_action": fast.to_dict(),
+            "current_node": "planner",
+            "next_node": "executor",
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
     # Construir prompt
     prompt = _build_planner_prompt(state)
     
     # Chamar LLM
     try:
-        response = gemini_client.generate_json(prompt, task="combat")
+        # Em thread: o event loop segue livre para a busca especulativa de contexto
+        response = await asyncio.to_thread(
+            gemini_client.generate_json,
+            prompt,
+            task="combat",
+            schema=PLANNED_ACTION_SCHEMA,
+            metrics_task="planner",
+        )
         
-        if isinstance(response, dict):
+        if isinstance(response, dict) and "error" in response:
+            # JSON irrecuperável mesmo após o reparo
+            print(f"[PLANNER] Resposta inválida do LLM: {response['error']}")
+            planned = _heuristic_plan(state)
+        elif isinstance(response, dict):
             # Resposta já é dict
-            planned = PlannedAction(
-                intent=ActionIntent(response.get("intent", "unknown")),
-                target_name=response.get("target_name"),
-                skill_name=response.get("skill_name"),
-                destination=response.get("destination"),
-                spoken_words=response.get("spoken_words"),
-                item_name=response.get("item_name"),
-                reasoning=response.get("reasoning", ""),
-                confidence=float(response.get("confidence", 0.7))
-            )
+            planned = _planned_action_from_dict(response)
         else:
             # Resposta é string, parsear
             planned = _parse_planner_response(str(response))
@@ -254,6 +266,26 @@ async def planner_node(state: AgentState, gemini_client) -> Dict[str, Any]:
     }
 
 
+def _classify_locally(state: AgentState) -> Optional[PlannedAction]:
+    """PlannedAction do classificador local, ou None para seguir ao LLM."""
+    from app.config import settings
+    if not settings.INTENT_CLASSIFIER_ENABLED:
+        return None
+    
+    from app.agents.nodes.intent_classifier import intent_classifier
+    try:
+        result = intent_classifier.classify(state)
+    except Exception as e:
+        print(f"[PLANNER] Erro no classificador local: {e}")
+        return None
+    
+    intent_classifier.record(result)
+    if not result.accepted:
+        print(f"[PLANNER] Classificador local -> LLM ({result.reason}, {result.confidence:.2f})")
+        return None
+    return result.action
+
+
 def _heuristic_plan(state: AgentState) -> PlannedAction:
     """Fallback: planeja ação usando heurísticas simples."""
     user_input = state.get("user_input", "").lower()
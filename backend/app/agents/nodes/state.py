@@ -15,7 +15,7 @@ from typing import TypedDict, List, Dict, Any, Optional, Literal, Annotated
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
-import operator
+import uuid
 
 
 # ==================== ENUMS ====================
@@ -215,6 +215,87 @@ class ValidationResult:
         }
 
 
+# ==================== REDUCER DE MENSAGENS ====================
+
+# Janela de mensagens mantidas na íntegra no estado (≈ MESSAGE_WINDOW / 2 turnos)
+MESSAGE_WINDOW = 20
+# Só resume quando estourar a janela por este lote: evita re-resumir a cada turno
+SUMMARY_BATCH = 10
+# Limite do texto do resumo (as linhas mais antigas são descartadas primeiro)
+SUMMARY_MAX_CHARS = 2000
+SUMMARY_LINE_CHARS = 160
+
+
+def _is_summary(message: Dict[str, Any]) -> bool:
+    return bool(message.get("metadata", {}).get("summary"))
+
+
+def _summary_line(message: Dict[str, Any]) -> str:
+    """Compacta uma mensagem em uma linha: papel, turno e o início do conteúdo."""
+    metadata = message.get("metadata", {})
+    content = " ".join(str(message.get("content", "")).split())
+    if len(content) > SUMMARY_LINE_CHARS:
+        content = content[:SUMMARY_LINE_CHARS].rstrip() + "…"
+    turn = metadata.get("turn")
+    prefix = f"[T{turn}] " if turn is not None else ""
+    speaker = "Jogador" if message.get("role") == "user" else "Narrador"
+    return f"{prefix}{speaker}: {content}"
+
+
+def summarize_messages(previous: Optional[Dict[str, Any]], messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Dobra mensagens antigas em uma única mensagem de resumo (extrativo e determinístico,
+    pois roda dentro do reducer a cada passo do grafo).
+    """
+    lines = previous["content"].splitlines() if previous else []
+    lines.extend(_summary_line(m) for m in messages)
+
+    # Mantém as linhas mais recentes dentro do limite
+    kept: List[str] = []
+    size = 0
+    for line in reversed(lines):
+        size += len(line) + 1
+        if size > SUMMARY_MAX_CHARS:
+            break
+        kept.append(line)
+    kept.reverse()
+
+    prev_meta = previous.get("metadata", {}) if previous else {}
+    turns = [m.get("metadata", {}).get("turn") for m in messages]
+    turns = [t for t in turns if t is not None]
+    first_turn = prev_meta.get("first_turn", turns[0] if turns else None)
+
+    return {
+        "role": "system",
+        "content": "\n".join(kept),
+        "timestamp": datetime.utcnow().isoformat(),
+        "metadata": {
+            "summary": True,
+            "summarized_count": prev_meta.get("summarized_count", 0) + len(messages),
+            "first_turn": first_turn,
+            "last_turn": turns[-1] if turns else prev_meta.get("last_turn"),
+        }
+    }
+
+
+def bounded_messages(left: Optional[List[Dict[str, Any]]], right: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Reducer do histórico: concatena como operator.add, mas mantém só as últimas
+    MESSAGE_WINDOW mensagens íntegras. As mais antigas viram uma mensagem de resumo
+    no início da lista, de modo que o checkpoint não cresce com a duração da sessão.
+    """
+    merged = list(left or []) + list(right or [])
+
+    summary = merged[0] if merged and _is_summary(merged[0]) else None
+    body = merged[1:] if summary else merged
+    if len(body) <= MESSAGE_WINDOW + SUMMARY_BATCH:
+        return merged
+
+    overflow = len(body) - MESSAGE_WINDOW
+    summary = summarize_messages(summary, body[:overflow])
+    return [summary] + body[overflow:]
+
+
 # ==================== AGENT STATE (TypedDict) ====================
 
 class AgentState(TypedDict, total=False):
@@ -224,7 +305,8 @@ class AgentState(TypedDict, total=False):
     Este é o contrato entre todos os nós do grafo.
     Usa TypedDict para compatibilidade com LangGraph.
     
-    Campos com Annotated[..., operator.add] acumulam valores.
+    Campos com Annotated[..., reducer] acumulam valores
+    (messages usa uma janela deslizante com resumo, ver bounded_messages).
     Campos normais são sobrescritos.
     """
     
@@ -232,12 +314,13 @@ class AgentState(TypedDict, total=False):
     session_id: str
     player_id: int
     turn_number: int
+    run_id: str  # Único por execução do grafo (chave das buscas do prefetch)
     
     # === Input do Usuário ===
     user_input: str
     
-    # === Histórico de Mensagens (acumula) ===
-    messages: Annotated[List[Dict[str, Any]], operator.add]
+    # === Histórico de Mensagens (acumula em janela deslizante) ===
+    messages: Annotated[List[Dict[str, Any]], bounded_messages]
     
     # === Contextos ===
     player: Dict[str, Any]  # PlayerContext serializado
@@ -291,6 +374,7 @@ def create_initial_state(
         session_id=session_id,
         player_id=player_id,
         turn_number=turn_number,
+        run_id=uuid.uuid4().hex,
         user_input=user_input,
         messages=[{
             "role": "user",
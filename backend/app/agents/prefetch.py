@@ -0,0 +1,319 @@
+"""
+Context Prefetch - Busca especulativa do contexto do Narrator
+GEM RPG ORBIS - LangGraph Architecture
+
+O grafo é sequencial (planner -> executor -> validator -> narrator) e o
+contexto do narrador só seria buscado depois da chamada LLM do planner.
+Mas quase tudo que o narrador precisa já é conhecido no início do turno:
+
+- recall (HierarchicalMemory) de cada NPC da cena, com o input do jogador
+- trechos de lore que citam o local atual
+- resumo do turno anterior (GameLog)
+
+`start()` dispara essas buscas em tasks asyncio quando o turno começa; elas
+rodam enquanto o planner espera o LLM. O narrador chama `collect()`, usa o
+que já terminou (com uma pequena tolerância) e as buscas restantes são
+canceladas. Cada turno gera um trace com o tempo sobreposto ao planner.
+
+As buscas ficam indexadas pelo `run_id` do estado (um UUID por execução do
+grafo), não por (session_id, turno): jogadores diferentes podem estar no
+mesmo turno da mesma sessão ("default") e nunca recebem o contexto do outro.
+
+Cada busca no banco usa sua própria AsyncSession (sessões não são seguras
+para uso concorrente); um semáforo limita as conexões simultâneas.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.location_index import normalize_name
+
+
+# Tamanho máximo do trecho de lore entregue ao narrador
+LORE_MAX_CHARS = 1200
+
+
+@dataclass
+class _PrefetchTask:
+    key: str
+    task: asyncio.Task
+    started: float
+    finished: Optional[float] = None
+    status: str = "running"  # running | done | failed | cancelled | unused
+
+
+@dataclass
+class PrefetchHandle:
+    """Buscas especulativas de um turno."""
+    run_id: str
+    session_id: str
+    player_id: Optional[int]
+    turn_number: int
+    started: float
+    tasks: Dict[str, _PrefetchTask] = field(default_factory=dict)
+    collected_at: Optional[float] = None
+
+
+class ContextPrefetcher:
+    """Dispara, coleta e cancela as buscas especulativas por turno."""
+
+    def __init__(self, grace_ms: int = 50, max_concurrency: int = 4, trace_size: int = 50):
+        self.grace_ms = grace_ms
+        self.max_concurrency = max_concurrency
+        self._handles: Dict[str, PrefetchHandle] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lore_by_location: Dict[str, str] = {}
+        self.traces: Deque[Dict[str, Any]] = deque(maxlen=trace_size)
+
+        # Métricas
+        self.turns = 0
+        self.tasks_started = 0
+        self.tasks_used = 0
+        self.tasks_cancelled = 0
+        self.tasks_failed = 0
+        self.overlapped_ms = 0.0
+        self.exposed_ms = 0.0
+
+    # ==================== DISPARO ====================
+
+    def start(self, state: Dict[str, Any]) -> Optional[PrefetchHandle]:
+        """Dispara as buscas do turno (chamado antes do grafo rodar)."""
+        if not settings.CONTEXT_PREFETCH_ENABLED:
+            return None
+
+        run_id = state.get("run_id")
+        if not run_id:
+            return None
+        self.discard(run_id)
+
+        world = state.get("world", {}) or {}
+        query = state.get("user_input", "")
+        player_id = state.get("player_id")
+        handle = PrefetchHandle(
+            run_id=run_id,
+            session_id=state.get("session_id", ""),
+            player_id=player_id,
+            turn_number=state.get("turn_number", 0),
+            started=time.perf_counter(),
+        )
+
+        for npc in world.get("npcs_in_scene", []) or []:
+            npc_id = npc.get("id")
+            if npc_id:
+                self._spawn(handle, f"npc:{npc_id}", self._recall_npc(npc_id, npc.get("name", ""), query))
+        location = world.get("current_location", "")
+        if location:
+            self._spawn(handle, "lore", self._select_lore(location))
+        if player_id:
+            self._spawn(handle, "previous_turn", self._previous_turn(player_id))
+
+        self._handles[run_id] = handle
+        self.turns += 1
+        return handle
+
+    def _spawn(self, handle: PrefetchHandle, key: str, coro: Awaitable[Any]) -> None:
+        entry = _PrefetchTask(key=key, task=asyncio.ensure_future(coro), started=time.perf_counter())
+        entry.task.add_done_callback(lambda _t, e=entry: setattr(e, "finished", time.perf_counter()))
+        handle.tasks[key] = entry
+        self.tasks_started += 1
+
+    def _limit(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    # ==================== BUSCAS ====================
+
+    async def _with_session(self, fetch: Callable[[Any], Awaitable[Any]]) -> Any:
+        from sqlmodel.ext.asyncio.session import AsyncSession
+        from app.database.db_connection import engine
+
+        async with self._limit():
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                return await fetch(session)
+
+    async def _recall_npc(self, npc_id: int, name: str, query: str) -> Dict[str, Any]:
+        from app.core.memory.memory_manager import HierarchicalMemory
+
+        async def fetch(session):
+            bundle = await HierarchicalMemory(session).recall(
+                npc_id, query, max_episodic=3, max_semantic=3, max_procedural=2
+            )
+            return {
+                "name": name,
+                "stance": bundle.relationship_stance,
+                "context": "" if bundle.is_empty() else bundle.get_compact_context(max_items=2),
+            }
+        return await self._with_session(fetch)
+
+    async def _previous_turn(self, player_id: int) -> Optional[Dict[str, Any]]:
+        from app.database.repositories.gamelog_repo import GameLogRepository
+
+        async def fetch(session):
+            turns = await GameLogRepository(session).get_recent_turns(player_id, limit=1)
+            if not turns:
+                return None
+            last = turns[0]
+            return {
+                "turn_number": last.turn_number,
+                "player_input": last.player_input,
+                "summary": (last.action_result or last.scene_description or "")[:300],
+            }
+        return await self._with_session(fetch)
+
+    async def _select_lore(self, location: str) -> str:
+        """Parágrafos de lore que citam o local (cacheado por local)."""
+        key = normalize_name(location)
+        if key not in self._lore_by_location:
+            self._lore_by_location[key] = await asyncio.to_thread(self._match_lore, key)
+        return self._lore_by_location[key]
+
+    @staticmethod
+    def _match_lore(location_key: str) -> str:
+        from app.services.lore_cache import lore_cache
+
+        tokens = [t for t in location_key.split() if len(t) >= 4]
+        if not tokens:
+            return ""
+        scored: List[Tuple[int, str]] = []
+        for paragraph in lore_cache.get_context().split("\n\n"):
+            text = normalize_name(paragraph)
+            if location_key in text:
+                scored.append((len(tokens) + 1, paragraph.strip()))
+            else:
+                hits = sum(1 for t in tokens if t in text)
+                if hits:
+                    scored.append((hits, paragraph.strip()))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        selected, size = [], 0
+        for _, paragraph in scored:
+            if size + len(paragraph) > LORE_MAX_CHARS:
+                break
+            selected.append(paragraph)
+            size += len(paragraph)
+        return "\n\n".join(selected)
+
+    # ==================== CONSUMO ====================
+
+    async def collect(self, run_id: str) -> Dict[str, Any]:
+        """
+        Contexto pronto para o narrador: espera no máximo `grace_ms` pelas
+        buscas pendentes, cancela o resto e fecha o trace do turno.
+        """
+        handle = self._handles.pop(run_id, None)
+        if handle is None:
+            return {}
+
+        handle.collected_at = time.perf_counter()
+        pending = [e.task for e in handle.tasks.values() if not e.task.done()]
+        if pending and self.grace_ms > 0:
+            await asyncio.wait(pending, timeout=self.grace_ms / 1000)
+
+        context: Dict[str, Any] = {"npc_memories": []}
+        for entry in handle.tasks.values():
+            if not entry.task.done():
+                entry.task.cancel()
+                entry.status = "cancelled"
+                continue
+            if entry.task.cancelled() or entry.task.exception() is not None:
+                entry.status = "failed"
+                if not entry.task.cancelled():
+                    print(f"[PREFETCH] {entry.key} falhou: {entry.task.exception()}")
+                continue
+            entry.status = "done"
+            value = entry.task.result()
+            if entry.key.startswith("npc:"):
+                if value and value.get("context"):
+                    context["npc_memories"].append(value)
+            elif value:
+                context[entry.key] = value
+
+        self._trace(handle)
+        return context
+
+    def discard(self, run_id: str) -> None:
+        """Cancela as buscas de um turno que não chegou ao narrador."""
+        handle = self._handles.pop(run_id, None)
+        if handle is None:
+            return
+        for entry in handle.tasks.values():
+            if not entry.task.done():
+                entry.task.cancel()
+                entry.status = "cancelled"
+            elif entry.status == "running":
+                entry.status = "unused"
+                if not entry.task.cancelled():
+                    entry.task.exception()  # evita "exception was never retrieved"
+        self._trace(handle)
+
+    # ==================== TRACES ====================
+
+    def _trace(self, handle: PrefetchHandle) -> None:
+        """
+        overlapped_ms: trabalho de busca que rodou antes do narrador pedir o
+        contexto (escondido atrás do planner/executor). exposed_ms: espera
+        extra do narrador dentro da tolerância.
+        """
+        collected = handle.collected_at or time.perf_counter()
+        tasks = []
+        overlapped = exposed = 0.0
+        for entry in handle.tasks.values():
+            end = entry.finished or collected
+            hidden = max(0.0, min(end, collected) - entry.started) * 1000
+            waited = max(0.0, end - collected) * 1000 if entry.status == "done" else 0.0
+            if entry.status == "done":
+                overlapped += hidden
+                exposed += waited
+                self.tasks_used += 1
+            elif entry.status == "cancelled":
+                self.tasks_cancelled += 1
+            elif entry.status == "failed":
+                self.tasks_failed += 1
+            tasks.append({
+                "key": entry.key,
+                "status": entry.status,
+                "duration_ms": round((end - entry.started) * 1000, 2),
+                "overlapped_ms": round(hidden, 2),
+            })
+
+        self.overlapped_ms += overlapped
+        self.exposed_ms += exposed
+        self.traces.append({
+            "session_id": handle.session_id,
+            "player_id": handle.player_id,
+            "turn_number": handle.turn_number,
+            "collected_after_ms": round((collected - handle.started) * 1000, 2) if handle.collected_at else None,
+            "overlapped_ms": round(overlapped, 2),
+            "exposed_ms": round(exposed, 2),
+            "tasks": tasks,
+        })
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self, traces: int = 10) -> Dict[str, Any]:
+        return {
+            "enabled": settings.CONTEXT_PREFETCH_ENABLED,
+            "grace_ms": self.grace_ms,
+            "turns": self.turns,
+            "in_flight": len(self._handles),
+            "tasks_started": self.tasks_started,
+            "tasks_used": self.tasks_used,
+            "tasks_cancelled": self.tasks_cancelled,
+            "tasks_failed": self.tasks_failed,
+            "overlapped_ms": round(self.overlapped_ms, 2),
+            "exposed_ms": round(self.exposed_ms, 2),
+            "avg_overlapped_ms": round(self.overlapped_ms / self.turns, 2) if self.turns else 0.0,
+            "recent": list(self.traces)[-traces:],
+        }
+
+
+# Instância global
+context_prefetcher = ContextPrefetcher(
+    grace_ms=settings.CONTEXT_PREFETCH_GRACE_MS,
+    max_concurrency=settings.CONTEXT_PREFETCH_MAX_CONCURRENCY,
+)
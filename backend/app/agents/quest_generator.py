@@ -145,7 +145,7 @@ class QuestGenerator:
         print(f"[QUEST GEN] Gerando quest tipo '{quest_type}' para tier {player.cultivation_tier} em {location}")
         
         try:
-            result = self.gemini_client.generate_json(prompt, task="story")
+            result = self.gemini_client.generate_json(prompt, task="story", cache_task="quest")
             
             if "error" in result:
                 print(f"[QUEST GEN] Erro: {result['error']}")
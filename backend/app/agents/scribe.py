@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from app.services.gemini_client import GeminiClient
 
 class Scribe:
@@ -36,7 +36,7 @@ class Scribe:
             f"--- JSON da Nova Habilidade ---"
         )
         
-        new_skill = self.gemini_client.generate_json(prompt, task="story")
+        new_skill = self.gemini_client.generate_json(prompt, task="story", cache_task="skill")
         # Lógica para salvar a nova skill em techniques.json ou no perfil do jogador
         print(f"Nova habilidade gerada: {new_skill.get('name')}")
         return new_skill
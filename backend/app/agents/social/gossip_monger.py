@@ -5,6 +5,7 @@ Gera rumores baseados em eventos do mundo (Sprint 6)
 
 from typing import Dict, Any, List
 from app.services.gemini_client import GeminiClient
+from app.core.world_graph import world_graph
 import random
 
 class GossipMonger:
@@ -124,7 +125,8 @@ class GossipMonger:
                 if prompt:
                     rumor = await self.gemini_client.generate_content_async(
                         prompt=prompt,
-                        model_type="flash"
+                        model_type="flash",
+                        cache_task="rumor"
                     )
                     return rumor.strip()
             except Exception as e:
@@ -192,18 +194,12 @@ Escreva em português brasileiro:
         print(f"Espalhando rumor para {len(npcs)} NPCs...")
     
     def spread_rumors(self):
-        """Espalha rumores para localizações vizinhas."""
-        
-        connections = {
-            "Vila Crisântemos": ["Floresta Nublada", "Cidade Imperial"],
-            "Floresta Nublada": ["Vila Crisântemos", "Cavernas Cristalinas"],
-            "Cidade Imperial": ["Vila Crisântemos", "Templo Abismo"],
-        }
+        """Espalha rumores para localizações vizinhas (adjacência do WorldGraph)."""
         
         for location, rumors in self.rumors_by_location.items():
             for rumor in rumors:
                 if random.random() < 0.4:
-                    neighbors = connections.get(location, [])
+                    neighbors = world_graph.neighbors(location)
                     
                     for neighbor in neighbors:
                         if neighbor not in self.rumors_by_location:
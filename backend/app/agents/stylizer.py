@@ -25,6 +25,6 @@ class Stylizer:
 
         print(f"--- Gerando descrição estilizada para {npc.name} via Gemini ---")
         
-        description = self.gemini_client.generate_text(prompt, task="story")
+        description = self.gemini_client.generate_text(prompt, task="story", cache_task="npc_description")
         
         return description
@@ -39,7 +39,7 @@ class NemesisEngine:
         """
         
         # 1. Buscar vilões hostis
-        hostile_npc_ids = self.profiler.get_hostile_npcs(player.id)
+        hostile_npc_ids = await self.profiler.get_hostile_npc_ids(player, npc_repo.session)
         
         # 2. Mover vilões vingativos
         for npc_id in hostile_npc_ids:
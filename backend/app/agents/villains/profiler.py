@@ -3,10 +3,18 @@ Villain Profiler - Emotional AI System
 Tracks relationships, vendetta, and emotional states (Sprint 6)
 """
 
+from sqlalchemy import or_
+from sqlmodel import select
+
 from app.database.models.npc import NPC
 from app.database.models.player import Player
+from app.database.models.relationship import RelationshipAggregate
+from app.database.repositories.relationship_repo import RelationshipRepository, target_key
 from typing import Dict, Optional
 
+# Hostilidade (score do Profiler) a partir da qual o NPC caça o jogador
+HOSTILITY_THRESHOLD = 50
+
 class Profiler:
     """
     Sistema emocional de NPCs antagonistas.
@@ -37,6 +45,7 @@ class Profiler:
         
         if event_type == "player_attacked_npc":
             self._increase_hostility(target, actor, amount=20)
+            await self._persist_scores(target, actor, npc_repo, hostility=20)
             print(f"Profiler: Hostilidade de {target.name} para com {actor.name} aumentou (+20).")
             
         elif event_type == "player_killed_npc":
@@ -51,18 +60,39 @@ class Profiler:
         elif event_type == "player_killed_npc_friend":
             self._increase_hostility(target, actor, amount=50)
             self._assign_vendetta(target, actor)
+            await self._persist_scores(target, actor, npc_repo, hostility=50)
             print(f"Profiler: {target.name} agora busca vingança contra {actor.name}.")
             
         elif event_type == "player_helped_npc":
             self._increase_friendship(target, actor, amount=15)
+            await self._persist_scores(target, actor, npc_repo, friendship=15)
             print(f"Profiler: Amizade de {target.name} com {actor.name} aumentou (+15).")
             
         elif event_type == "player_spared_enemy":
             # [SPRINT 6] Poupar inimigo gera respeito
             self._increase_respect(target, actor, amount=30)
             target.emotional_state = "respectful"
+            await self._persist_scores(target, actor, npc_repo, respect=30)
             print(f"Profiler: {target.name} agora respeita {actor.name} por tê-lo poupado.")
 
+    async def _persist_scores(self, npc: NPC, player: Player, npc_repo, **deltas: int):
+        """
+        Grava os deltas em relationship_aggregates (o dicionário acima é só cache
+        do processo; o agregado sobrevive a reinícios e alimenta get_hostile_npc_ids).
+        Não faz commit: a transação é do chamador (Director). Um savepoint isola
+        a falha, que é desfeita sem invalidar o resto do turno.
+        """
+        if npc_repo is None or npc.id is None:
+            return
+        session = npc_repo.session
+        try:
+            async with session.begin_nested():
+                await RelationshipRepository(session).adjust_scores(
+                    npc.id, player.name, target_id=player.id, commit=False, **deltas
+                )
+        except Exception as e:
+            print(f"[WARN] Profiler: falha ao persistir relacionamento: {e}")
+
     def _increase_hostility(self, npc: NPC, player: Player, amount: int):
         """Aumenta a hostilidade do NPC em relação ao jogador."""
         
@@ -80,7 +110,7 @@ class Profiler:
         self.relationships[npc.id][player.id]["hostility"] += amount
         
         # Atualizar estado emocional se hostilidade passar de threshold
-        if self.relationships[npc.id][player.id]["hostility"] >= 50:
+        if self.relationships[npc.id][player.id]["hostility"] >= HOSTILITY_THRESHOLD:
             npc.emotional_state = "hostile"
 
     def _increase_friendship(self, npc: NPC, player: Player, amount: int):
@@ -195,6 +225,29 @@ class Profiler:
         
         return None
 
+    async def get_hostile_npc_ids(self, player: Player, session) -> list[int]:
+        """
+        NPCs vivos e ativos que caçam o jogador: hostilidade do próprio Profiler
+        (cache do processo + score persistido em relationship_aggregates) ou
+        vendetta. Postura hostil vinda de override/contagem não conta.
+        """
+        scored = (
+            select(RelationshipAggregate.entity_id)
+            .where(RelationshipAggregate.target_key == target_key(player.name))
+            .where(RelationshipAggregate.hostility >= HOSTILITY_THRESHOLD)
+        )
+        result = await session.execute(
+            select(NPC.id)
+            .where(NPC.is_alive == True, NPC.is_active == True)
+            .where(or_(
+                NPC.id.in_(scored),
+                NPC.id.in_(self.get_hostile_npcs(player.id)),
+                NPC.vendetta_target == player.id,
+            ))
+            .order_by(NPC.id)
+        )
+        return list(result.scalars().all())
+
     def get_hostile_npcs(self, player_id: int) -> list[int]:
         """[SPRINT 6] Retorna lista de NPCs hostis ao jogador."""
         
@@ -202,7 +255,7 @@ class Profiler:
         
         for npc_id, player_relations in self.relationships.items():
             if player_id in player_relations:
-                if player_relations[player_id]["hostility"] >= 50:
+                if player_relations[player_id]["hostility"] >= HOSTILITY_THRESHOLD:
                     hostile_npcs.append(npc_id)
         
         return hostile_npcs
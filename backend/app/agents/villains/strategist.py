@@ -6,6 +6,7 @@ Moves villains around the map and plans ambushes (Sprint 6)
 from typing import Dict, Any, List
 from app.database.models.npc import NPC
 from app.database.models.player import Player
+from app.core.world_graph import WorldGraph, world_graph
 import random
 
 class Strategist:
@@ -15,25 +16,15 @@ class Strategist:
     [SPRINT 6] Sistema de emboscadas e caça.
     """
     
-    def __init__(self, world_map: Dict[str, Any] = None):
+    def __init__(self, graph: WorldGraph = None):
         """
-        Inicializa o estrategista com um mapa do mundo.
+        Inicializa o estrategista com o grafo do mundo.
         
         Args:
-            world_map: Estrutura com locations e conexões
+            graph: WorldGraph compartilhado (padrão: instância global)
         """
         
-        # Mapa padrão baseado em locations_desc.md
-        self.world_map = world_map or {
-            "Vila Crisântemos": ["Floresta Nublada", "Cidade Imperial"],
-            "Floresta Nublada": ["Vila Crisântemos", "Cavernas Cristalinas"],
-            "Cavernas Cristalinas": ["Floresta Nublada", "Cidade Subterrânea"],
-            "Templo Abismo": ["Cidade Imperial", "Montanha Arcaica"],
-            "Cidade Imperial": ["Vila Crisântemos", "Templo Abismo", "Passo da Montanha"],
-            "Montanha Arcaica": ["Templo Abismo", "Passo da Montanha"],
-            "Passo da Montanha": ["Cidade Imperial", "Montanha Arcaica", "Cidade Subterrânea"],
-            "Cidade Subterrânea": ["Cavernas Cristalinas", "Passo da Montanha"]
-        }
+        self.graph = graph or world_graph
         
         # Tracking de ambushes planejadas
         self.planned_ambushes: Dict[int, Dict[str, Any]] = {}  # NPC_ID -> ambush_data
@@ -102,45 +93,14 @@ class Strategist:
     def _get_next_step(self, from_location: str, to_location: str) -> str:
         """
         [SPRINT 6] Calcula o próximo passo na rota.
-        Usa BFS simples para encontrar caminho mais curto.
+        Usa o caminho mínimo (distância + perigo) em cache no WorldGraph.
+        Se não houver rota, fica parado.
         """
-        
-        if from_location == to_location:
-            return from_location
-        
-        # BFS para encontrar caminho
-        queue = [(from_location, [from_location])]
-        visited = {from_location}
-        
-        while queue:
-            current, path = queue.pop(0)
-            
-            # Verificar vizinhos
-            neighbors = self.world_map.get(current, [])
-            
-            for neighbor in neighbors:
-                if neighbor == to_location:
-                    # Chegamos! Retornar próximo passo
-                    if len(path) > 0:
-                        return path[1] if len(path) > 1 else neighbor
-                    return neighbor
-                
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, path + [neighbor]))
-        
-        # Se não encontrou rota, ficar parado
-        return from_location
+        return self.graph.next_step(from_location, to_location)
 
     def _get_random_neighbor(self, location: str) -> str:
         """Retorna uma localização vizinha aleatória."""
-        
-        neighbors = self.world_map.get(location, [])
-        
-        if neighbors:
-            return random.choice(neighbors)
-        
-        return location  # Ficar no mesmo lugar
+        return self.graph.random_neighbor(location)
 
     def _find_safe_location(self, villain: NPC) -> str:
         """
@@ -154,10 +114,10 @@ class Strategist:
         if villain.current_location in safe_locations:
             return villain.current_location
         
-        # Encontrar local seguro mais próximo
-        for safe_loc in safe_locations:
-            if safe_loc in self.world_map.get(villain.current_location, []):
-                return safe_loc
+        # Encontrar local seguro mais próximo: foge um passo na direção dele
+        safe_loc = self.graph.nearest(villain.current_location, safe_locations)
+        if safe_loc:
+            return self._get_next_step(villain.current_location, safe_loc)
         
         # Fallback: qualquer vizinho
         return self._get_random_neighbor(villain.current_location)
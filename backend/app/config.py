@@ -14,6 +14,49 @@ class Settings(BaseSettings):
     GEMINI_MODEL_COMBAT: str = "models/gemini-3-pro-preview"
     GEMINI_MODEL_FAST: str = "models/gemini-2.5-flash-preview-09-2025"
 
+    # Cache de respostas do LLM (ver app/services/llm_cache.py)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 512
+    LLM_CACHE_SEMANTIC: bool = False
+    LLM_CACHE_SEMANTIC_THRESHOLD: float = 0.97
+    # generate_json: JSON mode do SDK + response_schema quando o chamador passa um (ver app/services/json_repair.py)
+    GEMINI_STRUCTURED_OUTPUT: bool = True
+
+    # Banco: echo imprime cada statement (só para debug local); métricas em /system/metrics
+    DB_ECHO: bool = False
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_EXPLAIN_SLOW: bool = True
+
+    # Recall episódico: score = w_sim * similaridade + w_rec * decaimento + w_imp * importância
+    MEMORY_RECALL_SIMILARITY_WEIGHT: float = 1.0
+    MEMORY_RECALL_RECENCY_WEIGHT: float = 0.5
+    MEMORY_RECALL_IMPORTANCE_WEIGHT: float = 0.5
+    MEMORY_RECALL_HALF_LIFE_HOURS: float = 72.0  # Horas de jogo até a recência cair pela metade
+
+    # Cache de fatos/padrões por entidade, compartilhado entre requests (ver app/core/memory/memory_cache.py)
+    MEMORY_FACT_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    MEMORY_PATTERN_CACHE_MAX_BYTES: int = 4 * 1024 * 1024
+
+    # Undo de turnos: diffs reversos de Player/NPC mantidos por jogador (ver app/core/turn_snapshots.py)
+    TURN_SNAPSHOT_RETENTION_TURNS: int = 20
+
+    # Classificador local de intenção (pula o Planner LLM nos casos óbvios)
+    INTENT_CLASSIFIER_ENABLED: bool = True
+    INTENT_CLASSIFIER_THRESHOLD: float = 0.65  # Ajustar com benchmark_intent_classifier.py
+
+    # Busca especulativa do contexto do Narrator em paralelo ao Planner (ver app/agents/prefetch.py)
+    CONTEXT_PREFETCH_ENABLED: bool = True
+    CONTEXT_PREFETCH_GRACE_MS: int = 50  # Espera máxima do narrador por buscas ainda em andamento
+    CONTEXT_PREFETCH_MAX_CONCURRENCY: int = 4  # Conexões simultâneas usadas pelas buscas
+
+    # Intervalo do watcher que recompila ruleset_source/mechanics (ver app/core/ruleset_registry.py)
+    RULESET_WATCH_INTERVAL_SECONDS: float = 2.0
+
+    # Combate em massa vetorizado para hordas e guerras de facção (ver app/core/mass_combat.py)
+    MASS_COMBAT_MAX_ROUNDS: int = 50
+    MASS_COMBAT_MAX_UNITS: int = 500  # Teto de unidades por lado numa batalha de facção
+    ECOLOGY_HORDE_CHANCE: float = 0.1  # Chance diária de uma horda invadir uma região (daily tick)
+
     @property
     def async_database_url(self) -> str:
         """URL para LangGraph PostgresSaver (usa psycopg, não asyncpg)."""
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from app.core.world_version import world_version
 
 class Chronos:
     """
@@ -29,6 +30,7 @@ class Chronos:
         
         self.current_time += timedelta(hours=1)
         self.turn += 1
+        world_version.bump("clock")
         
         new_hour = self.current_time.hour
         new_day = self.current_time.day
@@ -57,6 +59,7 @@ class Chronos:
         """Avança o tempo em um dia completo."""
         self.current_time += timedelta(days=1)
         self.turn = 0
+        world_version.bump("clock")
         self._dawn_triggered_today = False
 
     def get_current_time_str(self) -> str:
@@ -1,31 +1,19 @@
 from typing import Optional
-import json
 import random
-from pathlib import Path
 from app.database.models.player import Player
 from app.database.models.npc import NPC
 from app.core.skill_manager import skill_manager
+from app.core.ruleset_registry import ruleset_registry
 from app.core.tribulation_engine import tribulation_engine
 from app.core.constitution_effects import ConstitutionEffects
+from app.core.effect_scheduler import effect_scheduler
 
 class CombatEngine:
     
-    @staticmethod
-    def _load_cultivation_ranks():
-        """Carrega dados dos tiers de cultivation."""
-        repo_root = Path(__file__).resolve().parents[3]
-        ranks_file = repo_root / "ruleset_source" / "mechanics" / "cultivation_ranks.json"
-        with open(ranks_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
     @staticmethod
     def get_tier_data(tier: int):
-        """Retorna os dados de um tier específico."""
-        ranks_data = CombatEngine._load_cultivation_ranks()
-        for tier_data in ranks_data.get("tiers", []):
-            if tier_data["tier"] == tier:
-                return tier_data
-        return None
+        """Retorna os dados de um tier específico (ruleset compilado, indexado por tier)."""
+        return ruleset_registry.current.tier(tier)
     
     @staticmethod
     def is_silent_art_detected(attacker, defender, skill_id: str) -> bool:
@@ -128,6 +116,9 @@ class CombatEngine:
                 target.status_effects.append(new_effect)
                 print(f"Efeito 'dot' aplicado a {target.name} por {new_effect['duration']} turnos.")
             # Adicionar lógica para outros tipos de efeitos (buffs, debuffs, etc.)
+
+        # Ticks e expiração passam a correr mesmo fora da cena do jogador
+        effect_scheduler.track(target)
     
     @staticmethod
     def process_turn_effects(character: Player | NPC):
@@ -162,6 +153,9 @@ class CombatEngine:
             if base_regen > 0:
                 print(f"{character.name} regenera {base_regen:.1f} HP (Constitution: {regen_rate*100}%).")
         
+        # Turno aplicado em memória: o scheduler não repete este turno no lote
+        effect_scheduler.track(character, processed=True)
+        
         return damage_this_turn
         
     @staticmethod
@@ -0,0 +1,191 @@
+"""
+Content Store - Itens, loot tables e bestiário gerados pelo Architect.
+
+Antes, cada monstro gerado relia o items.json inteiro por drop e
+reescrevia items.json, loot_tables.json e bestiary.json completos
+(DataManager): custo linear no tamanho do conteúdo, e dois spawns
+simultâneos (o npc_pool gera em threads) podiam sobrescrever um ao outro.
+Agora o conteúdo gerado vive em arquivos JSONL append-only:
+
+- Uma linha por escrita ({"key", "value"}); a última linha de uma chave vence
+- Índice em memória por tipo (e itens também por nome): consultas O(1)
+- Escrita = um único write() + fsync sob lock, então uma linha nunca
+  fica intercalada com outra; linha truncada (crash) é ignorada na carga
+  e recebe o \n que faltou, para o próximo append não colar nela
+- Compactação quando há linhas obsoletas demais: o arquivo é reescrito só
+  com as entradas vivas e trocado com os.replace (atômico)
+
+Os arquivos base de ruleset_source/mechanics continuam só leitura; o
+Ruleset (app/core/ruleset_registry.py) consulta este store como sobreposição,
+então LootManager e as game_tools veem conteúdo novo na hora.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+CONTENT_DIR = Path(__file__).resolve().parents[3] / "ruleset_source" / "generated"
+
+KINDS = ("items", "loot_tables", "bestiary")
+
+
+class ContentStore:
+    """Store append-only (JSONL) com índice em memória por tipo de conteúdo."""
+
+    def __init__(self, directory: Path = CONTENT_DIR, compact_ratio: float = 2.0, compact_min_lines: int = 200):
+        self.directory = Path(directory)
+        self.compact_ratio = compact_ratio
+        self.compact_min_lines = compact_min_lines
+        self._index: Dict[str, Dict[str, Dict[str, Any]]] = {kind: {} for kind in KINDS}
+        self._items_by_name: Dict[str, str] = {}
+        self._lines: Dict[str, int] = {kind: 0 for kind in KINDS}
+        self._lock = threading.RLock()
+        self._loaded = False
+
+        # Métricas
+        self.writes = 0
+        self.compactions = 0
+        self.skipped_lines = 0
+
+    def _path(self, kind: str) -> Path:
+        return self.directory / f"{kind}.jsonl"
+
+    # ==================== CARGA ====================
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for kind in KINDS:
+                self._load_kind(kind)
+            self._loaded = True
+
+    def _load_kind(self, kind: str) -> None:
+        path = self._path(kind)
+        if not path.exists():
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Escrita interrompida no meio da linha
+                    self.skipped_lines += 1
+                    continue
+                self._apply(kind, record["key"], record["value"])
+                self._lines[kind] += 1
+        self._repair_tail(path)
+        print(f"[CONTENT STORE] {kind}: {len(self._index[kind])} entradas ({self._lines[kind]} linhas)")
+
+    def _repair_tail(self, path: Path) -> None:
+        """Completa com \\n a última linha deixada sem quebra por um crash."""
+        with open(path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _apply(self, kind: str, key: str, value: Dict[str, Any]) -> None:
+        self._index[kind][key] = value
+        if kind == "items" and value.get("name"):
+            self._items_by_name[value["name"].lower()] = key
+
+    # ==================== ESCRITA ====================
+
+    def put(self, kind: str, key: str, value: Dict[str, Any]) -> Dict[str, Any]:
+        """Grava (ou substitui) uma entrada; visível imediatamente no índice."""
+        self._ensure_loaded()
+        line = json.dumps({"key": key, "value": value}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self._path(kind), "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._apply(kind, key, value)
+            self._lines[kind] += 1
+            self.writes += 1
+            self._maybe_compact(kind)
+        return value
+
+    def ensure_item(self, name: str, defaults: Optional[Dict[str, Any]] = None) -> str:
+        """Id do item gerado com esse nome, criando-o se necessário (idempotente)."""
+        self._ensure_loaded()
+        with self._lock:
+            item_id = self._items_by_name.get(name.lower())
+            if item_id is not None:
+                return item_id
+            item_id = name.lower().replace(" ", "_")
+            self.put("items", item_id, {"id": item_id, "name": name, **(defaults or {})})
+            return item_id
+
+    # ==================== LEITURA ====================
+
+    def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        return self._index[kind].get(key)
+
+    def item(self, key: str) -> Optional[Dict[str, Any]]:
+        """Item gerado por id ou nome (sem diferenciar maiúsculas)."""
+        self._ensure_loaded()
+        key = key.lower()
+        item_id = self._items_by_name.get(key, key)
+        return self._index["items"].get(item_id)
+
+    def keys(self, kind: str) -> List[str]:
+        self._ensure_loaded()
+        return list(self._index[kind])
+
+    def values(self, kind: str) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        return list(self._index[kind].values())
+
+    # ==================== COMPACTAÇÃO ====================
+
+    def _maybe_compact(self, kind: str) -> None:
+        lines, live = self._lines[kind], len(self._index[kind])
+        if lines >= self.compact_min_lines and lines > live * self.compact_ratio:
+            self.compact(kind)
+
+    def compact(self, kind: str) -> None:
+        """Reescreve o arquivo só com as entradas vivas (troca atômica)."""
+        self._ensure_loaded()
+        with self._lock:
+            path = self._path(kind)
+            tmp = path.with_suffix(".jsonl.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for key, value in self._index[kind].items():
+                    f.write(json.dumps({"key": key, "value": value}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+            self._lines[kind] = len(self._index[kind])
+            self.compactions += 1
+            print(f"[CONTENT STORE] {kind} compactado: {self._lines[kind]} linhas")
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._ensure_loaded()
+        return {
+            "entries": {kind: len(self._index[kind]) for kind in KINDS},
+            "lines": dict(self._lines),
+            "writes": self.writes,
+            "compactions": self.compactions,
+            "skipped_lines": self.skipped_lines,
+        }
+
+
+# Instância global
+content_store = ContentStore()
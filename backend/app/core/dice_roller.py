@@ -1,187 +1,467 @@
 """
 🎲 DICE ROLLER - Sistema de Rolagem de Dados
 Usado para cálculos de combate, defesa e checks de skill.
+
+A notação é compilada uma vez (cache) num DiceExpression, que rola um
+resultado, lotes NumPy ou devolve a distribuição exata de probabilidades.
+
+Notação (espaços e maiúsculas ignorados):
+    2d6+3        soma de dados e constantes, com + e - em qualquer ordem
+    1d20-1d4+2   vários grupos de dados
+    4d6kh3       keep highest: mantém os 3 maiores (kl = menores; k = kh)
+    2d20kh1      vantagem / 2d20kl1 desvantagem
+    3d6!         dados explosivos: o valor máximo rola de novo e soma
+    d%           o mesmo que 1d100
+
+Toda rolagem usa um numpy.random.Generator: o global do DiceRoller (troque
+com DiceRoller.seed/DiceRoller.use_rng) ou um passado via `rng`.
 """
 
-import random
-from typing import Optional
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from math import comb
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Limites de segurança (distribuições exatas e input vindo do LLM)
+MAX_DICE = 1000
+MAX_SIDES = 10000
+# Profundidade máxima de explosões por dado (a distribuição é truncada aqui)
+MAX_EXPLOSIONS = 20
+# Totais pré-rolados por expressão para rolagens avulsas no gerador global
+ROLL_BUFFER_SIZE = 256
+# Rolagens usadas para estimar a média de termos com keep (sem montar a distribuição)
+MEAN_SAMPLES = 4096
+
+_TERM = re.compile(r"([+-]?)(?:(\d*)d(\d+|%)(!?)(?:(kh|kl|k)(\d*))?|(\d+))")
+
+# Distribuição: (menor valor possível, probabilidades a partir dele)
+Pmf = Tuple[int, np.ndarray]
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    """Um grupo de dados (ex.: -4d6kh3)."""
+    count: int
+    sides: int
+    sign: int = 1
+    keep: Optional[str] = None  # "h" | "l"
+    keep_count: int = 0
+    explode: bool = False
+
+    def roll_batch(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """Matriz (n, count) com o valor de cada dado (explosões já somadas)."""
+        rolls = rng.integers(1, self.sides + 1, size=(n, self.count))
+        if self.explode:
+            exploding = rolls == self.sides
+            for _ in range(MAX_EXPLOSIONS):
+                if not exploding.any():
+                    break
+                extra = rng.integers(1, self.sides + 1, size=int(exploding.sum()))
+                rolls[exploding] += extra
+                exploding[exploding] = extra == self.sides
+        return rolls
+
+    def kept(self, rolls: np.ndarray) -> np.ndarray:
+        """Dados mantidos por linha (todos, se não houver keep)."""
+        if self.keep is None:
+            return rolls
+        ordered = np.sort(rolls, axis=1)
+        return ordered[:, -self.keep_count:] if self.keep == "h" else ordered[:, :self.keep_count]
+
+    def die_pmf(self) -> Pmf:
+        """Distribuição de um dado (com explosões até MAX_EXPLOSIONS)."""
+        p = 1.0 / self.sides
+        if not self.explode:
+            return 1, np.full(self.sides, p)
+        probs = np.zeros(self.sides * (MAX_EXPLOSIONS + 1))
+        for depth in range(MAX_EXPLOSIONS + 1):
+            weight = p ** depth
+            last = self.sides if depth == MAX_EXPLOSIONS else self.sides - 1
+            start = depth * self.sides
+            probs[start:start + last] += weight * p
+        return 1, probs
+
+    def die_mean(self) -> float:
+        """Média de um dado em forma fechada (explosões até MAX_EXPLOSIONS)."""
+        mean = (self.sides + 1) / 2
+        if not self.explode:
+            return mean
+        p = 1.0 / self.sides
+        return mean * sum(p ** depth for depth in range(MAX_EXPLOSIONS + 1))
+
+    def pmf(self) -> Pmf:
+        offset, die = self.die_pmf()
+        if self.keep is None:
+            low, probs = offset * self.count, die
+            for _ in range(self.count - 1):
+                probs = np.convolve(probs, die)
+        else:
+            low, probs = _keep_pmf(offset, die, self.count, self.keep_count, self.keep == "h")
+        if self.sign < 0:
+            return -(low + len(probs) - 1), probs[::-1]
+        return low, probs
+
+
+def _keep_pmf(offset: int, die: np.ndarray, count: int, keep: int, highest: bool) -> Pmf:
+    """
+    Soma dos `keep` maiores (ou menores) de `count` dados iguais. Percorre as
+    faces da melhor para a pior decidindo quantos dados caem em cada uma
+    (peso multinomial); só os primeiros `keep` dados atribuídos contam.
+    """
+    faces = range(len(die) - 1, -1, -1) if highest else range(len(die))
+    max_sum = (len(die) - 1) * keep
+    # states[atribuídos] = probabilidades da soma (relativa ao offset) dos mantidos
+    states: Dict[int, np.ndarray] = {0: np.zeros(max_sum + 1)}
+    states[0][0] = 1.0
+    for face in faces:
+        p = die[face]
+        if p == 0:
+            continue
+        nxt: Dict[int, np.ndarray] = {}
+        for assigned, probs in states.items():
+            remaining = count - assigned
+            for c in range(remaining + 1):
+                weight = comb(remaining, c) * p ** c
+                kept = min(c, max(0, keep - assigned))
+                shifted = np.zeros(max_sum + 1)
+                shift = kept * face
+                shifted[shift:] = probs[:max_sum + 1 - shift] if shift else probs
+                key = assigned + c
+                nxt[key] = nxt.get(key, 0) + weight * shifted
+        states = nxt
+    return offset * keep, states.get(count, np.zeros(max_sum + 1))
+
+
+class DiceExpression:
+    """Notação compilada: rola, rola em lote e calcula a distribuição exata."""
+
+    def __init__(self, notation: str, terms: Tuple[DiceTerm, ...], constant: int):
+        self.notation = notation
+        self.terms = terms
+        self.constant = constant
+        self._pmf: Optional[Pmf] = None
+        # Totais rolados em lote com o gerador global (consumidos com pop)
+        self._buffer: List[int] = []
+        self._buffer_rng: Optional[np.random.Generator] = None
+
+    def __repr__(self) -> str:
+        return f"DiceExpression({self.notation!r})"
+
+    # ==================== ROLAGEM ====================
+
+    def roll_detailed(self, rng: Optional[np.random.Generator] = None) -> Tuple[int, List[int]]:
+        """(total, valores dos dados mantidos) de uma rolagem."""
+        rng = rng or DiceRoller.rng
+        total, kept_dice = self.constant, []
+        for term in self.terms:
+            kept = term.kept(term.roll_batch(1, rng))[0]
+            total += term.sign * int(kept.sum())
+            kept_dice.extend(int(v) for v in kept)
+        return total, kept_dice
+
+    def roll(self, rng: Optional[np.random.Generator] = None) -> int:
+        """
+        Um total. No gerador global sai de um lote pré-rolado (uma chamada
+        NumPy a cada ROLL_BUFFER_SIZE rolagens); trocar a seed descarta o lote.
+        """
+        if rng is not None:
+            return self.roll_detailed(rng)[0]
+        if self._buffer_rng is not DiceRoller.rng:
+            self._buffer, self._buffer_rng = [], DiceRoller.rng
+        try:
+            return self._buffer.pop()
+        except IndexError:
+            self._buffer = self.roll_batch(ROLL_BUFFER_SIZE, DiceRoller.rng).tolist()
+            return self._buffer.pop()
+
+    def roll_batch(self, n: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """`n` rolagens independentes num array int64."""
+        rng = rng or DiceRoller.rng
+        totals = np.full(n, self.constant, dtype=np.int64)
+        for term in self.terms:
+            totals += term.sign * term.kept(term.roll_batch(n, rng)).sum(axis=1)
+        return totals
+
+    # ==================== PROBABILIDADES ====================
+
+    def pmf(self) -> Pmf:
+        """(menor total, probabilidades) exatas; explosões truncadas em MAX_EXPLOSIONS."""
+        if self._pmf is None:
+            low, probs = self.constant, np.ones(1)
+            for term in self.terms:
+                term_low, term_probs = term.pmf()
+                low, probs = low + term_low, np.convolve(probs, term_probs)
+            self._pmf = (low, probs)
+        return self._pmf
+
+    def distribution(self) -> Dict[int, float]:
+        """Total -> probabilidade (só totais possíveis)."""
+        low, probs = self.pmf()
+        return {low + i: float(p) for i, p in enumerate(probs) if p > 0}
+
+    def chance_at_least(self, target: int) -> float:
+        """P(total >= target), ex.: chance de passar num skill check."""
+        low, probs = self.pmf()
+        index = max(0, target - low)
+        return float(probs[index:].sum()) if index < len(probs) else 0.0
+
+    @property
+    def minimum(self) -> int:
+        low, probs = self.pmf()
+        return low + int(np.flatnonzero(probs)[0])
+
+    @property
+    def maximum(self) -> int:
+        low, probs = self.pmf()
+        return low + int(np.flatnonzero(probs)[-1])
+
+    @property
+    def mean(self) -> float:
+        low, probs = self.pmf()
+        return float(np.dot(np.arange(low, low + len(probs)), probs))
+
+    def quick_mean(self) -> float:
+        """
+        Média sem montar a distribuição exata (seguro para input do LLM):
+        forma fechada para termos sem keep; termos com keep são estimados com
+        MEAN_SAMPLES rolagens num gerador de seed fixa (resultado determinístico).
+        """
+        total = float(self.constant)
+        rng = None
+        for term in self.terms:
+            if term.keep is None:
+                total += term.sign * term.count * term.die_mean()
+                continue
+            rng = rng or np.random.default_rng(0)
+            total += term.sign * float(term.kept(term.roll_batch(MEAN_SAMPLES, rng)).sum(axis=1).mean())
+        return total
+
+
+@lru_cache(maxsize=512)
+def compile_dice(notation: str) -> DiceExpression:
+    """Compila (e cacheia) uma notação de dados. ValueError se inválida."""
+    text = notation.lower().replace(" ", "")
+    if not text:
+        raise ValueError("Notação de dados vazia")
+
+    terms: List[DiceTerm] = []
+    constant = 0
+    position = 0
+    while position < len(text):
+        match = _TERM.match(text, position)
+        if not match or match.end() == position or (position > 0 and not match.group(1)):
+            raise ValueError(f"Notação de dados inválida: {notation!r}")
+        sign_text, count_text, sides_text, bang, keep_text, keep_count_text, number = match.groups()
+        sign = -1 if sign_text == "-" else 1
+        position = match.end()
+
+        if number is not None:
+            constant += sign * int(number)
+            continue
+
+        count = int(count_text) if count_text else 1
+        sides = 100 if sides_text == "%" else int(sides_text)
+        if not 1 <= count <= MAX_DICE or not 1 <= sides <= MAX_SIDES:
+            raise ValueError(f"Dados fora dos limites em {notation!r} (1-{MAX_DICE} dados, 1-{MAX_SIDES} lados)")
+        if bang and sides == 1:
+            raise ValueError(f"d1 não pode explodir: {notation!r}")
+
+        keep, keep_count = None, 0
+        if keep_text:
+            keep = "l" if keep_text == "kl" else "h"
+            keep_count = int(keep_count_text) if keep_count_text else 1
+            if not 1 <= keep_count <= count:
+                raise ValueError(f"Keep inválido em {notation!r}")
+            if keep_count == count:
+                keep = None
+        terms.append(DiceTerm(count, sides, sign, keep, keep_count, bool(bang)))
+
+    return DiceExpression(notation, tuple(terms), constant)
+
+
+D20 = "1d20"
+
 
 class DiceRoller:
     """Sistema centralizado de rolagem de dados para RPG."""
-    
+
+    # Gerador padrão de todas as rolagens (injetável para testes e simulações)
+    rng: np.random.Generator = np.random.default_rng()
+
+    @classmethod
+    def seed(cls, seed: Optional[int]) -> None:
+        """Reinicia o gerador global com uma seed (rolagens reproduzíveis)."""
+        cls.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def use_rng(cls, rng: np.random.Generator) -> None:
+        """Troca o gerador global."""
+        cls.rng = rng
+
     @staticmethod
-    def roll(dice_notation: str) -> int:
+    def compile(dice_notation: str) -> DiceExpression:
+        """Expressão compilada (cacheada) da notação."""
+        return compile_dice(dice_notation)
+
+    @staticmethod
+    def roll(dice_notation: str, rng: Optional[np.random.Generator] = None) -> int:
         """
         Rola dados baseado em notação padrão (ex: '2d6', '1d20+5').
-        
+
         Args:
-            dice_notation: String no formato 'XdY+Z' onde:
-                X = número de dados
-                Y = lados do dado
-                Z = modificador (opcional)
-        
+            dice_notation: Notação (XdY±Z, keep kh/kl, explosivos '!', vários termos)
+            rng: Gerador NumPy (padrão: DiceRoller.rng)
+
         Returns:
             Resultado total da rolagem
-        
+
         Examples:
             roll('1d20') -> 1-20
             roll('2d6+3') -> 5-15
             roll('3d8-2') -> 1-22
+            roll('1d20+5-1d4') -> 2-24
         """
-        # Parse da notação
-        parts = dice_notation.lower().replace(' ', '')
-        
-        # Separar modificador
-        modifier = 0
-        if '+' in parts:
-            parts, mod_str = parts.split('+')
-            modifier = int(mod_str)
-        elif '-' in parts:
-            parts, mod_str = parts.split('-')
-            modifier = -int(mod_str)
-        
-        # Parse de XdY
-        if 'd' not in parts:
-            return int(parts) + modifier
-        
-        num_dice, sides = parts.split('d')
-        num_dice = int(num_dice)
-        sides = int(sides)
-        
-        # Rolar dados
-        total = sum(random.randint(1, sides) for _ in range(num_dice))
-        return total + modifier
-    
+        return compile_dice(dice_notation).roll(rng)
+
+    @staticmethod
+    def roll_batch(dice_notation: str, n: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """`n` rolagens da notação num array NumPy."""
+        return compile_dice(dice_notation).roll_batch(n, rng)
+
     @staticmethod
-    def roll_attack(attack_power: int) -> int:
+    def distribution(dice_notation: str) -> Dict[int, float]:
+        """Distribuição exata: total -> probabilidade."""
+        return compile_dice(dice_notation).distribution()
+
+    @staticmethod
+    def roll_attack(attack_power: int, rng: Optional[np.random.Generator] = None) -> int:
         """
         Rola ataque: 1d20 + attack_power.
-        
+
         Args:
             attack_power: Poder de ataque base
-        
+
         Returns:
             Resultado do roll de ataque
         """
-        return random.randint(1, 20) + attack_power
-    
+        return compile_dice(D20).roll(rng) + attack_power
+
     @staticmethod
-    def roll_defense(defense_power: int) -> int:
+    def roll_defense(defense_power: int, rng: Optional[np.random.Generator] = None) -> int:
         """
         Rola defesa: 1d20 + defense_power.
-        
+
         Args:
             defense_power: Poder de defesa base
-        
+
         Returns:
             Resultado do roll de defesa
         """
-        return random.randint(1, 20) + defense_power
-    
+        return compile_dice(D20).roll(rng) + defense_power
+
     @staticmethod
-    def roll_skill_check(skill_bonus: int, difficulty: int = 15) -> bool:
+    def roll_skill_check(skill_bonus: int, difficulty: int = 15, rng: Optional[np.random.Generator] = None) -> bool:
         """
         Rola check de skill: 1d20 + skill_bonus vs difficulty.
-        
+
         Args:
             skill_bonus: Bônus da skill
             difficulty: DC (Difficulty Class) padrão 15
-        
+
         Returns:
             True se sucesso, False se falha
         """
-        roll = random.randint(1, 20) + skill_bonus
+        roll = compile_dice(D20).roll(rng) + skill_bonus
         return roll >= difficulty
-    
+
     @staticmethod
-    def roll_damage(damage_dice: str, bonus: int = 0) -> int:
+    def roll_damage(damage_dice: str, bonus: int = 0, rng: Optional[np.random.Generator] = None) -> int:
         """
         Rola dano: XdY + bonus.
-        
+
         Args:
             damage_dice: Notação de dados (ex: '2d8')
             bonus: Bônus de dano
-        
+
         Returns:
             Dano total
         """
-        base_damage = DiceRoller.roll(damage_dice)
+        base_damage = DiceRoller.roll(damage_dice, rng)
         return max(0, base_damage + bonus)
-    
+
     @staticmethod
-    def roll_critical() -> bool:
+    def roll_critical(rng: Optional[np.random.Generator] = None) -> bool:
         """
         Verifica se houve crítico (1d20 >= 18).
-        
+
         Returns:
             True se crítico, False caso contrário
         """
-        return random.randint(1, 20) >= 18
-    
+        return compile_dice(D20).roll(rng) >= 18
+
     @staticmethod
-    def roll_percentile() -> int:
+    def roll_percentile(rng: Optional[np.random.Generator] = None) -> int:
         """
         Rola 1d100 (0-99).
-        
+
         Returns:
             Número entre 0-99
         """
-        return random.randint(0, 99)
-    
+        return compile_dice("1d100-1").roll(rng)
+
     @staticmethod
-    def advantage_roll(modifier: int = 0) -> int:
+    def advantage_roll(modifier: int = 0, rng: Optional[np.random.Generator] = None) -> int:
         """
         Rola com vantagem: rola 2d20, pega o maior.
-        
+
         Args:
             modifier: Modificador adicional
-        
+
         Returns:
             Maior resultado + modifier
         """
-        roll1 = random.randint(1, 20)
-        roll2 = random.randint(1, 20)
-        return max(roll1, roll2) + modifier
-    
+        return compile_dice("2d20kh1").roll(rng) + modifier
+
     @staticmethod
-    def disadvantage_roll(modifier: int = 0) -> int:
+    def disadvantage_roll(modifier: int = 0, rng: Optional[np.random.Generator] = None) -> int:
         """
         Rola com desvantagem: rola 2d20, pega o menor.
-        
+
         Args:
             modifier: Modificador adicional
-        
+
         Returns:
             Menor resultado + modifier
         """
-        roll1 = random.randint(1, 20)
-        roll2 = random.randint(1, 20)
-        return min(roll1, roll2) + modifier
-    
+        return compile_dice("2d20kl1").roll(rng) + modifier
+
     @staticmethod
-    def roll_initiative(dexterity_bonus: int = 0) -> int:
+    def roll_initiative(dexterity_bonus: int = 0, rng: Optional[np.random.Generator] = None) -> int:
         """
         Rola iniciativa: 1d20 + dexterity.
-        
+
         Args:
             dexterity_bonus: Bônus de destreza
-        
+
         Returns:
             Iniciativa
         """
-        return random.randint(1, 20) + dexterity_bonus
-    
+        return compile_dice(D20).roll(rng) + dexterity_bonus
+
     @staticmethod
-    def roll_saving_throw(save_bonus: int, dc: int) -> bool:
+    def roll_saving_throw(save_bonus: int, dc: int, rng: Optional[np.random.Generator] = None) -> bool:
         """
         Rola saving throw: 1d20 + bonus vs DC.
-        
+
         Args:
             save_bonus: Bônus do saving throw
             dc: Difficulty Class
-        
+
         Returns:
             True se passou, False se falhou
         """
-        roll = random.randint(1, 20) + save_bonus
+        roll = compile_dice(D20).roll(rng) + save_bonus
         return roll >= dc
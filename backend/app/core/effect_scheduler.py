@@ -0,0 +1,366 @@
+"""
+Effect Scheduler - Efeitos de status de todos os Players/NPCs por turno de jogo
+
+`CombatEngine.process_turn_effects` só roda para quem está na cena do
+jogador: DoT e regeneração de NPCs fora da cena nunca avançavam, e processar
+todo mundo exigiria varrer a tabela inteira a cada turno.
+
+Aqui cada entidade com efeitos ativos (ou regenerando HP) fica agendada numa
+timing wheel hierárquica, indexada pelo turno de jogo:
+
+- Efeitos periódicos (DoT) e regeneração: a entidade vence todo turno
+- Efeitos sem tick (buffs/debuffs futuros): a entidade só vence quando o
+  primeiro deles expira; os turnos pulados são descontados de uma vez
+- `advance` aplica as entidades vencidas no turno com a mesma regra de
+  process_turn_effects e grava tudo num único UPDATE em lote por tabela
+
+O custo por turno é proporcional às entidades vencidas, não ao número de
+entidades do mundo. A wheel guarda um espelho dos efeitos: o CombatEngine
+chama `track` sempre que muda os efeitos de alguém em memória.
+"""
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import JSON, bindparam, case, func, or_, update
+from sqlmodel import select
+
+from app.core.constitution_effects import ConstitutionEffects
+from app.database.models.npc import NPC
+from app.database.models.player import Player
+
+EntityKey = Tuple[str, int]
+
+# Efeitos com tick a cada turno (os demais só expiram)
+PERIODIC_EFFECTS = ("dot",)
+
+# Regeneração base: 5% do HP máximo por turno (process_turn_effects)
+BASE_REGEN_FRACTION = 0.05
+
+
+class TimingWheel:
+    """
+    Timing wheel hierárquica (Varghese & Lauck): `levels` rodas de 2^slot_bits
+    slots; a roda N cobre 2^(slot_bits * (N + 1)) turnos. Um item desce de
+    nível (cascata) quando o turno atual entra no slot dele; o que não cabe
+    na roda mais alta espera num heap de overflow.
+
+    `advance` pula direto para o próximo slot ocupado, então o custo depende
+    dos itens vencidos, não dos turnos percorridos.
+    """
+
+    def __init__(self, slot_bits: int = 6, levels: int = 4, start: int = 0):
+        self.bits = slot_bits
+        self.mask = (1 << slot_bits) - 1
+        self.levels = levels
+        self.slots: List[List[List[Tuple[int, Any]]]] = [[[] for _ in range(1 << slot_bits)] for _ in range(levels)]
+        self.counts = [0] * levels
+        self.overflow: List[Tuple[int, int, Any]] = []
+        self._sequence = itertools.count()
+        self.now = start
+
+    def __len__(self) -> int:
+        return sum(self.counts) + len(self.overflow)
+
+    def _level_for(self, turn: int) -> Optional[int]:
+        """Menor roda em que o turno está na rotação atual (None = overflow)."""
+        for level in range(self.levels):
+            shift = self.bits * (level + 1)
+            if turn >> shift == self.now >> shift:
+                return level
+        return None
+
+    def _insert(self, turn: int, item: Any) -> None:
+        level = self._level_for(turn)
+        if level is None:
+            heapq.heappush(self.overflow, (turn, next(self._sequence), item))
+            return
+        self.slots[level][(turn >> (self.bits * level)) & self.mask].append((turn, item))
+        self.counts[level] += 1
+
+    def schedule(self, turn: int, item: Any) -> int:
+        """Agenda o item no turno (turnos já passados viram o próximo turno)."""
+        turn = max(turn, self.now + 1)
+        self._insert(turn, item)
+        return turn
+
+    def _next_stop(self, limit: int) -> int:
+        """Próximo turno com algo a fazer: slot ocupado da roda 0 ou início de slot ocupado acima."""
+        stop = limit
+        for level in range(self.levels):
+            if not self.counts[level]:
+                continue
+            shift = self.bits * level
+            base = (self.now >> (shift + self.bits)) << (shift + self.bits)
+            for index in range(((self.now >> shift) & self.mask) + 1, self.mask + 1):
+                if self.slots[level][index]:
+                    stop = min(stop, base | (index << shift))
+                    break
+        if self.overflow:
+            top = self.bits * self.levels
+            stop = min(stop, (self.overflow[0][0] >> top) << top)
+        return max(stop, self.now + 1)
+
+    def _cascade(self) -> None:
+        """Desce os itens dos slots em que o turno atual acabou de entrar."""
+        top = self.bits * self.levels
+        if self.now & ((1 << top) - 1) == 0:
+            while self.overflow and self.overflow[0][0] >> top == self.now >> top:
+                turn, _, item = heapq.heappop(self.overflow)
+                self._insert(turn, item)
+        for level in range(self.levels - 1, 0, -1):
+            shift = self.bits * level
+            if self.now & ((1 << shift) - 1):
+                continue
+            slot = self.slots[level][(self.now >> shift) & self.mask]
+            if slot:
+                self.counts[level] -= len(slot)
+                entries = list(slot)
+                slot.clear()
+                for turn, item in entries:
+                    self._insert(turn, item)
+
+    def advance(self, to_turn: int) -> List[Tuple[int, Any]]:
+        """Avança até `to_turn` e retorna os itens vencidos (turno, item), em ordem de turno."""
+        due: List[Tuple[int, Any]] = []
+        while self.now < to_turn:
+            if not len(self):
+                self.now = to_turn
+                break
+            self.now = self._next_stop(to_turn)
+            self._cascade()
+            slot = self.slots[0][self.now & self.mask]
+            if slot:
+                self.counts[0] -= len(slot)
+                due.extend(slot)
+                slot.clear()
+        return due
+
+
+@dataclass
+class TrackedEntity:
+    """Espelho dos efeitos de uma entidade agendada."""
+    kind: str                 # "player" | "npc"
+    entity_id: int
+    name: str
+    effects: List[Dict[str, Any]]
+    current_hp: float
+    max_hp: float
+    regen_fraction: float     # fração do max_hp regenerada por turno (0 = sem regeneração)
+    last_turn: int            # último turno já aplicado
+    token: int = 0
+
+    @property
+    def periodic(self) -> bool:
+        if any(e.get("type") in PERIODIC_EFFECTS for e in self.effects):
+            return True
+        return self.regen_fraction > 0 and self.current_hp < self.max_hp
+
+    @property
+    def dead(self) -> bool:
+        return self.current_hp <= 0
+
+    @property
+    def active(self) -> bool:
+        return not self.dead and (bool(self.effects) or self.periodic)
+
+    def next_due(self) -> int:
+        if self.periodic:
+            return self.last_turn + 1
+        return self.last_turn + min(e["turns_left"] for e in self.effects)
+
+
+class EffectScheduler:
+    """Agenda e aplica em lote os efeitos de status de todos os Players/NPCs."""
+
+    MODELS = {"player": Player, "npc": NPC}
+
+    def __init__(self, slot_bits: int = 6, levels: int = 4):
+        self.wheel = TimingWheel(slot_bits=slot_bits, levels=levels)
+        self.entities: Dict[EntityKey, TrackedEntity] = {}
+        self._tokens = itertools.count(1)
+        self.ticks = 0
+        self.entity_ticks = 0
+        self.stale_skipped = 0
+        self.rows_written = 0
+        self.dot_damage = 0.0
+        self.effects_expired = 0
+        self.deaths = 0
+        self.total_ms = 0.0
+
+    @property
+    def turn(self) -> int:
+        return self.wheel.now
+
+    @staticmethod
+    def entity_key(entity: Player | NPC) -> EntityKey:
+        return ("player" if isinstance(entity, Player) else "npc", entity.id)
+
+    @staticmethod
+    def regen_fraction(entity: Player | NPC) -> float:
+        """Regeneração passiva por constituição (só quem tem constitution_type)."""
+        constitution_type = getattr(entity, "constitution_type", None)
+        if not constitution_type:
+            return 0.0
+        regen_rate = ConstitutionEffects.get_modifiers(constitution_type).get("quintessence_regen", 1.0)
+        return BASE_REGEN_FRACTION * regen_rate
+
+    def track(self, entity: Player | NPC, processed: bool = False) -> None:
+        """
+        (Re)agenda a entidade a partir do estado em memória.
+
+        Args:
+            entity: Player ou NPC cujos efeitos mudaram
+            processed: True se o turno que vai começar já foi aplicado em
+                memória (process_turn_effects); o scheduler pula esse turno
+        """
+        if entity.id is None:
+            return
+        key = self.entity_key(entity)
+        tracked = TrackedEntity(
+            kind=key[0],
+            entity_id=key[1],
+            name=entity.name,
+            effects=[dict(e) for e in entity.status_effects or []],
+            current_hp=entity.current_hp,
+            max_hp=entity.max_hp,
+            regen_fraction=self.regen_fraction(entity),
+            last_turn=self.turn + (1 if processed else 0),
+        )
+        if not tracked.active or not getattr(entity, "is_alive", True):
+            self.entities.pop(key, None)
+            return
+        self._schedule(key, tracked)
+
+    def _schedule(self, key: EntityKey, tracked: TrackedEntity) -> None:
+        # Agendamentos anteriores da entidade ficam obsoletos (token antigo)
+        tracked.token = next(self._tokens)
+        self.entities[key] = tracked
+        self.wheel.schedule(tracked.next_due(), (key, tracked.token))
+
+    def _apply(self, tracked: TrackedEntity, turn: int) -> Dict[str, Any]:
+        """Mesma regra de process_turn_effects para os turnos desde last_turn."""
+        elapsed = turn - tracked.last_turn
+        damage = 0.0
+        remaining = []
+        for effect in tracked.effects:
+            if effect.get("type") == "dot":
+                damage += effect.get("damage", 0) * min(elapsed, effect["turns_left"])
+            effect["turns_left"] -= elapsed
+            if effect["turns_left"] > 0:
+                remaining.append(effect)
+            else:
+                self.effects_expired += 1
+
+        tracked.effects = remaining
+        tracked.current_hp = max(0.0, min(tracked.current_hp - damage + tracked.max_hp * tracked.regen_fraction, tracked.max_hp))
+        if tracked.dead:
+            self.deaths += 1
+        tracked.last_turn = turn
+        self.dot_damage += damage
+        return {"b_id": tracked.entity_id, "b_dot": damage, "b_regen": tracked.regen_fraction, "b_effects": remaining}
+
+    @staticmethod
+    def _bulk_update(model):
+        """
+        UPDATE em lote: HP relativo ao valor do banco (outras escritas no mesmo
+        turno valem), limitado a [0, max_hp]. NPCs que chegam a 0 morrem, como
+        em NpcRepository.update_hp; NPCs já mortos não são tocados.
+        """
+        table = model.__table__
+        raw_hp = table.c.current_hp - bindparam("b_dot") + table.c.max_hp * bindparam("b_regen")
+        hp = func.greatest(func.least(raw_hp, table.c.max_hp), 0)
+        values = {
+            "current_hp": hp,
+            "status_effects": bindparam("b_effects", type_=JSON),
+        }
+        stmt = update(table).where(table.c.id == bindparam("b_id"))
+        if "is_alive" in table.c:
+            values["is_alive"] = case((raw_hp <= 0, False), else_=table.c.is_alive)
+            stmt = stmt.where(table.c.is_alive == True)
+        return stmt.values(**values)
+
+    async def advance(self, session) -> Dict[str, Any]:
+        """
+        Avança um turno de jogo: aplica os efeitos das entidades vencidas e
+        grava o resultado com um UPDATE em lote por tabela.
+
+        Returns:
+            Resumo do tick {turn, entities, dot_damage, expired}
+        """
+        start = time.perf_counter()
+        turn = self.turn + 1
+        expired_before, damage_before = self.effects_expired, self.dot_damage
+
+        rows: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in self.MODELS}
+        for _, (key, token) in self.wheel.advance(turn):
+            tracked = self.entities.get(key)
+            if tracked is None or tracked.token != token:
+                self.stale_skipped += 1
+                continue
+            rows[tracked.kind].append(self._apply(tracked, turn))
+            # Mortos (HP 0) e quem não tem mais efeitos saem do agendamento
+            if tracked.active:
+                self._schedule(key, tracked)
+            else:
+                del self.entities[key]
+
+        written = 0
+        for kind, params in rows.items():
+            if params:
+                await session.execute(self._bulk_update(self.MODELS[kind]), params)
+                written += len(params)
+        if written:
+            await session.commit()
+
+        self.ticks += 1
+        self.entity_ticks += written
+        self.rows_written += written
+        self.total_ms += (time.perf_counter() - start) * 1000
+        summary = {
+            "turn": turn,
+            "entities": written,
+            "dot_damage": round(self.dot_damage - damage_before, 2),
+            "expired": self.effects_expired - expired_before,
+        }
+        if written:
+            print(f"[EFFECTS] Turno {turn}: {written} entidades, {summary['dot_damage']} de dano contínuo, "
+                  f"{summary['expired']} efeitos expirados")
+        return summary
+
+    async def load_from_db(self, session) -> int:
+        """Agenda quem tem efeitos ativos ou está regenerando (chamado uma vez no startup)."""
+        players = await session.exec(select(Player).where(or_(
+            func.json_array_length(Player.status_effects) > 0,
+            Player.current_hp < Player.max_hp,
+        )))
+        npcs = await session.exec(select(NPC).where(
+            NPC.is_alive == True,
+            func.json_array_length(NPC.status_effects) > 0,
+        ))
+        for entity in list(players.all()) + list(npcs.all()):
+            self.track(entity)
+        print(f"[EFFECTS] {len(self.entities)} entidades com efeitos agendadas")
+        return len(self.entities)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "turn": self.turn,
+            "tracked_entities": len(self.entities),
+            "wheel_entries": len(self.wheel),
+            "ticks": self.ticks,
+            "entity_ticks": self.entity_ticks,
+            "stale_skipped": self.stale_skipped,
+            "rows_written": self.rows_written,
+            "dot_damage": round(self.dot_damage, 2),
+            "effects_expired": self.effects_expired,
+            "deaths": self.deaths,
+            "avg_tick_ms": round(self.total_ms / self.ticks, 3) if self.ticks else 0.0,
+        }
+
+
+# Instância global
+effect_scheduler = EffectScheduler()
@@ -0,0 +1,345 @@
+"""
+Location Index - Índice em memória para resolução de nomes de locais.
+
+Antes, cada intenção de movimento passava por alias de casa, alias do
+player, busca exata + ILIKE em dynamic_locations e o dicionário de locais
+estáticos (várias queries por ação). Este índice agrupa tudo:
+- Locais estáticos do Códice e `locations` (mapa do mundo)
+- `dynamic_locations` (inclusive destruídos, com a flag)
+- Aliases pessoais de cada player (carregados sob demanda)
+
+Os nomes são normalizados (sem acento, minúsculos, sem pontuação) e
+indexados numa trie (match exato e por prefixo único) e em trigramas
+(similaridade no estilo pg_trgm para erros de digitação).
+
+Invalidação: DynamicLocationRepository.create/destroy e
+LocationAliasRepository.set_alias marcam o segmento correspondente como
+sujo; ele é reconstruído na próxima resolução.
+"""
+
+import asyncio
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from sqlmodel import select
+
+from app.database.models.location import DynamicLocation, Location, LocationAlias
+
+
+# Similaridade mínima de trigramas para aceitar um match aproximado
+SIMILARITY_THRESHOLD = 0.45
+MIN_PREFIX_LENGTH = 3
+
+# Prioridade em empates (menor = preferido): alias > dinâmico > mapa > estático
+KIND_PRIORITY = {"alias": 0, "dynamic": 1, "world": 2, "static": 3}
+
+
+def normalize_name(text: str) -> str:
+    """'Vila Crisântemos!' -> 'vila crisantemos'"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    stripped = re.sub(r"[^\w\s]", " ", stripped)
+    return " ".join(stripped.split())
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Trigramas por palavra com padding, como o pg_trgm."""
+    grams: Set[str] = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+@dataclass
+class IndexEntry:
+    key: str                      # nome (ou alias) normalizado
+    name: str                     # nome real do local resolvido
+    kind: str                     # static | world | dynamic | alias
+    description: str = ""
+    location_id: Optional[int] = None
+    owner_player_id: Optional[int] = None
+    is_public: bool = True
+    is_destroyed: bool = False
+    grams: FrozenSet[str] = field(default_factory=frozenset)
+
+    def visible_to(self, player_id: Optional[int]) -> bool:
+        return self.is_public or self.owner_player_id == player_id
+
+
+@dataclass
+class ResolvedLocation:
+    entry: IndexEntry
+    match: str        # exact | prefix | fuzzy
+    score: float = 1.0
+
+
+class _Segment:
+    """Conjunto de entradas com trie e postings de trigramas."""
+
+    _TERMINAL = "\0"
+
+    def __init__(self):
+        self.entries: List[IndexEntry] = []
+        self.trie: Dict[str, Any] = {}
+        self.postings: Dict[str, List[int]] = {}
+
+    def add(self, entry: IndexEntry):
+        if not entry.key:
+            return
+        entry.grams = trigrams(entry.key)
+        idx = len(self.entries)
+        self.entries.append(entry)
+
+        node = self.trie
+        for char in entry.key:
+            node = node.setdefault(char, {})
+        node.setdefault(self._TERMINAL, []).append(idx)
+
+        for gram in entry.grams:
+            self.postings.setdefault(gram, []).append(idx)
+
+    def _node(self, key: str) -> Optional[Dict[str, Any]]:
+        node = self.trie
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def exact(self, key: str) -> List[IndexEntry]:
+        node = self._node(key)
+        if not node:
+            return []
+        return [self.entries[i] for i in node.get(self._TERMINAL, [])]
+
+    def prefix(self, key: str, limit: int = 8) -> List[IndexEntry]:
+        node = self._node(key)
+        if not node:
+            return []
+        found: List[IndexEntry] = []
+        stack = [node]
+        while stack and len(found) < limit:
+            current = stack.pop()
+            for char, child in current.items():
+                if char == self._TERMINAL:
+                    found.extend(self.entries[i] for i in child)
+                else:
+                    stack.append(child)
+        return found
+
+    def similar(self, grams: FrozenSet[str]) -> List[Tuple[float, IndexEntry]]:
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for idx in self.postings.get(gram, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        scored = []
+        for idx, count in shared.items():
+            entry = self.entries[idx]
+            score = count / (len(grams) + len(entry.grams) - count)
+            scored.append((score, entry))
+        return scored
+
+
+class LocationResolutionIndex:
+    """
+    Índice global (estáticos + mapa + dinâmicos) e segmentos de aliases por player.
+    """
+
+    def __init__(self, similarity_threshold: float = SIMILARITY_THRESHOLD):
+        self.similarity_threshold = similarity_threshold
+        self._static: Dict[str, Dict[str, str]] = {}
+        self._global: Optional[_Segment] = None
+        self._dynamic_names: Dict[int, str] = {}
+        self._aliases: Dict[int, _Segment] = {}
+        self._lock: Optional[asyncio.Lock] = None
+
+        # Métricas
+        self.lookups = 0
+        self.hits = {"exact": 0, "prefix": 0, "fuzzy": 0}
+        self.misses = 0
+        self.rebuilds = 0
+
+    # ==================== INVALIDAÇÃO ====================
+
+    def register_static(self, locations: Dict[str, Dict[str, str]]):
+        """Registra os locais estáticos do Códice ({chave: {name, description}})."""
+        if locations != self._static:
+            self._static = dict(locations)
+            self._global = None
+
+    def invalidate_locations(self):
+        """Locais dinâmicos ou do mapa mudaram: reconstruir o segmento global."""
+        self._global = None
+        # Aliases de locais dinâmicos guardam o nome resolvido
+        self._aliases.clear()
+
+    def add_dynamic(self, loc: DynamicLocation):
+        """
+        Local dinâmico novo (criado aqui ou achado no banco): entra no segmento
+        global já construído, sem rebuild. Sem segmento, o próximo build o inclui.
+        """
+        if self._global is None or loc.id in self._dynamic_names:
+            return
+        self._dynamic_names[loc.id] = loc.name
+        self._global.add(IndexEntry(
+            key=normalize_name(loc.name),
+            name=loc.name,
+            kind="dynamic",
+            description=loc.description,
+            location_id=loc.id,
+            owner_player_id=loc.owner_player_id,
+            is_public=loc.is_public,
+            is_destroyed=loc.is_destroyed
+        ))
+
+    def invalidate_player(self, player_id: int):
+        """Aliases do player mudaram."""
+        self._aliases.pop(player_id, None)
+
+    # ==================== CONSTRUÇÃO ====================
+
+    async def _ensure_global(self, session) -> _Segment:
+        if self._global is not None:
+            return self._global
+
+        segment = _Segment()
+        for data in self._static.values():
+            segment.add(IndexEntry(
+                key=normalize_name(data["name"]),
+                name=data["name"],
+                kind="static",
+                description=data.get("description", "")
+            ))
+
+        result = await session.execute(select(Location.id, Location.name, Location.short_description))
+        for location_id, name, short_description in result.all():
+            segment.add(IndexEntry(
+                key=normalize_name(name),
+                name=name,
+                kind="world",
+                description=short_description or "",
+                location_id=location_id
+            ))
+
+        result = await session.execute(select(DynamicLocation))
+        dynamic_names: Dict[int, str] = {}
+        for loc in result.scalars().all():
+            dynamic_names[loc.id] = loc.name
+            segment.add(IndexEntry(
+                key=normalize_name(loc.name),
+                name=loc.name,
+                kind="dynamic",
+                description=loc.description,
+                location_id=loc.id,
+                owner_player_id=loc.owner_player_id,
+                is_public=loc.is_public,
+                is_destroyed=loc.is_destroyed
+            ))
+
+        self._dynamic_names = dynamic_names
+        self._global = segment
+        self.rebuilds += 1
+        return segment
+
+    async def _ensure_aliases(self, session, player_id: int) -> _Segment:
+        segment = self._aliases.get(player_id)
+        if segment is not None:
+            return segment
+
+        segment = _Segment()
+        result = await session.execute(select(LocationAlias).where(LocationAlias.player_id == player_id))
+        for alias in result.scalars().all():
+            if alias.location_id and alias.location_id in self._dynamic_names:
+                name = self._dynamic_names[alias.location_id]
+            elif alias.static_location_name:
+                name = alias.static_location_name
+            else:
+                continue
+            segment.add(IndexEntry(
+                key=normalize_name(alias.alias),
+                name=name,
+                kind="alias",
+                location_id=alias.location_id,
+                owner_player_id=player_id,
+                is_public=False
+            ))
+
+        self._aliases[player_id] = segment
+        return segment
+
+    # ==================== RESOLUÇÃO ====================
+
+    async def resolve(self, session, text: str, player_id: int) -> Optional[ResolvedLocation]:
+        """
+        Resolve um nome digitado pelo jogador: exato -> prefixo único -> trigramas.
+        Só consulta o banco quando algum segmento precisa ser (re)construído.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            global_segment = await self._ensure_global(session)
+            alias_segment = await self._ensure_aliases(session, player_id)
+
+        self.lookups += 1
+        key = normalize_name(text)
+        if not key:
+            self.misses += 1
+            return None
+
+        segments = (alias_segment, global_segment)
+
+        def visible(entries: List[IndexEntry]) -> List[IndexEntry]:
+            return sorted(
+                (e for e in entries if e.visible_to(player_id)),
+                key=lambda e: KIND_PRIORITY[e.kind]
+            )
+
+        # 1. Exato
+        for segment in segments:
+            found = visible(segment.exact(key))
+            if found:
+                self.hits["exact"] += 1
+                return ResolvedLocation(found[0], "exact")
+
+        # 2. Prefixo que aponta para um único local (prefixos curtos demais são ambíguos)
+        for segment in segments if len(key) >= MIN_PREFIX_LENGTH else ():
+            found = visible(segment.prefix(key))
+            if found and len({e.name for e in found}) == 1:
+                self.hits["prefix"] += 1
+                return ResolvedLocation(found[0], "prefix")
+
+        # 3. Similaridade de trigramas
+        grams = trigrams(key)
+        best: Optional[Tuple[float, int, IndexEntry]] = None
+        for segment in segments:
+            for score, entry in segment.similar(grams):
+                if score < self.similarity_threshold or not entry.visible_to(player_id):
+                    continue
+                candidate = (score, -KIND_PRIORITY[entry.kind], entry)
+                if best is None or candidate[:2] > best[:2]:
+                    best = candidate
+        if best:
+            self.hits["fuzzy"] += 1
+            return ResolvedLocation(best[2], "fuzzy", round(best[0], 3))
+
+        self.misses += 1
+        return None
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._global.entries) if self._global else 0,
+            "players_with_aliases": len(self._aliases),
+            "lookups": self.lookups,
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "rebuilds": self.rebuilds,
+        }
+
+
+# Instância global
+location_index = LocationResolutionIndex()
@@ -5,11 +5,50 @@ Permite que a IA crie locais baseados na narrativa ou pedidos do player
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from sqlmodel import select
+from sqlalchemy import func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database.models.location import DynamicLocation, LocationAlias
 from ..database.models.player import Player
 from ..services.gemini_client import GeminiClient
+from .location_index import SIMILARITY_THRESHOLD, location_index, normalize_name
+
+
+# Locais principais do Códice Triluna
+STATIC_LOCATIONS = {
+    "vale dos mil picos": {
+        "name": "Vale dos Mil Picos",
+        "description": "Um vale cercado por montanhas pontiagudas que rasgam as nuvens."
+    },
+    "floresta nublada": {
+        "name": "Floresta Nublada",
+        "description": "Uma floresta antiga coberta por névoa eterna, lar de espíritos e bestas."
+    },
+    "vila crisântemos": {
+        "name": "Vila Crisântemos",
+        "description": "Uma pequena vila agrícola conhecida por suas flores douradas."
+    },
+    "cidade imperial": {
+        "name": "Cidade Imperial",
+        "description": "A capital do Império, sede do poder e centro de intrigas."
+    },
+    "seita da lua sombria": {
+        "name": "Seita da Lua Sombria",
+        "description": "Território da temida seita de assassinos e cultivadores das sombras."
+    },
+    "montanha do dragão adormecido": {
+        "name": "Montanha do Dragão Adormecido",
+        "description": "Pico lendário onde dizem dormir um dragão primordial."
+    },
+    "mercado celestial": {
+        "name": "Mercado Celestial",
+        "description": "O maior centro comercial do continente, onde tudo pode ser comprado."
+    },
+    "ruínas do império antigo": {
+        "name": "Ruínas do Império Antigo",
+        "description": "Restos de uma civilização perdida, cheios de tesouros e perigos."
+    }
+}
 
 
 class LocationManager:
@@ -25,6 +64,7 @@ class LocationManager:
     
     # Sinônimos de "casa" em português
     HOME_ALIASES = ["casa", "lar", "meu lar", "minha casa", "residência", "moradia", "cabana", "refúgio"]
+    _HOME_KEYS = {normalize_name(alias) for alias in HOME_ALIASES}
     
     def __init__(self, session: AsyncSession, gemini_client: Optional[GeminiClient] = None):
         self.session = session
@@ -34,41 +74,52 @@ class LocationManager:
         """
         Resolve um nome de local para o local real.
         Retorna info sobre o local (nome real, descrição, se existe, etc.)
-        """
-        location_lower = location_name.lower().strip()
         
+        Aliases do player, locais dinâmicos e estáticos são resolvidos numa única
+        consulta ao índice em memória (exato, prefixo ou aproximado por trigramas).
+        """
         # 1. Verificar se é um alias de casa
-        if location_lower in self.HOME_ALIASES:
+        if normalize_name(location_name) in self._HOME_KEYS:
             return await self._resolve_home(player_id)
         
-        # 2. Verificar aliases personalizados do player
-        alias_result = await self._check_alias(location_lower, player_id)
-        if alias_result:
-            return alias_result
+        # 2. Índice de resolução (aliases > dinâmicos > mapa > estáticos)
+        location_index.register_static(STATIC_LOCATIONS)
+        resolved = await location_index.resolve(self.session, location_name, player_id)
+        if resolved:
+            entry = resolved.entry
+            if entry.kind == "alias":
+                loc_type = "aliased_dynamic" if entry.location_id else "aliased_static"
+            elif entry.kind == "dynamic":
+                loc_type = "dynamic"
+            else:
+                loc_type = "static"
+            return {
+                "found": True,
+                "type": loc_type,
+                "name": entry.name,
+                "description": entry.description,
+                "location_id": entry.location_id,
+                "is_destroyed": entry.is_destroyed,
+                "match": resolved.match,
+                "score": resolved.score
+            }
         
-        # 3. Verificar locais dinâmicos
+        # 3. Fallback no banco (local criado por outro processo desde o último rebuild)
         dynamic = await self._find_dynamic_location(location_name, player_id)
         if dynamic:
+            location_index.add_dynamic(dynamic)
             return {
                 "found": True,
                 "type": "dynamic",
                 "location": dynamic,
+                "location_id": dynamic.id,
                 "name": dynamic.name,
                 "description": dynamic.description,
-                "is_destroyed": dynamic.is_destroyed
-            }
-        
-        # 4. Verificar locais estáticos (do locations_desc.md)
-        static = self._check_static_location(location_name)
-        if static:
-            return {
-                "found": True,
-                "type": "static",
-                "name": static["name"],
-                "description": static["description"]
+                "is_destroyed": dynamic.is_destroyed,
+                "match": "database"
             }
         
-        # 5. Local não encontrado
+        # 4. Local não encontrado
         return {
             "found": False,
             "name": location_name,
@@ -124,95 +175,45 @@ class LocationManager:
             "message": "Você ainda não tem um lar definido neste mundo."
         }
     
-    async def _check_alias(self, alias: str, player_id: int) -> Optional[Dict]:
-        """Verifica aliases personalizados do player"""
-        stmt = select(LocationAlias).where(
-            LocationAlias.alias == alias,
-            LocationAlias.player_id == player_id
-        )
-        result = await self.session.execute(stmt)
-        location_alias = result.scalar_one_or_none()
-        
-        if location_alias:
-            if location_alias.location_id:
-                # Buscar o DynamicLocation
-                stmt = select(DynamicLocation).where(DynamicLocation.id == location_alias.location_id)
+    async def _find_dynamic_location(self, name: str, player_id: int) -> Optional[DynamicLocation]:
+        """
+        Busca um local dinâmico no banco pela similaridade de trigramas (pg_trgm),
+        usando o índice GIN em lower(name). Sem a extensão, cai na busca antiga
+        (nome exato ou ILIKE nos locais do próprio player).
+        """
+        visible = or_(DynamicLocation.is_public == True, DynamicLocation.owner_player_id == player_id)
+        try:
+            similarity = func.similarity(func.lower(DynamicLocation.name), name.lower())
+            # `%` (limiar padrão 0.3) só aproveita o índice; o corte é o mesmo do índice em memória
+            stmt = (
+                select(DynamicLocation)
+                .where(
+                    visible,
+                    func.lower(DynamicLocation.name).op("%")(name.lower()),
+                    similarity >= SIMILARITY_THRESHOLD
+                )
+                .order_by(similarity.desc())
+                .limit(1)
+            )
+            # Savepoint: uma falha aqui não pode desfazer o que o turno já alterou na sessão
+            async with self.session.begin_nested():
                 result = await self.session.execute(stmt)
-                loc = result.scalar_one_or_none()
-                if loc:
-                    return {
-                        "found": True,
-                        "type": "aliased_dynamic",
-                        "location": loc,
-                        "name": loc.name,
-                        "description": loc.description
-                    }
-            elif location_alias.static_location_name:
-                return {
-                    "found": True,
-                    "type": "aliased_static",
-                    "name": location_alias.static_location_name
-                }
+                return result.scalars().first()
+        except Exception as e:
+            print(f"[LOCATION] pg_trgm indisponível, usando ILIKE: {e}")
         
-        return None
-    
-    async def _find_dynamic_location(self, name: str, player_id: int) -> Optional[DynamicLocation]:
-        """Busca um local dinâmico pelo nome"""
-        # Buscar exato
-        stmt = select(DynamicLocation).where(DynamicLocation.name == name)
+        stmt = select(DynamicLocation).where(DynamicLocation.name == name).limit(1)
         result = await self.session.execute(stmt)
-        loc = result.scalar_one_or_none()
-        
+        loc = result.scalars().first()
         if loc:
             return loc
         
-        # Buscar por owner
         stmt = select(DynamicLocation).where(
             DynamicLocation.owner_player_id == player_id,
             DynamicLocation.name.ilike(f"%{name}%")
-        )
+        ).limit(1)
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
-    
-    def _check_static_location(self, name: str) -> Optional[Dict]:
-        """Verifica locais estáticos definidos no jogo"""
-        # Locais principais do Códice Triluna
-        STATIC_LOCATIONS = {
-            "vale dos mil picos": {
-                "name": "Vale dos Mil Picos",
-                "description": "Um vale cercado por montanhas pontiagudas que rasgam as nuvens."
-            },
-            "floresta nublada": {
-                "name": "Floresta Nublada",
-                "description": "Uma floresta antiga coberta por névoa eterna, lar de espíritos e bestas."
-            },
-            "vila crisântemos": {
-                "name": "Vila Crisântemos",
-                "description": "Uma pequena vila agrícola conhecida por suas flores douradas."
-            },
-            "cidade imperial": {
-                "name": "Cidade Imperial",
-                "description": "A capital do Império, sede do poder e centro de intrigas."
-            },
-            "seita da lua sombria": {
-                "name": "Seita da Lua Sombria",
-                "description": "Território da temida seita de assassinos e cultivadores das sombras."
-            },
-            "montanha do dragão adormecido": {
-                "name": "Montanha do Dragão Adormecido",
-                "description": "Pico lendário onde dizem dormir um dragão primordial."
-            },
-            "mercado celestial": {
-                "name": "Mercado Celestial",
-                "description": "O maior centro comercial do continente, onde tudo pode ser comprado."
-            },
-            "ruínas do império antigo": {
-                "name": "Ruínas do Império Antigo",
-                "description": "Restos de uma civilização perdida, cheios de tesouros e perigos."
-            }
-        }
-        
-        return STATIC_LOCATIONS.get(name.lower())
+        return result.scalars().first()
     
     async def create_location_from_session_zero(
         self,
@@ -239,6 +240,7 @@ class LocationManager:
         self.session.add(location)
         await self.session.commit()
         await self.session.refresh(location)
+        location_index.add_dynamic(location)
         
         # Atualizar player com referência
         player.home_location = home_name
@@ -274,6 +276,7 @@ class LocationManager:
         self.session.add(location)
         await self.session.commit()
         await self.session.refresh(location)
+        location_index.add_dynamic(location)
         
         return location
     
@@ -347,3 +350,4 @@ Responda em JSON:
         )
         self.session.add(loc_alias)
         await self.session.commit()
+        location_index.invalidate_player(player_id)
@@ -1,13 +1,235 @@
 """
 Loot Manager
 Gera drops baseados em loot_tables.json (Sprint 5 - Integração com Lore)
+
+As tabelas são compiladas uma vez por monstro (e por valor de sorte) em
+tabelas de alias de Walker: os itens por chance (rare/legendary e o formato
+antigo "drops") viram uma distribuição categórica sobre as combinações de
+itens que podem cair juntos, então um abate custa uma única amostragem O(1)
+por grupo de até ALIAS_MAX_ENTRIES itens, em vez de um random() por item.
+
+`calculate_loot_batch` amostra os drops de muitos abates de uma vez com
+arrays NumPy (hordas, fast-forward da simulação e o simulate_balance.py);
+`calculate_loot` é o mesmo caminho para um único abate.
 """
 
-import json
-import os
-import random
-from typing import Dict, Any, List
-from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.content_store import content_store
+from app.core.dice_roller import DiceRoller
+from app.core.ruleset_registry import RulesetRegistry, ruleset_registry
+
+# Itens por chance em uma mesma tabela de alias (2^N combinações)
+ALIAS_MAX_ENTRIES = 10
+
+RARITIES = ("guaranteed", "rare", "legendary")
+
+
+class AliasTable:
+    """Tabela de alias de Walker (método de Vose): amostragem O(1) de uma categórica."""
+
+    __slots__ = ("outcomes", "prob", "alias")
+
+    def __init__(self, weights: np.ndarray):
+        weights = np.asarray(weights, dtype=float)
+        # Resultados de probabilidade zero ficam fora (erro de arredondamento não os sorteia)
+        self.outcomes = np.flatnonzero(weights > 0)
+        scaled = weights[self.outcomes] * len(self.outcomes) / weights[self.outcomes].sum()
+        self.prob = np.ones(len(self.outcomes))
+        self.alias = np.arange(len(self.outcomes))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def sample(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        column = rng.integers(len(self.outcomes), size=n)
+        picked = np.where(rng.random(n) < self.prob[column], column, self.alias[column])
+        return self.outcomes[picked]
+
+
+class ChanceGroup:
+    """Até ALIAS_MAX_ENTRIES itens independentes: resultado = bitmask dos itens que caíram."""
+
+    __slots__ = ("entries", "table", "bits")
+
+    def __init__(self, entries: np.ndarray, chances: np.ndarray):
+        self.entries = entries
+        self.bits = np.arange(len(entries))
+        masks = (np.arange(2 ** len(entries))[:, None] >> self.bits) & 1
+        self.table = AliasTable(np.prod(np.where(masks, chances, 1.0 - chances), axis=1))
+
+    def sample(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """Matriz (n, itens) de booleanos: quais itens do grupo caíram em cada abate."""
+        return ((self.table.sample(n, rng)[:, None] >> self.bits) & 1).astype(bool)
+
+
+class CompiledLootTable:
+    """
+    Loot table de um monstro compilada para amostragem em lote.
+    Mesma semântica de antes: guaranteed sempre, rare/legendary por chance
+    (multiplicada pela sorte) e o formato antigo "drops" só quando nada caiu.
+    """
+
+    def __init__(self, monster_id: str, source: Optional[Dict[str, Any]], entries: List[Dict[str, Any]], luck_scaled: bool = True):
+        self.monster_id = monster_id
+        self.source = source
+        self.luck_scaled = luck_scaled
+        self.item_ids = tuple(e["item_id"] for e in entries)
+        self.rarity = np.array([RARITIES.index(e["rarity"]) for e in entries], dtype=np.int8)
+        self.quantity_min = np.array([e["quantity_min"] for e in entries], dtype=np.int64)
+        self.quantity_max = np.array([e["quantity_max"] for e in entries], dtype=np.int64)
+        self.ranged = bool((self.quantity_max > self.quantity_min).any())
+        self.chance = np.array([e.get("chance", 1.0) for e in entries], dtype=float)
+
+        stage = np.array([e["stage"] for e in entries], dtype=np.int8)
+        self.guaranteed = np.flatnonzero(stage == 0)
+        self.primary = np.flatnonzero(stage == 1)
+        self.fallback = np.flatnonzero(stage == 2)
+        self._groups: Dict[float, Tuple[List[ChanceGroup], List[ChanceGroup]]] = {}
+        self.groups(1.0)
+
+    @classmethod
+    def from_table(cls, monster_id: str, table: Dict[str, Any]) -> "CompiledLootTable":
+        entries = []
+        for item in table.get("guaranteed", []):
+            quantity = item.get("quantity", 1)
+            entries.append({"item_id": item["item_id"], "quantity_min": quantity, "quantity_max": quantity,
+                            "rarity": "guaranteed", "stage": 0})
+        for rarity, default_chance in (("rare", 0.5), ("legendary", 0.1)):
+            for item in table.get(rarity, []):
+                quantity = item.get("quantity", 1)
+                entries.append({"item_id": item["item_id"], "quantity_min": quantity, "quantity_max": quantity,
+                                "rarity": rarity, "stage": 1, "chance": item.get("chance", default_chance)})
+        # [BACKWARD COMPATIBILITY] Formato antigo com "drops"
+        for item in table.get("drops", []):
+            entries.append({"item_id": item["item_id"], "quantity_min": item.get("quantity_min", 1),
+                            "quantity_max": item.get("quantity_max", 1), "rarity": "rare", "stage": 2,
+                            "chance": item.get("chance", 0.5)})
+        return cls(monster_id, table, entries)
+
+    @classmethod
+    def generic(cls, monster_id: str) -> "CompiledLootTable":
+        """
+        Loot genérico quando a tabela não existe.
+        Baseado nas regras do GDD (cores 100%, sangue 50%, pele 80%, ossos 60%).
+        """
+        entries = [
+            {"item_id": f"{monster_id}_core", "quantity_min": 1, "quantity_max": 1, "rarity": "guaranteed", "stage": 0},
+            {"item_id": f"{monster_id}_blood", "quantity_min": 1, "quantity_max": 3, "rarity": "rare", "stage": 1, "chance": 0.5},
+            {"item_id": f"{monster_id}_hide", "quantity_min": 1, "quantity_max": 1, "rarity": "rare", "stage": 1, "chance": 0.8},
+            {"item_id": f"{monster_id}_bones", "quantity_min": 1, "quantity_max": 2, "rarity": "rare", "stage": 1, "chance": 0.6},
+        ]
+        return cls(monster_id, None, entries, luck_scaled=False)
+
+    @property
+    def is_generic(self) -> bool:
+        return self.source is None
+
+    def _chances(self, entries: np.ndarray, luck: float) -> np.ndarray:
+        chances = self.chance[entries] * (luck if self.luck_scaled else 1.0)
+        return np.clip(chances, 0.0, 1.0)
+
+    def groups(self, luck: float) -> Tuple[List[ChanceGroup], List[ChanceGroup]]:
+        """Tabelas de alias (itens por chance e fallback "drops") para a sorte dada."""
+        if not self.luck_scaled:
+            luck = 1.0
+        compiled = self._groups.get(luck)
+        if compiled is None:
+            if len(self._groups) >= 16:
+                self._groups = {1.0: self._groups[1.0]}
+            compiled = tuple(
+                [ChanceGroup(chunk, self._chances(chunk, luck))
+                 for chunk in np.array_split(entries, -(-len(entries) // ALIAS_MAX_ENTRIES))]
+                if len(entries) else []
+                for entries in (self.primary, self.fallback)
+            )
+            self._groups[luck] = compiled
+        return compiled
+
+    def sample(self, kills: int, luck: float, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Drops de `kills` abates.
+
+        Returns:
+            (abate, entrada da tabela, quantidade) por drop, ordenados por abate
+            e, dentro do abate, na ordem da tabela
+        """
+        primary_groups, fallback_groups = self.groups(luck)
+        hits = np.zeros((kills, len(self.item_ids)), dtype=bool)
+        hits[:, self.guaranteed] = True
+        for group in primary_groups:
+            hits[:, group.entries] = group.sample(kills, rng)
+        if fallback_groups:
+            # O formato antigo só dropa quando nada acima caiu
+            nothing = ~hits.any(axis=1)
+            for group in fallback_groups:
+                hits[:, group.entries] = group.sample(kills, rng) & nothing[:, None]
+
+        # nonzero percorre a matriz por linha: drops já saem ordenados por abate
+        kill, entry = np.nonzero(hits)
+        quantity = self.quantity_min[entry]
+        if self.ranged:
+            quantity = quantity + rng.integers(0, self.quantity_max[entry] - quantity + 1)
+        return kill, entry, quantity
+
+    def expected_quantities(self, luck: float = 1.0) -> Dict[str, float]:
+        """Quantidade esperada de cada item por abate (valor exato, sem amostrar)."""
+        expected: Dict[str, float] = {}
+        mean_quantity = (self.quantity_min + self.quantity_max) / 2
+        for i in self.guaranteed:
+            expected[self.item_ids[i]] = expected.get(self.item_ids[i], 0.0) + float(mean_quantity[i])
+        primary_chances = self._chances(self.primary, luck)
+        for i, chance in zip(self.primary, primary_chances):
+            expected[self.item_ids[i]] = expected.get(self.item_ids[i], 0.0) + float(chance * mean_quantity[i])
+        p_nothing = 0.0 if len(self.guaranteed) else float(np.prod(1.0 - primary_chances))
+        for i, chance in zip(self.fallback, self._chances(self.fallback, luck)):
+            expected[self.item_ids[i]] = expected.get(self.item_ids[i], 0.0) + p_nothing * float(chance * mean_quantity[i])
+        return expected
+
+
+@dataclass
+class LootBatch:
+    """Drops de vários abates em arrays paralelos (um elemento por drop)."""
+    kills: int
+    item_ids: Tuple[str, ...]
+    kill: np.ndarray       # índice do abate
+    item: np.ndarray       # índice em item_ids
+    quantity: np.ndarray
+    rarity: np.ndarray     # índice em RARITIES
+
+    def __len__(self) -> int:
+        return len(self.kill)
+
+    def totals(self) -> Dict[str, int]:
+        """Quantidade total por item_id."""
+        summed = np.bincount(self.item, weights=self.quantity, minlength=len(self.item_ids))
+        return {item_id: int(total) for item_id, total in zip(self.item_ids, summed) if total}
+
+    def per_kill(self, item_values: Optional[np.ndarray] = None) -> np.ndarray:
+        """Soma por abate da quantidade (ou de quantidade * item_values[item])."""
+        weights = self.quantity if item_values is None else self.quantity * np.asarray(item_values)[self.item]
+        return np.bincount(self.kill, weights=weights, minlength=self.kills)
+
+    def drops_for(self, kill: int) -> List[Dict[str, Any]]:
+        """Drops de um abate no formato de calculate_loot."""
+        start, end = np.searchsorted(self.kill, [kill, kill + 1])
+        return [
+            {"item_id": self.item_ids[item], "quantity": int(quantity), "rarity": RARITIES[rarity]}
+            for item, quantity, rarity in zip(self.item[start:end], self.quantity[start:end], self.rarity[start:end])
+        ]
+
+    def to_lists(self) -> List[List[Dict[str, Any]]]:
+        return [self.drops_for(kill) for kill in range(self.kills)]
+
 
 class LootManager:
     """
@@ -15,149 +237,161 @@ class LootManager:
     Baseado no sistema de drop do GDD (cores, sangue, pele, ossos).
     [SPRINT 5] Atualizado para usar estrutura completa do loot_tables.json
     """
-    
-    def __init__(self, loot_tables_path: str = "./ruleset_source/mechanics/loot_tables.json"):
-        self.loot_tables = self._load_loot_tables(loot_tables_path)
 
-    def _load_loot_tables(self, file_path: str) -> Dict[str, Any]:
-        """Carrega as tabelas de loot do arquivo JSON."""
-        loot_path = Path(file_path)
-        
-        if not loot_path.exists():
-            print(f"WARNING: loot_tables.json não encontrado em {file_path}. Usando tabela vazia.")
-            return {"monsters": {}, "exploration": {}, "bosses": {}}
-        
-        try:
-            with open(loot_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                # Validar estrutura (backward compatibility)
-                if "monsters" not in data:
-                    print("WARNING: loot_tables.json está no formato antigo. Usando com fallback.")
-                    return {"monsters": data, "exploration": {}, "bosses": {}}
-                
-                return data
-        except Exception as e:
-            print(f"ERROR ao carregar loot_tables.json: {e}")
-            return {"monsters": {}, "exploration": {}, "bosses": {}}
-    
+    def __init__(self, registry: RulesetRegistry = ruleset_registry):
+        self.registry = registry
+        self._compiled: Dict[str, CompiledLootTable] = {}
+        self._ruleset_version: Optional[int] = None
+        self.batches = 0
+        self.kills_sampled = 0
+        self.drops_sampled = 0
+
+    @property
+    def loot_tables(self) -> Dict[str, Any]:
+        """Tabelas de loot do ruleset atual (monsters/exploration/bosses)."""
+        return self.registry.current.loot
+
+    @staticmethod
+    def normalize_id(monster_id: str) -> str:
+        """Normalizar nome (lowercase, underscore)."""
+        return monster_id.lower().replace("-", "_").replace(" ", "_")
+
+    def precompile(self) -> int:
+        """Compila todas as loot tables do ruleset atual e do content store."""
+        ruleset = self.registry.current
+        self._compiled = {}
+        self._ruleset_version = ruleset.version
+        for monster_id in set(ruleset.loot["monsters"]) | set(content_store.keys("loot_tables")):
+            self.compiled(monster_id)
+        print(f"[LOOT] {len(self._compiled)} loot tables compiladas (ruleset v{ruleset.version})")
+        return len(self._compiled)
+
+    def compiled(self, monster_id: str) -> CompiledLootTable:
+        """
+        Tabela compilada do monstro. Recompila quando o ruleset é recarregado
+        ou a tabela muda no content store (o Architect grava um dict novo).
+        """
+        if self.registry.current.version != self._ruleset_version:
+            self.precompile()
+
+        normalized_id = self.normalize_id(monster_id)
+        # Tabela gerada pelo Architect ou loot_tables.json -> monsters
+        table = self.registry.current.monster_loot(normalized_id)
+        compiled = self._compiled.get(normalized_id)
+        if compiled is not None and compiled.source is table:
+            return compiled
+
+        if table:
+            compiled = CompiledLootTable.from_table(normalized_id, table)
+        else:
+            print(f"WARNING: Loot table para '{monster_id}' não encontrada. Usando loot genérico.")
+            compiled = CompiledLootTable.generic(normalized_id)
+        self._compiled[normalized_id] = compiled
+        return compiled
+
+    def sample_kills(
+        self,
+        monster_id: str,
+        kills: int,
+        player_luck: float = 1.0,
+        rng: Optional[np.random.Generator] = None
+    ) -> LootBatch:
+        """
+        Drops de `kills` abates do mesmo monstro.
+
+        Args:
+            monster_id: ID do monstro
+            kills: Número de abates
+            player_luck: Multiplicador de sorte (1.0 = normal)
+            rng: Gerador NumPy (padrão: DiceRoller.rng)
+        """
+        table = self.compiled(monster_id)
+        kill, entry, quantity = table.sample(kills, player_luck, rng or DiceRoller.rng)
+        self._count(kills, len(kill))
+        item_ids = tuple(dict.fromkeys(table.item_ids))
+        to_item = np.array([item_ids.index(i) for i in table.item_ids], dtype=np.int64)
+        return LootBatch(kills, item_ids, kill, to_item[entry], quantity, table.rarity[entry])
+
+    def calculate_loot_batch(
+        self,
+        monster_ids: Sequence[str],
+        player_luck: float = 1.0,
+        rng: Optional[np.random.Generator] = None
+    ) -> LootBatch:
+        """
+        Calcula o loot de muitos abates de uma vez (um monstro por abate).
+        Cada monstro distinto é amostrado em lote pela sua tabela compilada.
+
+        Args:
+            monster_ids: ID do monstro de cada abate
+            player_luck: Multiplicador de sorte (1.0 = normal, 1.5 = +50% chance)
+            rng: Gerador NumPy (padrão: DiceRoller.rng)
+
+        Returns:
+            LootBatch com os drops de todos os abates (abate i = monster_ids[i])
+        """
+        rng = rng or DiceRoller.rng
+        kills = len(monster_ids)
+        if kills == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return LootBatch(0, (), empty, empty, empty, empty.astype(np.int8))
+
+        positions: Dict[str, List[int]] = {}
+        for i, monster_id in enumerate(monster_ids):
+            positions.setdefault(monster_id, []).append(i)
+
+        vocabulary: Dict[str, int] = {}
+        kill_parts, item_parts, quantity_parts, rarity_parts = [], [], [], []
+        for monster_id, kill_positions in positions.items():
+            kill_positions = np.array(kill_positions)
+            table = self.compiled(monster_id)
+            kill, entry, quantity = table.sample(len(kill_positions), player_luck, rng)
+            to_item = np.array([vocabulary.setdefault(i, len(vocabulary)) for i in table.item_ids], dtype=np.int64)
+            kill_parts.append(kill_positions[kill])
+            item_parts.append(to_item[entry])
+            quantity_parts.append(quantity)
+            rarity_parts.append(table.rarity[entry])
+
+        kill = np.concatenate(kill_parts)
+        order = np.argsort(kill, kind="stable")
+        self._count(kills, len(kill))
+        return LootBatch(
+            kills, tuple(vocabulary), kill[order], np.concatenate(item_parts)[order],
+            np.concatenate(quantity_parts)[order], np.concatenate(rarity_parts)[order],
+        )
+
     def calculate_loot(self, monster_id: str, player_luck: float = 1.0) -> List[Dict[str, Any]]:
         """
         Calcula o loot dropado por um monstro com base em sua tabela.
         [SPRINT 5] Agora suporta guaranteed/rare/legendary + fallback genérico.
-        
+
         Args:
             monster_id: ID do monstro (ex: "iron_hide_boar")
             player_luck: Multiplicador de sorte (1.0 = normal, 1.5 = +50% chance)
-        
+
         Returns:
             Lista de itens dropados [{item_id, quantity, rarity}]
         """
-        
-        # Normalizar nome (lowercase, underscore)
-        normalized_id = monster_id.lower().replace("-", "_").replace(" ", "_")
-        
-        # Tentar buscar na tabela nova (monsters -> monster_id)
-        monster_loot_table = self.loot_tables.get("monsters", {}).get(normalized_id)
-        
-        if not monster_loot_table:
-            print(f"WARNING: Loot table para '{monster_id}' não encontrada. Gerando loot genérico.")
-            return self._generate_generic_loot(monster_id)
-        
-        dropped_loot = []
-        
-        # 1. Guaranteed Drops (100% chance)
-        if "guaranteed" in monster_loot_table:
-            for item in monster_loot_table["guaranteed"]:
-                dropped_loot.append({
-                    "item_id": item["item_id"],
-                    "quantity": item.get("quantity", 1),
-                    "rarity": "guaranteed"
-                })
-        
-        # 2. Rare Drops (chance-based)
-        if "rare" in monster_loot_table:
-            for item in monster_loot_table["rare"]:
-                base_chance = item.get("chance", 0.5)
-                effective_chance = base_chance * player_luck
-                
-                if random.random() < effective_chance:
-                    dropped_loot.append({
-                        "item_id": item["item_id"],
-                        "quantity": item.get("quantity", 1),
-                        "rarity": "rare"
-                    })
-        
-        # 3. Legendary Drops (very low chance)
-        if "legendary" in monster_loot_table:
-            for item in monster_loot_table["legendary"]:
-                base_chance = item.get("chance", 0.1)
-                effective_chance = base_chance * player_luck
-                
-                if random.random() < effective_chance:
-                    dropped_loot.append({
-                        "item_id": item["item_id"],
-                        "quantity": item.get("quantity", 1),
-                        "rarity": "legendary"
-                    })
-        
-        # [BACKWARD COMPATIBILITY] Formato antigo com "drops"
-        if "drops" in monster_loot_table and not dropped_loot:
-            for item_info in monster_loot_table["drops"]:
-                if random.random() < item_info.get("chance", 0.5) * player_luck:
-                    quantity = random.randint(
-                        item_info.get("quantity_min", 1), 
-                        item_info.get("quantity_max", 1)
-                    )
-                    dropped_loot.append({
-                        "item_id": item_info["item_id"], 
-                        "quantity": quantity,
-                        "rarity": "rare"
-                    })
-        
+        dropped_loot = self.sample_kills(monster_id, 1, player_luck).drops_for(0)
         print(f"Loot calculado para {monster_id}: {dropped_loot}")
         return dropped_loot
-    
-    def _generate_generic_loot(self, monster_name: str) -> List[Dict[str, Any]]:
-        """
-        Gera loot genérico quando a tabela não existe.
-        Baseado nas regras do GDD (cores 100%, sangue 50%, pele 80%, ossos 60%).
-        """
-        drops = []
-        
-        # Core (sempre dropa)
-        drops.append({
-            "item_id": f"{monster_name.lower().replace(' ', '_')}_core",
-            "quantity": 1,
-            "rarity": "guaranteed"
-        })
-        
-        # Sangue (50% chance)
-        if random.random() < 0.5:
-            drops.append({
-                "item_id": f"{monster_name.lower().replace(' ', '_')}_blood",
-                "quantity": random.randint(1, 3),
-                "rarity": "rare"
-            })
-        
-        # Pele (80% chance)
-        if random.random() < 0.8:
-            drops.append({
-                "item_id": f"{monster_name.lower().replace(' ', '_')}_hide",
-                "quantity": 1,
-                "rarity": "rare"
-            })
-        
-        # Ossos (60% chance)
-        if random.random() < 0.6:
-            drops.append({
-                "item_id": f"{monster_name.lower().replace(' ', '_')}_bones",
-                "quantity": random.randint(1, 2),
-                "rarity": "rare"
-            })
-        
-        return drops
-    
+
+    def _count(self, kills: int, drops: int) -> None:
+        self.batches += 1
+        self.kills_sampled += kills
+        self.drops_sampled += drops
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tabelas compiladas e volume de abates/drops amostrados."""
+        return {
+            "ruleset_version": self._ruleset_version,
+            "compiled_tables": len(self._compiled),
+            "generic_tables": sum(1 for t in self._compiled.values() if t.is_generic),
+            "batches": self.batches,
+            "kills_sampled": self.kills_sampled,
+            "drops_sampled": self.drops_sampled,
+        }
+
     def format_loot_message(self, drops: List[Dict[str, Any]]) -> str:
         """
         Formata a mensagem de loot para exibir ao jogador.
@@ -188,4 +422,4 @@ class LootManager:
         
         return "🎁 Você encontrou:\n" + "\n".join(items_str)
 
-loot_manager = LootManager(loot_tables_path="ruleset_source/mechanics/loot_tables.json")
+loot_manager = LootManager()
@@ -0,0 +1,403 @@
+"""
+Mass Combat Engine - Combate vetorizado para hordas e guerras de facções
+
+`CombatEngine.calculate_damage` resolve um par atacante/defensor por vez,
+sobre objetos ORM. Para hordas e batalhas de facção isso não escala, então
+o mundo reduzia a luta inteira a uma única rolagem.
+
+Aqui cada lado é um `Army`: N combatentes representados como arrays NumPy
+(HP, defesa, dano base, multiplicadores de constituição, DoT ativo). Cada
+rodada é resolvida de uma vez para todas as unidades, com a mesma fórmula
+do GDD usada pelo CombatEngine:
+
+    Dano = Base * MultConstituição * 100 / (100 + (Defesa - Penetração) * MultDefesa)
+
+Ordem da rodada (simultânea para os dois lados):
+1. Efeitos de início de turno (DoT e regeneração por constituição, como
+   `CombatEngine.process_turn_effects`)
+2. Cada unidade viva escolhe um alvo vivo aleatório do outro lado
+3. Dano acumulado por alvo (np.bincount) e DoT da skill aplicado no alvo
+
+O resultado (MassCombatResult) é agregado: baixas, sobreviventes e dano
+por lado e por tipo de unidade, prontos para o narrador.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.core.constitution_effects import ConstitutionEffects
+from app.core.ruleset_registry import ruleset_registry
+
+
+def skill_profile(skill_id: str) -> Dict[str, Any]:
+    """Parâmetros de dano da skill, lidos como em CombatEngine.calculate_damage."""
+    profile = {
+        "base": 0.0, "penetration": 0.0, "stealth": 0.0, "dot_damage": 0.0, "dot_turns": 0,
+        "cost_type": "none", "cost_amount": 0.0, "cooldown": 0, "tier_requirement": 1,
+    }
+    skill = ruleset_registry.current.skill(skill_id)
+    if not skill:
+        return profile
+
+    profile["base"] = skill.get("base_damage", 0.0)
+    profile["cost_type"] = skill.get("cost_type", "none")
+    profile["cost_amount"] = skill.get("cost_amount", 0.0)
+    profile["cooldown"] = skill.get("cooldown", 0)
+    profile["tier_requirement"] = skill.get("tier_requirement", 1)
+    for effect in skill.get("effects", []) or []:
+        if effect.get("type") == "armor_penetration":
+            profile["penetration"] = effect.get("value", 0.0)
+        elif effect.get("type") == "stealth_bonus" and skill.get("is_silent_art", False):
+            profile["stealth"] = profile["base"] * effect.get("value", 0.0)
+        elif effect.get("type") == "dot":
+            profile["dot_damage"] = effect.get("damage_per_turn", 0)
+            profile["dot_turns"] = effect.get("duration", 0)
+    return profile
+
+
+def constitution_profile(constitution_type: Optional[str]) -> Tuple[float, float, float]:
+    """(mult. de dano, mult. de defesa, regeneração); regeneração 0 sem constituição."""
+    if not constitution_type:
+        return 1.0, 1.0, 0.0
+    modifiers = ConstitutionEffects.get_modifiers(constitution_type)
+    return (
+        modifiers.get("damage_multiplier", 1.0),
+        modifiers.get("defense_multiplier", 1.0),
+        modifiers.get("quintessence_regen", 1.0),
+    )
+
+
+@dataclass
+class Army:
+    """Um lado da batalha: uma linha por combatente em cada array."""
+    name: str
+    kinds: List[str]              # nomes dos tipos de unidade
+    kind: np.ndarray              # índice em `kinds` por unidade
+    hp: np.ndarray
+    max_hp: np.ndarray
+    base_damage: np.ndarray
+    damage_mult: np.ndarray
+    defense: np.ndarray
+    defense_mult: np.ndarray
+    penetration: np.ndarray       # fração da defesa do alvo ignorada
+    stealth_damage: np.ndarray    # bônus de Silent Art se o alvo não detectar
+    tier: np.ndarray              # cultivation_tier (detecção de Silent Arts)
+    regen: np.ndarray             # quintessence_regen (0 = sem constituição)
+    hit_dot_damage: np.ndarray    # DoT que a skill da unidade aplica no alvo
+    hit_dot_turns: np.ndarray
+    dot_damage: np.ndarray = field(default=None)  # DoT ativo na unidade
+    dot_turns: np.ndarray = field(default=None)
+
+    def __post_init__(self):
+        if self.dot_damage is None:
+            self.dot_damage = np.zeros_like(self.hp)
+        if self.dot_turns is None:
+            self.dot_turns = np.zeros(len(self.hp), dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.hp)
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self.hp > 0
+
+    # ==================== CONSTRUÇÃO ====================
+
+    @classmethod
+    def uniform(
+        cls,
+        name: str,
+        count: int,
+        kind: Optional[str] = None,
+        max_hp: float = 100.0,
+        defense: float = 10.0,
+        skill_id: str = "basic_attack",
+        constitution_type: Optional[str] = None,
+        tier: int = 1,
+    ) -> "Army":
+        """N unidades idênticas (defaults iguais aos de um NPC novo)."""
+        skill = skill_profile(skill_id)
+        damage_mult, defense_mult, regen = constitution_profile(constitution_type)
+        full = lambda value: np.full(count, value, dtype=np.float64)
+        return cls(
+            name=name,
+            kinds=[kind or name],
+            kind=np.zeros(count, dtype=np.int32),
+            hp=full(max_hp),
+            max_hp=full(max_hp),
+            base_damage=full(skill["base"] * damage_mult),
+            damage_mult=full(damage_mult),
+            defense=full(defense),
+            defense_mult=full(defense_mult),
+            penetration=full(skill["penetration"]),
+            stealth_damage=full(skill["stealth"] * damage_mult),
+            tier=np.full(count, tier, dtype=np.int32),
+            regen=full(regen),
+            hit_dot_damage=full(skill["dot_damage"]),
+            hit_dot_turns=np.full(count, skill["dot_turns"], dtype=np.int32),
+        )
+
+    @classmethod
+    def from_units(cls, name: str, units: Iterable[Any], skill_id: str = "basic_attack") -> "Army":
+        """Exército a partir de Players/NPCs (lidos, nunca modificados)."""
+        armies = []
+        skill = skill_profile(skill_id)
+        for unit in units:
+            army = cls.uniform(
+                name,
+                1,
+                kind=getattr(unit, "name", name),
+                max_hp=getattr(unit, "max_hp", 100.0),
+                defense=getattr(unit, "defense", 10.0),
+                skill_id=skill_id,
+                constitution_type=getattr(unit, "constitution_type", None),
+                tier=getattr(unit, "cultivation_tier", 1),
+            )
+            army.hp[:] = max(0.0, getattr(unit, "current_hp", army.max_hp[0]))
+            # Bônus de Shadow Chi (só Players têm shadow_chi), como no CombatEngine
+            if skill["cost_type"] == "shadow_chi":
+                army.base_damage[:] = (skill["base"] + getattr(unit, "shadow_chi", 0.0) * 0.02) * army.damage_mult
+            armies.append(army)
+        return cls.merge(name, armies)
+
+    @classmethod
+    def merge(cls, name: str, armies: List["Army"]) -> "Army":
+        """Junta vários grupos (ex.: tipos de monstro da horda) num só lado."""
+        kinds: List[str] = []
+        kind_arrays = []
+        for army in armies:
+            remap = np.array([_index_of(kinds, k) for k in army.kinds], dtype=np.int32)
+            kind_arrays.append(remap[army.kind] if len(army) else army.kind)
+        cat = lambda attr: np.concatenate([getattr(a, attr) for a in armies]) if armies else np.zeros(0)
+        return cls(
+            name=name,
+            kinds=kinds,
+            kind=np.concatenate(kind_arrays) if armies else np.zeros(0, dtype=np.int32),
+            hp=cat("hp"),
+            max_hp=cat("max_hp"),
+            base_damage=cat("base_damage"),
+            damage_mult=cat("damage_mult"),
+            defense=cat("defense"),
+            defense_mult=cat("defense_mult"),
+            penetration=cat("penetration"),
+            stealth_damage=cat("stealth_damage"),
+            tier=cat("tier").astype(np.int32),
+            regen=cat("regen"),
+            hit_dot_damage=cat("hit_dot_damage"),
+            hit_dot_turns=cat("hit_dot_turns").astype(np.int32),
+            dot_damage=cat("dot_damage"),
+            dot_turns=cat("dot_turns").astype(np.int32),
+        )
+
+
+def damage_formula(
+    base: np.ndarray,
+    stealth: np.ndarray,
+    penetration: np.ndarray,
+    attacker_tier: np.ndarray,
+    defense: np.ndarray,
+    defense_mult: np.ndarray,
+    defender_tier: np.ndarray,
+) -> np.ndarray:
+    """
+    CombatEngine.calculate_damage elemento a elemento. `base` e `stealth` já
+    incluem o multiplicador de dano da constituição do atacante.
+    """
+    # Silent Art: bônus furtivo a menos que o alvo esteja 3+ tiers acima
+    undetected = defender_tier - attacker_tier < 3
+    effective_defense = np.maximum(defense - defense * penetration, 0.0) * defense_mult
+    return (base + np.where(undetected, stealth, 0.0)) * 100.0 / (100.0 + effective_defense)
+
+
+def _index_of(items: List[str], item: str) -> int:
+    if item not in items:
+        items.append(item)
+    return items.index(item)
+
+
+@dataclass
+class MassCombatResult:
+    """Resultado agregado de uma batalha em massa."""
+    winner: Optional[str]
+    rounds: int
+    sides: Dict[str, Dict[str, Any]]
+    elapsed_ms: float
+
+    def casualty_rate(self, side: str) -> float:
+        stats = self.sides[side]
+        return stats["casualties"] / stats["units"] if stats["units"] else 0.0
+
+    def summary(self) -> str:
+        """Resumo curto em texto, para eventos e para o narrador."""
+        parts = [
+            f"{name}: {stats['survivors']}/{stats['units']} de pé ({stats['casualties']} baixas)"
+            for name, stats in self.sides.items()
+        ]
+        outcome = f"{self.winner} venceu" if self.winner else "Nenhum lado venceu"
+        return f"{outcome} após {self.rounds} rodadas. " + "; ".join(parts) + "."
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "winner": self.winner,
+            "rounds": self.rounds,
+            "sides": self.sides,
+            "summary": self.summary(),
+            "elapsed_ms": round(self.elapsed_ms, 2),
+        }
+
+
+class MassCombatEngine:
+    """Resolve batalhas entre dois Armies, todas as unidades por rodada."""
+
+    def __init__(self, max_rounds: int = 50):
+        self.max_rounds = max_rounds
+
+        # Métricas
+        self.battles = 0
+        self.units_simulated = 0
+        self.total_ms = 0.0
+
+    # ==================== RODADA ====================
+
+    @staticmethod
+    def _turn_effects(army: Army) -> np.ndarray:
+        """DoT e regeneração de início de turno; retorna o dano de DoT por unidade."""
+        alive = army.alive
+        ticking = alive & (army.dot_turns > 0)
+        dot = np.where(ticking, army.dot_damage, 0.0)
+        army.hp -= dot
+        army.dot_turns[ticking] -= 1
+        army.dot_damage[army.dot_turns <= 0] = 0.0
+
+        # Regeneração passiva: 5% do HP máximo por turno * quintessence_regen
+        regen_mask = alive & (army.hp > 0)
+        army.hp[regen_mask] = np.minimum(
+            army.hp[regen_mask] + army.max_hp[regen_mask] * 0.05 * army.regen[regen_mask],
+            army.max_hp[regen_mask],
+        )
+        return dot
+
+    @staticmethod
+    def _strike(attacker: Army, defender: Army, rng: np.random.Generator) -> np.ndarray:
+        """Cada atacante vivo golpeia um defensor vivo aleatório; retorna o dano por defensor."""
+        attackers = np.flatnonzero(attacker.alive)
+        targets_alive = np.flatnonzero(defender.alive)
+        if len(attackers) == 0 or len(targets_alive) == 0:
+            return np.zeros(len(defender))
+
+        targets = targets_alive[rng.integers(0, len(targets_alive), size=len(attackers))]
+        damage = damage_formula(
+            attacker.base_damage[attackers],
+            attacker.stealth_damage[attackers],
+            attacker.penetration[attackers],
+            attacker.tier[attackers],
+            defender.defense[targets],
+            defender.defense_mult[targets],
+            defender.tier[targets],
+        )
+
+        # DoT da skill: o alvo fica com o mais forte/mais longo que recebeu
+        dotting = attacker.hit_dot_turns[attackers] > 0
+        if dotting.any():
+            np.maximum.at(defender.dot_damage, targets[dotting], attacker.hit_dot_damage[attackers][dotting])
+            np.maximum.at(defender.dot_turns, targets[dotting], attacker.hit_dot_turns[attackers][dotting])
+
+        return np.bincount(targets, weights=damage, minlength=len(defender))
+
+    # ==================== BATALHA ====================
+
+    def simulate(
+        self,
+        side_a: Army,
+        side_b: Army,
+        max_rounds: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> MassCombatResult:
+        """
+        Luta até um lado ser eliminado ou acabar o limite de rodadas. Os
+        arrays dos Armies são modificados. Sem vencedor por eliminação, vence
+        quem preservou a maior fração do HP total.
+        """
+        start = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        max_rounds = max_rounds or self.max_rounds
+        armies = (side_a, side_b)
+        initial_alive = [army.alive.copy() for army in armies]
+        initial_hp = [float(army.hp.sum()) for army in armies]
+        dealt = [0.0, 0.0]
+        dot_taken = [0.0, 0.0]
+
+        rounds = 0
+        while rounds < max_rounds and side_a.alive.any() and side_b.alive.any():
+            rounds += 1
+            for i, army in enumerate(armies):
+                dot_taken[i] += float(self._turn_effects(army).sum())
+
+            to_b = self._strike(side_a, side_b, rng)
+            to_a = self._strike(side_b, side_a, rng)
+            side_b.hp -= to_b
+            side_a.hp -= to_a
+            dealt[0] += float(to_b.sum())
+            dealt[1] += float(to_a.sum())
+
+        alive_a, alive_b = side_a.alive.any(), side_b.alive.any()
+        if alive_a != alive_b:
+            winner = side_a.name if alive_a else side_b.name
+        elif alive_a:
+            ratio = [
+                float(np.clip(army.hp, 0, None).sum()) / hp if hp else 0.0
+                for army, hp in zip(armies, initial_hp)
+            ]
+            winner = side_a.name if ratio[0] > ratio[1] else side_b.name if ratio[1] > ratio[0] else None
+        else:
+            winner = None
+
+        sides = {
+            army.name: self._side_stats(army, initial_alive[i], dealt[i], dot_taken[i])
+            for i, army in enumerate(armies)
+        }
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.battles += 1
+        self.units_simulated += len(side_a) + len(side_b)
+        self.total_ms += elapsed_ms
+        return MassCombatResult(winner=winner, rounds=rounds, sides=sides, elapsed_ms=elapsed_ms)
+
+    @staticmethod
+    def _side_stats(army: Army, initial_alive: np.ndarray, dealt: float, dot_taken: float) -> Dict[str, Any]:
+        alive = army.alive
+        fallen = initial_alive & ~alive
+        by_kind = {}
+        for index, kind in enumerate(army.kinds):
+            of_kind = army.kind == index
+            by_kind[kind] = {
+                "units": int((of_kind & initial_alive).sum()),
+                "survivors": int((of_kind & alive).sum()),
+                "casualties": int((of_kind & fallen).sum()),
+            }
+        return {
+            "units": int(initial_alive.sum()),
+            "survivors": int(alive.sum()),
+            "casualties": int(fallen.sum()),
+            "damage_dealt": round(dealt, 1),
+            "dot_damage_taken": round(dot_taken, 1),
+            "hp_remaining": round(float(np.clip(army.hp, 0, None).sum()), 1),
+            "by_kind": by_kind,
+        }
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "battles": self.battles,
+            "units_simulated": self.units_simulated,
+            "avg_ms": round(self.total_ms / self.battles, 3) if self.battles else 0.0,
+        }
+
+
+# Instância global
+mass_combat_engine = MassCombatEngine(max_rounds=settings.MASS_COMBAT_MAX_ROUNDS)
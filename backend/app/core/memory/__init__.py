@@ -11,9 +11,11 @@ A HierarchicalMemory orquestra as três stores e fornece
 interface unificada para remember/recall.
 """
 
-from app.core.memory.episodic import EpisodicMemory, EpisodicStore, TimeRange
+from app.core.memory.episodic import EpisodicMemory, EpisodicStore, TimeRange, RecallWeights
 from app.core.memory.semantic import SemanticFact, SemanticStore, FactType
 from app.core.memory.procedural import BehaviorPattern, ProceduralStore, PatternType
+from app.core.memory.memory_cache import EntityMemoryCache, fact_cache, pattern_cache
+from app.core.memory.consolidation import ConsolidationPolicy, ConsolidationReport, MemoryConsolidator, memory_consolidator
 from app.core.memory.memory_manager import HierarchicalMemory, MemoryBundle, GameEvent
 
 __all__ = [
@@ -21,6 +23,7 @@ __all__ = [
     "EpisodicMemory",
     "EpisodicStore", 
     "TimeRange",
+    "RecallWeights",
     # Semantic
     "SemanticFact",
     "SemanticStore",
@@ -29,6 +32,15 @@ __all__ = [
     "BehaviorPattern",
     "ProceduralStore",
     "PatternType",
+    # Cache
+    "EntityMemoryCache",
+    "fact_cache",
+    "pattern_cache",
+    # Consolidation
+    "ConsolidationPolicy",
+    "ConsolidationReport",
+    "MemoryConsolidator",
+    "memory_consolidator",
     # Manager
     "HierarchicalMemory",
     "MemoryBundle",
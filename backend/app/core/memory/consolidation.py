@@ -0,0 +1,546 @@
+"""
+Memory Consolidation - Digests e retenção em camadas
+GEM RPG ORBIS - Arquitetura Cognitiva
+
+A tabela `memory` é quente: toda busca vetorial e todo LIKE de fatos e
+padrões passam por ela. Sem consolidação ela cresce sem limite. Este
+módulo mantém cada entidade dentro de um orçamento:
+
+1. As `keep_recent` memórias episódicas mais novas ficam intactas
+2. As mais antigas são agrupadas por similaridade de embedding e
+   proximidade no tempo de jogo (clusters)
+3. Cada cluster vira UMA memória "digest" (resumo por template ou LLM),
+   com importância máxima, valência média e embedding do centróide
+4. As linhas originais vão para o arquivo frio `memory_archive`
+5. Se ainda assim a entidade passar do orçamento, as memórias antigas de
+   menor importância são arquivadas sem digest
+
+Fatos semânticos e padrões procedurais (também na tabela `memory`) nunca
+são tocados aqui.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple, TYPE_CHECKING
+
+from app.core.memory.episodic import EmotionalValence, parse_game_time
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "ConsolidationPolicy",
+    "ConsolidationReport",
+    "MemoryConsolidator",
+    "memory_consolidator",
+]
+
+
+# Linhas episódicas (inclusive texto puro antigo, marcado por migrate_memory_columns.py)
+EPISODIC_FILTER = "memory_type = 'episodic'"
+
+DIGEST_EVENT_TYPE = "digest"
+
+_VALENCE_SCORES = {
+    EmotionalValence.VERY_NEGATIVE.value: -1.0,
+    EmotionalValence.NEGATIVE.value: -0.5,
+    EmotionalValence.NEUTRAL.value: 0.0,
+    EmotionalValence.POSITIVE.value: 0.5,
+    EmotionalValence.VERY_POSITIVE.value: 1.0,
+}
+
+
+@dataclass
+class ConsolidationPolicy:
+    """Parâmetros de consolidação e retenção por entidade."""
+    # Consolidar quando a entidade tiver pelo menos N memórias episódicas quentes
+    trigger_count: int = 50
+    # Teto de memórias episódicas quentes após a consolidação
+    hot_budget: int = 40
+    # Memórias mais recentes que nunca são consolidadas
+    keep_recent: int = 20
+    # Similaridade de cosseno mínima com o centróide do cluster
+    similarity_threshold: float = 0.80
+    # Distância máxima (em dias de jogo) entre memórias do mesmo cluster
+    time_window_days: float = 3.0
+    min_cluster_size: int = 2
+    max_cluster_size: int = 12
+    # Memórias acima desta importância não são removidas pelo orçamento
+    protect_importance: float = 0.85
+    # Escritas (remember/Director/HybridSearch) checam a contagem a cada N inserts
+    check_every_inserts: int = 10
+
+
+@dataclass
+class ConsolidationReport:
+    """Resultado de uma rodada de consolidação."""
+    entity_id: int
+    hot_before: int = 0
+    hot_after: int = 0
+    clusters: int = 0
+    digests_created: int = 0
+    rows_archived: int = 0
+    evicted_by_budget: int = 0
+    digest_ids: List[int] = field(default_factory=list)
+
+    @property
+    def rows_reclaimed(self) -> int:
+        return self.hot_before - self.hot_after
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "entity_id": self.entity_id,
+            "hot_before": self.hot_before,
+            "hot_after": self.hot_after,
+            "clusters": self.clusters,
+            "digests_created": self.digests_created,
+            "rows_archived": self.rows_archived,
+            "evicted_by_budget": self.evicted_by_budget,
+            "rows_reclaimed": self.rows_reclaimed,
+        }
+
+
+@dataclass
+class _HotRow:
+    """Linha episódica carregada para consolidação."""
+    id: int
+    data: Dict[str, Any]
+    embedding: Optional[List[float]]
+    game_day: Optional[float]
+
+    @property
+    def importance(self) -> float:
+        return float(self.data.get("importance", 0.5))
+
+    @property
+    def is_digest(self) -> bool:
+        return self.data.get("event_type") == DIGEST_EVENT_TYPE
+
+
+def _parse_game_day(game_time: Optional[str]) -> Optional[float]:
+    """'DD-MM-YYYY HH:MM' -> dias (fracionários) para medir distância no tempo."""
+    dt = parse_game_time(game_time)
+    if dt is None:
+        return None
+    return dt.toordinal() + (dt.hour * 60 + dt.minute) / 1440.0
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+def _valence_from_score(score: float) -> str:
+    """Valência mais próxima de uma média de scores."""
+    return min(_VALENCE_SCORES, key=lambda v: abs(_VALENCE_SCORES[v] - score))
+
+
+class _Cluster:
+    """Cluster incremental com centróide (soma dos vetores) e janela de tempo."""
+
+    def __init__(self, row: _HotRow):
+        self.rows: List[_HotRow] = [row]
+        self.vector_sum: Optional[List[float]] = list(row.embedding) if row.embedding else None
+        self.first_day = row.game_day
+        self.last_day = row.game_day
+
+    @property
+    def centroid(self) -> Optional[List[float]]:
+        if self.vector_sum is None:
+            return None
+        n = len(self.rows)
+        return [x / n for x in self.vector_sum]
+
+    def accepts(self, row: _HotRow, policy: ConsolidationPolicy) -> bool:
+        if len(self.rows) >= policy.max_cluster_size:
+            return False
+        if row.game_day is not None and self.first_day is not None:
+            if row.game_day - self.first_day > policy.time_window_days:
+                return False
+        if row.embedding is None or self.vector_sum is None:
+            return False
+        return _cosine(row.embedding, self.vector_sum) >= policy.similarity_threshold
+
+    def add(self, row: _HotRow) -> None:
+        self.rows.append(row)
+        self.vector_sum = [a + b for a, b in zip(self.vector_sum, row.embedding)]
+        if row.game_day is not None:
+            self.first_day = row.game_day if self.first_day is None else min(self.first_day, row.game_day)
+            self.last_day = row.game_day if self.last_day is None else max(self.last_day, row.game_day)
+
+
+class MemoryConsolidator:
+    """
+    Motor de consolidação de memórias episódicas.
+    Uma instância global acumula métricas de todas as rodadas.
+    """
+
+    def __init__(self, policy: Optional[ConsolidationPolicy] = None, llm_client=None):
+        self.policy = policy or ConsolidationPolicy()
+        # Cliente LLM opcional (GeminiClient) para resumir clusters; sem ele usa template
+        self.llm_client = llm_client
+
+        # Métricas
+        self.runs = 0
+        self.clusters = 0
+        self.digests_created = 0
+        self.rows_archived = 0
+        self.rows_reclaimed = 0
+        self.evicted_by_budget = 0
+        self.forgotten = 0
+        self.llm_failures = 0
+        self.last_run: Optional[str] = None
+
+        # Inserts desde a última checagem, por entidade
+        self._pending_inserts: Dict[int, int] = {}
+
+    # ==================== CARGA ====================
+
+    async def count_hot(self, session: "AsyncSession", entity_id: int) -> int:
+        """Conta memórias episódicas (inclusive digests) na tabela quente."""
+        from sqlalchemy import text
+
+        result = await session.execute(
+            text(f"SELECT COUNT(*) FROM memory WHERE npc_id = :entity_id AND {EPISODIC_FILTER}"),
+            {"entity_id": entity_id}
+        )
+        return result.scalar() or 0
+
+    async def _load_hot(self, session: "AsyncSession", entity_id: int) -> List[_HotRow]:
+        """Carrega as memórias episódicas quentes, da mais nova para a mais antiga."""
+        from sqlalchemy import text
+
+        result = await session.execute(
+            text(f"""
+                SELECT id, content, embedding FROM memory
+                WHERE npc_id = :entity_id AND {EPISODIC_FILTER}
+                ORDER BY id DESC
+            """),
+            {"entity_id": entity_id}
+        )
+
+        rows = []
+        for memory_id, content, embedding in result.fetchall():
+            if content.startswith("{"):
+                try:
+                    data = json.loads(content)
+                except ValueError:
+                    data = {"description": content}
+            else:
+                data = {"description": content, "event_type": "unknown"}
+            rows.append(_HotRow(
+                id=memory_id,
+                data=data,
+                embedding=[float(x) for x in embedding] if embedding is not None else None,
+                game_day=_parse_game_day(data.get("game_time")),
+            ))
+        return rows
+
+    # ==================== CLUSTERING ====================
+
+    def _cluster(self, rows: List[_HotRow]) -> List[_Cluster]:
+        """
+        Agrupamento guloso em ordem cronológica: cada memória entra no cluster
+        aberto mais similar (dentro da janela de tempo) ou abre um novo.
+        """
+        clusters: List[_Cluster] = []
+        for row in sorted(rows, key=lambda r: (r.game_day is None, r.game_day or 0.0, r.id)):
+            best: Optional[Tuple[float, _Cluster]] = None
+            for cluster in clusters:
+                if not cluster.accepts(row, self.policy):
+                    continue
+                score = _cosine(row.embedding, cluster.vector_sum)
+                if best is None or score > best[0]:
+                    best = (score, cluster)
+            if best:
+                best[1].add(row)
+            else:
+                clusters.append(_Cluster(row))
+        return [c for c in clusters if len(c.rows) >= self.policy.min_cluster_size]
+
+    # ==================== DIGEST ====================
+
+    def _template_summary(self, cluster: _Cluster) -> str:
+        """Resumo determinístico: tipos, locais, participantes e trechos."""
+        type_counts: Dict[str, int] = {}
+        locations: List[str] = []
+        participants: List[str] = []
+        for row in cluster.rows:
+            event_type = row.data.get("event_type", "unknown")
+            type_counts[event_type] = type_counts.get(event_type, 0) + 1
+            location = row.data.get("location")
+            if location and location not in locations:
+                locations.append(location)
+            for name in row.data.get("participants", []):
+                if name not in participants:
+                    participants.append(name)
+
+        types_str = ", ".join(f"{t} x{n}" for t, n in sorted(type_counts.items(), key=lambda i: -i[1]))
+        parts = [f"{len(cluster.rows)} eventos semelhantes ({types_str})"]
+        if locations:
+            parts.append("em " + ", ".join(locations[:3]))
+        if participants:
+            parts.append("envolvendo " + ", ".join(participants[:4]))
+
+        # Trechos das memórias mais importantes
+        top = sorted(cluster.rows, key=lambda r: -r.importance)[:3]
+        snippets = "; ".join(str(r.data.get("description", ""))[:80] for r in top)
+        return " ".join(parts) + f". Destaques: {snippets}"
+
+    async def _llm_summary(self, cluster: _Cluster) -> Optional[str]:
+        """Resume o cluster com o LLM (modelo rápido). None em caso de falha."""
+        lines = "\n".join(
+            f"- [{r.data.get('game_time', '?')}] {r.data.get('description', '')}"
+            for r in cluster.rows
+        )
+        prompt = (
+            "Resuma as memórias abaixo de um personagem em UMA frase curta em português, "
+            "preservando nomes, locais e o impacto emocional:\n" + lines
+        )
+        try:
+            summary = await self.llm_client.generate_content_async(
+                prompt, model_type="flash", cache_task="memory_digest"
+            )
+        except Exception as e:
+            logger.warning(f"Falha ao resumir cluster com LLM: {e}")
+            summary = None
+        if not summary or summary.startswith("(IA instável)"):
+            self.llm_failures += 1
+            return None
+        return summary.strip()
+
+    async def _build_digest(self, entity_id: int, cluster: _Cluster) -> Dict[str, Any]:
+        """Monta o conteúdo JSON (formato episódico) do digest de um cluster."""
+        summary = None
+        if self.llm_client is not None:
+            summary = await self._llm_summary(cluster)
+        if summary is None:
+            summary = self._template_summary(cluster)
+
+        rows = sorted(cluster.rows, key=lambda r: (r.game_day or 0.0, r.id))
+        valence_score = sum(
+            _VALENCE_SCORES.get(r.data.get("emotional_valence", "neutral"), 0.0) for r in rows
+        ) / len(rows)
+        participants: List[str] = []
+        for row in rows:
+            for name in row.data.get("participants", []):
+                if name not in participants:
+                    participants.append(name)
+
+        return {
+            "type": "episodic",
+            "event_type": DIGEST_EVENT_TYPE,
+            "description": summary,
+            "location": rows[-1].data.get("location", "Desconhecido"),
+            "participants": participants,
+            "game_time": rows[-1].data.get("game_time", "01-01-1000 12:00"),
+            "emotional_valence": _valence_from_score(valence_score),
+            "importance": max(r.importance for r in rows),
+            "metadata": {
+                "digest": True,
+                "source_ids": [r.id for r in rows],
+                "source_count": len(rows),
+                "game_time_range": [rows[0].data.get("game_time"), rows[-1].data.get("game_time")],
+            },
+        }
+
+    # ==================== ARQUIVO ====================
+
+    async def _archive(
+        self,
+        session: "AsyncSession",
+        ids: List[int],
+        reason: str,
+        digest_id: Optional[int] = None
+    ) -> int:
+        """Move linhas de `memory` para `memory_archive` (mesma transação da sessão)."""
+        from sqlalchemy import text
+
+        if not ids:
+            return 0
+        await session.execute(
+            text("""
+                INSERT INTO memory_archive
+                    (original_id, npc_id, content, embedding, digest_id, reason, archived_at)
+                SELECT id, npc_id, content, embedding, :digest_id, :reason, :archived_at
+                FROM memory WHERE id = ANY(:ids)
+            """),
+            {"ids": ids, "digest_id": digest_id, "reason": reason, "archived_at": datetime.utcnow()}
+        )
+        result = await session.execute(
+            text("DELETE FROM memory WHERE id = ANY(:ids)"),
+            {"ids": ids}
+        )
+        return result.rowcount or 0
+
+    async def _insert_digest(
+        self,
+        session: "AsyncSession",
+        entity_id: int,
+        content: Dict[str, Any],
+        embedding: Optional[List[float]]
+    ) -> int:
+        from sqlalchemy import text, bindparam
+        from pgvector.sqlalchemy import Vector
+
+        sql = text("""
+            INSERT INTO memory (
+                npc_id, content, embedding, memory_type, event_type,
+                importance, emotional_valence, game_time, created_at
+            )
+            VALUES (
+                :entity_id, :content, :embedding, 'episodic', :event_type,
+                :importance, :emotional_valence, :game_time, :created_at
+            )
+            RETURNING id
+        """).bindparams(bindparam("embedding", type_=Vector(128)))
+        result = await session.execute(sql, {
+            "entity_id": entity_id,
+            "content": json.dumps(content, ensure_ascii=False),
+            "embedding": embedding,
+            "event_type": content["event_type"],
+            "importance": content["importance"],
+            "emotional_valence": content["emotional_valence"],
+            "game_time": parse_game_time(content["game_time"]),
+            "created_at": datetime.utcnow(),
+        })
+        return result.scalar()
+
+    # ==================== API ====================
+
+    async def consolidate(
+        self,
+        session: "AsyncSession",
+        entity_id: int,
+        force: bool = False
+    ) -> ConsolidationReport:
+        """
+        Consolida as memórias episódicas antigas de uma entidade.
+
+        Args:
+            session: Sessão do banco (commit ao final)
+            entity_id: ID da entidade
+            force: Consolidar mesmo abaixo de `trigger_count`
+
+        Returns:
+            ConsolidationReport com clusters, digests e linhas recuperadas
+        """
+        policy = self.policy
+        rows = await self._load_hot(session, entity_id)
+        report = ConsolidationReport(entity_id=entity_id, hot_before=len(rows))
+
+        if not force and len(rows) < policy.trigger_count:
+            report.hot_after = len(rows)
+            return report
+
+        # 1. Só memórias antigas (as recentes ficam intactas) e que ainda não são digests
+        old = rows[policy.keep_recent:]
+        candidates = [r for r in old if not r.is_digest]
+
+        # 2. Clusters -> digests
+        hot = {r.id: r for r in rows}
+        for cluster in self._cluster(candidates):
+            content = await self._build_digest(entity_id, cluster)
+            digest_id = await self._insert_digest(session, entity_id, content, cluster.centroid)
+            source_ids = [r.id for r in cluster.rows]
+            report.rows_archived += await self._archive(session, source_ids, "consolidated", digest_id)
+            report.clusters += 1
+            report.digests_created += 1
+            report.digest_ids.append(digest_id)
+            for memory_id in source_ids:
+                hot.pop(memory_id, None)
+            hot[digest_id] = _HotRow(digest_id, content, None, None)
+
+        # 3. Orçamento: arquivar as antigas menos importantes (digests por último)
+        excess = len(hot) - policy.hot_budget
+        if excess > 0:
+            recent_ids = {r.id for r in rows[:policy.keep_recent]}
+            evictable = [
+                r for r in hot.values()
+                if r.id not in recent_ids and r.importance < policy.protect_importance
+            ]
+            evictable.sort(key=lambda r: (r.is_digest, r.importance, r.id))
+            evict_ids = [r.id for r in evictable[:excess]]
+            evicted = await self._archive(session, evict_ids, "budget")
+            report.rows_archived += evicted
+            report.evicted_by_budget = evicted
+            for memory_id in evict_ids:
+                hot.pop(memory_id, None)
+
+        await session.commit()
+        report.hot_after = len(hot)
+
+        # Métricas globais
+        self.runs += 1
+        self.clusters += report.clusters
+        self.digests_created += report.digests_created
+        self.rows_archived += report.rows_archived
+        self.rows_reclaimed += report.rows_reclaimed
+        self.evicted_by_budget += report.evicted_by_budget
+        self.last_run = datetime.utcnow().isoformat()
+
+        logger.info(
+            f"Consolidação da entidade {entity_id}: {report.hot_before} -> {report.hot_after} "
+            f"memórias quentes ({report.digests_created} digests, {report.rows_archived} arquivadas)"
+        )
+        return report
+
+    async def maybe_consolidate(
+        self,
+        session: "AsyncSession",
+        entity_id: int
+    ) -> Optional[ConsolidationReport]:
+        """
+        Registra um insert e, a cada `check_every_inserts`, consolida se a
+        entidade passou do gatilho. Evita um COUNT por memória gravada.
+        """
+        pending = self._pending_inserts.get(entity_id, 0) + 1
+        if pending < self.policy.check_every_inserts:
+            self._pending_inserts[entity_id] = pending
+            return None
+        self._pending_inserts[entity_id] = 0
+
+        if await self.count_hot(session, entity_id) < self.policy.trigger_count:
+            return None
+        return await self.consolidate(session, entity_id, force=True)
+
+    async def forget(self, session: "AsyncSession", entity_id: int, memory_ids: List[int]) -> int:
+        """Arquiva memórias específicas (forget_about). Retorna quantas saíram da tabela quente."""
+        removed = await self._archive(session, list(memory_ids), "forgotten")
+        await session.commit()
+        self.forgotten += removed
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "policy": {
+                "trigger_count": self.policy.trigger_count,
+                "hot_budget": self.policy.hot_budget,
+                "keep_recent": self.policy.keep_recent,
+                "similarity_threshold": self.policy.similarity_threshold,
+                "time_window_days": self.policy.time_window_days,
+            },
+            "runs": self.runs,
+            "clusters": self.clusters,
+            "digests_created": self.digests_created,
+            "rows_archived": self.rows_archived,
+            "rows_reclaimed": self.rows_reclaimed,
+            "evicted_by_budget": self.evicted_by_budget,
+            "forgotten": self.forgotten,
+            "llm_failures": self.llm_failures,
+            "last_run": self.last_run,
+        }
+
+
+# Instância global
+memory_consolidator = MemoryConsolidator()
@@ -29,6 +29,7 @@ __all__ = [
     "EpisodicStore",
     "TimeRange",
     "EmotionalValence",
+    "RecallWeights",
 ]
 
 
@@ -67,6 +68,38 @@ class TimeRange:
         return cls(start=None, end=None)
 
 
+@dataclass
+class RecallWeights:
+    """
+    Pesos do recall pontuado (ver EpisodicStore.query_scored):
+    score = similarity * sim + recency * 0.5^(idade/half_life) + importance * imp
+    """
+    similarity: float = 1.0
+    recency: float = 0.5
+    importance: float = 0.5
+    half_life_hours: float = 72.0  # Horas de jogo
+
+    @classmethod
+    def from_settings(cls) -> "RecallWeights":
+        from app.config import settings
+        return cls(
+            similarity=settings.MEMORY_RECALL_SIMILARITY_WEIGHT,
+            recency=settings.MEMORY_RECALL_RECENCY_WEIGHT,
+            importance=settings.MEMORY_RECALL_IMPORTANCE_WEIGHT,
+            half_life_hours=settings.MEMORY_RECALL_HALF_LIFE_HOURS,
+        )
+
+
+def parse_game_time(game_time: Optional[str]) -> Optional[datetime]:
+    """'DD-MM-YYYY HH:MM' -> datetime (None se inválido)."""
+    if not game_time:
+        return None
+    try:
+        return datetime.strptime(game_time, "%d-%m-%Y %H:%M")
+    except ValueError:
+        return None
+
+
 @dataclass
 class EpisodicMemory:
     """
@@ -188,10 +221,16 @@ class EpisodicStore:
         from pgvector.sqlalchemy import Vector
         from sqlalchemy import bindparam
         
-        # Inserir na tabela memory com campos extras em JSON
+        # JSON completo em content; campos de filtro/ranking também em colunas reais
         sql = text("""
-            INSERT INTO memory (npc_id, content, embedding)
-            VALUES (:entity_id, :content, :embedding)
+            INSERT INTO memory (
+                npc_id, content, embedding, memory_type, event_type,
+                importance, emotional_valence, game_time, created_at
+            )
+            VALUES (
+                :entity_id, :content, :embedding, 'episodic', :event_type,
+                :importance, :emotional_valence, :game_time, :created_at
+            )
             RETURNING id
         """).bindparams(
             bindparam("embedding", type_=Vector(128))
@@ -201,6 +240,11 @@ class EpisodicStore:
             "entity_id": memory.entity_id,
             "content": content,
             "embedding": memory.embedding,
+            "event_type": memory.event_type,
+            "importance": memory.importance_score,
+            "emotional_valence": memory.emotional_valence.value,
+            "game_time": parse_game_time(memory.game_timestamp),
+            "created_at": memory.timestamp,
         })
         
         await self.session.commit()
@@ -274,41 +318,66 @@ class EpisodicStore:
         """
         from sqlalchemy import text
         
-        # Query base
-        sql = """
-            SELECT id, content 
+        # Filtros aplicados no banco (colunas reais): só `limit` linhas voltam
+        where, params = self._filters(entity_id, time_range, event_types, min_importance)
+        sql = f"""
+            SELECT id, content, created_at
             FROM memory 
-            WHERE npc_id = :entity_id
+            WHERE {where}
             ORDER BY id DESC
             LIMIT :limit
         """
+        params["limit"] = limit
         
-        result = await self.session.execute(
-            text(sql),
-            {"entity_id": entity_id, "limit": limit * 2}  # Pegar mais para filtrar
-        )
+        result = await self.session.execute(text(sql), params)
         
-        rows = result.fetchall()
         memories = []
-        
-        for row in rows:
-            memory = self._parse_memory_content(row[0], row[1], entity_id)
+        for row in result.fetchall():
+            memory = self._parse_memory_content(row[0], row[1], entity_id, created_at=row[2])
             if memory:
-                # Filtrar por event_types se especificado
-                if event_types and memory.event_type not in event_types:
-                    continue
-                
-                # Filtrar por importância
-                if memory.importance_score < min_importance:
-                    continue
-                
                 memories.append(memory)
-                
-                if len(memories) >= limit:
-                    break
         
         return memories
     
+    def _filters(
+        self,
+        entity_id: int,
+        time_range: Optional[TimeRange] = None,
+        event_types: Optional[List[str]] = None,
+        min_importance: float = 0.0,
+        valences: Optional[List[str]] = None
+    ) -> tuple:
+        """Monta o WHERE (e os parâmetros) das buscas episódicas."""
+        clauses = ["npc_id = :entity_id", "memory_type = 'episodic'"]
+        params: Dict[str, Any] = {"entity_id": entity_id}
+        
+        if event_types:
+            clauses.append("event_type = ANY(:event_types)")
+            params["event_types"] = list(event_types)
+        if min_importance > 0.0:
+            clauses.append("COALESCE(importance, 0.5) >= :min_importance")
+            params["min_importance"] = min_importance
+        if valences:
+            clauses.append("emotional_valence = ANY(:valences)")
+            params["valences"] = list(valences)
+        if time_range and time_range.start:
+            clauses.append("created_at >= :start")
+            params["start"] = time_range.start
+        if time_range and time_range.end:
+            clauses.append("created_at <= :end")
+            params["end"] = time_range.end
+        
+        return " AND ".join(clauses), params
+    
+    def _query_vector(self, query_text: str) -> List[float]:
+        """Embedding da query ajustado para 128D."""
+        query_vec = self.embedding_service.generate_embedding(query_text)
+        if len(query_vec) > 128:
+            query_vec = query_vec[:128]
+        elif len(query_vec) < 128:
+            query_vec = query_vec + [0.0] * (128 - len(query_vec))
+        return query_vec
+    
     async def query_semantic(
         self,
         entity_id: int,
@@ -332,18 +401,13 @@ class EpisodicStore:
         from pgvector.sqlalchemy import Vector
         from sqlalchemy import bindparam
         
-        # Gerar embedding da query
-        query_vec = self.embedding_service.generate_embedding(query_text)
-        if len(query_vec) > 128:
-            query_vec = query_vec[:128]
-        elif len(query_vec) < 128:
-            query_vec = query_vec + [0.0] * (128 - len(query_vec))
+        query_vec = self._query_vector(query_text)
         
         # Busca vetorial com distância coseno
         sql = text("""
-            SELECT id, content, 1 - (embedding <=> :qvec) as similarity
+            SELECT id, content, 1 - (embedding <=> :qvec) as similarity, created_at
             FROM memory
-            WHERE npc_id = :entity_id
+            WHERE npc_id = :entity_id AND memory_type = 'episodic'
             ORDER BY embedding <=> :qvec
             LIMIT :limit
         """).bindparams(
@@ -360,12 +424,102 @@ class EpisodicStore:
         memories = []
         
         for row in rows:
-            similarity = row[2] if len(row) > 2 else 0.5
+            similarity = row[2] if row[2] is not None else 0.0
             if similarity < min_similarity:
                 continue
             
-            memory = self._parse_memory_content(row[0], row[1], entity_id)
+            memory = self._parse_memory_content(row[0], row[1], entity_id, created_at=row[3])
+            if memory:
+                memories.append(memory)
+        
+        return memories
+    
+    async def query_scored(
+        self,
+        entity_id: int,
+        query_text: str,
+        limit: int = 5,
+        weights: Optional[RecallWeights] = None,
+        now: Optional[datetime] = None,
+        event_types: Optional[List[str]] = None,
+        min_importance: float = 0.0,
+        min_similarity: float = 0.0
+    ) -> List[EpisodicMemory]:
+        """
+        Recall pontuado: uma única query ranqueia por
+        similaridade vetorial + decaimento exponencial de recência + importância.
+        
+        A recência é medida em horas de JOGO entre `now` (padrão: relógio do
+        mundo) e o game_time da memória. O conjunto por entidade é limitado pelo
+        orçamento da consolidação, então o scan por npc_id é barato.
+        
+        Args:
+            entity_id: ID da entidade
+            query_text: Texto da query
+            limit: Top-k retornado
+            weights: Pesos (padrão: settings.MEMORY_RECALL_*)
+            now: Tempo de jogo de referência
+            event_types: Filtrar tipos de evento (opcional)
+            min_importance: Importância mínima
+            min_similarity: Similaridade mínima
+        
+        Returns:
+            Memórias ordenadas por score (score em metadata["recall_score"])
+        """
+        import math
+        from sqlalchemy import text, bindparam, Float, DateTime
+        from pgvector.sqlalchemy import Vector
+        
+        weights = weights or RecallWeights.from_settings()
+        if now is None:
+            from app.core.chronos import world_clock
+            now = world_clock.get_current_datetime()
+        
+        where, params = self._filters(entity_id, None, event_types, min_importance)
+        sql = text(f"""
+            SELECT id, content, created_at, similarity, score FROM (
+                SELECT id, content, created_at,
+                       COALESCE(1 - (embedding <=> :qvec), 0) AS similarity,
+                       :w_sim * COALESCE(1 - (embedding <=> :qvec), 0)
+                       + :w_rec * COALESCE(
+                           EXP(-:decay * GREATEST(EXTRACT(EPOCH FROM (:now - game_time)) / 3600.0, 0)),
+                           0)
+                       + :w_imp * COALESCE(importance, 0.5) AS score
+                FROM memory
+                WHERE {where}
+            ) scored
+            WHERE similarity >= :min_similarity
+            ORDER BY score DESC
+            LIMIT :limit
+        """).bindparams(
+            bindparam("qvec", type_=Vector(128)),
+            bindparam("w_sim", type_=Float),
+            bindparam("w_rec", type_=Float),
+            bindparam("w_imp", type_=Float),
+            bindparam("decay", type_=Float),
+            bindparam("min_similarity", type_=Float),
+            bindparam("now", type_=DateTime),
+        )
+        
+        params.update({
+            "qvec": self._query_vector(query_text),
+            "w_sim": weights.similarity,
+            "w_rec": weights.recency,
+            "w_imp": weights.importance,
+            "decay": math.log(2) / max(weights.half_life_hours, 1e-6),
+            "now": now,
+            "min_similarity": min_similarity,
+            "limit": limit,
+        })
+        
+        result = await self.session.execute(sql, params)
+        
+        memories = []
+        for row in result.fetchall():
+            memory = self._parse_memory_content(row[0], row[1], entity_id, created_at=row[2])
             if memory:
+                memory.metadata["recall_similarity"] = round(float(row[3]), 4)
+                memory.metadata["recall_score"] = round(float(row[4]), 4)
                 memories.append(memory)
         
         return memories
@@ -389,11 +543,21 @@ class EpisodicStore:
     
     async def get_traumatic(self, entity_id: int, limit: int = 5) -> List[EpisodicMemory]:
         """Retorna memórias traumáticas (very_negative)."""
-        all_memories = await self.query(entity_id, limit=limit * 5)
-        return [
-            m for m in all_memories 
-            if m.emotional_valence == EmotionalValence.VERY_NEGATIVE
-        ][:limit]
+        from sqlalchemy import text
+        
+        where, params = self._filters(
+            entity_id, valences=[EmotionalValence.VERY_NEGATIVE.value]
+        )
+        params["limit"] = limit
+        result = await self.session.execute(
+            text(f"SELECT id, content, created_at FROM memory WHERE {where} ORDER BY id DESC LIMIT :limit"),
+            params
+        )
+        memories = [
+            self._parse_memory_content(row[0], row[1], entity_id, created_at=row[2])
+            for row in result.fetchall()
+        ]
+        return [m for m in memories if m]
     
     async def count(self, entity_id: int) -> int:
         """Conta total de memórias de uma entidade."""
@@ -410,7 +574,8 @@ class EpisodicStore:
         self, 
         memory_id: int, 
         content: str, 
-        entity_id: int
+        entity_id: int,
+        created_at: Optional[datetime] = None
     ) -> Optional[EpisodicMemory]:
         """
         Parseia conteúdo de memória do banco.
@@ -426,7 +591,7 @@ class EpisodicStore:
                 return EpisodicMemory(
                     id=memory_id,
                     entity_id=entity_id,
-                    timestamp=datetime.utcnow(),  # Aproximação
+                    timestamp=created_at or datetime.utcnow(),
                     game_timestamp=data.get("game_time", "01-01-1000 12:00"),
                     location=data.get("location", "Desconhecido"),
                     participants=data.get("participants", []),
@@ -458,7 +623,7 @@ class EpisodicStore:
                 return EpisodicMemory(
                     id=memory_id,
                     entity_id=entity_id,
-                    timestamp=datetime.utcnow(),
+                    timestamp=created_at or datetime.utcnow(),
                     game_timestamp="01-01-1000 12:00",
                     location="Desconhecido",
                     participants=participants,
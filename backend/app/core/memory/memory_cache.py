@@ -0,0 +1,177 @@
+"""
+Memory Cache - Cache de fatos e padrões compartilhado entre requests.
+
+SemanticStore e ProceduralStore tinham dicts por instância, recriados a
+cada HierarchicalMemory(session): nunca sobreviviam ao request e, se
+sobrevivessem, cresceriam sem limite. Aqui há um cache por processo:
+
+- LRU por entidade: cada entrada é o conjunto COMPLETO de fatos (ou
+  padrões) de uma entidade, então uma consulta pode ser respondida sem SQL
+- Contabilidade de bytes (estimada pelo JSON de cada item) com teto global
+- Invalidação por escrita: upsert/add/forget e o flush do detector de
+  padrões atualizam ou removem o item no cache depois do commit
+
+NPCs quentes ficam em memória entre turnos. Com vários workers cada um
+tem seu cache; escritas de outro processo só aparecem após o despejo.
+"""
+
+import json
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.config import settings
+
+
+# Overhead aproximado de um objeto dataclass + entrada de dict
+ITEM_OVERHEAD_BYTES = 256
+
+
+def estimate_item_bytes(item: Any) -> int:
+    """Tamanho aproximado de um fato/padrão (JSON + embedding + overhead)."""
+    try:
+        size = len(json.dumps(item.to_dict(), ensure_ascii=False, default=str))
+    except Exception:
+        size = sys.getsizeof(item)
+    embedding = getattr(item, "embedding", None)
+    if embedding:
+        size += len(embedding) * 8
+    return size + ITEM_OVERHEAD_BYTES
+
+
+class _EntitySlot:
+    __slots__ = ("items", "sizes", "bytes")
+
+    def __init__(self):
+        self.items: Dict[Hashable, Any] = {}
+        self.sizes: Dict[Hashable, int] = {}
+        self.bytes = 0
+
+    def set(self, key: Hashable, item: Any) -> int:
+        """Insere/substitui e retorna a variação de bytes."""
+        size = estimate_item_bytes(item)
+        delta = size - self.sizes.get(key, 0)
+        self.items[key] = item
+        self.sizes[key] = size
+        self.bytes += delta
+        return delta
+
+    def remove(self, key: Hashable) -> int:
+        if key not in self.items:
+            return 0
+        del self.items[key]
+        size = self.sizes.pop(key)
+        self.bytes -= size
+        return -size
+
+
+class EntityMemoryCache:
+    """
+    Cache LRU (entity_id -> {chave: item}) limitado por bytes.
+    Só existe slot para entidades carregadas por completo: escritas em
+    entidades fora do cache são ignoradas (a próxima leitura carrega do banco).
+    """
+
+    def __init__(self, name: str, max_bytes: int = 8 * 1024 * 1024):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._slots: "OrderedDict[int, _EntitySlot]" = OrderedDict()
+        self._bytes = 0
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.writes = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.oversized = 0
+
+    # ==================== LEITURA ====================
+
+    def get_entity(self, entity_id: int) -> Optional[Dict[Hashable, Any]]:
+        """Todos os itens da entidade (ordem de inserção) ou None se não está em cache."""
+        slot = self._slots.get(entity_id)
+        if slot is None:
+            self.misses += 1
+            return None
+        self._slots.move_to_end(entity_id)
+        self.hits += 1
+        return slot.items
+
+    def load_entity(self, entity_id: int, items: Dict[Hashable, Any]) -> None:
+        """Registra o conjunto completo de itens lido do banco."""
+        self._drop(entity_id)
+        slot = _EntitySlot()
+        for key, item in items.items():
+            slot.set(key, item)
+        if slot.bytes > self.max_bytes:
+            self.oversized += 1
+            return
+        self._slots[entity_id] = slot
+        self._bytes += slot.bytes
+        self.loads += 1
+        self._evict()
+
+    # ==================== ESCRITA ====================
+
+    def put(self, entity_id: int, key: Hashable, item: Any) -> None:
+        """Write-through de um item gravado (só se a entidade está em cache)."""
+        slot = self._slots.get(entity_id)
+        if slot is None:
+            return
+        self._bytes += slot.set(key, item)
+        self.writes += 1
+        self._evict()
+
+    def discard(self, entity_id: int, key: Hashable) -> None:
+        """Item removido do banco."""
+        slot = self._slots.get(entity_id)
+        if slot is None:
+            return
+        self._bytes += slot.remove(key)
+        self.writes += 1
+
+    def invalidate(self, entity_id: Optional[int] = None) -> None:
+        """Descarta uma entidade (ou tudo)."""
+        if entity_id is None:
+            self._slots.clear()
+            self._bytes = 0
+        else:
+            self._drop(entity_id)
+        self.invalidations += 1
+
+    def _drop(self, entity_id: int) -> None:
+        slot = self._slots.pop(entity_id, None)
+        if slot is not None:
+            self._bytes -= slot.bytes
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._slots:
+            _, slot = self._slots.popitem(last=False)
+            self._bytes -= slot.bytes
+            self.evictions += 1
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entities": len(self._slots),
+            "items": sum(len(s.items) for s in self._slots.values()),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "loads": self.loads,
+            "writes": self.writes,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "oversized": self.oversized,
+        }
+
+
+# Instâncias globais
+fact_cache = EntityMemoryCache("facts", max_bytes=settings.MEMORY_FACT_CACHE_MAX_BYTES)
+pattern_cache = EntityMemoryCache("patterns", max_bytes=settings.MEMORY_PATTERN_CACHE_MAX_BYTES)
@@ -12,19 +12,24 @@ Fornece interface unificada para remember() e recall().
 
 from __future__ import annotations
 import logging
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional, Dict, Any, TYPE_CHECKING
 from enum import Enum
 
 from app.core.memory.episodic import (
-    EpisodicMemory, EpisodicStore, EmotionalValence, TimeRange
+    EpisodicMemory, EpisodicStore, EmotionalValence, TimeRange, RecallWeights
 )
 from app.core.memory.semantic import (
     SemanticFact, SemanticStore, FactType, FactConfidence
 )
 from app.core.memory.procedural import (
-    BehaviorPattern, ProceduralStore, PatternType
+    BehaviorPattern, ProceduralStore, PatternType, PatternStrength
+)
+from app.database.repositories.relationship_repo import RelationshipRepository, target_key
+from app.core.memory.consolidation import (
+    ConsolidationReport, MemoryConsolidator, memory_consolidator
 )
 
 if TYPE_CHECKING:
@@ -274,16 +279,19 @@ class HierarchicalMemory:
     Gerencia os três stores e fornece interface unificada.
     """
     
-    def __init__(self, session: "AsyncSession"):
+    def __init__(self, session: "AsyncSession", consolidator: Optional[MemoryConsolidator] = None):
         self.session = session
         self.episodic_store = EpisodicStore(session)
         self.semantic_store = SemanticStore(session)
         self.procedural_store = ProceduralStore(session)
+        self.consolidator = consolidator or memory_consolidator
+        self.relationships = RelationshipRepository(session)
         
         # Configurações
         self.auto_extract_facts = True
         self.auto_detect_patterns = True
-        self.consolidation_threshold = 50  # Consolidar após N memórias
+        self.consolidation_threshold = self.consolidator.policy.trigger_count  # Consolidar após N memórias
+        self.recall_weights = RecallWeights.from_settings()
     
     async def remember(
         self,
@@ -337,26 +345,56 @@ class HierarchicalMemory:
         
         logger.info(f"Memória criada para entidade {entity_id}: {event.event_type.value}")
         
+        # 4b. Atualizar agregados de relacionamento (um upsert por participante)
+        await self._update_relationships(entity_id, event, emotional_valence)
+        
         # 5. Extrair fatos semânticos (se habilitado)
         if self.auto_extract_facts:
             facts = self._extract_facts_from_event(entity_id, event, saved_memory.id)
             for fact in facts:
                 await self.semantic_store.upsert(fact)
         
-        # 6. Detectar padrões (se habilitado e suficientes memórias)
+        # 6. Detectar padrões (incremental: O(1) por memória, grava só o que mudou)
         if self.auto_detect_patterns:
-            memory_count = await self.episodic_store.count(entity_id)
-            if memory_count >= 5 and memory_count % 5 == 0:  # A cada 5 memórias
-                recent = await self.episodic_store.get_recent(entity_id, n=10)
-                await self.procedural_store.detect_patterns(entity_id, recent)
+            await self.procedural_store.observe(saved_memory)
         
-        # 7. Consolidar se necessário
-        memory_count = await self.episodic_store.count(entity_id)
-        if memory_count >= self.consolidation_threshold:
-            await self.consolidate(entity_id)
+        # 7. Consolidar se necessário: a cada `check_every_inserts` o consolidador
+        # conta só as episódicas quentes (fatos/padrões e arquivadas não entram)
+        await self.consolidator.maybe_consolidate(self.session, entity_id)
         
         return saved_memory
     
+    async def _update_relationships(
+        self,
+        entity_id: int,
+        event: GameEvent,
+        emotional_valence: EmotionalValence
+    ) -> None:
+        """Soma o evento ao agregado (entidade -> participante) de cada outro participante."""
+        others = []
+        if event.actor_id != entity_id:
+            others.append((event.actor_name, event.actor_id))
+        if event.target_name and event.target_id != entity_id:
+            others.append((event.target_name, event.target_id))
+        others.extend((name, None) for name in event.other_participants)
+        
+        seen = set()
+        for name, target_id in others:
+            if not name or name.lower() in seen:
+                continue
+            seen.add(name.lower())
+            await self.relationships.record_interaction(
+                entity_id,
+                name,
+                emotional_valence.value,
+                event_type=event.event_type.value,
+                game_time=event.game_time,
+                target_id=target_id,
+                commit=False
+            )
+        if seen:
+            await self.session.commit()
+    
     def _extract_facts_from_event(
         self,
         entity_id: int,
@@ -494,10 +532,12 @@ class HierarchicalMemory:
         
         # 1. Buscar memórias episódicas
         if include_episodic:
-            episodic = await self.episodic_store.query_semantic(
+            # Similaridade + recência (tempo de jogo) + importância, ranqueado no banco
+            episodic = await self.episodic_store.query_scored(
                 entity_id=entity_id,
                 query_text=query,
-                limit=max_episodic
+                limit=max_episodic,
+                weights=self.recall_weights
             )
             bundle.episodic_memories = episodic
             
@@ -546,7 +586,7 @@ class HierarchicalMemory:
         if include_procedural:
             patterns = await self.procedural_store.get_patterns(
                 entity_id=entity_id,
-                min_strength=PatternType.COMBAT_OPENER  # Qualquer tipo
+                min_strength=PatternStrength.WEAK  # Qualquer força
             )
             bundle.behavior_patterns = patterns[:max_procedural]
             
@@ -593,39 +633,25 @@ class HierarchicalMemory:
         
         return None
     
-    async def consolidate(self, entity_id: int) -> None:
+    async def consolidate(self, entity_id: int, force: bool = False) -> ConsolidationReport:
         """
         Consolida memórias antigas.
         
-        - Memórias de baixa importância são compactadas
-        - Fatos semânticos são fortalecidos ou esquecidos
-        - Padrões fracos são removidos
+        - Memórias episódicas antigas e parecidas viram um único digest
+        - As originais vão para o arquivo frio (memory_archive)
+        - A entidade é mantida dentro do orçamento de memórias quentes
         """
         logger.info(f"Iniciando consolidação para entidade {entity_id}")
         
-        # Buscar todas as memórias
-        all_memories = await self.episodic_store.query(entity_id, limit=100)
-        
-        if len(all_memories) < self.consolidation_threshold:
-            return
-        
-        # Detectar novos padrões
-        await self.procedural_store.detect_patterns(entity_id, all_memories[-20:])
+        # Padrões já foram contabilizados memória a memória pelo detector
+        # incremental, então arquivar as originais não perde nada
+        report = await self.consolidator.consolidate(self.session, entity_id, force=force)
         
-        # Remover memórias muito antigas e de baixa importância
-        old_low_importance = [
-            m for m in all_memories 
-            if m.importance_score < 0.3 and 
-            (datetime.utcnow() - m.timestamp).days > 7
-        ]
-        
-        # Por enquanto, apenas log - não deletar ainda
-        if old_low_importance:
-            logger.info(
-                f"Consolidação: {len(old_low_importance)} memórias poderiam ser compactadas"
-            )
-        
-        logger.info(f"Consolidação concluída para entidade {entity_id}")
+        logger.info(
+            f"Consolidação concluída para entidade {entity_id}: "
+            f"{report.rows_reclaimed} linhas recuperadas"
+        )
+        return report
     
     async def get_relationship_summary(
         self,
@@ -635,6 +661,9 @@ class HierarchicalMemory:
         """
         Retorna resumo do relacionamento entre entidade e alvo.
         
+        Postura e contagens vêm do agregado materializado (leitura por PK);
+        fatos e padrões continuam vindo dos seus stores.
+        
         Args:
             entity_id: ID da entidade
             target_name: Nome do alvo do relacionamento
@@ -642,8 +671,7 @@ class HierarchicalMemory:
         Returns:
             Dict com informações do relacionamento
         """
-        # Buscar memórias envolvendo o alvo
-        episodic = await self.episodic_store.get_by_participant(entity_id, target_name, limit=10)
+        aggregate = await self.relationships.get(entity_id, target_name)
         
         # Buscar fatos sobre o alvo
         semantic = await self.semantic_store.get_facts_about(entity_id, target_name)
@@ -655,52 +683,63 @@ class HierarchicalMemory:
             if target_name.lower() in p.trigger.lower() or target_name.lower() in p.behavior.lower()
         ]
         
-        # Analisar emoções
-        emotions = [m.emotional_valence for m in episodic]
-        positive_count = sum(1 for e in emotions if e.value.startswith("positive") or e.value == "very_positive")
-        negative_count = sum(1 for e in emotions if e.value.startswith("negative") or e.value == "very_negative")
-        
-        # Determinar stance
-        if negative_count > positive_count * 2:
-            stance = "hostile"
-        elif positive_count > negative_count * 2:
-            stance = "friendly"
-        elif negative_count > positive_count:
-            stance = "wary"
-        elif positive_count > negative_count:
-            stance = "warm"
+        if aggregate:
+            summary = RelationshipRepository.to_dict(aggregate)
+            summary["target"] = target_name
         else:
-            stance = "neutral"
-        
-        return {
-            "target": target_name,
-            "stance": stance,
-            "total_interactions": len(episodic),
-            "positive_interactions": positive_count,
-            "negative_interactions": negative_count,
-            "known_facts": [f.get_statement() for f in semantic[:5]],
-            "patterns": [p.get_description() for p in relevant_patterns[:3]],
-            "last_interaction": episodic[0].timestamp.isoformat() if episodic else None,
-        }
+            summary = {
+                "target": target_name,
+                "stance": "neutral",
+                "total_interactions": 0,
+                "positive_interactions": 0,
+                "negative_interactions": 0,
+                "last_interaction": None,
+            }
+        
+        summary["known_facts"] = [f.get_statement() for f in semantic[:5]]
+        summary["patterns"] = [p.get_description() for p in relevant_patterns[:3]]
+        return summary
+    
+    async def get_stance(self, entity_id: int, target_name: str) -> str:
+        """Postura da entidade para o alvo (uma leitura por chave primária)."""
+        return await self.relationships.get_stance(entity_id, target_name)
     
     async def forget_about(self, entity_id: int, target_name: str) -> int:
         """
         Remove todas as memórias sobre um alvo específico.
         Usado para "resetar" relacionamentos ou limpar dados.
         
+        Memórias episódicas vão para o arquivo frio (restauráveis);
+        fatos semânticos cujo sujeito é o alvo são esquecidos.
+        
         Returns:
             Número de memórias removidas
         """
-        # Buscar memórias envolvendo o alvo
-        memories = await self.episodic_store.get_by_participant(entity_id, target_name, limit=100)
+        target = target_key(target_name)
+        # Palavra inteira: "Li" não pode casar com "Lina" nem "aliado"
+        mention = re.compile(rf"(?<!\w){re.escape(target)}(?!\w)", re.IGNORECASE)
+        
+        # Todas as episódicas quentes (não só as 100 mais recentes)
+        rows = await self.consolidator._load_hot(self.session, entity_id)
+        memory_ids = [
+            row.id for row in rows
+            if any(target_key(p) == target for p in row.data.get("participants", []))
+            or mention.search(" ".join(str(row.data.get("description", "")).split()))
+        ]
+        removed = await self.consolidator.forget(self.session, entity_id, memory_ids)
+        
+        facts = await self.semantic_store.get_facts_about(entity_id, target_name)
+        for fact in facts:
+            await self.semantic_store.forget(entity_id, fact.id)
+        
+        await self.relationships.delete(entity_id, target_name)
         
-        # Por segurança, não deletamos - apenas log
         logger.warning(
-            f"forget_about chamado para {target_name}: "
-            f"{len(memories)} memórias seriam removidas"
+            f"forget_about {target_name}: {removed} memórias arquivadas, "
+            f"{len(facts)} fatos esquecidos"
         )
         
-        return len(memories)
+        return removed
     
     def clear_caches(self, entity_id: Optional[int] = None) -> None:
         """Limpa caches de todos os stores."""
@@ -0,0 +1,431 @@
+"""
+Streaming Pattern Detector - Detecção incremental de padrões
+GEM RPG ORBIS - Arquitetura Cognitiva
+
+Antes, ProceduralStore.detect_patterns reanalisava as últimas 10-20
+memórias do zero a cada 5 memórias (Counters novos + add() por padrão,
+cada um com seu _find_existing). Aqui cada entidade mantém estatísticas
+suficientes e compactas:
+
+    (tipo do padrão, gatilho) -> {comportamento: contagem com decaimento}
+
+Cada memória nova atualiza só os gatilhos que ela toca (O(1)). O
+comportamento dominante de um gatilho é o padrão (mesmo ID do
+BehaviorPattern: entidade + tipo + gatilho); as demais observações do
+gatilho contam como exceções. Um padrão é promovido quando a contagem
+decaída passa de `promote_threshold` e rebaixado (removido) quando cai
+abaixo de `demote_threshold`. Só os padrões que mudaram são gravados,
+num único lote por flush.
+"""
+
+from __future__ import annotations
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Set, Tuple, TYPE_CHECKING
+
+from app.core.memory.procedural import BehaviorPattern, PatternType
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from app.core.memory.episodic import EpisodicMemory
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "StreamingPatternDetector",
+    "extract_signals",
+    "pattern_detector",
+]
+
+
+# (tipo, gatilho, comportamento) extraído de uma memória
+Signal = Tuple[PatternType, str, str]
+TriggerKey = Tuple[PatternType, str]
+
+# Exceções herdadas de padrões gravados antes do detector (comportamento desconhecido)
+OTHERS = ""
+
+NEGATIVE_VALENCES = ("negative", "very_negative")
+POSITIVE_VALENCES = ("positive", "very_positive")
+
+
+def extract_signals(memory: "EpisodicMemory") -> List[Signal]:
+    """
+    Sinais comportamentais de UMA memória episódica
+    (mesmas regras das antigas análises em lote do ProceduralStore).
+    """
+    signals: List[Signal] = []
+    description = memory.raw_description.lower()
+
+    # Preferência de localização
+    if memory.location and memory.location != "Desconhecido":
+        signals.append((PatternType.LOCATION_PREFERENCE, "escolha de localização", f"frequenta {memory.location}"))
+
+    # Combate: abertura e fuga
+    if memory.event_type.startswith("combat"):
+        if "primeiro" in description or "iniciou" in description:
+            if "ataque" in description:
+                opener = "ataque agressivo"
+            elif "defesa" in description or "recuo" in description:
+                opener = "posição defensiva"
+            else:
+                opener = "abordagem cautelosa"
+            signals.append((PatternType.COMBAT_OPENER, "início de combate", f"usa {opener}"))
+
+        if "fugiu" in description or "recuou" in description or "escapou" in description:
+            if "ferido" in description or "hp baixo" in description:
+                condition = "quando ferido gravemente"
+            elif "cercado" in description:
+                condition = "quando cercado"
+            else:
+                condition = "quando em desvantagem"
+            signals.append((PatternType.COMBAT_ESCAPE, condition, "foge do combate"))
+
+    # Reações
+    valence = memory.emotional_valence.value
+    if valence in NEGATIVE_VALENCES:
+        reaction = None
+        if "atacou" in description or "revidou" in description:
+            reaction = "retalia"
+        elif "fugiu" in description or "recuou" in description:
+            reaction = "evita confronto"
+        elif "guardou rancor" in description or "lembrar" in description:
+            reaction = "guarda rancor"
+        if reaction:
+            signals.append((PatternType.REACTION_TO_THREAT, "ameaça ou agressão", reaction))
+
+    if valence in POSITIVE_VALENCES:
+        reaction = None
+        if "agradeceu" in description or "gratidão" in description:
+            reaction = "demonstra gratidão"
+        elif "ajudou" in description or "retribuiu" in description:
+            reaction = "retribui o favor"
+        if reaction:
+            signals.append((PatternType.REACTION_TO_KINDNESS, "ajuda ou gentileza", reaction))
+
+    return signals
+
+
+@dataclass
+class _TriggerStats:
+    """Contagens decaídas por comportamento para um gatilho."""
+    behaviors: Dict[str, float] = field(default_factory=dict)
+    last_tick: int = 0
+    source_ids: deque = field(default_factory=lambda: deque(maxlen=10))
+    first_observed: datetime = field(default_factory=datetime.utcnow)
+
+    # Estado publicado (o que está gravado no banco)
+    active: bool = False
+    row_id: Optional[int] = None
+    published: Optional[Tuple[str, int, int]] = None  # (behavior, occurrences, exceptions)
+
+    def decay_to(self, tick: int, factor: float) -> None:
+        """Aplica o decaimento pendente desde o último toque (lazy)."""
+        steps = tick - self.last_tick
+        if steps > 0:
+            scale = factor ** steps
+            for behavior in self.behaviors:
+                self.behaviors[behavior] *= scale
+            self.last_tick = tick
+
+    def dominant(self) -> Tuple[Optional[str], float, float]:
+        """(comportamento dominante, contagem dele, contagem das demais)."""
+        candidates = [b for b in self.behaviors if b != OTHERS]
+        if not candidates:
+            return None, 0.0, 0.0
+        behavior = max(candidates, key=self.behaviors.get)
+        count = self.behaviors[behavior]
+        return behavior, count, sum(self.behaviors.values()) - count
+
+
+@dataclass
+class _EntityStats:
+    tick: int = 0
+    last_memory_id: int = 0
+    triggers: Dict[TriggerKey, _TriggerStats] = field(default_factory=dict)
+    dirty: Set[TriggerKey] = field(default_factory=set)
+    demoted_rows: List[int] = field(default_factory=list)
+
+
+class StreamingPatternDetector:
+    """
+    Detector incremental de padrões (estado por processo, compartilhado
+    entre sessões). Use observe() a cada memória e flush() para gravar.
+    """
+
+    def __init__(
+        self,
+        decay: float = 0.98,
+        promote_threshold: float = 2.0,
+        demote_threshold: float = 1.0,
+        sweep_every: int = 25
+    ):
+        # Fator por memória observada (0.98 -> meia-vida de ~34 memórias)
+        self.decay = decay
+        self.promote_threshold = promote_threshold
+        self.demote_threshold = demote_threshold
+        # Gatilhos não tocados só decaem; a cada N memórias varremos todos para rebaixar
+        self.sweep_every = sweep_every
+
+        self._entities: Dict[int, _EntityStats] = {}
+
+        # Métricas
+        self.observed = 0
+        self.promotions = 0
+        self.demotions = 0
+        self.rows_written = 0
+        self.flushes = 0
+
+    # ==================== ESTADO ====================
+
+    async def _hydrate(
+        self,
+        session: "AsyncSession",
+        entity_id: int,
+        current_memory_id: Optional[int] = None
+    ) -> _EntityStats:
+        """Carrega os padrões já gravados da entidade (uma vez por processo)."""
+        stats = self._entities.get(entity_id)
+        if stats is not None:
+            return stats
+
+        from sqlalchemy import text
+
+        stats = _EntityStats()
+        result = await session.execute(
+            text("""
+                SELECT id, content FROM memory
+                WHERE npc_id = :entity_id AND memory_type = 'procedural'
+            """),
+            {"entity_id": entity_id}
+        )
+        for row_id, content in result.fetchall():
+            try:
+                pattern = BehaviorPattern.from_dict(json.loads(content))
+            except Exception as e:
+                logger.warning(f"Padrão {row_id} ilegível: {e}")
+                continue
+            key = (pattern.pattern_type, pattern.trigger)
+            trigger = stats.triggers.setdefault(key, _TriggerStats())
+            trigger.behaviors[pattern.behavior] = float(pattern.occurrences)
+            if pattern.exceptions:
+                trigger.behaviors[OTHERS] = float(pattern.exceptions)
+            trigger.first_observed = pattern.first_observed
+            trigger.source_ids.extend(pattern.source_memory_ids[-10:])
+            trigger.active = True
+            trigger.row_id = row_id
+            trigger.published = (pattern.behavior, pattern.occurrences, pattern.exceptions)
+
+        # Memórias anteriores à atual já foram analisadas pelo detector antigo
+        result = await session.execute(
+            text("""
+                SELECT COALESCE(MAX(id), 0) FROM memory
+                WHERE npc_id = :entity_id AND memory_type = 'episodic' AND id < :current_id
+            """),
+            {"entity_id": entity_id, "current_id": current_memory_id or 2 ** 62}
+        )
+        stats.last_memory_id = result.scalar() or 0
+
+        self._entities[entity_id] = stats
+        return stats
+
+    def _evaluate(self, stats: _EntityStats, key: TriggerKey) -> None:
+        """Promove/rebaixa/atualiza um gatilho e marca como sujo se mudou."""
+        trigger = stats.triggers[key]
+        trigger.decay_to(stats.tick, self.decay)
+        behavior, count, others = trigger.dominant()
+
+        if not trigger.active:
+            if behavior and count >= self.promote_threshold:
+                trigger.active = True
+                self.promotions += 1
+                stats.dirty.add(key)
+            return
+
+        if count < self.demote_threshold:
+            trigger.active = False
+            self.demotions += 1
+            if trigger.row_id is not None:
+                stats.demoted_rows.append(trigger.row_id)
+            trigger.row_id = None
+            trigger.published = None
+            stats.dirty.discard(key)
+            return
+
+        if (behavior, round(count), round(others)) != trigger.published:
+            stats.dirty.add(key)
+
+    # ==================== API ====================
+
+    async def observe(self, session: "AsyncSession", memory: "EpisodicMemory") -> int:
+        """
+        Incorpora uma memória nova às estatísticas da entidade.
+
+        Returns:
+            Número de sinais extraídos da memória
+        """
+        stats = await self._hydrate(session, memory.entity_id, memory.id)
+        if memory.id is not None:
+            if memory.id <= stats.last_memory_id:
+                return 0  # Já contabilizada
+            stats.last_memory_id = memory.id
+
+        stats.tick += 1
+        self.observed += 1
+
+        signals = extract_signals(memory)
+        for pattern_type, trigger_text, behavior in signals:
+            key = (pattern_type, trigger_text)
+            trigger = stats.triggers.get(key)
+            if trigger is None:
+                trigger = stats.triggers[key] = _TriggerStats(last_tick=stats.tick)
+            trigger.decay_to(stats.tick, self.decay)
+            trigger.behaviors[behavior] = trigger.behaviors.get(behavior, 0.0) + 1.0
+            if memory.id:
+                trigger.source_ids.append(memory.id)
+            self._evaluate(stats, key)
+
+        if stats.tick % self.sweep_every == 0:
+            for key in list(stats.triggers):
+                self._evaluate(stats, key)
+                trigger = stats.triggers[key]
+                if not trigger.active and sum(trigger.behaviors.values()) < 0.05:
+                    del stats.triggers[key]
+
+        return len(signals)
+
+    def _build_pattern(self, entity_id: int, key: TriggerKey, trigger: _TriggerStats) -> BehaviorPattern:
+        behavior, count, others = trigger.dominant()
+        occurrences = max(1, round(count))
+        exceptions = round(others)
+        total = count + others
+        return BehaviorPattern(
+            entity_id=entity_id,
+            pattern_type=key[0],
+            trigger=key[1],
+            behavior=behavior,
+            frequency=count / total if total > 0 else 0.5,
+            occurrences=occurrences,
+            exceptions=exceptions,
+            first_observed=trigger.first_observed,
+            last_observed=datetime.utcnow(),
+            source_memory_ids=list(trigger.source_ids),
+            metadata={"decayed_count": round(count, 3)},
+        )
+
+    async def flush(self, session: "AsyncSession", entity_id: int) -> List[BehaviorPattern]:
+        """
+        Grava num único lote os padrões que mudaram (insert/update) e remove
+        os rebaixados. Retorna os padrões gravados.
+        """
+        stats = self._entities.get(entity_id)
+        if stats is None or (not stats.dirty and not stats.demoted_rows):
+            return []
+
+        from sqlalchemy import text, bindparam
+        from pgvector.sqlalchemy import Vector
+
+        updates: List[Dict[str, Any]] = []
+        inserts: List[Tuple[TriggerKey, BehaviorPattern, str]] = []
+        written: List[BehaviorPattern] = []
+        written_keys: List[TriggerKey] = []
+
+        for key in stats.dirty:
+            trigger = stats.triggers.get(key)
+            if trigger is None or not trigger.active:
+                continue
+            pattern = self._build_pattern(entity_id, key, trigger)
+            trigger.published = (pattern.behavior, pattern.occurrences, pattern.exceptions)
+            written.append(pattern)
+            written_keys.append(key)
+            content = json.dumps({"type": "procedural", **pattern.to_dict()}, ensure_ascii=False)
+            if trigger.row_id is not None:
+                updates.append({"row_id": trigger.row_id, "content": content})
+            else:
+                inserts.append((key, pattern, content))
+
+        if updates:
+            await session.execute(
+                text("UPDATE memory SET content = :content WHERE id = :row_id"),
+                updates
+            )
+
+        if inserts:
+            # Um INSERT multi-VALUES; RETURNING traz o conteúdo para mapear id -> padrão
+            from app.services.embedding_service import embedding_service
+            values = []
+            params: Dict[str, Any] = {"entity_id": entity_id}
+            binds = []
+            for i, (_, pattern, content) in enumerate(inserts):
+                vec = embedding_service.generate_embedding(pattern.get_description())
+                vec = (vec + [0.0] * 128)[:128]
+                values.append(f"(:entity_id, :content_{i}, :embedding_{i}, 'procedural', NOW())")
+                params[f"content_{i}"] = content
+                params[f"embedding_{i}"] = vec
+                binds.append(bindparam(f"embedding_{i}", type_=Vector(128)))
+            result = await session.execute(
+                text(f"""
+                    INSERT INTO memory (npc_id, content, embedding, memory_type, created_at)
+                    VALUES {", ".join(values)}
+                    RETURNING id, content
+                """).bindparams(*binds),
+                params
+            )
+            row_ids = {json.loads(content)["id"]: row_id for row_id, content in result.fetchall()}
+            for key, pattern, _ in inserts:
+                stats.triggers[key].row_id = row_ids.get(pattern.id)
+
+        if stats.demoted_rows:
+            await session.execute(
+                text("DELETE FROM memory WHERE id = ANY(:ids)"),
+                {"ids": list(stats.demoted_rows)}
+            )
+
+        await session.commit()
+
+        # Cache compartilhado de padrões (chave = id da linha em memory)
+        from app.core.memory.memory_cache import pattern_cache
+        for key, pattern in zip(written_keys, written):
+            row_id = stats.triggers[key].row_id
+            if row_id is not None:
+                pattern_cache.put(entity_id, row_id, pattern)
+        for row_id in stats.demoted_rows:
+            pattern_cache.discard(entity_id, row_id)
+
+        self.flushes += 1
+        self.rows_written += len(updates) + len(inserts) + len(stats.demoted_rows)
+        stats.dirty.clear()
+        stats.demoted_rows.clear()
+        return written
+
+    def active_patterns(self, entity_id: int) -> List[BehaviorPattern]:
+        """Padrões ativos da entidade a partir das estatísticas em memória."""
+        stats = self._entities.get(entity_id)
+        if stats is None:
+            return []
+        return [
+            self._build_pattern(entity_id, key, trigger)
+            for key, trigger in stats.triggers.items()
+            if trigger.active
+        ]
+
+    def forget_entity(self, entity_id: int) -> None:
+        self._entities.pop(entity_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entities": len(self._entities),
+            "triggers": sum(len(s.triggers) for s in self._entities.values()),
+            "observed": self.observed,
+            "promotions": self.promotions,
+            "demotions": self.demotions,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+        }
+
+
+# Instância global
+pattern_detector = StreamingPatternDetector()
@@ -20,7 +20,6 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple, TYPE_CHECKING
 from enum import Enum
-from collections import Counter
 
 if TYPE_CHECKING:
     from sqlmodel.ext.asyncio.session import AsyncSession
@@ -203,10 +202,18 @@ class ProceduralStore:
     Detecta e armazena padrões a partir de memórias episódicas.
     """
     
-    def __init__(self, session: "AsyncSession"):
+    def __init__(self, session: "AsyncSession", detector=None, cache=None):
         self.session = session
-        # Cache de padrões por entidade
-        self._pattern_cache: Dict[int, Dict[str, BehaviorPattern]] = {}
+        # Cache de padrões por entidade, chaveado pelo id da linha em memory
+        # (padrão: instância global compartilhada entre requests)
+        if cache is None:
+            from app.core.memory.memory_cache import pattern_cache as cache
+        self._pattern_cache = cache
+        
+        # Detector incremental (padrão: instância global compartilhada entre sessões)
+        if detector is None:
+            from app.core.memory.pattern_detector import pattern_detector as detector
+        self.detector = detector
         
         # Configurações de detecção
         self.min_occurrences_for_pattern = 2
@@ -220,32 +227,26 @@ class ProceduralStore:
         if existing:
             # Atualizar existente
             existing.observe(followed=True)
-            await self._persist_pattern(existing)
-            
-            # Atualizar cache
-            if pattern.entity_id not in self._pattern_cache:
-                self._pattern_cache[pattern.entity_id] = {}
-            self._pattern_cache[pattern.entity_id][existing.id] = existing
-            
+            row_id = await self._persist_pattern(existing)
+            self._pattern_cache.put(pattern.entity_id, row_id, existing)
             return existing
         
         # Novo padrão
-        await self._persist_pattern(pattern)
-        
-        # Adicionar ao cache
-        if pattern.entity_id not in self._pattern_cache:
-            self._pattern_cache[pattern.entity_id] = {}
-        self._pattern_cache[pattern.entity_id][pattern.id] = pattern
+        row_id = await self._persist_pattern(pattern)
+        self._pattern_cache.put(pattern.entity_id, row_id, pattern)
         
         logger.info(f"Padrão adicionado: {pattern.get_description()}")
         return pattern
     
     async def _find_existing(self, pattern: BehaviorPattern) -> Optional[BehaviorPattern]:
         """Busca padrão existente."""
-        # Primeiro no cache
-        entity_patterns = self._pattern_cache.get(pattern.entity_id, {})
-        if pattern.id in entity_patterns:
-            return entity_patterns[pattern.id]
+        # Primeiro no cache (entidade em cache = conjunto completo)
+        entity_patterns = self._pattern_cache.get_entity(pattern.entity_id)
+        if entity_patterns is not None:
+            for cached in entity_patterns.values():
+                if cached.id == pattern.id:
+                    return cached
+            return None
         
         # Depois no banco
         from sqlalchemy import text
@@ -268,8 +269,8 @@ class ProceduralStore:
         
         return None
     
-    async def _persist_pattern(self, pattern: BehaviorPattern) -> None:
-        """Persiste padrão no banco."""
+    async def _persist_pattern(self, pattern: BehaviorPattern) -> int:
+        """Persiste padrão no banco e retorna o id da linha."""
         from sqlalchemy import text
         from pgvector.sqlalchemy import Vector
         from sqlalchemy import bindparam
@@ -315,22 +316,26 @@ class ProceduralStore:
                 "content": content,
                 "memory_id": existing_row[0]
             })
+            row_id = existing_row[0]
         else:
             # Inserir
             insert_sql = text("""
-                INSERT INTO memory (npc_id, content, embedding)
-                VALUES (:entity_id, :content, :embedding)
+                INSERT INTO memory (npc_id, content, embedding, memory_type, created_at)
+                VALUES (:entity_id, :content, :embedding, 'procedural', NOW())
+                RETURNING id
             """).bindparams(
                 bindparam("embedding", type_=Vector(128))
             )
             
-            await self.session.execute(insert_sql, {
+            result = await self.session.execute(insert_sql, {
                 "entity_id": pattern.entity_id,
                 "content": content,
                 "embedding": embedding,
             })
+            row_id = result.scalar()
         
         await self.session.commit()
+        return row_id
     
     async def get_patterns(
         self,
@@ -349,18 +354,7 @@ class ProceduralStore:
         Returns:
             Lista de padrões ordenados por força
         """
-        from sqlalchemy import text
-        
-        sql = text("""
-            SELECT id, content FROM memory
-            WHERE npc_id = :entity_id
-            AND content LIKE '%"type": "procedural"%'
-            ORDER BY id DESC
-            LIMIT 50
-        """)
-        
-        result = await self.session.execute(sql, {"entity_id": entity_id})
-        rows = result.fetchall()
+        entity_patterns = await self._entity_patterns(entity_id)
         
         patterns = []
         strength_order = [
@@ -371,10 +365,9 @@ class ProceduralStore:
         ]
         min_strength_index = strength_order.index(min_strength)
         
-        for row in rows:
-            pattern = self._parse_pattern_content(row[0], row[1], entity_id)
-            if not pattern:
-                continue
+        # Os 50 mais recentes (maior id de linha)
+        for row_id in sorted(entity_patterns, reverse=True)[:50]:
+            pattern = entity_patterns[row_id]
             
             # Filtrar por tipo
             if pattern_types and pattern.pattern_type not in pattern_types:
@@ -395,168 +388,66 @@ class ProceduralStore:
         
         return patterns
     
+    async def _entity_patterns(self, entity_id: int) -> Dict[int, BehaviorPattern]:
+        """Todos os padrões da entidade por id da linha (cache compartilhado; um SELECT no miss)."""
+        cached = self._pattern_cache.get_entity(entity_id)
+        if cached is not None:
+            return cached
+        
+        from sqlalchemy import text
+        
+        result = await self.session.execute(
+            text("""
+                SELECT id, content FROM memory
+                WHERE npc_id = :entity_id AND memory_type = 'procedural'
+                ORDER BY id
+            """),
+            {"entity_id": entity_id}
+        )
+        patterns: Dict[int, BehaviorPattern] = {}
+        for row in result.fetchall():
+            pattern = self._parse_pattern_content(row[0], row[1], entity_id)
+            if pattern:
+                patterns[row[0]] = pattern
+        
+        self._pattern_cache.load_entity(entity_id, patterns)
+        return patterns
+    
+    async def observe(self, memory: "EpisodicMemory") -> List[BehaviorPattern]:
+        """
+        Incorpora UMA memória nova ao detector incremental e grava, num lote,
+        os padrões promovidos/rebaixados/alterados por ela.
+        """
+        await self.detector.observe(self.session, memory)
+        return await self._flush(memory.entity_id)
+    
+    async def _flush(self, entity_id: int) -> List[BehaviorPattern]:
+        # O detector atualiza o cache compartilhado após o commit do lote
+        changed = await self.detector.flush(self.session, entity_id)
+        for pattern in changed:
+            logger.info(f"Padrão atualizado: {pattern.get_description()}")
+        return changed
+    
     async def detect_patterns(
         self,
         entity_id: int,
         recent_events: List["EpisodicMemory"]
     ) -> List[BehaviorPattern]:
         """
-        Detecta padrões em eventos recentes.
-        Analisa sequências de eventos e comportamentos recorrentes.
+        Alimenta o detector incremental com memórias (ex.: backfill).
+        Memórias já observadas são ignoradas, então chamar de novo com as
+        mesmas memórias não infla as contagens.
         
         Args:
             entity_id: ID da entidade
-            recent_events: Lista de memórias episódicas recentes
+            recent_events: Lista de memórias episódicas
         
         Returns:
-            Lista de padrões detectados ou fortalecidos
+            Lista de padrões gravados (novos ou alterados)
         """
-        if len(recent_events) < self.min_occurrences_for_pattern:
-            return []
-        
-        detected_patterns = []
-        
-        # Analisar padrões de combate
-        combat_events = [e for e in recent_events if e.event_type == "combat"]
-        if len(combat_events) >= 2:
-            combat_patterns = self._analyze_combat_patterns(entity_id, combat_events)
-            detected_patterns.extend(combat_patterns)
-        
-        # Analisar padrões de localização
-        location_counts = Counter(e.location for e in recent_events)
-        for location, count in location_counts.most_common(3):
-            if count >= 2:
-                pattern = BehaviorPattern(
-                    entity_id=entity_id,
-                    pattern_type=PatternType.LOCATION_PREFERENCE,
-                    trigger="escolha de localização",
-                    behavior=f"frequenta {location}",
-                    occurrences=count,
-                    source_memory_ids=[e.id for e in recent_events if e.location == location and e.id]
-                )
-                detected_patterns.append(pattern)
-        
-        # Analisar padrões de reação
-        reaction_patterns = self._analyze_reaction_patterns(entity_id, recent_events)
-        detected_patterns.extend(reaction_patterns)
-        
-        # Persistir padrões detectados
-        final_patterns = []
-        for pattern in detected_patterns:
-            saved = await self.add(pattern)
-            final_patterns.append(saved)
-        
-        return final_patterns
-    
-    def _analyze_combat_patterns(
-        self,
-        entity_id: int,
-        combat_events: List["EpisodicMemory"]
-    ) -> List[BehaviorPattern]:
-        """Analisa padrões em eventos de combate."""
-        patterns = []
-        
-        # Detectar padrão de abertura de combate
-        openers = []
-        for event in combat_events:
-            description_lower = event.raw_description.lower()
-            if "primeiro" in description_lower or "iniciou" in description_lower:
-                if "ataque" in description_lower:
-                    openers.append("ataque agressivo")
-                elif "defesa" in description_lower or "recuo" in description_lower:
-                    openers.append("posição defensiva")
-                else:
-                    openers.append("abordagem cautelosa")
-        
-        if openers:
-            most_common_opener = Counter(openers).most_common(1)[0]
-            if most_common_opener[1] >= 2:
-                patterns.append(BehaviorPattern(
-                    entity_id=entity_id,
-                    pattern_type=PatternType.COMBAT_OPENER,
-                    trigger="início de combate",
-                    behavior=f"usa {most_common_opener[0]}",
-                    occurrences=most_common_opener[1]
-                ))
-        
-        # Detectar padrão de fuga
-        escapes = []
-        for event in combat_events:
-            description_lower = event.raw_description.lower()
-            if "fugiu" in description_lower or "recuou" in description_lower or "escapou" in description_lower:
-                if "ferido" in description_lower or "hp baixo" in description_lower:
-                    escapes.append("quando ferido gravemente")
-                elif "cercado" in description_lower:
-                    escapes.append("quando cercado")
-                else:
-                    escapes.append("quando em desvantagem")
-        
-        if escapes:
-            most_common_escape = Counter(escapes).most_common(1)[0]
-            if most_common_escape[1] >= 2:
-                patterns.append(BehaviorPattern(
-                    entity_id=entity_id,
-                    pattern_type=PatternType.COMBAT_ESCAPE,
-                    trigger=most_common_escape[0],
-                    behavior="foge do combate",
-                    occurrences=most_common_escape[1]
-                ))
-        
-        return patterns
-    
-    def _analyze_reaction_patterns(
-        self,
-        entity_id: int,
-        events: List["EpisodicMemory"]
-    ) -> List[BehaviorPattern]:
-        """Analisa padrões de reação."""
-        patterns = []
-        
-        # Agrupar por valência emocional e tipo de reação
-        reactions_to_negative = []
-        reactions_to_positive = []
-        
-        for event in events:
-            description_lower = event.raw_description.lower()
-            
-            if event.emotional_valence.value.startswith("negative"):
-                if "atacou" in description_lower or "revidou" in description_lower:
-                    reactions_to_negative.append("retalia")
-                elif "fugiu" in description_lower or "recuou" in description_lower:
-                    reactions_to_negative.append("evita confronto")
-                elif "guardou rancor" in description_lower or "lembrar" in description_lower:
-                    reactions_to_negative.append("guarda rancor")
-            
-            if event.emotional_valence.value.startswith("positive"):
-                if "agradeceu" in description_lower or "gratidão" in description_lower:
-                    reactions_to_positive.append("demonstra gratidão")
-                elif "ajudou" in description_lower or "retribuiu" in description_lower:
-                    reactions_to_positive.append("retribui o favor")
-        
-        # Criar padrões para reações comuns
-        if reactions_to_negative:
-            most_common = Counter(reactions_to_negative).most_common(1)[0]
-            if most_common[1] >= 2:
-                patterns.append(BehaviorPattern(
-                    entity_id=entity_id,
-                    pattern_type=PatternType.REACTION_TO_THREAT,
-                    trigger="ameaça ou agressão",
-                    behavior=most_common[0],
-                    occurrences=most_common[1]
-                ))
-        
-        if reactions_to_positive:
-            most_common = Counter(reactions_to_positive).most_common(1)[0]
-            if most_common[1] >= 2:
-                patterns.append(BehaviorPattern(
-                    entity_id=entity_id,
-                    pattern_type=PatternType.REACTION_TO_KINDNESS,
-                    trigger="ajuda ou gentileza",
-                    behavior=most_common[0],
-                    occurrences=most_common[1]
-                ))
-        
-        return patterns
+        for event in sorted(recent_events, key=lambda e: e.id or 0):
+            await self.detector.observe(self.session, event)
+        return await self._flush(entity_id)
     
     async def predict_behavior(
         self,
@@ -623,9 +514,5 @@ class ProceduralStore:
             return None
     
     def clear_cache(self, entity_id: Optional[int] = None) -> None:
-        """Limpa cache de padrões."""
-        if entity_id:
-            if entity_id in self._pattern_cache:
-                del self._pattern_cache[entity_id]
-        else:
-            self._pattern_cache.clear()
+        """Limpa cache de padrões (compartilhado: afeta todos os requests)."""
+        self._pattern_cache.invalidate(entity_id)
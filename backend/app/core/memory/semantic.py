@@ -179,11 +179,13 @@ class SemanticStore:
     Usa a tabela de memória existente com tipo "semantic".
     """
     
-    def __init__(self, session: "AsyncSession"):
+    def __init__(self, session: "AsyncSession", cache=None):
         self.session = session
         self._embedding_service = None
-        # Cache em memória de fatos por entidade
-        self._fact_cache: Dict[int, Dict[str, SemanticFact]] = {}
+        # Cache de fatos por entidade (padrão: instância global compartilhada entre requests)
+        if cache is None:
+            from app.core.memory.memory_cache import fact_cache as cache
+        self._fact_cache = cache
     
     @property
     def embedding_service(self):
@@ -198,37 +200,28 @@ class SemanticStore:
         Insere ou atualiza um fato.
         Se o fato já existe (mesmo subject/predicate), fortalece.
         """
-        # Verificar se já existe no cache
-        entity_facts = self._fact_cache.get(fact.entity_id, {})
-        existing = entity_facts.get(fact.id)
+        # Verificar se já existe no cache (com a entidade em cache, ausência = fato novo)
+        entity_facts = self._fact_cache.get_entity(fact.entity_id)
+        existing = entity_facts.get(fact.id) if entity_facts is not None else None
         
         if existing:
             # Fortalecer fato existente
             existing.strengthen()
             await self._persist_fact(existing)
+            self._fact_cache.put(fact.entity_id, existing.id, existing)
             return existing
         
         # Verificar no banco
-        existing_from_db = await self._find_existing(fact)
+        existing_from_db = await self._find_existing(fact) if entity_facts is None else None
         if existing_from_db:
             existing_from_db.strengthen()
             await self._persist_fact(existing_from_db)
-            
-            # Atualizar cache
-            if fact.entity_id not in self._fact_cache:
-                self._fact_cache[fact.entity_id] = {}
-            self._fact_cache[fact.entity_id][existing_from_db.id] = existing_from_db
-            
             return existing_from_db
         
         # Novo fato
         fact.embedding = self._generate_embedding(fact)
         await self._persist_fact(fact)
-        
-        # Adicionar ao cache
-        if fact.entity_id not in self._fact_cache:
-            self._fact_cache[fact.entity_id] = {}
-        self._fact_cache[fact.entity_id][fact.id] = fact
+        self._fact_cache.put(fact.entity_id, fact.id, fact)
         
         logger.info(f"Fato semântico adicionado: {fact.get_statement()}")
         return fact
@@ -300,8 +293,8 @@ class SemanticStore:
         else:
             # Inserir novo
             insert_sql = text("""
-                INSERT INTO memory (npc_id, content, embedding)
-                VALUES (:entity_id, :content, :embedding)
+                INSERT INTO memory (npc_id, content, embedding, memory_type, created_at)
+                VALUES (:entity_id, :content, :embedding, 'semantic', NOW())
             """).bindparams(
                 bindparam("embedding", type_=Vector(128))
             )
@@ -350,23 +343,7 @@ class SemanticStore:
         Returns:
             Lista de fatos ordenados por relevância/confiança
         """
-        from sqlalchemy import text
-        
-        # Buscar todos os fatos semânticos da entidade
-        sql = text("""
-            SELECT id, content FROM memory
-            WHERE npc_id = :entity_id
-            AND content LIKE '%"type": "semantic"%'
-            ORDER BY id DESC
-            LIMIT :limit
-        """)
-        
-        result = await self.session.execute(sql, {
-            "entity_id": entity_id,
-            "limit": limit * 3  # Pegar mais para filtrar
-        })
-        
-        rows = result.fetchall()
+        entity_facts = await self._entity_facts(entity_id)
         facts = []
         
         confidence_order = [
@@ -378,11 +355,8 @@ class SemanticStore:
         ]
         min_conf_index = confidence_order.index(min_confidence)
         
-        for row in rows:
-            fact = self._parse_fact_content(row[0], row[1], entity_id)
-            if not fact:
-                continue
-            
+        # Mais recentes primeiro
+        for fact in reversed(list(entity_facts.values())):
             # Filtrar por subject
             if subject and not fact.matches(subject=subject):
                 continue
@@ -407,6 +381,31 @@ class SemanticStore:
         
         return facts
     
+    async def _entity_facts(self, entity_id: int) -> Dict[str, SemanticFact]:
+        """Todos os fatos da entidade (cache compartilhado; um SELECT no miss)."""
+        cached = self._fact_cache.get_entity(entity_id)
+        if cached is not None:
+            return cached
+        
+        from sqlalchemy import text
+        
+        result = await self.session.execute(
+            text("""
+                SELECT id, content FROM memory
+                WHERE npc_id = :entity_id AND memory_type = 'semantic'
+                ORDER BY id
+            """),
+            {"entity_id": entity_id}
+        )
+        facts: Dict[str, SemanticFact] = {}
+        for row in result.fetchall():
+            fact = self._parse_fact_content(row[0], row[1], entity_id)
+            if fact:
+                facts[fact.id] = fact
+        
+        self._fact_cache.load_entity(entity_id, facts)
+        return facts
+    
     async def _rerank_by_similarity(
         self, 
         facts: List[SemanticFact], 
@@ -471,11 +470,6 @@ class SemanticStore:
         """Remove um fato (esquece)."""
         from sqlalchemy import text
         
-        # Remover do cache
-        if entity_id in self._fact_cache:
-            if fact_id in self._fact_cache[entity_id]:
-                del self._fact_cache[entity_id][fact_id]
-        
         # Remover do banco
         sql = text("""
             DELETE FROM memory
@@ -489,6 +483,7 @@ class SemanticStore:
         })
         
         await self.session.commit()
+        self._fact_cache.discard(entity_id, fact_id)
         logger.info(f"Fato esquecido: {fact_id}")
         return True
     
@@ -512,9 +507,5 @@ class SemanticStore:
             return None
     
     def clear_cache(self, entity_id: Optional[int] = None) -> None:
-        """Limpa cache de fatos."""
-        if entity_id:
-            if entity_id in self._fact_cache:
-                del self._fact_cache[entity_id]
-        else:
-            self._fact_cache.clear()
+        """Limpa cache de fatos (compartilhado: afeta todos os requests)."""
+        self._fact_cache.invalidate(entity_id)
@@ -243,6 +243,24 @@ KEYWORD_TO_PROFILE = {
     "praça": "mercado",  # Praças geralmente têm comércio
 }
 
+# Roles que podem aparecer como hostis
+HOSTILE_ROLES = {
+    "beast", "bandit", "demon", "undead", "golem", "spirit",
+    "poison_creature", "corrupted_cultivator", "rogue_cultivator",
+    "ancient_beast", "treasure_guardian", "drunk", "pickpocket",
+    "fighter", "witch",
+}
+
+# Papel das chaves hostis do NPCPool: generate_enemy(tier, biome) ignora o papel,
+# então há um único pool hostil por (location_type, tier)
+HOSTILE_POOL_ROLE = "enemy"
+
+# Roles que nunca aparecem como amigáveis
+NON_FRIENDLY_ROLES = {
+    "beast", "bandit", "demon", "undead", "golem",
+    "poison_creature", "corrupted_cultivator",
+}
+
 
 class NPCPopulationManager:
     """
@@ -334,19 +352,13 @@ class NPCPopulationManager:
         for _ in range(to_spawn):
             # Decidir se hostil ou não
             if random.random() < profile.hostile_chance:
-                hostile_roles = [r for r in profile.npc_roles if r in 
-                    ["beast", "bandit", "demon", "undead", "golem", "spirit", 
-                     "poison_creature", "corrupted_cultivator", "rogue_cultivator",
-                     "ancient_beast", "treasure_guardian", "drunk", "pickpocket",
-                     "fighter", "witch"]]
+                hostile_roles = [r for r in profile.npc_roles if r in HOSTILE_ROLES]
                 if hostile_roles:
                     roles.append(("hostile", random.choice(hostile_roles)))
                 else:
                     roles.append(("hostile", "beast"))
             else:
-                friendly_roles = [r for r in profile.npc_roles if r not in 
-                    ["beast", "bandit", "demon", "undead", "golem", 
-                     "poison_creature", "corrupted_cultivator"]]
+                friendly_roles = [r for r in profile.npc_roles if r not in NON_FRIENDLY_ROLES]
                 if friendly_roles:
                     roles.append(("friendly", random.choice(friendly_roles)))
                 else:
@@ -354,6 +366,27 @@ class NPCPopulationManager:
         
         return (to_spawn, roles)
     
+    def get_pool_keys(self, location: str, tier: int) -> List[Tuple[str, int, str, str]]:
+        """
+        Lista as chaves (location_type, tier, role, disposition) que o perfil
+        da localização pode pedir ao spawnar. Usado pelo NPCPool para saber
+        o que manter pré-gerado.
+        """
+        profile = self.get_location_profile(location)
+        keys = []
+        
+        if profile.hostile_chance > 0:
+            keys.append((profile.location_type, int(tier or 1), HOSTILE_POOL_ROLE, "hostile"))
+        
+        if profile.hostile_chance < 1.0:
+            friendly_roles = [r for r in profile.npc_roles if r not in NON_FRIENDLY_ROLES]
+            if friendly_roles:
+                keys.extend((profile.location_type, 0, role, "friendly") for role in friendly_roles)
+            else:
+                keys.append((profile.location_type, 0, "wanderer", "neutral"))
+        
+        return keys
+    
     def should_spawn_quest_giver(self, location: str, player_has_quest: bool) -> bool:
         """
         Determina se devemos spawnar um NPC com quest.
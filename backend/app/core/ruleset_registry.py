@@ -0,0 +1,349 @@
+"""
+Ruleset Registry - Dados de mecânica compilados e recarregados a quente.
+
+Cada consumidor de ruleset_source/mechanics tinha o próprio loader:
+`CombatEngine.get_tier_data` relia e reparseava cultivation_ranks.json a
+cada chamada, skill_manager/loot_manager liam uma vez no import (e nunca
+viam o que o Architect acrescentava) e as game_tools abriam items.json e
+techniques.json a cada tool call. Aqui:
+
+- Todos os arquivos de mecânica são lidos uma vez e compilados num
+  `Ruleset` imutável: regras tipadas com __slots__, tiers indexados por
+  número, skills/itens/técnicas em dicts por id, nome e elemento
+- As regras aceitam `.get()`/`[]` como os dicts antigos (`.raw` é o JSON
+  original, usado nas respostas das tools)
+- Um watcher verifica mtime/tamanho dos arquivos e recompila tudo; a troca
+  é uma atribuição de referência (atômica), então leitores nunca veem um
+  ruleset pela metade. Arquivo inválido mantém a versão anterior dele.
+- Conteúdo gerado pelo Architect (app/core/content_store.py) é consultado
+  como sobreposição nos lookups de item e loot, sem recompilar nada
+
+Benchmark de carga e latência: benchmark_ruleset.py
+"""
+
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.content_store import content_store
+
+
+MECHANICS_DIR = Path(__file__).resolve().parents[3] / "ruleset_source" / "mechanics"
+
+# Arquivo -> valor quando ausente/vazio
+MECHANICS_FILES = {
+    "classes.json": [],
+    "compatibility.json": {},
+    "constitutions.json": {},
+    "cultivation_ranks.json": {},
+    "godfiend_transformations.json": {},
+    "items.json": [],
+    "loot_tables.json": {},
+    "skills.json": [],
+    "techniques.json": [],
+}
+
+
+# ==================== REGRAS TIPADAS ====================
+
+class _Rule:
+    """Base: campos tipados em __slots__ + acesso de dict ao JSON original."""
+    __slots__ = ("raw",)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.raw.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.raw[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.raw
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.raw!r})"
+
+
+class TierRule(_Rule):
+    __slots__ = (
+        "tier", "rank_name", "level_range", "can_fly", "physics_type",
+        "max_hp_multiplier", "qi_multiplier", "xp_to_next_tier", "abilities",
+    )
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        self.tier = int(raw["tier"])
+        self.rank_name = raw.get("rank_name", "")
+        self.level_range = tuple(raw.get("level_range", ()))
+        self.can_fly = bool(raw.get("can_fly", False))
+        self.physics_type = raw.get("physics_type", "newtonian")
+        self.max_hp_multiplier = float(raw.get("max_hp_multiplier", 1.0))
+        self.qi_multiplier = float(raw.get("qi_multiplier", 1.0))
+        self.xp_to_next_tier = raw.get("xp_to_next_tier")
+        self.abilities = tuple(raw.get("abilities", ()))
+
+
+class SkillRule(_Rule):
+    __slots__ = (
+        "skill_id", "name", "base_damage", "cost_type", "cost_amount", "cooldown",
+        "element", "effects", "is_silent_art", "tier_requirement",
+    )
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        self.skill_id = raw["skill_id"]
+        self.name = raw.get("name", self.skill_id)
+        self.base_damage = float(raw.get("base_damage", 0.0))
+        self.cost_type = raw.get("cost_type")
+        self.cost_amount = raw.get("cost_amount", 0)
+        self.cooldown = raw.get("cooldown", 0)
+        self.element = raw.get("element")
+        self.effects = tuple(raw.get("effects", ()))
+        self.is_silent_art = bool(raw.get("is_silent_art", False))
+        self.tier_requirement = int(raw.get("tier_requirement", 1) or 1)
+
+
+class ItemRule(_Rule):
+    __slots__ = ("id", "name", "type", "value", "slot")
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        self.id = raw.get("id", "")
+        self.name = raw.get("name", self.id)
+        self.type = raw.get("type", "misc")
+        self.value = raw.get("value")
+        self.slot = raw.get("slot")
+
+
+class TechniqueRule(_Rule):
+    __slots__ = ("id", "name", "element", "cost_type", "cost_amount", "base_damage", "silent_art")
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        self.id = raw.get("id", "")
+        self.name = raw.get("name", self.id)
+        self.element = (raw.get("element") or "").lower()
+        self.cost_type = raw.get("cost_type")
+        self.cost_amount = raw.get("cost_amount", 0)
+        self.base_damage = float(raw.get("base_damage", 0.0))
+        self.silent_art = bool(raw.get("silent_art", False))
+
+
+# ==================== RULESET COMPILADO ====================
+
+class Ruleset:
+    """Snapshot imutável de todas as mecânicas (trocado inteiro a cada reload)."""
+    __slots__ = (
+        "version", "loaded_at", "raw", "tiers", "tiers_by_number", "skills", "skills_by_tier",
+        "items", "items_by_id", "items_by_name", "techniques", "techniques_by_element",
+        "loot", "compatibility", "constitutions", "classes",
+    )
+
+    def __init__(self, raw: Dict[str, Any], version: int):
+        self.version = version
+        self.loaded_at = time.time()
+        self.raw = raw
+
+        ranks = raw["cultivation_ranks.json"]
+        tiers = [TierRule(t) for t in (ranks.get("tiers", []) if isinstance(ranks, dict) else ranks)]
+        self.tiers_by_number: Dict[int, TierRule] = {t.tier: t for t in tiers}
+        # Índice direto por número do tier (posição 0 e buracos = None)
+        size = max(self.tiers_by_number, default=0) + 1
+        self.tiers: Tuple[Optional[TierRule], ...] = tuple(self.tiers_by_number.get(i) for i in range(size))
+
+        self.skills: Dict[str, SkillRule] = {}
+        by_tier: Dict[int, List[SkillRule]] = {}
+        for entry in raw["skills.json"]:
+            skill = SkillRule(entry)
+            self.skills[skill.skill_id] = skill
+            by_tier.setdefault(skill.tier_requirement, []).append(skill)
+        self.skills_by_tier = {tier: tuple(skills) for tier, skills in by_tier.items()}
+
+        self.items: Tuple[ItemRule, ...] = tuple(ItemRule(i) for i in raw["items.json"])
+        self.items_by_id = {i.id.lower(): i for i in self.items if i.id}
+        self.items_by_name = {i.name.lower(): i for i in self.items if i.name}
+
+        self.techniques: Tuple[TechniqueRule, ...] = tuple(TechniqueRule(t) for t in raw["techniques.json"])
+        by_element: Dict[str, List[TechniqueRule]] = {}
+        for technique in self.techniques:
+            by_element.setdefault(technique.element, []).append(technique)
+        self.techniques_by_element = {e: tuple(t) for e, t in by_element.items()}
+
+        loot = raw["loot_tables.json"]
+        if loot and "monsters" not in loot:
+            print("WARNING: loot_tables.json está no formato antigo. Usando com fallback.")
+            loot = {"monsters": loot}
+        self.loot = {
+            "monsters": loot.get("monsters", {}),
+            "exploration": loot.get("exploration", {}),
+            "bosses": loot.get("bosses", {}),
+        }
+
+        compatibility = raw["compatibility.json"]
+        self.compatibility: Dict[str, Dict[str, float]] = compatibility.get("matrix", {}) if compatibility else {}
+        self.constitutions = raw["constitutions.json"]
+        self.classes = raw["classes.json"]
+
+    # ==================== LOOKUPS ====================
+
+    def tier(self, tier: int) -> Optional[TierRule]:
+        if 0 <= tier < len(self.tiers):
+            return self.tiers[tier]
+        return None
+
+    def skill(self, skill_id: str) -> Optional[SkillRule]:
+        return self.skills.get(skill_id)
+
+    def skills_up_to_tier(self, tier: int) -> List[SkillRule]:
+        """Skills liberadas até o tier informado."""
+        return [s for t, skills in self.skills_by_tier.items() if t <= tier for s in skills]
+
+    def item(self, key: str) -> Optional[ItemRule]:
+        """Item por id ou nome (sem diferenciar maiúsculas), base ou gerado pelo Architect."""
+        key = key.lower()
+        item = self.items_by_name.get(key) or self.items_by_id.get(key)
+        if item is None:
+            generated = content_store.item(key)
+            if generated is not None:
+                item = ItemRule(generated)
+        return item
+
+    def all_items(self) -> List[ItemRule]:
+        """Itens base seguidos dos gerados (content store)."""
+        generated = [ItemRule(i) for i in content_store.values("items") if i.get("id", "").lower() not in self.items_by_id]
+        return list(self.items) + generated
+
+    def monster_loot(self, monster_id: str) -> Optional[Dict[str, Any]]:
+        """Loot table do monstro: gerada pelo Architect ou do loot_tables.json."""
+        return content_store.get("loot_tables", monster_id) or self.loot["monsters"].get(monster_id)
+
+    def techniques_for(self, element: str) -> Tuple[TechniqueRule, ...]:
+        return self.techniques_by_element.get(element.lower(), ())
+
+    def element_multiplier(self, attacker: str, defender: str) -> float:
+        return self.compatibility.get(attacker, {}).get(defender, 1.0)
+
+
+# ==================== REGISTRY ====================
+
+class RulesetRegistry:
+    """Mantém o Ruleset atual e o recompila quando os arquivos mudam."""
+
+    def __init__(self, mechanics_dir: Path = MECHANICS_DIR):
+        self.mechanics_dir = Path(mechanics_dir)
+        self._current: Optional[Ruleset] = None
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._watch_task: Optional[asyncio.Task] = None
+
+        # Métricas
+        self.reloads = 0
+        self.failed_files = 0
+        self.last_load_ms = 0.0
+
+    @property
+    def current(self) -> Ruleset:
+        ruleset = self._current
+        if ruleset is None:
+            ruleset = self.load()
+        return ruleset
+
+    # ==================== CARGA ====================
+
+    def _signature(self, filename: str) -> Tuple[int, int]:
+        try:
+            stat = (self.mechanics_dir / filename).stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return (0, 0)
+
+    def _read(self, filename: str, previous: Optional[Ruleset]) -> Any:
+        """JSON do arquivo; se inválido, mantém a versão do ruleset anterior."""
+        path = self.mechanics_dir / filename
+        default = MECHANICS_FILES[filename]
+        if not path.exists() or path.stat().st_size == 0:
+            return default
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.failed_files += 1
+            print(f"[RULESET] Erro ao ler {filename}: {e}. Mantendo versão anterior.")
+            return previous.raw[filename] if previous is not None else default
+
+    def load(self) -> Ruleset:
+        """Lê e compila todos os arquivos; troca o ruleset atual de uma vez."""
+        with self._lock:
+            start = time.perf_counter()
+            previous = self._current
+            signatures = {name: self._signature(name) for name in MECHANICS_FILES}
+            raw = {name: self._read(name, previous) for name in MECHANICS_FILES}
+            ruleset = Ruleset(raw, version=(previous.version + 1) if previous else 1)
+
+            self._current = ruleset
+            self._signatures = signatures
+            self.last_load_ms = (time.perf_counter() - start) * 1000
+            if previous is not None:
+                self.reloads += 1
+            print(
+                f"[RULESET] v{ruleset.version} carregado em {self.last_load_ms:.1f}ms "
+                f"({len(ruleset.skills)} skills, {len(ruleset.items)} itens, {len(ruleset.tiers_by_number)} tiers)"
+            )
+            return ruleset
+
+    def changed_files(self) -> List[str]:
+        return [name for name in MECHANICS_FILES if self._signature(name) != self._signatures.get(name)]
+
+    def reload_if_changed(self) -> bool:
+        """Recompila se algum arquivo mudou desde a última carga."""
+        changed = self.changed_files()
+        if not changed:
+            return False
+        print(f"[RULESET] Alterações detectadas: {', '.join(changed)}")
+        self.load()
+        return True
+
+    # ==================== WATCHER ====================
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # stat + parse fora do event loop
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                print(f"[RULESET] Erro no watcher: {e}")
+
+    def start_watching(self, interval: float = 2.0) -> None:
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch(interval))
+
+    def stop_watching(self) -> None:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        ruleset = self._current
+        return {
+            "version": ruleset.version if ruleset else 0,
+            "loaded_at": ruleset.loaded_at if ruleset else None,
+            "last_load_ms": round(self.last_load_ms, 2),
+            "reloads": self.reloads,
+            "failed_files": self.failed_files,
+            "watching": self._watch_task is not None and not self._watch_task.done(),
+            "tiers": len(ruleset.tiers_by_number) if ruleset else 0,
+            "skills": len(ruleset.skills) if ruleset else 0,
+            "items": len(ruleset.items) if ruleset else 0,
+            "techniques": len(ruleset.techniques) if ruleset else 0,
+            "loot_monsters": len(ruleset.loot["monsters"]) if ruleset else 0,
+            "generated": content_store.get_stats(),
+        }
+
+
+# Instância global
+ruleset_registry = RulesetRegistry()
@@ -19,7 +19,8 @@ import json
 import logging
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from typing import List, Optional, Dict, Any, TYPE_CHECKING
+from contextvars import ContextVar
+from typing import List, Optional, Dict, Any, Set, Tuple, TYPE_CHECKING
 from enum import Enum
 
 if TYPE_CHECKING:
@@ -287,6 +288,34 @@ class TurnSummary:
             "new_location": self.new_location
         }
     
+    @classmethod
+    def from_graph_result(
+        cls,
+        turn_number: int,
+        player_input: str,
+        result: Dict[str, Any],
+        location: str,
+        npcs_involved: List[str],
+        emotional_beat: str
+    ) -> "TurnSummary":
+        """Cria o resumo a partir do retorno do grafo v2 (narration/action_summary/action_result)."""
+        action = result.get("action_result") or {}
+        return cls(
+            turn_number=turn_number,
+            player_input=player_input,
+            interpreted_action=result.get("action_summary", ""),
+            action_result=action.get("message"),
+            scene_description=result.get("narration", ""),
+            location=location,
+            npcs_involved=npcs_involved,
+            emotional_beat=emotional_beat,
+            combat_occurred=bool(action.get("damage_dealt") or action.get("damage_received")),
+            npc_killed=action.get("npc_killed"),
+            item_obtained=(action.get("items_gained") or [{}])[0].get("name"),
+            location_changed=action.get("location_changed", False),
+            new_location=action.get("new_location")
+        )
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "TurnSummary":
         return cls(
@@ -541,6 +570,13 @@ class SessionContext:
     last_updated: datetime = field(default_factory=datetime.utcnow)
     total_turns: int = 0
     
+    # Deltas pendentes de persistência (ver app/core/session_store.py)
+    _new_turns: List[TurnSummary] = field(default_factory=list, init=False, repr=False, compare=False)
+    _dirty_hooks: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _expired_hooks: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _dirty_threads: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _state_dirty: bool = field(default=False, init=False, repr=False, compare=False)
+    
     @classmethod
     def create_new(
         cls,
@@ -564,6 +600,7 @@ class SessionContext:
         Mantém apenas os últimos max_history_size turnos.
         """
         self.turn_history.append(turn)
+        self._new_turns.append(turn)
         self.total_turns += 1
         
         # Manter tamanho do histórico
@@ -580,8 +617,10 @@ class SessionContext:
         for thread in self.active_threads:
             if thread.status == ThreadStatus.ACTIVE:
                 thread.age()
+                self._dirty_threads.add(thread.id)
         
         self.last_updated = datetime.utcnow()
+        self._state_dirty = True
         logger.debug(f"Turno {turn.turn_number} adicionado. Total: {self.total_turns}")
     
     def _update_state_flags(self, turn: TurnSummary) -> None:
@@ -752,6 +791,7 @@ class SessionContext:
     def plant_hook(self, hook: NarrativeHook) -> None:
         """Planta um novo hook narrativo."""
         self.pending_hooks.append(hook)
+        self._dirty_hooks.add(hook.id)
         logger.info(f"Hook plantado: {hook.hook_type.value} - {hook.description[:50]}")
     
     def resolve_hook(self, hook_id: str, resolution_turn: int) -> Optional[NarrativeHook]:
@@ -762,6 +802,7 @@ class SessionContext:
                 hook.resolved_turn = resolution_turn
                 self.resolved_hooks.append(hook)
                 self.pending_hooks.pop(i)
+                self._dirty_hooks.add(hook.id)
                 logger.info(f"Hook resolvido: {hook.description[:50]}")
                 return hook
         return None
@@ -788,6 +829,8 @@ class SessionContext:
         self.pending_hooks = [h for h in self.pending_hooks if not h.is_expired(current_turn)]
         
         for hook in expired:
+            self._dirty_hooks.discard(hook.id)
+            self._expired_hooks.add(hook.id)
             logger.warning(f"Hook expirou: {hook.description[:50]}")
         
         return expired
@@ -797,6 +840,7 @@ class SessionContext:
     def add_plot_thread(self, thread: PlotThread) -> None:
         """Adiciona nova thread de plot."""
         self.active_threads.append(thread)
+        self._dirty_threads.add(thread.id)
         logger.info(f"Thread criada: {thread.title}")
     
     def get_thread(self, thread_id: str) -> Optional[PlotThread]:
@@ -817,12 +861,14 @@ class SessionContext:
             thread.update_interaction(current_turn)
             if milestone:
                 thread.add_milestone(milestone)
+            self._dirty_threads.add(thread.id)
     
     def resolve_thread(self, thread_id: str) -> None:
         """Marca uma thread como resolvida."""
         thread = self.get_thread(thread_id)
         if thread:
             thread.status = ThreadStatus.RESOLVED
+            self._dirty_threads.add(thread.id)
             logger.info(f"Thread resolvida: {thread.title}")
     
     # ==================== MÉTODOS DE COMBATE ====================
@@ -855,46 +901,53 @@ class SessionContext:
             "session_id": self.session_id,
             "player_id": self.player_id,
             "player_name": self.player_name,
+            **self.serialize_state(),
+            "turn_history": [t.to_dict() for t in self.turn_history],
+            "pending_hooks": [h.to_dict() for h in self.pending_hooks],
+            "resolved_hooks": [h.to_dict() for h in self.resolved_hooks],
+            "active_threads": [t.to_dict() for t in self.active_threads],
+            "created_at": self.created_at.isoformat(),
+        }
+    
+    def serialize_state(self) -> Dict[str, Any]:
+        """Estado escalar (sem histórico, hooks e threads) - o delta 'state' de cada turno."""
+        return {
             "current_location": self.current_location,
             "present_entities": [asdict(e) for e in self.present_entities],
-            "turn_history": [t.to_dict() for t in self.turn_history],
             "time_context": self.time_context.to_dict() if self.time_context else None,
             "current_beat": self.current_beat.value,
             "tension_level": self.tension_level,
-            "pending_hooks": [h.to_dict() for h in self.pending_hooks],
-            "resolved_hooks": [h.to_dict() for h in self.resolved_hooks],
-            "active_threads": [t.to_dict() for t in self.active_threads],
             "in_combat": self.in_combat,
             "combat_round": self.combat_round,
             "combat_participants": self.combat_participants,
             "last_action_type": self.last_action_type,
             "consecutive_combat_turns": self.consecutive_combat_turns,
             "consecutive_peaceful_turns": self.consecutive_peaceful_turns,
-            "created_at": self.created_at.isoformat(),
             "last_updated": self.last_updated.isoformat(),
             "total_turns": self.total_turns
         }
     
+    @staticmethod
+    def _entity_from_dict(e_data: Dict[str, Any]) -> Entity:
+        return Entity(
+            id=e_data["id"],
+            name=e_data["name"],
+            entity_type=EntityType(e_data["entity_type"]),
+            species=e_data.get("species", "human"),
+            gender=e_data.get("gender", "unknown"),
+            can_speak=e_data.get("can_speak", True),
+            emotional_state=e_data.get("emotional_state", "neutral"),
+            rank=e_data.get("rank", 1),
+            current_hp_percent=e_data.get("current_hp_percent", 1.0),
+            disposition_to_player=e_data.get("disposition_to_player", "neutral"),
+            notable_traits=e_data.get("notable_traits", [])
+        )
+    
     @classmethod
     def deserialize(cls, data: Dict[str, Any]) -> "SessionContext":
         """Deserializa contexto de dados persistidos."""
         # Reconstruir entidades
-        entities = []
-        for e_data in data.get("present_entities", []):
-            entity_type = EntityType(e_data["entity_type"])
-            entities.append(Entity(
-                id=e_data["id"],
-                name=e_data["name"],
-                entity_type=entity_type,
-                species=e_data.get("species", "human"),
-                gender=e_data.get("gender", "unknown"),
-                can_speak=e_data.get("can_speak", True),
-                emotional_state=e_data.get("emotional_state", "neutral"),
-                rank=e_data.get("rank", 1),
-                current_hp_percent=e_data.get("current_hp_percent", 1.0),
-                disposition_to_player=e_data.get("disposition_to_player", "neutral"),
-                notable_traits=e_data.get("notable_traits", [])
-            ))
+        entities = [cls._entity_from_dict(e) for e in data.get("present_entities", [])]
         
         # Reconstruir histórico de turnos
         turns = [TurnSummary.from_dict(t) for t in data.get("turn_history", [])]
@@ -935,6 +988,96 @@ class SessionContext:
             total_turns=data.get("total_turns", 0)
         )
     
+    # ==================== DELTAS ====================
+    
+    def has_pending_deltas(self) -> bool:
+        return bool(
+            self._new_turns or self._dirty_hooks or self._expired_hooks
+            or self._dirty_threads or self._state_dirty
+        )
+    
+    def mark_dirty(self, hook_id: Optional[str] = None, thread_id: Optional[str] = None) -> None:
+        """Marca alterações feitas fora dos métodos do contexto (ex.: hook.urgency = 2)."""
+        if hook_id:
+            self._dirty_hooks.add(hook_id)
+        if thread_id:
+            self._dirty_threads.add(thread_id)
+        self._state_dirty = True
+    
+    def pop_deltas(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Retorna e limpa as alterações desde a última chamada, na ordem de replay:
+        turnos novos, hooks (estado final de cada um), threads e o estado escalar.
+        """
+        deltas: List[Tuple[str, Dict[str, Any]]] = [("turn", t.to_dict()) for t in self._new_turns]
+        
+        hooks = {h.id: h for h in self.pending_hooks + self.resolved_hooks}
+        for hook_id in sorted(self._dirty_hooks):
+            if hook_id in hooks:
+                deltas.append(("hook", hooks[hook_id].to_dict()))
+        for hook_id in sorted(self._expired_hooks):
+            if hook_id not in hooks:
+                deltas.append(("hook", {"id": hook_id, "expired": True}))
+        
+        threads = {t.id: t for t in self.active_threads}
+        for thread_id in sorted(self._dirty_threads):
+            if thread_id in threads:
+                deltas.append(("thread", threads[thread_id].to_dict()))
+        
+        if deltas or self._state_dirty:
+            deltas.append(("state", self.serialize_state()))
+        
+        self._new_turns = []
+        self._dirty_hooks = set()
+        self._expired_hooks = set()
+        self._dirty_threads = set()
+        self._state_dirty = False
+        return deltas
+    
+    def apply_delta(self, kind: str, payload: Dict[str, Any]) -> None:
+        """Reaplica um delta persistido (replay na carga da sessão)."""
+        if kind == "turn":
+            self.turn_history.append(TurnSummary.from_dict(payload))
+            if len(self.turn_history) > self.max_history_size:
+                self.turn_history = self.turn_history[-self.max_history_size:]
+        
+        elif kind == "hook":
+            hook_id = payload["id"]
+            self.pending_hooks = [h for h in self.pending_hooks if h.id != hook_id]
+            self.resolved_hooks = [h for h in self.resolved_hooks if h.id != hook_id]
+            if not payload.get("expired"):
+                hook = NarrativeHook.from_dict(payload)
+                (self.resolved_hooks if hook.resolved else self.pending_hooks).append(hook)
+        
+        elif kind == "thread":
+            thread = PlotThread.from_dict(payload)
+            for i, existing in enumerate(self.active_threads):
+                if existing.id == thread.id:
+                    self.active_threads[i] = thread
+                    break
+            else:
+                self.active_threads.append(thread)
+        
+        elif kind == "state":
+            self.current_location = payload["current_location"]
+            self.present_entities = [self._entity_from_dict(e) for e in payload.get("present_entities", [])]
+            self.time_context = (
+                TimeContext.from_dict(payload["time_context"]) if payload.get("time_context") else None
+            )
+            self.current_beat = NarrativeBeat(payload.get("current_beat", "setup"))
+            self.tension_level = payload.get("tension_level", 0.0)
+            self.in_combat = payload.get("in_combat", False)
+            self.combat_round = payload.get("combat_round", 0)
+            self.combat_participants = payload.get("combat_participants", [])
+            self.last_action_type = payload.get("last_action_type", "none")
+            self.consecutive_combat_turns = payload.get("consecutive_combat_turns", 0)
+            self.consecutive_peaceful_turns = payload.get("consecutive_peaceful_turns", 0)
+            self.last_updated = datetime.fromisoformat(payload["last_updated"])
+            self.total_turns = payload.get("total_turns", self.total_turns)
+        
+        else:
+            logger.warning(f"Delta de sessão desconhecido: {kind}")
+    
     def to_json(self) -> str:
         """Serializa para JSON string."""
         return json.dumps(self.serialize(), ensure_ascii=False, indent=2)
@@ -996,24 +1139,30 @@ class SessionContext:
         return "\n".join(parts)
 
 
-# Singleton para sessão atual (por worker/request)
-_current_session: Optional[SessionContext] = None
+# Sessão atual do request/task (ContextVar: requests concorrentes não se sobrescrevem).
+# Os contextos vivem no SessionContextStore, indexados por session_id.
+_current_session_id: ContextVar[Optional[str]] = ContextVar("current_session_id", default=None)
 
 
-def get_current_session() -> Optional[SessionContext]:
-    """Retorna sessão atual (para uso em contexto de request)."""
-    global _current_session
-    return _current_session
+def get_current_session(session_id: Optional[str] = None) -> Optional[SessionContext]:
+    """Retorna a sessão pedida (ou a do request atual) se estiver no cache do store."""
+    from app.core.session_store import session_store
+    
+    session_id = session_id or _current_session_id.get()
+    if session_id is None:
+        return None
+    return session_store.get(session_id)
 
 
 def set_current_session(session: SessionContext) -> None:
-    """Define sessão atual."""
-    global _current_session
-    _current_session = session
+    """Registra a sessão no store e a define como atual neste request."""
+    from app.core.session_store import session_store
+    
+    session_store.put(session)
+    _current_session_id.set(session.session_id)
     logger.debug(f"Sessão definida: {session.session_id}")
 
 
 def clear_current_session() -> None:
-    """Limpa sessão atual."""
-    global _current_session
-    _current_session = None
+    """Limpa a sessão atual deste request (o contexto continua no store)."""
+    _current_session_id.set(None)
@@ -0,0 +1,320 @@
+"""
+Session Store - Contextos de sessão por session_id com persistência incremental.
+
+Antes havia um único `_current_session` global (sessões concorrentes se
+sobrescreviam) e a persistência seria o `serialize()` completo a cada turno.
+Agora:
+- Cache LRU em processo: session_id -> SessionContext
+- Postgres: snapshot por sessão + log append-only de deltas
+  (turno novo, hook/thread alterado, estado escalar do turno)
+- Compactação a cada `compact_every` deltas: o snapshot é reescrito com o
+  estado atual e os deltas incorporados são apagados
+
+Carregar uma sessão (mesmo com 500 turnos) é um único SELECT pelo PK do
+snapshot e pelo índice (session_id, seq) dos deltas.
+"""
+
+import asyncio
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.core.session_context import Entity, SessionContext, set_current_session
+
+
+# Snapshot vem como seq = -1 para ordenar antes dos deltas
+LOAD_SQL = text("""
+    SELECT -1 AS seq, 'snapshot' AS kind, CAST(data AS TEXT) AS payload, last_seq
+    FROM session_context_snapshots
+    WHERE session_id = :session_id
+    UNION ALL
+    SELECT d.seq, d.kind, CAST(d.payload AS TEXT), s.last_seq
+    FROM session_context_deltas d
+    JOIN session_context_snapshots s ON s.session_id = d.session_id
+    WHERE d.session_id = :session_id AND d.seq > s.last_seq
+    ORDER BY seq
+""")
+
+
+class SessionContextStore:
+    """
+    Cache LRU de SessionContext + persistência snapshot/deltas.
+    `_seq` guarda o último seq gravado de cada sessão e `_since_snapshot`
+    quantos deltas ainda não foram compactados.
+    """
+
+    def __init__(self, max_sessions: int = 256, compact_every: int = 100):
+        self.max_sessions = max_sessions
+        self.compact_every = compact_every
+        self._cache: "OrderedDict[str, SessionContext]" = OrderedDict()
+        self._seq: Dict[str, int] = {}
+        self._since_snapshot: Dict[str, int] = {}
+        # Contextos expulsos do LRU com deltas ainda não gravados
+        self._evicted_dirty: Dict[str, SessionContext] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.deltas_replayed = 0
+        self.deltas_written = 0
+        self.snapshots_written = 0
+        self.compactions = 0
+        self.evictions = 0
+
+    def _lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    # ==================== CACHE ====================
+
+    def get(self, session_id: str) -> Optional[SessionContext]:
+        """Busca só no cache em processo."""
+        context = self._cache.get(session_id)
+        if context is None:
+            context = self._evicted_dirty.get(session_id)
+            if context is None:
+                return None
+            self.put(context)
+        self._cache.move_to_end(session_id)
+        return context
+
+    def put(self, context: SessionContext) -> None:
+        """Coloca (ou renova) o contexto no LRU."""
+        self._evicted_dirty.pop(context.session_id, None)
+        self._cache[context.session_id] = context
+        self._cache.move_to_end(context.session_id)
+
+        while len(self._cache) > self.max_sessions:
+            session_id, evicted = self._cache.popitem(last=False)
+            self.evictions += 1
+            if evicted.has_pending_deltas():
+                self._evicted_dirty[session_id] = evicted
+            else:
+                self._forget(session_id)
+
+    def evict(self, session_id: str) -> None:
+        """Remove do cache (deltas pendentes continuam aguardando o próximo flush)."""
+        context = self._cache.pop(session_id, None)
+        if context is not None and context.has_pending_deltas():
+            self._evicted_dirty[session_id] = context
+        elif context is not None:
+            self._forget(session_id)
+
+    def _forget(self, session_id: str) -> None:
+        self._seq.pop(session_id, None)
+        self._since_snapshot.pop(session_id, None)
+        self._locks.pop(session_id, None)
+
+    # ==================== CARGA ====================
+
+    async def load(self, db_session, session_id: str) -> Optional[SessionContext]:
+        """Cache -> snapshot + deltas (um SELECT). None se a sessão não existe."""
+        context = self.get(session_id)
+        if context is not None:
+            self.hits += 1
+            return context
+
+        self.misses += 1
+        result = await db_session.execute(LOAD_SQL, {"session_id": session_id})
+        rows = result.all()
+        if not rows:
+            return None
+
+        _, _, snapshot, last_seq = rows[0]
+        context = SessionContext.deserialize(json.loads(snapshot))
+        seq = last_seq
+        for seq, kind, payload, _ in rows[1:]:
+            context.apply_delta(kind, json.loads(payload))
+
+        self.loads += 1
+        self.deltas_replayed += len(rows) - 1
+        self._seq[session_id] = seq
+        self._since_snapshot[session_id] = len(rows) - 1
+        self.put(context)
+        return context
+
+    async def open_turn(self, db_session, session_id: str, player, npcs_in_scene, location: str) -> SessionContext:
+        """
+        Carrega (ou cria) o contexto da sessão no início de um turno, atualiza
+        a cena e o define como sessão atual do request. Sessão nova só é
+        gravada no primeiro `save`.
+        """
+        context = await self.load(db_session, session_id)
+        if context is None:
+            context = SessionContext(
+                session_id=session_id,
+                player_id=player.id,
+                player_name=player.name,
+                current_location=location
+            )
+        context.current_location = location
+        context.set_present_entities(
+            [Entity.from_player(player)] + [Entity.from_npc(npc) for npc in npcs_in_scene]
+        )
+        set_current_session(context)
+        return context
+
+    # ==================== PERSISTÊNCIA ====================
+
+    async def save(self, db_session, context: SessionContext, commit: bool = True) -> int:
+        """
+        Grava os deltas pendentes do contexto (append-only) e compacta se
+        necessário. Sessão nova ganha o snapshot direto. Retorna quantos
+        registros foram gravados.
+        """
+        session_id = context.session_id
+        async with self._lock(session_id):
+            if session_id not in self._seq:
+                last_seq = await self._persisted_seq(db_session, session_id)
+                if last_seq is None:
+                    # Nunca persistida: o snapshot já contém tudo
+                    context.pop_deltas()
+                    await self._write_snapshot(db_session, context, 0, insert=True)
+                    self._seq[session_id] = 0
+                    self._since_snapshot[session_id] = 0
+                    if commit:
+                        await db_session.commit()
+                    self.put(context)
+                    return 1
+                self._seq[session_id] = last_seq
+
+            deltas = context.pop_deltas()
+            if not deltas:
+                return 0
+
+            seq = self._seq[session_id]
+            now = datetime.utcnow()
+            params: List[Dict[str, Any]] = []
+            for kind, payload in deltas:
+                seq += 1
+                params.append({
+                    "session_id": session_id,
+                    "seq": seq,
+                    "kind": kind,
+                    "payload": json.dumps(payload, ensure_ascii=False),
+                    "created_at": now,
+                })
+            await db_session.execute(
+                text("""
+                    INSERT INTO session_context_deltas (session_id, seq, kind, payload, created_at)
+                    VALUES (:session_id, :seq, :kind, CAST(:payload AS JSON), :created_at)
+                """),
+                params
+            )
+            self._seq[session_id] = seq
+            self._since_snapshot[session_id] = self._since_snapshot.get(session_id, 0) + len(params)
+            self.deltas_written += len(params)
+
+            if self._since_snapshot[session_id] >= self.compact_every:
+                await self._compact(db_session, context)
+
+            if commit:
+                await db_session.commit()
+            self._evicted_dirty.pop(session_id, None)
+            return len(params)
+
+    async def flush_evicted(self, db_session) -> int:
+        """Grava os deltas de contextos que saíram do LRU antes de serem salvos."""
+        written = 0
+        for context in list(self._evicted_dirty.values()):
+            written += await self.save(db_session, context, commit=False)
+            self._evicted_dirty.pop(context.session_id, None)
+            if context.session_id not in self._cache:
+                self._forget(context.session_id)
+        if written:
+            await db_session.commit()
+        return written
+
+    async def compact(self, db_session, session_id: str) -> bool:
+        """Força a compactação de uma sessão em cache."""
+        context = self.get(session_id)
+        if context is None:
+            return False
+        await self.save(db_session, context, commit=False)
+        async with self._lock(session_id):
+            await self._compact(db_session, context)
+        await db_session.commit()
+        return True
+
+    async def _compact(self, db_session, context: SessionContext) -> None:
+        """Reescreve o snapshot até o seq atual e apaga os deltas incorporados."""
+        session_id = context.session_id
+        seq = self._seq.get(session_id, 0)
+        await self._write_snapshot(db_session, context, seq)
+        await db_session.execute(
+            text("DELETE FROM session_context_deltas WHERE session_id = :session_id AND seq <= :seq"),
+            {"session_id": session_id, "seq": seq}
+        )
+        self._since_snapshot[session_id] = 0
+        self.compactions += 1
+
+    async def _persisted_seq(self, db_session, session_id: str) -> Optional[int]:
+        """Último seq gravado (None se a sessão não tem snapshot)."""
+        result = await db_session.execute(
+            text("""
+                SELECT s.last_seq, (
+                    SELECT MAX(d.seq) FROM session_context_deltas d WHERE d.session_id = s.session_id
+                )
+                FROM session_context_snapshots s
+                WHERE s.session_id = :session_id
+            """),
+            {"session_id": session_id}
+        )
+        row = result.first()
+        if row is None:
+            return None
+        last_seq, max_delta = row
+        return max(last_seq, max_delta or 0)
+
+    async def _write_snapshot(self, db_session, context: SessionContext, seq: int, insert: bool = False) -> None:
+        params = {
+            "session_id": context.session_id,
+            "player_id": context.player_id,
+            "data": json.dumps(context.serialize(), ensure_ascii=False),
+            "last_seq": seq,
+            "now": datetime.utcnow(),
+        }
+        if insert:
+            sql = """
+                INSERT INTO session_context_snapshots (session_id, player_id, data, last_seq, updated_at)
+                VALUES (:session_id, :player_id, CAST(:data AS JSON), :last_seq, :now)
+            """
+        else:
+            sql = """
+                UPDATE session_context_snapshots
+                SET data = CAST(:data AS JSON), last_seq = :last_seq, updated_at = :now
+                WHERE session_id = :session_id
+            """
+        await db_session.execute(text(sql), params)
+        self.snapshots_written += 1
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cached_sessions": len(self._cache),
+            "max_sessions": self.max_sessions,
+            "evicted_dirty": len(self._evicted_dirty),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "loads": self.loads,
+            "deltas_replayed": self.deltas_replayed,
+            "deltas_written": self.deltas_written,
+            "snapshots_written": self.snapshots_written,
+            "compactions": self.compactions,
+            "evictions": self.evictions,
+            "compact_every": self.compact_every,
+        }
+
+
+# Instância global
+session_store = SessionContextStore()
@@ -3,11 +3,14 @@ Daily Tick Simulator - Main simulation orchestrator
 Runs all background simulations that evolve the world
 """
 
+import random
 from typing import List, Dict, Any, Optional
+from app.config import settings
 from app.core.simulation.economy import EconomySimulator
 from app.core.simulation.ecology import EcologySimulator
 from app.core.simulation.lineage import LineageSimulator
 from app.core.simulation.faction_simulator import FactionSimulator
+from app.core.world_version import world_version
 
 
 class DailyTickSimulator:
@@ -48,7 +51,7 @@ class DailyTickSimulator:
             world_event_repo=world_event_repo
         )
         
-        self.ecology_sim = EcologySimulator(world_map={})
+        self.ecology_sim = EcologySimulator()
         
         self.lineage_sim = LineageSimulator(npc_repo=npc_repo)
         
@@ -111,6 +114,11 @@ class DailyTickSimulator:
         try:
             await self.ecology_sim.process_migrations()
             print(f"      -> Migrações processadas")
+            
+            horde_event = await self._maybe_spawn_horde()
+            if horde_event:
+                report["ecology_events"].append(horde_event)
+                report["events"].append(horde_event)
         except Exception as e:
             print(f"      -> ERRO: {e}")
         
@@ -130,6 +138,9 @@ class DailyTickSimulator:
         except Exception as e:
             print(f"      -> ERRO: {e}")
         
+        # Facções, economia e ecologia mudaram: invalida os caches de leitura
+        world_version.bump("world")
+        
         print(f"\n{'='*60}")
         print(f"[DAILY TICK] SIMULAÇÃO DO TURNO {self.current_turn} CONCLUÍDA")
         print(f"             Total de eventos: {len(report['events'])}")
@@ -137,6 +148,30 @@ class DailyTickSimulator:
         
         return report
 
+    async def _maybe_spawn_horde(self) -> Optional[Dict[str, Any]]:
+        """
+        Com chance ECOLOGY_HORDE_CHANCE por dia, uma horda invade uma região
+        aleatória e enfrenta os NPCs não hostis que estão lá. O HP final
+        (e a morte) de cada defensor é gravado no banco.
+        """
+        
+        regions = list(self.ecology_sim.monster_populations)
+        if not regions or random.random() >= settings.ECOLOGY_HORDE_CHANCE:
+            return None
+        
+        region = random.choice(regions)
+        defenders = []
+        if self.npc_repo:
+            defenders = [npc for npc in await self.npc_repo.get_by_location(region) if npc.role != "enemy"]
+        
+        event = self.ecology_sim.spawn_monster_horde(region, defenders=defenders)
+        encounter = (event or {}).get("encounter")
+        if encounter:
+            for outcome in encounter["defenders"]:
+                if outcome["id"] is not None:
+                    await self.npc_repo.update_hp(outcome["id"], outcome["hp"])
+        return event
+
     async def _reset_daily_resources(self):
         """
         Reseta recursos diários de NPCs e locais.
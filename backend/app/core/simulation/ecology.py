@@ -3,9 +3,13 @@ Ecology Simulator - Monster migration and population dynamics
 Based on GDD: Godfiends need to eat, monsters migrate based on resources
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import random
 
+from app.core.loot_manager import loot_manager
+from app.core.mass_combat import Army, MassCombatEngine, mass_combat_engine
+from app.core.world_graph import WorldGraph, world_graph
+
 
 class EcologySimulator:
     """
@@ -13,26 +17,19 @@ class EcologySimulator:
     Monstros migram baseado em recursos e pressão de caça.
     """
     
-    def __init__(self, world_map: Dict[str, List[str]] = None):
+    # Perfil padrão de uma unidade de monstro em combate em massa (defaults de NPC)
+    HORDE_UNIT_PROFILE: Dict[str, Any] = {"max_hp": 100.0, "defense": 10.0, "skill_id": "basic_attack"}
+    
+    def __init__(self, graph: WorldGraph = None):
         """
         Inicializa o simulador de ecologia.
         
         Args:
-            world_map: Mapa de conexões entre locais
+            graph: WorldGraph compartilhado (padrão: instância global)
         """
         
-        # Mapa de conexões entre locais
-        self.world_map = world_map or {
-            "Floresta Nublada": ["Vila Crisântemos", "Cavernas Cristalinas", "Vale dos Mil Picos"],
-            "Vale dos Mil Picos": ["Floresta Nublada", "Montanha Arcaica"],
-            "Cavernas Cristalinas": ["Floresta Nublada", "Cidade Subterrânea"],
-            "Montanha Arcaica": ["Vale dos Mil Picos", "Passo da Montanha"],
-            "Passo da Montanha": ["Montanha Arcaica", "Cidade Imperial", "Geleiras Sussurrantes"],
-            "Pântano dos Mil Venenos": ["Floresta Venenosa"],
-            "Floresta Venenosa": ["Pântano dos Mil Venenos", "Seita Lua Sombria"],
-            "Deserto Carmesim": ["Oásis Eterno", "Ruínas Solares"],
-            "Geleiras Sussurrantes": ["Passo da Montanha", "Pico do Trovão Eterno"],
-        }
+        # Grafo de conexões entre locais
+        self.graph = graph or world_graph
         
         # População de monstros por região (tipo -> quantidade)
         self.monster_populations: Dict[str, Dict[str, int]] = {
@@ -126,7 +123,7 @@ class EcologySimulator:
         """
         
         # Encontrar região vizinha com menor população
-        neighbors = self.world_map.get(from_region, [])
+        neighbors = self.graph.neighbors(from_region)
         
         if not neighbors:
             return None
@@ -261,10 +258,11 @@ class EcologySimulator:
         
         return list(populations.keys())[0]
     
-    def spawn_monster_horde(self, region: str) -> Dict[str, Any]:
+    def spawn_monster_horde(self, region: str, defenders: Optional[List[Any]] = None) -> Dict[str, Any]:
         """
         Cria um evento de horda de monstros (evento mundial).
-        Dobra a população de um tipo aleatório.
+        Dobra a população de um tipo aleatório; com defensores na região,
+        a horda recém-chegada os enfrenta (simulate_horde_encounter).
         """
         
         populations = self.monster_populations.get(region, {})
@@ -287,6 +285,90 @@ class EcologySimulator:
             "description": f"Uma horda de {monster_type}s invadiu {region}! População dobrou!"
         }
         
+        print(f"[ECOLOGY EVENT] {event['description']}")
+        
+        if defenders:
+            event["encounter"] = self.simulate_horde_encounter(
+                region,
+                defenders,
+                monster_type=monster_type,
+                horde_size=event["count"]
+            )
+        return event
+    
+    def simulate_horde_encounter(
+        self,
+        region: str,
+        defenders: List[Any],
+        monster_type: Optional[str] = None,
+        horde_size: Optional[int] = None,
+        unit_profile: Optional[Dict[str, Any]] = None,
+        engine: MassCombatEngine = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Resolve um confronto entre uma horda da região e os defensores
+        (Players/NPCs) no nível de unidade, com o motor de combate em massa.
+        As baixas da horda saem da população e viram pressão de caça, e o
+        loot dos abates é amostrado em lote pela loot table do monstro.
+        O HP final de cada defensor vai em event["defenders"]; quem grava no
+        banco é o chamador (DailyTickSimulator usa NpcRepository.update_hp).
+        
+        Args:
+            region: Região de onde vem a horda
+            defenders: Players/NPCs que enfrentam a horda (não são modificados)
+            monster_type: Tipo de monstro (padrão: o mais populoso da região)
+            horde_size: Tamanho da horda (padrão: toda a população do tipo)
+            unit_profile: Sobrescreve HORDE_UNIT_PROFILE (max_hp, defense, skill_id, ...)
+        
+        Returns:
+            Evento com o resultado agregado da batalha, ou None sem horda/defensores
+        """
+        
+        populations = self.monster_populations.get(region, {})
+        if not populations or not defenders:
+            return None
+        
+        monster_type = monster_type or max(populations, key=populations.get)
+        count = min(horde_size or populations.get(monster_type, 0), populations.get(monster_type, 0))
+        if count <= 0:
+            return None
+        
+        horde = Army.uniform(
+            f"Horda de {monster_type}",
+            count,
+            kind=monster_type,
+            **{**self.HORDE_UNIT_PROFILE, **(unit_profile or {})}
+        )
+        defending = Army.from_units("Defensores", defenders)
+        battle = (engine or mass_combat_engine).simulate(horde, defending)
+        
+        killed = battle.sides[horde.name]["casualties"]
+        populations[monster_type] -= killed
+        self.hunting_pressure[region] = self.hunting_pressure.get(region, 0) + killed
+        
+        event = {
+            "type": "horde_encounter",
+            "region": region,
+            "monster_type": monster_type,
+            "horde_size": count,
+            "monsters_killed": killed,
+            "defenders_fallen": battle.sides["Defensores"]["casualties"],
+            "defenders_won": battle.winner == "Defensores",
+            # Mesma ordem de `defenders` (Army.from_units preserva a ordem)
+            "defenders": [
+                {
+                    "id": getattr(unit, "id", None),
+                    "name": getattr(unit, "name", None),
+                    "hp": round(max(0.0, float(hp)), 1),
+                    "fallen": bool(hp <= 0),
+                }
+                for unit, hp in zip(defenders, defending.hp)
+            ],
+            "loot": loot_manager.sample_kills(monster_type, killed).totals() if killed else {},
+            "battle": battle.to_dict(),
+            "description": f"Horda de {monster_type} em {region}: {battle.summary()}"
+        }
+        
         print(f"[ECOLOGY EVENT] {event['description']}")
         return event
     
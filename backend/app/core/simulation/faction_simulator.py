@@ -6,6 +6,10 @@ Based on GDD: World should feel alive with faction politics
 from typing import Dict, List, Optional, Any
 import random
 
+from app.config import settings
+from app.core.mass_combat import Army, mass_combat_engine
+from app.core.world_graph import world_graph
+
 
 class FactionSimulator:
     """
@@ -26,6 +30,10 @@ class FactionSimulator:
     EVENT_FACTION_WEAKENED = "faction_weakened"
     EVENT_LEADER_KILLED = "leader_killed"
     
+    # Batalhas em massa: poder representado por cada unidade e perda de poder por aniquilação
+    POWER_PER_UNIT = 5
+    BATTLE_POWER_LOSS = 0.1
+    
     def __init__(self, faction_repo=None, world_event_repo=None):
         """
         Inicializa o simulador de facções.
@@ -150,31 +158,37 @@ class FactionSimulator:
         attacker_power = self.faction_power.get(attacker_name, 100)
         defender_power = self.faction_power.get(defender_name, 100)
         
-        # Adicionar variação aleatória
-        attacker_roll = attacker_power * random.uniform(0.7, 1.3)
-        defender_roll = defender_power * random.uniform(0.7, 1.3)
+        # Batalha no nível de unidade (motor de combate em massa vetorizado)
+        battle = mass_combat_engine.simulate(
+            self._muster_army(attacker_name, attacker_power),
+            self._muster_army(defender_name, defender_power),
+        )
         
-        if attacker_roll > defender_roll:
-            # Atacante vence
-            winner = attacker_name
-            loser = defender_name
-            power_lost = int(defender_power * 0.1)  # Perde 10% do poder
-            self.faction_power[defender_name] = max(50, defender_power - power_lost)
+        # Sem vencedor claro, o defensor segura a posição
+        if battle.winner == attacker_name:
+            winner, loser = attacker_name, defender_name
         else:
-            # Defensor vence
-            winner = defender_name
-            loser = attacker_name
-            power_lost = int(attacker_power * 0.1)
-            self.faction_power[attacker_name] = max(50, attacker_power - power_lost)
+            winner, loser = defender_name, attacker_name
+        
+        # Cada lado perde poder proporcional às baixas (aniquilação = 10%)
+        power_losses = {}
+        casualties = {}
+        for name, power in ((attacker_name, attacker_power), (defender_name, defender_power)):
+            power_losses[name] = int(power * battle.casualty_rate(name) * self.BATTLE_POWER_LOSS)
+            self.faction_power[name] = max(50, power - power_losses[name])
+            casualties[name] = battle.sides[name]["casualties"]
+        power_lost = power_losses[loser]
         
         # Criar evento
         event = {
             "type": self.EVENT_FACTION_WEAKENED,
-            "description": f"Batalha entre {attacker_name} e {defender_name}! {winner} venceu.",
+            "description": f"Batalha entre {attacker_name} e {defender_name}! {battle.summary()}",
             "public_description": f"Rumores de batalha entre cultivadores do {attacker_name} e {defender_name} se espalham.",
             "winner": winner,
             "loser": loser,
             "power_lost": power_lost,
+            "casualties": casualties,
+            "battle": battle.to_dict(),
             "turn": current_turn
         }
         
@@ -185,12 +199,21 @@ class FactionSimulator:
                 description=event["description"],
                 public_description=event["public_description"],
                 turn_occurred=current_turn,
-                effects={"winner": winner, "loser": loser, "power_lost": power_lost}
+                effects={"winner": winner, "loser": loser, "power_lost": power_lost, "casualties": casualties}
             )
         
         print(f"[FACTION WAR] {event['description']}")
         return event
 
+    def _muster_army(self, faction_name: str, power: int) -> Army:
+        """
+        Tropas mobilizadas para uma batalha: uma unidade a cada POWER_PER_UNIT
+        de poder, com 70-130% de comparecimento (a antiga variação da rolagem).
+        """
+        count = int(power / self.POWER_PER_UNIT * random.uniform(0.7, 1.3))
+        count = max(1, min(count, settings.MASS_COMBAT_MAX_UNITS))
+        return Army.uniform(faction_name, count, kind="cultivador")
+
     async def _check_for_new_tensions(self, current_turn: int) -> List[Dict[str, Any]]:
         """
         Verifica se novas tensões surgem entre facções.
@@ -363,15 +386,9 @@ class FactionSimulator:
         return events
 
     def _get_adjacent_factions(self, territory: str) -> List[str]:
-        """Retorna facções com territórios adjacentes."""
-        
-        # Mapa de adjacência simplificado
-        adjacency = {
-            "Floresta Nublada": ["Cidade Imperial", "Vila Crisântemos", "Cavernas Cristalinas"],
-            "Vale dos Mil Picos": ["Montanha Arcaica", "Cidade Imperial"],
-        }
+        """Retorna facções com territórios adjacentes (adjacência do WorldGraph)."""
         
-        adjacent_territories = adjacency.get(territory, [])
+        adjacent_territories = world_graph.neighbors(territory)
         factions = set()
         
         for adj_territory in adjacent_territories:
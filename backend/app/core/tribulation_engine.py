@@ -19,6 +19,9 @@ FÓRMULAS:
 
 from typing import Dict, Optional, Tuple
 import random
+
+import numpy as np
+
 from app.database.models.player import Player
 from app.database.models.npc import NPC
 from app.core.dice_roller import DiceRoller
@@ -63,28 +66,43 @@ class TribulationEngine:
         Returns:
             True se tribulação deve ocorrer
         """
-        # Verificar tipo de constituição
         constitution_type = getattr(entity, 'constitution_type', 'mortal')
-        
+        chance = self.trigger_chance(constitution_type, entity.cultivation_tier)
+        return random.random() < chance
+    
+    @staticmethod
+    def constitution_category(constitution_type: str) -> str:
+        """Categoria de tribulação (mortal/godfiend/taboo/chimera/procedural) da constituição."""
         # Taboo constitutions sempre têm nome específico
         if "Scourge" in constitution_type or "Cursed" in constitution_type:
-            constitution_category = "taboo"
+            return "taboo"
         elif constitution_type in ["Black Sand", "Eon Sea", "Phoenix", "Vermilion", "Azure Dragon", "White Tiger", "Black Tortoise"]:
-            constitution_category = "godfiend"
+            return "godfiend"
         elif constitution_type == "Human" or constitution_type == "mortal":
-            constitution_category = "mortal"
+            return "mortal"
         elif "Chimera" in constitution_type:
-            constitution_category = "chimera"
-        else:
-            constitution_category = "procedural"
-        
-        chance = self.tribulation_chance.get(constitution_category, 0.30)
+            return "chimera"
+        return "procedural"
+    
+    def trigger_chance(self, constitution_type: str, tier: int) -> float:
+        """Chance de tribulação no breakthrough para a constituição e o tier."""
+        chance = self.tribulation_chance.get(self.constitution_category(constitution_type), 0.30)
         
         # Tier 8+ tem chance aumentada (+20%)
-        if entity.cultivation_tier >= 8:
+        if tier >= 8:
             chance = min(1.0, chance + 0.20)
         
-        return random.random() < chance
+        return chance
+    
+    def lightning_for_tier(self, tier: int) -> Dict:
+        """Tipo de raio da tribulação para o tier."""
+        if tier <= 3:
+            return self.lightning_types[0]  # Raio Menor
+        elif tier <= 6:
+            return self.lightning_types[1]  # Raio Celestial
+        elif tier <= 8:
+            return self.lightning_types[2]  # Raio da Aniquilação
+        return self.lightning_types[3]  # Raio do Julgamento
     
     def calculate_tribulation_damage(self, entity: Player | NPC) -> Dict:
         """
@@ -99,14 +117,7 @@ class TribulationEngine:
         tier = entity.cultivation_tier
         
         # Selecionar tipo de raio baseado no tier
-        if tier <= 3:
-            lightning = self.lightning_types[0]  # Raio Menor
-        elif tier <= 6:
-            lightning = self.lightning_types[1]  # Raio Celestial
-        elif tier <= 8:
-            lightning = self.lightning_types[2]  # Raio da Aniquilação
-        else:
-            lightning = self.lightning_types[3]  # Raio do Julgamento
+        lightning = self.lightning_for_tier(tier)
         
         # Dano base: tier * 100
         base_damage = tier * 100
@@ -130,6 +141,28 @@ class TribulationEngine:
             "tier": tier
         }
     
+    def calculate_tribulation_damage_batch(
+        self,
+        tier: int,
+        defense: np.ndarray,
+        rng: np.random.Generator
+    ) -> Tuple[int, np.ndarray]:
+        """
+        Mesma fórmula de calculate_tribulation_damage para N cultivadores do
+        mesmo tier (usado pelo simulador de balanceamento).
+        
+        Args:
+            tier: Tier do breakthrough
+            defense: Quintessence + Yuan Qi / 2 de cada cultivador
+            rng: Gerador NumPy (rolagens 1d20 da defesa)
+        
+        Returns:
+            (dano bruto, array de dano final)
+        """
+        raw_damage = int(tier * 100 * self.lightning_for_tier(tier)["multiplier"])
+        defense_roll = DiceRoller.roll_batch("1d20", len(defense), rng) + defense  # roll_defense
+        return raw_damage, np.maximum(0, raw_damage - defense_roll)
+    
     def calculate_rewards(self, entity: Player | NPC, survived: bool) -> Dict:
         """
         Calcula as recompensas por sobreviver à tribulação.
@@ -0,0 +1,292 @@
+"""
+Turn Snapshots - Diffs reversos por turno para undo de verdade.
+
+O undo do GameGraph só voltava os canais do LangGraph (narração, número do
+turno); HP, inventário, ouro, localização e dano nos NPCs continuavam
+alterados no banco. Agora cada turno grava, ao lado do GameLog, o diff
+reverso das linhas de Player e NPC que ele tocou:
+
+- `begin()` guarda o estado das linhas no início do turno (copy-on-write:
+  escalares são compartilhados, só os campos JSON são copiados)
+- `record()` compara com o estado final e grava apenas os campos alterados
+  (valor anterior) em `turn_snapshots`; NPCs criados no turno viram op="created"
+  e todo turno gravado ganha um marcador op="turn" (mesmo sem diffs)
+- `rewind()` aplica os diffs dos turnos desfeitos, do mais novo para o mais
+  antigo, numa única transação (UPDATE por linha tocada + DELETE dos logs)
+- `undo()` só desfaz um turno que tem marcador: turno sem snapshot (gravado
+  por um caminho que não chamou `record()`) é recusado sem apagar logs
+
+O custo do undo depende só do que os turnos desfeitos tocaram, nunca do
+tamanho do mundo. Guardamos os últimos `retention_turns` turnos por jogador.
+"""
+
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+
+from app.config import settings
+from app.database.models.logs import GameLog, TurnSnapshot
+from app.database.models.npc import NPC
+from app.database.models.player import Player
+
+
+MODELS = {"player": Player, "npc": NPC}
+
+# Campos que nunca entram no diff
+IGNORED_FIELDS = {"id"}
+
+
+def _columns(model) -> List[str]:
+    return [c.name for c in model.__table__.columns if c.name not in IGNORED_FIELDS]
+
+
+def _capture(obj, columns: List[str]) -> Dict[str, Any]:
+    """Estado atual da linha; só valores mutáveis (JSON) são copiados."""
+    state = {}
+    for name in columns:
+        value = getattr(obj, name, None)
+        state[name] = copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+    return state
+
+
+@dataclass
+class TurnCapture:
+    """Estado das linhas no início de um turno."""
+    player_id: int
+    _tracked: Dict[Tuple[str, int], Tuple[Any, Dict[str, Any]]] = field(default_factory=dict)
+    _created: Dict[int, Any] = field(default_factory=dict)
+
+    def track(self, entity_type: str, obj) -> None:
+        key = (entity_type, obj.id)
+        if obj.id is None or key in self._tracked or obj.id in self._created:
+            return
+        self._tracked[key] = (obj, _capture(obj, _columns(MODELS[entity_type])))
+
+    def track_npcs(self, npcs: Iterable[NPC]) -> None:
+        for npc in npcs:
+            self.track("npc", npc)
+
+    def is_tracked(self, npc: NPC) -> bool:
+        return ("npc", npc.id) in self._tracked or npc.id in self._created
+
+    def mark_created(self, npcs: Iterable[NPC]) -> None:
+        """NPCs criados durante o turno (o undo os remove)."""
+        for npc in npcs:
+            if npc.id is not None and ("npc", npc.id) not in self._tracked:
+                self._created[npc.id] = npc
+
+    def diffs(self) -> List[Tuple[str, int, str, Dict[str, Any]]]:
+        """[(entity_type, entity_id, op, before)] só das linhas que mudaram."""
+        result = []
+        for (entity_type, entity_id), (obj, before) in self._tracked.items():
+            changed = {
+                name: old for name, old in before.items()
+                if getattr(obj, name, None) != old
+            }
+            if changed:
+                result.append((entity_type, entity_id, "update", changed))
+        for npc_id in self._created:
+            result.append(("npc", npc_id, "created", {}))
+        return result
+
+
+class TurnSnapshotStore:
+    """Grava e aplica os diffs reversos de turno."""
+
+    def __init__(self, retention_turns: int = 20):
+        self.retention_turns = retention_turns
+
+        # Métricas
+        self.turns_recorded = 0
+        self.rows_recorded = 0
+        self.rewinds = 0
+        self.turns_undone = 0
+        self.rows_restored = 0
+        self.pruned = 0
+
+    # ==================== CAPTURA ====================
+
+    def begin(self, player: Player, npcs: Iterable[NPC] = ()) -> TurnCapture:
+        capture = TurnCapture(player_id=player.id)
+        capture.track("player", player)
+        capture.track_npcs(npcs)
+        return capture
+
+    async def record(
+        self,
+        session,
+        capture: TurnCapture,
+        turn_number: int,
+        game_log_id: Optional[int] = None
+    ) -> int:
+        """Grava os diffs do turno e aplica a retenção. Retorna quantas linhas mudaram."""
+        diffs = capture.diffs()
+        # Marcador do turno: o undo recusa turnos sem ele
+        session.add(TurnSnapshot(
+            player_id=capture.player_id,
+            turn_number=turn_number,
+            game_log_id=game_log_id,
+            entity_type="player",
+            entity_id=capture.player_id,
+            op="turn"
+        ))
+        for entity_type, entity_id, op, before in diffs:
+            session.add(TurnSnapshot(
+                player_id=capture.player_id,
+                turn_number=turn_number,
+                game_log_id=game_log_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                op=op,
+                before=before
+            ))
+
+        if self.retention_turns > 0:
+            result = await session.execute(
+                delete(TurnSnapshot)
+                .where(TurnSnapshot.player_id == capture.player_id)
+                .where(TurnSnapshot.turn_number <= turn_number - self.retention_turns)
+            )
+            self.pruned += result.rowcount or 0
+
+        await session.commit()
+        self.turns_recorded += 1
+        self.rows_recorded += len(diffs)
+        return len(diffs)
+
+    # ==================== UNDO ====================
+
+    async def oldest_undoable_turn(self, session, player_id: int) -> Optional[int]:
+        """Turno mais antigo que ainda pode ser desfeito (limite da retenção)."""
+        result = await session.execute(
+            select(func.max(GameLog.turn_number)).where(GameLog.player_id == player_id)
+        )
+        last_turn = result.scalar()
+        if last_turn is None:
+            return None
+        return max(1, last_turn - self.retention_turns + 1)
+
+    async def has_snapshot(self, session, player_id: int, turn_number: int) -> bool:
+        """O turno foi gravado por `record()` (tem marcador)?"""
+        result = await session.execute(
+            select(TurnSnapshot.id)
+            .where(TurnSnapshot.player_id == player_id)
+            .where(TurnSnapshot.turn_number == turn_number)
+            .where(TurnSnapshot.op == "turn")
+            .limit(1)
+        )
+        return result.scalar() is not None
+
+    async def undo(self, session, player_id: int, turn_number: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Desfaz o último turno do jogador. Com `turn_number` (o turno do
+        checkpoint da sessão), recusa se esse não for o último turno gravado.
+        """
+        result = await session.execute(
+            select(func.max(GameLog.turn_number)).where(GameLog.player_id == player_id)
+        )
+        last_turn = result.scalar()
+        if last_turn is None:
+            return {"success": False, "error": "Não há turno anterior para desfazer"}
+        if turn_number is not None and turn_number != last_turn:
+            return {
+                "success": False,
+                "error": f"Turno {turn_number} da sessão não é o último turno do jogador ({last_turn})"
+            }
+        if not await self.has_snapshot(session, player_id, last_turn):
+            return {"success": False, "error": f"Turno {last_turn} não tem snapshot para desfazer"}
+        return await self.rewind(session, player_id, last_turn - 1)
+
+    async def rewind(self, session, player_id: int, to_turn: int) -> Dict[str, Any]:
+        """
+        Volta Player/NPCs ao estado do fim de `to_turn` numa transação:
+        diffs dos turnos posteriores aplicados do mais novo ao mais antigo
+        (o valor final de cada campo é o do turno mais antigo desfeito).
+        """
+        oldest = await self.oldest_undoable_turn(session, player_id)
+        if oldest is None:
+            return {"success": False, "error": "Não há turno anterior para desfazer"}
+        if to_turn + 1 < oldest:
+            return {
+                "success": False,
+                "error": f"Turno {to_turn} está fora da janela de undo (mínimo: {oldest - 1})"
+            }
+
+        result = await session.execute(
+            select(TurnSnapshot)
+            .where(TurnSnapshot.player_id == player_id)
+            .where(TurnSnapshot.turn_number > to_turn)
+            .order_by(TurnSnapshot.turn_number.desc(), TurnSnapshot.id.desc())
+        )
+        snapshots = result.scalars().all()
+
+        restored: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        created: set = set()
+        for snap in snapshots:
+            if snap.op == "turn":
+                continue
+            if snap.op == "created":
+                created.add(snap.entity_id)
+                continue
+            restored.setdefault((snap.entity_type, snap.entity_id), {}).update(snap.before)
+
+        try:
+            for (entity_type, entity_id), values in restored.items():
+                if entity_type == "npc" and entity_id in created:
+                    continue
+                model = MODELS[entity_type]
+                await session.execute(
+                    update(model).where(model.id == entity_id).values(**values)
+                )
+            if created:
+                await session.execute(delete(NPC).where(NPC.id.in_(list(created))))
+
+            logs = await session.execute(
+                delete(GameLog)
+                .where(GameLog.player_id == player_id)
+                .where(GameLog.turn_number > to_turn)
+            )
+            await session.execute(
+                delete(TurnSnapshot)
+                .where(TurnSnapshot.player_id == player_id)
+                .where(TurnSnapshot.turn_number > to_turn)
+            )
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+        # Objetos já carregados nesta sessão estão desatualizados
+        session.expire_all()
+
+        turns_undone = logs.rowcount or 0
+        self.rewinds += 1
+        self.turns_undone += turns_undone
+        self.rows_restored += len(restored) + len(created)
+        return {
+            "success": True,
+            "player_id": player_id,
+            "turn_number": to_turn,
+            "turns_undone": turns_undone,
+            "rows_restored": len(restored),
+            "npcs_removed": len(created),
+        }
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "retention_turns": self.retention_turns,
+            "turns_recorded": self.turns_recorded,
+            "rows_recorded": self.rows_recorded,
+            "rewinds": self.rewinds,
+            "turns_undone": self.turns_undone,
+            "rows_restored": self.rows_restored,
+            "pruned": self.pruned,
+        }
+
+
+# Instância global
+turn_snapshots = TurnSnapshotStore(retention_turns=settings.TURN_SNAPSHOT_RETENTION_TURNS)
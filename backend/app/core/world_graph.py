@@ -0,0 +1,421 @@
+"""
+World Graph - Grafo de navegação do mundo em memória.
+
+Fonte única de conectividade para todos os subsistemas (caça de vilões,
+migração de monstros, adjacência territorial, opções de viagem, rumores).
+É construído uma vez a partir de `locations.connections` e mantido atualizado
+por `LocationRepository.add_connection`.
+
+Internamente a adjacência é compilada em arrays CSR (indptr/indices/pesos)
+e os caminhos mínimos (Dijkstra ponderado por distância e perigo) ficam
+em cache por origem, formando a tabela all-pairs sob demanda.
+"""
+
+import heapq
+import math
+import random
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Peso extra por nível de perigo da aresta: peso = distância * (1 + DANGER_WEIGHT * rank)
+DANGER_RANKS: Dict[str, int] = {
+    "safe": 0,
+    "low": 1,
+    "moderate": 2,
+    "high": 3,
+    "extreme": 4,
+    "forbidden": 5,
+}
+DANGER_WEIGHT = 0.25
+
+# Conexões conhecidas antes do mapa vir do banco (antes espalhadas pelo Strategist,
+# EcologySimulator, FactionSimulator, GossipMonger e game_tools). O banco sobrescreve.
+DEFAULT_CONNECTIONS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "Vila Crisântemos": {
+        "Floresta Nublada": {"danger": "low"},
+        "Cidade Imperial": {"danger": "safe"},
+    },
+    "Floresta Nublada": {
+        "Vila Crisântemos": {"danger": "low"},
+        "Cavernas Cristalinas": {"danger": "moderate"},
+        "Vale dos Mil Picos": {"danger": "moderate"},
+        "Cidade Imperial": {"danger": "low"},
+    },
+    "Cavernas Cristalinas": {
+        "Floresta Nublada": {"danger": "moderate"},
+        "Cidade Subterrânea": {"danger": "moderate"},
+    },
+    "Templo Abismo": {
+        "Cidade Imperial": {"danger": "moderate"},
+        "Montanha Arcaica": {"danger": "high"},
+    },
+    "Cidade Imperial": {
+        "Vila Crisântemos": {"danger": "safe"},
+        "Templo Abismo": {"danger": "moderate"},
+        "Passo da Montanha": {"danger": "low"},
+        "Floresta Nublada": {"danger": "low"},
+        "Vale dos Mil Picos": {"danger": "moderate"},
+    },
+    "Montanha Arcaica": {
+        "Templo Abismo": {"danger": "high"},
+        "Passo da Montanha": {"danger": "moderate"},
+        "Vale dos Mil Picos": {"danger": "moderate"},
+    },
+    "Passo da Montanha": {
+        "Cidade Imperial": {"danger": "low"},
+        "Montanha Arcaica": {"danger": "moderate"},
+        "Cidade Subterrânea": {"danger": "moderate"},
+        "Geleiras Sussurrantes": {"danger": "high"},
+    },
+    "Cidade Subterrânea": {
+        "Cavernas Cristalinas": {"danger": "moderate"},
+        "Passo da Montanha": {"danger": "moderate"},
+    },
+    "Vale dos Mil Picos": {
+        "Floresta Nublada": {"danger": "moderate"},
+        "Montanha Arcaica": {"danger": "moderate"},
+        "Cidade Imperial": {"danger": "moderate"},
+    },
+    "Pântano dos Mil Venenos": {
+        "Floresta Venenosa": {"danger": "high"},
+    },
+    "Floresta Venenosa": {
+        "Pântano dos Mil Venenos": {"danger": "high"},
+        "Seita Lua Sombria": {"danger": "high"},
+    },
+    "Deserto Carmesim": {
+        "Oásis Eterno": {"danger": "moderate"},
+        "Ruínas Solares": {"danger": "high"},
+    },
+    "Geleiras Sussurrantes": {
+        "Passo da Montanha": {"danger": "high"},
+        "Pico do Trovão Eterno": {"danger": "extreme"},
+    },
+    "Initial Village": {
+        "Misty Forest": {"travel_time": "2 hours", "danger": "low"},
+        "Merchant City": {"travel_time": "1 day", "danger": "safe"},
+    },
+    "Misty Forest": {
+        "Initial Village": {"travel_time": "2 hours", "danger": "low"},
+        "Dragon Mountains": {"travel_time": "6 hours", "danger": "moderate"},
+        "Spirit Lake": {"travel_time": "4 hours", "danger": "low"},
+    },
+    "Dragon Mountains": {
+        "Misty Forest": {"travel_time": "6 hours", "danger": "moderate"},
+        "Ancient Ruins": {"travel_time": "1 day", "danger": "high"},
+    },
+    "Merchant City": {
+        "Initial Village": {"travel_time": "1 day", "danger": "safe"},
+        "Sword Sect": {"travel_time": "8 hours", "danger": "safe"},
+        "Poison Swamp": {"travel_time": "2 days", "danger": "moderate"},
+    },
+}
+
+
+class WorldGraph:
+    """
+    Grafo ponderado de localizações com caminhos mínimos em cache.
+
+    As mutações (add_edge/add_location) só marcam o grafo como sujo;
+    a compilação CSR e a invalidação do cache acontecem na próxima consulta.
+    """
+
+    def __init__(self, connections: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None):
+        # Fonte da verdade: origem -> destino -> {distance, travel_time, danger}
+        self._edges: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._coords: Dict[str, Tuple[float, float]] = {}
+
+        # Representação compilada (CSR)
+        self._names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._indptr = array("i")
+        self._indices = array("i")
+        self._weights = array("d")
+        self._dirty = True
+
+        # Cache all-pairs: origem -> (distâncias, predecessores)
+        self._sssp: Dict[int, Tuple[List[float], List[int]]] = {}
+        self._heuristic_scale = 0.0
+
+        self.version = 0
+        self.loaded_from_db = False
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        for origin, destinations in (connections or {}).items():
+            for destination, data in destinations.items():
+                self.add_edge(origin, destination, bidirectional=False, **data)
+
+    # ==================== MUTAÇÃO ====================
+
+    def add_edge(
+        self,
+        from_location: str,
+        to_location: str,
+        distance: float = 1,
+        travel_time: str = "1 hour",
+        danger: str = "low",
+        bidirectional: bool = True
+    ):
+        """Adiciona (ou atualiza) uma conexão."""
+        data = {"distance": distance, "travel_time": travel_time, "danger": danger}
+        self._edges.setdefault(from_location, {})[to_location] = data
+        self._edges.setdefault(to_location, {})
+        if bidirectional:
+            self._edges[to_location][from_location] = dict(data)
+        self._mark_dirty()
+
+    def add_location(self, location) -> None:
+        """Registra um `Location` do banco (conexões e coordenadas)."""
+        self._edges.setdefault(location.name, {})
+        for destination, data in (location.connections or {}).items():
+            self.add_edge(
+                location.name,
+                destination,
+                distance=data.get("distance", 1),
+                travel_time=data.get("travel_time", "1 hour"),
+                danger=data.get("danger", "low"),
+                bidirectional=False
+            )
+        if location.x is not None and location.y is not None:
+            self._coords[location.name] = (float(location.x), float(location.y))
+        self._mark_dirty()
+
+    def load_locations(self, locations: Iterable[Any]) -> int:
+        """Sobrepõe as conexões do banco às conexões padrão."""
+        count = 0
+        for location in locations:
+            # O banco é autoritativo para as saídas de um local conhecido
+            self._edges[location.name] = {}
+            self.add_location(location)
+            count += 1
+        self.loaded_from_db = True
+        return count
+
+    async def load_from_db(self, session) -> int:
+        """Carrega `locations.connections` (chamado uma vez no startup)."""
+        from app.database.repositories.location_repo import LocationRepository
+        locations = await LocationRepository(session).get_all()
+        count = self.load_locations(locations)
+        print(f"[WORLD GRAPH] {count} localizações carregadas do banco ({len(self._edges)} nós no grafo).")
+        return count
+
+    def _mark_dirty(self):
+        self._dirty = True
+        self.version += 1
+
+    # ==================== COMPILAÇÃO (CSR) ====================
+
+    @staticmethod
+    def edge_weight(data: Dict[str, Any]) -> float:
+        distance = float(data.get("distance", 1) or 1)
+        rank = DANGER_RANKS.get(str(data.get("danger", "low")).lower(), 1)
+        return distance * (1 + DANGER_WEIGHT * rank)
+
+    def _compile(self):
+        if not self._dirty:
+            return
+        self._names = sorted(self._edges)
+        self._index = {name: i for i, name in enumerate(self._names)}
+        indptr, indices, weights = array("i", [0]), array("i"), array("d")
+        for name in self._names:
+            # Vizinhos ordenados por nome: resultados determinísticos
+            for destination, data in sorted(self._edges[name].items()):
+                indices.append(self._index[destination])
+                weights.append(self.edge_weight(data))
+            indptr.append(len(indices))
+        self._indptr, self._indices, self._weights = indptr, indices, weights
+        self._sssp.clear()
+        self._heuristic_scale = self._compute_heuristic_scale()
+        self._dirty = False
+
+    def _compute_heuristic_scale(self) -> float:
+        """
+        Fator para a heurística euclidiana do A* continuar admissível:
+        o menor peso/distância-euclidiana entre arestas com coordenadas.
+        """
+        scale = math.inf
+        for u, name in enumerate(self._names):
+            if name not in self._coords:
+                continue
+            for k in range(self._indptr[u], self._indptr[u + 1]):
+                other = self._names[self._indices[k]]
+                if other not in self._coords:
+                    continue
+                euclid = math.dist(self._coords[name], self._coords[other])
+                if euclid > 0:
+                    scale = min(scale, self._weights[k] / euclid)
+        return 0.0 if math.isinf(scale) else scale
+
+    # ==================== CONSULTAS ====================
+
+    def has_location(self, name: str) -> bool:
+        return name in self._edges
+
+    def location_names(self) -> List[str]:
+        return list(self._edges)
+
+    def neighbors(self, name: str) -> List[str]:
+        self._compile()
+        u = self._index.get(name)
+        if u is None:
+            return []
+        return [self._names[self._indices[k]] for k in range(self._indptr[u], self._indptr[u + 1])]
+
+    def random_neighbor(self, name: str) -> str:
+        """Vizinho aleatório (ou o próprio local se isolado)."""
+        neighbors = self.neighbors(name)
+        return random.choice(neighbors) if neighbors else name
+
+    def edges(self, name: str) -> List[Dict[str, Any]]:
+        """Saídas de um local com os metadados de viagem."""
+        return [
+            {"destination": destination, **data}
+            for destination, data in sorted(self._edges.get(name, {}).items())
+        ]
+
+    def _shortest_from(self, source: int) -> Tuple[List[float], List[int]]:
+        """Dijkstra de uma origem sobre o CSR (resultado em cache)."""
+        cached = self._sssp.get(source)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        self.cache_misses += 1
+
+        n = len(self._names)
+        dist = [math.inf] * n
+        prev = [-1] * n
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nd = d + weights[k]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd, v))
+
+        self._sssp[source] = (dist, prev)
+        return dist, prev
+
+    def _build_path(self, prev, source: int, target: int) -> List[str]:
+        """Reconstrói o caminho a partir dos predecessores (lista ou dict)."""
+        path = []
+        node = target
+        while node != -1:
+            path.append(self._names[node])
+            if node == source:
+                break
+            node = prev[node]
+        path.reverse()
+        return path
+
+    def shortest_path(self, from_location: str, to_location: str) -> Optional[List[str]]:
+        """Caminho mínimo (inclui origem e destino) ou None se inalcançável."""
+        self._compile()
+        source, target = self._index.get(from_location), self._index.get(to_location)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [from_location]
+        dist, prev = self._shortest_from(source)
+        if math.isinf(dist[target]):
+            return None
+        return self._build_path(prev, source, target)
+
+    def astar_path(self, from_location: str, to_location: str) -> Optional[List[str]]:
+        """
+        A* ponto-a-ponto sem tocar no cache (útil para consultas únicas em grafos grandes).
+        Sem coordenadas a heurística é zero e equivale a Dijkstra com parada antecipada.
+        """
+        self._compile()
+        source, target = self._index.get(from_location), self._index.get(to_location)
+        if source is None or target is None:
+            return None
+
+        target_xy = self._coords.get(to_location)
+
+        def h(u: int) -> float:
+            xy = self._coords.get(self._names[u])
+            if xy is None or target_xy is None:
+                return 0.0
+            return math.dist(xy, target_xy) * self._heuristic_scale
+
+        g = {source: 0.0}
+        prev = {source: -1}
+        heap = [(h(source), source)]
+        closed = set()
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u == target:
+                return self._build_path(prev, source, target)
+            if u in closed:
+                continue
+            closed.add(u)
+            for k in range(self._indptr[u], self._indptr[u + 1]):
+                v = self._indices[k]
+                ng = g[u] + self._weights[k]
+                if ng < g.get(v, math.inf):
+                    g[v] = ng
+                    prev[v] = u
+                    heapq.heappush(heap, (ng + h(v), v))
+        return None
+
+    def next_step(self, from_location: str, to_location: str) -> str:
+        """Próximo local na rota (ou a própria origem se não houver rota)."""
+        path = self.shortest_path(from_location, to_location)
+        if not path or len(path) < 2:
+            return from_location
+        return path[1]
+
+    def distance(self, from_location: str, to_location: str) -> float:
+        """Custo do caminho mínimo (inf se inalcançável)."""
+        self._compile()
+        source, target = self._index.get(from_location), self._index.get(to_location)
+        if source is None or target is None:
+            return math.inf
+        return self._shortest_from(source)[0][target]
+
+    def nearest(self, from_location: str, candidates: Iterable[str]) -> Optional[str]:
+        """Candidato alcançável mais próximo (ou None)."""
+        best, best_dist = None, math.inf
+        for candidate in candidates:
+            d = self.distance(from_location, candidate)
+            if d < best_dist:
+                best, best_dist = candidate, d
+        return best
+
+    def all_pairs(self) -> Dict[str, Dict[str, float]]:
+        """Preenche e retorna a tabela all-pairs (apenas pares alcançáveis)."""
+        self._compile()
+        table = {}
+        for source, name in enumerate(self._names):
+            dist, _ = self._shortest_from(source)
+            table[name] = {
+                self._names[v]: round(d, 3) for v, d in enumerate(dist) if not math.isinf(d)
+            }
+        return table
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._compile()
+        return {
+            "nodes": len(self._names),
+            "edges": len(self._indices),
+            "version": self.version,
+            "loaded_from_db": self.loaded_from_db,
+            "cached_sources": len(self._sssp),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+# Instância global
+world_graph = WorldGraph(DEFAULT_CONNECTIONS)
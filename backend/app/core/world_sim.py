@@ -1,5 +1,6 @@
 from typing import List, Dict, Any
 from app.core.chronos import world_clock
+from app.core.effect_scheduler import effect_scheduler
 from app.database.models.npc import NPC
 from app.database.models.player import Player
 from app.agents.villains.strategist import Strategist
@@ -13,7 +14,7 @@ class WorldSimulator:
     """
     def __init__(self, gemini_client):
         # Inicializa os agentes de IA
-        self.strategist = Strategist(world_map={})  # world_map pode vir do DB
+        self.strategist = Strategist()  # Usa o WorldGraph global (carregado do DB no startup)
         self.diplomat = Diplomat()
         self.gossip_monger = GossipMonger()
         self.gemini_client = gemini_client
@@ -23,6 +24,7 @@ class WorldSimulator:
         """Executa um único passo (tick) da simulação do mundo."""
         world_clock.advance_turn()
         print(f"--- Tick de Simulação: {world_clock.get_current_time_str()} ---")
+        await effect_scheduler.advance(npc_repo.session)
         
         # Busca NPCs hostis do banco
         npcs = await npc_repo.get_all()
@@ -19,6 +19,8 @@ from datetime import datetime, timedelta
 import json
 import asyncio
 
+from app.core.world_version import world_version
+
 
 class WorldRegion(str, Enum):
     """Regiões do mundo."""
@@ -624,6 +626,8 @@ class WorldStateManager:
     
     async def _notify_change(self, event_type: str, data: Dict[str, Any]):
         """Notifica todos os listeners sobre uma mudança."""
+        # Invalida os caches de leitura (ver app/services/response_cache.py)
+        world_version.bump("world")
         for listener in self._change_listeners:
             try:
                 if asyncio.iscoroutinefunction(listener):
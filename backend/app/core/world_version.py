@@ -0,0 +1,40 @@
+"""
+World Version - Contadores de versão do estado do mundo.
+
+Cada escopo ("world" para facções/economia/ecologia/locais, "clock" para o
+tempo do Chronos) tem um contador monotônico. Quem altera o estado chama
+`world_version.bump(scope)`; caches de leitura comparam a assinatura das
+versões para saber se o conteúdo ainda é válido, sem tocar no banco.
+"""
+
+import threading
+from typing import Dict, Iterable
+
+
+class WorldVersion:
+    """Contadores de versão por escopo (thread-safe)."""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, scope: str = "world") -> int:
+        """Incrementa a versão de um escopo e retorna o novo valor."""
+        with self._lock:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+            return self._versions[scope]
+
+    def get(self, scope: str = "world") -> int:
+        return self._versions.get(scope, 0)
+
+    def signature(self, scopes: Iterable[str]) -> str:
+        """Assinatura combinada (ex: 'world.12-clock.40') dos escopos dados."""
+        return "-".join(f"{scope}.{self.get(scope)}" for scope in scopes)
+
+    def to_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
+
+
+# Instância global
+world_version = WorldVersion()
@@ -0,0 +1,156 @@
+"""
+Checkpoint Retention - Poda das tabelas checkpoint_* do LangGraph.
+
+O AsyncPostgresSaver grava um checkpoint por passo do grafo (planner,
+executor, validator, narrator...) em `checkpoints`, `checkpoint_writes` e
+`checkpoint_blobs`, sem nunca apagar. A política aqui mantém:
+- Todos os checkpoints dos últimos `keep_turns` turnos de cada sessão
+  (suficiente para undo/time travel recente)
+- Um checkpoint âncora por dia de jogo (o último do dia)
+- Sempre o checkpoint mais recente da sessão
+
+O resto é apagado, junto com os writes e os blobs que ficarem órfãos.
+O GameGraph grava `turn_number` e `game_day` no metadata de cada checkpoint.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import text
+
+from app.database.db_connection import engine
+
+
+@dataclass
+class CheckpointRetentionPolicy:
+    keep_turns: int = 20
+    keep_daily_anchors: bool = True
+    # Poda automática a cada N turnos de uma sessão (0 desativa)
+    prune_every_turns: int = 25
+
+
+def _doomed_cte(thread_filter: str, keep_daily_anchors: bool) -> str:
+    anchor_clause = "AND NOT (game_day IS NOT NULL AND day_rank = 1)" if keep_daily_anchors else ""
+    return f"""
+        WITH ranked AS (
+            SELECT thread_id, checkpoint_ns, checkpoint_id,
+                   (metadata->>'turn_number')::int AS turn,
+                   metadata->>'game_day' AS game_day,
+                   MAX((metadata->>'turn_number')::int)
+                       OVER (PARTITION BY thread_id, checkpoint_ns) AS max_turn,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                   ) AS recency,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY thread_id, checkpoint_ns, metadata->>'game_day'
+                       ORDER BY checkpoint_id DESC
+                   ) AS day_rank
+            FROM checkpoints
+            {thread_filter}
+        ),
+        doomed AS (
+            SELECT thread_id, checkpoint_ns, checkpoint_id FROM ranked
+            WHERE recency > 1
+              AND NOT (turn IS NOT NULL AND turn > max_turn - :keep_turns)
+              {anchor_clause}
+        )
+    """
+
+
+async def prune_checkpoints(
+    thread_id: Optional[str] = None,
+    policy: Optional[CheckpointRetentionPolicy] = None
+) -> Dict[str, Any]:
+    """
+    Aplica a política de retenção (a uma sessão ou a todas).
+
+    Returns:
+        Contagem de linhas apagadas por tabela.
+    """
+    policy = policy or CheckpointRetentionPolicy()
+    params: Dict[str, Any] = {"keep_turns": policy.keep_turns}
+    thread_filter = ""
+    blob_filter = ""
+    if thread_id is not None:
+        thread_filter = "WHERE thread_id = :thread_id"
+        blob_filter = "AND b.thread_id = :thread_id"
+        params["thread_id"] = thread_id
+
+    cte = _doomed_cte(thread_filter, policy.keep_daily_anchors)
+    try:
+        async with engine.begin() as conn:
+            writes = await conn.execute(text(f"""
+                {cte}
+                DELETE FROM checkpoint_writes w USING doomed d
+                WHERE w.thread_id = d.thread_id
+                  AND w.checkpoint_ns = d.checkpoint_ns
+                  AND w.checkpoint_id = d.checkpoint_id
+            """), params)
+            checkpoints = await conn.execute(text(f"""
+                {cte}
+                DELETE FROM checkpoints c USING doomed d
+                WHERE c.thread_id = d.thread_id
+                  AND c.checkpoint_ns = d.checkpoint_ns
+                  AND c.checkpoint_id = d.checkpoint_id
+            """), params)
+            # Blobs são versionados por canal; só sobrevivem os referenciados por algum checkpoint
+            blobs = await conn.execute(text(f"""
+                DELETE FROM checkpoint_blobs b
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = b.thread_id
+                      AND c.checkpoint_ns = b.checkpoint_ns
+                      AND c.checkpoint->'channel_versions'->>b.channel = b.version
+                )
+                {blob_filter}
+            """), params)
+    except Exception as e:
+        print(f"[CHECKPOINT RETENTION] Falha ao podar checkpoints: {e}")
+        return {"success": False, "error": str(e)}
+
+    result = {
+        "success": True,
+        "thread_id": thread_id,
+        "checkpoints": checkpoints.rowcount,
+        "checkpoint_writes": writes.rowcount,
+        "checkpoint_blobs": blobs.rowcount,
+    }
+    print(f"[CHECKPOINT RETENTION] Podados: {result}")
+    return result
+
+
+class CheckpointPruner:
+    """
+    Agenda a poda em background a cada `prune_every_turns` turnos de uma sessão,
+    sem nunca rodar duas podas da mesma sessão ao mesmo tempo.
+    """
+
+    def __init__(self, policy: Optional[CheckpointRetentionPolicy] = None):
+        self.policy = policy or CheckpointRetentionPolicy()
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def maybe_schedule(self, thread_id: str, turn_number: int):
+        every = self.policy.prune_every_turns
+        if every <= 0 or turn_number % every != 0 or thread_id in self._running:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._running.add(thread_id)
+        task = loop.create_task(self._prune(thread_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _prune(self, thread_id: str):
+        try:
+            await prune_checkpoints(thread_id, self.policy)
+        finally:
+            self._running.discard(thread_id)
+
+
+# Instância global
+checkpoint_pruner = CheckpointPruner()
@@ -1,23 +1,28 @@
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from app.config import settings
+from app.database.instrumentation import sql_metrics
 
 # Cria engine assíncrono; para psycopg3/async basta usar create_async_engine com o driver 'postgresql+psycopg'
 engine: AsyncEngine = create_async_engine(
     settings.DATABASE_URL,
-    echo=True,
+    echo=settings.DB_ECHO,
     future=True,
 )
+# Métricas de latência/linhas/queries por request (substitui o echo em produção)
+sql_metrics.install(engine)
 
 async def init_db():
     # Importar todos os modelos para que o SQLModel os registre no metadata
     from app.database.models.player import Player
     from app.database.models.npc import NPC
     from app.database.models.world_state import WorldEvent, Faction, GlobalEconomy
-    from app.database.models.logs import GameLog
+    from app.database.models.logs import GameLog, TurnSnapshot
     from app.database.models.location import DynamicLocation, LocationAlias
     from app.database.models.quest import Quest
-    from app.database.models.memory import Memory
+    from app.database.models.memory import Memory, MemoryArchive
+    from app.database.models.relationship import RelationshipAggregate
+    from app.database.models.session_context import SessionContextSnapshot, SessionContextDelta
     
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
@@ -0,0 +1,393 @@
+"""
+SQL Instrumentation - Métricas de banco via eventos do SQLAlchemy.
+
+Substitui o `echo=True` (que imprime cada statement no stdout) por
+agregados baratos:
+- Histograma de latência e linhas retornadas por statement (fingerprint)
+- Contagem de queries por request, por endpoint, com detecção de N+1
+  (mesma query repetida muitas vezes na mesma request)
+- Amostragem de queries lentas com EXPLAIN, rodado em background
+
+Tudo é exposto em formato texto do Prometheus via `render_prometheus()`.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.config import settings
+
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERIES_PER_REQUEST_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\([^)]*\)", re.IGNORECASE)
+_TABLE_RE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+\"?([A-Za-z_][\w]*)", re.IGNORECASE)
+
+
+class Histogram:
+    """Histograma cumulativo no estilo Prometheus."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        sep = "," if labels else ""
+        lines = [
+            f'{name}_bucket{{{labels}{sep}le="{bound}"}} {count}'
+            for bound, count in zip(self.buckets, self.counts)
+        ]
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+@dataclass
+class StatementStats:
+    query_id: str
+    operation: str
+    table: str
+    sample: str
+    latency: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS))
+    rows: int = 0
+    slow: int = 0
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    queries: Histogram = field(default_factory=lambda: Histogram(QUERIES_PER_REQUEST_BUCKETS))
+    db_seconds: float = 0.0
+    n_plus_one: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class RequestStats:
+    """Acumulador por request (vive numa ContextVar)."""
+    queries: int = 0
+    db_seconds: float = 0.0
+    by_query: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class SlowQuerySample:
+    query_id: str
+    statement: str
+    duration_ms: float
+    endpoint: Optional[str]
+    plan: Optional[List[str]] = None
+
+
+_current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "sql_request_stats", default=None
+)
+_current_endpoint: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "sql_request_endpoint", default=None
+)
+
+
+def fingerprint(statement: str) -> Tuple[str, str, str, str]:
+    """
+    Normaliza um statement (literais e listas IN viram '?') e retorna
+    (query_id, operation, table, normalized).
+    """
+    normalized = _IN_LIST_RE.sub("IN (?)", statement)
+    normalized = _LITERAL_RE.sub("?", normalized)
+    normalized = " ".join(normalized.split())
+    query_id = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:10]
+    operation = normalized.split(" ", 1)[0].upper() if normalized else "UNKNOWN"
+    match = _TABLE_RE.search(normalized)
+    table = match.group(1) if match else ""
+    return query_id, operation, table, normalized
+
+
+class SQLInstrumentation:
+    """
+    Coletor de métricas SQL. Instalado uma vez no engine via `install()`.
+    """
+
+    def __init__(
+        self,
+        slow_query_ms: float = 200.0,
+        explain_slow: bool = True,
+        n_plus_one_threshold: int = 10,
+        max_slow_samples: int = 50,
+    ):
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow = explain_slow
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+        self._statements: Dict[str, StatementStats] = {}
+        self._endpoints: Dict[str, EndpointStats] = {}
+        self._slow_samples: Deque[SlowQuerySample] = deque(maxlen=max_slow_samples)
+        self._explained: set = set()
+        self._lock = threading.Lock()
+        self._engine = None
+        self._tasks: set = set()
+
+    # ==================== INSTALAÇÃO ====================
+
+    def install(self, engine):
+        """Registra os listeners no engine (AsyncEngine ou Engine síncrono)."""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        if self._engine is not None:
+            return
+        self._engine = engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start_time")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+
+        # Não instrumentar os próprios EXPLAINs
+        if statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+
+        query_id, operation, table, normalized = fingerprint(statement)
+        rowcount = getattr(cursor, "rowcount", -1)
+        rows = rowcount if isinstance(rowcount, int) and rowcount > 0 else 0
+        is_slow = elapsed * 1000 >= self.slow_query_ms
+
+        with self._lock:
+            stats = self._statements.get(query_id)
+            if stats is None:
+                stats = StatementStats(query_id, operation, table, normalized[:300])
+                self._statements[query_id] = stats
+            stats.latency.observe(elapsed)
+            stats.rows += rows
+            if is_slow:
+                stats.slow += 1
+
+        request_stats = _current_request.get()
+        if request_stats is not None:
+            request_stats.queries += 1
+            request_stats.db_seconds += elapsed
+            request_stats.by_query[query_id] = request_stats.by_query.get(query_id, 0) + 1
+
+        if is_slow:
+            self._record_slow(query_id, statement, parameters, elapsed, operation)
+
+    # ==================== QUERIES LENTAS ====================
+
+    def _record_slow(self, query_id: str, statement: str, parameters, elapsed: float, operation: str):
+        sample = SlowQuerySample(
+            query_id=query_id,
+            statement=statement[:1000],
+            duration_ms=round(elapsed * 1000, 2),
+            endpoint=_current_endpoint.get(),
+        )
+        self._slow_samples.append(sample)
+
+        # EXPLAIN só uma vez por fingerprint, só para SELECT, fora do caminho da query
+        if not self.explain_slow or operation != "SELECT" or query_id in self._explained:
+            return
+        self._explained.add(query_id)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._explain(sample, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, sample: SlowQuerySample, statement: str, parameters):
+        try:
+            async with self._engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                sample.plan = [row[0] for row in result.fetchall()]
+        except Exception as e:
+            sample.plan = [f"EXPLAIN falhou: {e}"]
+
+    # ==================== ESCOPO DE REQUEST ====================
+
+    def start_request(self, endpoint: str) -> Tuple[contextvars.Token, contextvars.Token]:
+        tokens = (_current_request.set(RequestStats()), _current_endpoint.set(endpoint))
+        return tokens
+
+    def finish_request(self, tokens, endpoint: Optional[str] = None):
+        """Fecha o escopo da request e agrega no endpoint (path do template da rota)."""
+        request_stats = _current_request.get()
+        endpoint = endpoint or _current_endpoint.get() or "unknown"
+        self.end_request(tokens)
+        self.record_request(request_stats, endpoint)
+
+    @staticmethod
+    def current_request() -> Optional[RequestStats]:
+        return _current_request.get()
+
+    @staticmethod
+    def end_request(tokens) -> None:
+        """Restaura as ContextVars (no mesmo contexto em que start_request rodou)."""
+        _current_request.reset(tokens[0])
+        _current_endpoint.reset(tokens[1])
+
+    def record_request(self, request_stats: Optional[RequestStats], endpoint: str) -> None:
+        """Agrega o acumulador de uma request no endpoint."""
+        if request_stats is None:
+            return
+
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.queries.observe(request_stats.queries)
+            stats.db_seconds += request_stats.db_seconds
+            for query_id, count in request_stats.by_query.items():
+                if count >= self.n_plus_one_threshold:
+                    stats.n_plus_one[query_id] = stats.n_plus_one.get(query_id, 0) + 1
+
+    # ==================== EXPORTAÇÃO ====================
+
+    def render_prometheus(self) -> str:
+        """Renderiza todas as métricas no formato texto do Prometheus."""
+        lines: List[str] = []
+        with self._lock:
+            statements = list(self._statements.values())
+            endpoints = list(self._endpoints.items())
+
+        lines.append("# HELP orbis_db_query_duration_seconds Latência de statements SQL por fingerprint.")
+        lines.append("# TYPE orbis_db_query_duration_seconds histogram")
+        for s in statements:
+            labels = f'query_id="{s.query_id}",operation="{s.operation}",table="{s.table}"'
+            lines.extend(s.latency.render("orbis_db_query_duration_seconds", labels))
+
+        lines.append("# HELP orbis_db_query_rows_total Linhas retornadas/afetadas por fingerprint.")
+        lines.append("# TYPE orbis_db_query_rows_total counter")
+        for s in statements:
+            lines.append(f'orbis_db_query_rows_total{{query_id="{s.query_id}"}} {s.rows}')
+
+        lines.append("# HELP orbis_db_slow_queries_total Statements acima do limite de query lenta.")
+        lines.append("# TYPE orbis_db_slow_queries_total counter")
+        for s in statements:
+            if s.slow:
+                lines.append(f'orbis_db_slow_queries_total{{query_id="{s.query_id}"}} {s.slow}')
+
+        lines.append("# HELP orbis_db_queries_per_request Número de queries SQL por request.")
+        lines.append("# TYPE orbis_db_queries_per_request histogram")
+        for endpoint, stats in endpoints:
+            lines.extend(stats.queries.render("orbis_db_queries_per_request", f'endpoint="{endpoint}"'))
+
+        lines.append("# HELP orbis_db_request_seconds_total Tempo total gasto no banco por endpoint.")
+        lines.append("# TYPE orbis_db_request_seconds_total counter")
+        for endpoint, stats in endpoints:
+            lines.append(f'orbis_db_request_seconds_total{{endpoint="{endpoint}"}} {stats.db_seconds:.6f}')
+
+        lines.append("# HELP orbis_db_n_plus_one_requests_total Requests que repetiram a mesma query muitas vezes.")
+        lines.append("# TYPE orbis_db_n_plus_one_requests_total counter")
+        for endpoint, stats in endpoints:
+            for query_id, count in stats.n_plus_one.items():
+                lines.append(
+                    f'orbis_db_n_plus_one_requests_total{{endpoint="{endpoint}",query_id="{query_id}"}} {count}'
+                )
+
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Versão JSON (inclui o texto das queries e os planos de EXPLAIN)."""
+        with self._lock:
+            return {
+                "statements": {
+                    s.query_id: {
+                        "operation": s.operation,
+                        "table": s.table,
+                        "sample": s.sample,
+                        "count": s.latency.count,
+                        "total_ms": round(s.latency.total * 1000, 2),
+                        "rows": s.rows,
+                        "slow": s.slow,
+                    }
+                    for s in self._statements.values()
+                },
+                "endpoints": {
+                    endpoint: {
+                        "requests": stats.requests,
+                        "queries": int(stats.queries.total),
+                        "avg_queries": round(stats.queries.total / stats.queries.count, 2) if stats.queries.count else 0,
+                        "db_ms": round(stats.db_seconds * 1000, 2),
+                        "n_plus_one": dict(stats.n_plus_one),
+                    }
+                    for endpoint, stats in self._endpoints.items()
+                },
+                "slow_queries": [vars(sample) for sample in self._slow_samples],
+            }
+
+
+
+class SQLMetricsMiddleware:
+    """
+    Middleware ASGI puro que abre o escopo de métricas por request.
+
+    Com @app.middleware("http") (BaseHTTPMiddleware) o escopo fechava quando
+    call_next retornava, antes de um StreamingResponse (SSE/NDJSON) enviar o
+    corpo, e as queries do streaming ficavam sem endpoint. Aqui a request é
+    agregada quando o último `http.response.body` (more_body=False) é enviado,
+    ou quando a aplicação termina/falha sem enviá-lo.
+    """
+
+    def __init__(self, app, metrics: Optional[SQLInstrumentation] = None):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics or sql_metrics
+        tokens = metrics.start_request(scope.get("path", ""))
+        request_stats = metrics.current_request()
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            # Agrega pelo template da rota (/player/{player_id}) para não explodir a cardinalidade
+            route = scope.get("route")
+            metrics.record_request(request_stats, getattr(route, "path", None) or "unmatched")
+
+        async def send_wrapper(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record()
+            metrics.end_request(tokens)
+
+
+# Instância global
+sql_metrics = SQLInstrumentation(
+    slow_query_ms=settings.DB_SLOW_QUERY_MS,
+    explain_slow=settings.DB_EXPLAIN_SLOW,
+)
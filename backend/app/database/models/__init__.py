@@ -5,7 +5,7 @@ GEM RPG ORBIS - Arquitetura Cognitiva
 from .player import Player
 from .npc import NPC
 from .world_state import WorldEvent, Faction, GlobalEconomy
-from .logs import GameLog
+from .logs import GameLog, TurnSnapshot
 from .location import (
     Location, 
     DynamicLocation, 
@@ -16,7 +16,9 @@ from .location import (
     DangerLevel
 )
 from .quest import Quest
-from .memory import Memory
+from .memory import Memory, MemoryArchive
+from .relationship import RelationshipAggregate
+from .session_context import SessionContextSnapshot, SessionContextDelta
 
 __all__ = [
     # Player & NPC
@@ -30,6 +32,7 @@ __all__ = [
     
     # Logs
     "GameLog",
+    "TurnSnapshot",
     
     # Locations
     "Location",
@@ -42,5 +45,11 @@ __all__ = [
     
     # Quest & Memory
     "Quest",
-    "Memory"
+    "Memory",
+    "MemoryArchive",
+    "RelationshipAggregate",
+
+    # Session Context
+    "SessionContextSnapshot",
+    "SessionContextDelta"
 ]
@@ -5,6 +5,7 @@ Stores every game turn with embeddings for semantic search
 from typing import Optional
 from datetime import datetime
 from sqlmodel import Field, SQLModel, Column, JSON
+from sqlalchemy import Index
 from pgvector.sqlalchemy import Vector
 
 
@@ -14,6 +15,10 @@ class GameLog(SQLModel, table=True):
     Replaces volatile game_state dict
     """
     __tablename__ = "game_logs"
+    __table_args__ = (
+        # Keyset pagination do histórico: WHERE player_id = ? AND (turn_number, id) < (?, ?)
+        Index("ix_game_logs_player_turn_id", "player_id", "turn_number", "id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     player_id: int = Field(index=True)  # Removed foreign key constraint for simpler migration
@@ -40,3 +45,29 @@ class GameLog(SQLModel, table=True):
     
     class Config:
         arbitrary_types_allowed = True
+
+
+class TurnSnapshot(SQLModel, table=True):
+    """
+    Diff reverso de um Player/NPC alterado num turno (guardado ao lado do GameLog).
+    `before` tem só os campos que mudaram, com o valor anterior ao turno;
+    op = "created" marca NPCs criados no turno (o undo os remove);
+    op = "turn" é o marcador de que o turno foi gravado (o undo exige).
+    """
+    __tablename__ = "turn_snapshots"
+    __table_args__ = (
+        # Undo/rewind: WHERE player_id = ? AND turn_number > ? ORDER BY turn_number DESC
+        Index("ix_turn_snapshots_player_turn", "player_id", "turn_number"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    player_id: int
+    turn_number: int
+    game_log_id: Optional[int] = Field(default=None)
+
+    entity_type: str  # player | npc
+    entity_id: int
+    op: str = Field(default="update")  # update | created | turn
+    before: dict = Field(default_factory=dict, sa_column=Column(JSON))
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional, List
 from sqlmodel import Field, SQLModel, Column
 from sqlalchemy import Index
@@ -12,6 +13,36 @@ class Memory(SQLModel, table=True):
 	# Vetor de embedding semântico (pgvector)
 	embedding: Optional[List[float]] = Field(default=None, sa_column=Column(Vector(128)))
 
+	# Colunas reais para filtrar/ranquear em SQL (antes só existiam dentro do JSON de content)
+	memory_type: Optional[str] = Field(default=None, index=True)  # episodic | semantic | procedural
+	event_type: Optional[str] = None
+	importance: Optional[float] = None
+	emotional_valence: Optional[str] = None
+	game_time: Optional[datetime] = None  # Tempo in-game do evento
+	created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+
+class MemoryArchive(SQLModel, table=True):
+	"""
+	Arquivo frio: memórias episódicas tiradas da tabela quente `memory`
+	pela consolidação (viraram um digest), pelo orçamento por entidade ou
+	por forget_about. Não participa de buscas; serve para auditoria/restauração.
+	"""
+	__tablename__ = "memory_archive"
+
+	id: Optional[int] = Field(default=None, primary_key=True)
+	original_id: int = Field(index=True)
+	npc_id: int = Field(index=True)
+	content: str
+	embedding: Optional[List[float]] = Field(default=None, sa_column=Column(Vector(128)))
+
+	# Digest que substituiu esta memória (None quando removida por orçamento/forget)
+	digest_id: Optional[int] = Field(default=None, index=True)
+	reason: str = Field(default="consolidated")  # consolidated | budget | forgotten
+	archived_at: datetime = Field(default_factory=datetime.utcnow)
+
 
 # Índice para buscas vetoriais eficientes (cosine)
 Index("ix_memory_embedding", Memory.__table__.c.embedding, postgresql_using="ivfflat")
+# Recall episódico por entidade ordenado por tempo de jogo
+Index("ix_memory_npc_type_game_time", Memory.__table__.c.npc_id, Memory.__table__.c.memory_type, Memory.__table__.c.game_time)
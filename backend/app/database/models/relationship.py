@@ -0,0 +1,74 @@
+"""
+RelationshipAggregate Model - Relacionamentos materializados
+GEM RPG ORBIS - Arquitetura Cognitiva
+
+Uma linha por (entidade, alvo), atualizada incrementalmente a cada
+memória gravada (HierarchicalMemory.remember) e a cada evento do Profiler.
+Substitui a recontagem de valências em Python a cada consulta de postura
+e é a fonte única para o Profiler e para NPC.relationships.
+"""
+from typing import Optional
+from datetime import datetime
+from sqlmodel import Field, SQLModel, Column
+from sqlalchemy import Index, String, Computed
+
+
+# Interações do mesmo sinal necessárias para a contagem virar 'hostile'/'friendly'
+# (uma única troca ruim deixa o NPC só 'wary', sem alimentar a caça do Nemesis)
+STANCE_MIN_INTERACTIONS = 3
+
+# Postura derivada (coluna gerada): override manual > scores do Profiler > contagem de valências
+STANCE_EXPRESSION = f"""
+CASE
+    WHEN stance_override IS NOT NULL THEN stance_override
+    WHEN hostility >= 50 THEN 'hostile'
+    WHEN friendship >= 40 THEN 'friendly'
+    WHEN (negative_count + very_negative_count) >= {STANCE_MIN_INTERACTIONS}
+     AND (negative_count + very_negative_count) > (positive_count + very_positive_count) * 2 THEN 'hostile'
+    WHEN (positive_count + very_positive_count) >= {STANCE_MIN_INTERACTIONS}
+     AND (positive_count + very_positive_count) > (negative_count + very_negative_count) * 2 THEN 'friendly'
+    WHEN (negative_count + very_negative_count) > (positive_count + very_positive_count) THEN 'wary'
+    WHEN (positive_count + very_positive_count) > (negative_count + very_negative_count) THEN 'warm'
+    ELSE 'neutral'
+END
+"""
+
+
+class RelationshipAggregate(SQLModel, table=True):
+    __tablename__ = "relationship_aggregates"
+    __table_args__ = (
+        # "Quem odeia o jogador": WHERE target_key = ? AND stance = 'hostile'
+        Index("ix_relationship_aggregates_target_stance", "target_key", "stance"),
+    )
+
+    # Chave: entidade que lembra + nome normalizado do alvo
+    entity_id: int = Field(primary_key=True)
+    target_key: str = Field(primary_key=True)  # nome do alvo em minúsculas
+    target_name: str
+    target_id: Optional[int] = Field(default=None)
+
+    # Contagem de interações por valência emocional
+    very_negative_count: int = Field(default=0)
+    negative_count: int = Field(default=0)
+    neutral_count: int = Field(default=0)
+    positive_count: int = Field(default=0)
+    very_positive_count: int = Field(default=0)
+    total_interactions: int = Field(default=0)
+
+    # Scores do Profiler (Nemesis System)
+    hostility: int = Field(default=0)
+    friendship: int = Field(default=0)
+    respect: int = Field(default=0)
+
+    # Postura definida explicitamente (NpcRepository.add_relationship)
+    stance_override: Optional[str] = Field(default=None)
+    history: Optional[str] = Field(default=None)
+
+    last_event_type: Optional[str] = Field(default=None)
+    last_game_time: Optional[str] = Field(default=None)
+    last_interaction_at: Optional[datetime] = Field(default=None)
+
+    stance: Optional[str] = Field(
+        default=None,
+        sa_column=Column(String, Computed(STANCE_EXPRESSION, persisted=True))
+    )
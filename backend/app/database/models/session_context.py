@@ -0,0 +1,40 @@
+"""
+SessionContext Models - Persistência do contexto de sessão
+GEM RPG ORBIS - Arquitetura Cognitiva
+
+Cada sessão tem um snapshot (SessionContext.serialize() completo, reescrito
+só na compactação) e um log append-only de deltas: turnos novos, hooks e
+threads alterados e o estado escalar do turno. Carregar uma sessão é um
+único SELECT (snapshot + deltas posteriores) pelo índice (session_id, seq).
+"""
+from typing import Optional
+from datetime import datetime
+from sqlmodel import Field, SQLModel, Column, JSON
+from sqlalchemy import Index
+
+
+class SessionContextSnapshot(SQLModel, table=True):
+    __tablename__ = "session_context_snapshots"
+
+    session_id: str = Field(primary_key=True)
+    player_id: int = Field(index=True)
+    data: dict = Field(default_factory=dict, sa_column=Column(JSON))
+
+    # Último delta já incorporado ao snapshot
+    last_seq: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SessionContextDelta(SQLModel, table=True):
+    __tablename__ = "session_context_deltas"
+    __table_args__ = (
+        # Replay: WHERE session_id = ? AND seq > ? ORDER BY seq
+        Index("ix_session_context_deltas_session_seq", "session_id", "seq", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    session_id: str
+    seq: int
+    kind: str  # turn | hook | thread | state
+    payload: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
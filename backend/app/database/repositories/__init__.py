@@ -9,6 +9,7 @@ from app.database.repositories.gamelog_repo import GameLogRepository
 from app.database.repositories.world_event_repo import WorldEventRepository
 from app.database.repositories.faction_repo import FactionRepository
 from app.database.repositories.economy_repo import GlobalEconomyRepository
+from app.database.repositories.relationship_repo import RelationshipRepository
 from app.database.repositories.location_repo import (
     LocationRepository,
     DynamicLocationRepository,
@@ -20,6 +21,7 @@ __all__ = [
     # Player & NPC
     "PlayerRepository",
     "NpcRepository",
+    "RelationshipRepository",
     
     # Game Logs
     "GameLogRepository",
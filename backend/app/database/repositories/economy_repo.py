@@ -7,6 +7,7 @@ from typing import Optional, List
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.database.models.world_state import GlobalEconomy
+from app.core.world_version import world_version
 
 
 class GlobalEconomyRepository:
@@ -36,6 +37,7 @@ class GlobalEconomyRepository:
         self.session.add(item)
         await self.session.commit()
         await self.session.refresh(item)
+        world_version.bump("world")
         
         return item
     
@@ -68,6 +70,7 @@ class GlobalEconomyRepository:
         self.session.add(item)
         await self.session.commit()
         await self.session.refresh(item)
+        world_version.bump("world")
         
         return item
     
@@ -184,6 +187,7 @@ class GlobalEconomyRepository:
         if item:
             await self.session.delete(item)
             await self.session.commit()
+            world_version.bump("world")
             return True
         
         return False
@@ -6,6 +6,7 @@ from typing import Optional, List
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.database.models.world_state import Faction
+from app.core.world_version import world_version
 
 
 class FactionRepository:
@@ -33,6 +34,7 @@ class FactionRepository:
         self.session.add(faction)
         await self.session.commit()
         await self.session.refresh(faction)
+        world_version.bump("world")
         
         return faction
     
@@ -63,6 +65,7 @@ class FactionRepository:
         self.session.add(faction)
         await self.session.commit()
         await self.session.refresh(faction)
+        world_version.bump("world")
         
         return faction
     
@@ -158,6 +161,7 @@ class FactionRepository:
         if faction:
             await self.session.delete(faction)
             await self.session.commit()
+            world_version.bump("world")
             return True
         
         return False
@@ -1,8 +1,10 @@
 """
 GameLogRepository - Persistent Turn History Management
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple, AsyncIterator
 from sqlmodel import Session, select, desc
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import defer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.logs import GameLog
@@ -98,9 +100,79 @@ class GameLogRepository:
     
     async def get_turn_count(self, player_id: int) -> int:
         """Get total turns for a player"""
-        statement = select(GameLog).where(GameLog.player_id == player_id)
+        statement = select(func.count()).select_from(GameLog).where(GameLog.player_id == player_id)
         result = await self.session.execute(statement)
-        return len(result.scalars().all())
+        return result.scalar_one()
+    
+    # ==================== KEYSET PAGINATION ====================
+    
+    @staticmethod
+    def encode_cursor(log: GameLog) -> str:
+        """Cursor opaco para a próxima página: '<turn_number>:<id>'"""
+        return f"{log.turn_number}:{log.id}"
+    
+    @staticmethod
+    def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[int, int]]:
+        """
+        Decodifica o cursor (aceita também só o turn_number).
+        
+        Raises:
+            ValueError: cursor malformado
+        """
+        if not cursor:
+            return None
+        turn, _, log_id = cursor.partition(":")
+        try:
+            return int(turn), int(log_id) if log_id else 2**31 - 1
+        except ValueError:
+            raise ValueError(f"Cursor inválido: {cursor!r}") from None
+    
+    def _turns_keyset_statement(self, player_id: int, cursor: Optional[str]):
+        """
+        Turnos do mais recente para o mais antigo, a partir do cursor.
+        Usa o índice (player_id, turn_number, id) e não carrega o embedding.
+        """
+        statement = (
+            select(GameLog)
+            .options(defer(GameLog.embedding))
+            .where(GameLog.player_id == player_id)
+        )
+        position = self.decode_cursor(cursor)
+        if position:
+            statement = statement.where(tuple_(GameLog.turn_number, GameLog.id) < position)
+        return statement.order_by(desc(GameLog.turn_number), desc(GameLog.id))
+    
+    async def get_turns_page(
+        self,
+        player_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[GameLog], Optional[str]]:
+        """
+        Página de turnos (mais recentes primeiro) via keyset pagination.
+        
+        Returns:
+            (logs, next_cursor) - next_cursor é None na última página
+        """
+        statement = self._turns_keyset_statement(player_id, cursor).limit(limit + 1)
+        result = await self.session.execute(statement)
+        logs = list(result.scalars().all())
+        next_cursor = self.encode_cursor(logs[limit - 1]) if len(logs) > limit else None
+        return logs[:limit], next_cursor
+    
+    async def stream_turns(
+        self,
+        player_id: int,
+        cursor: Optional[str] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[GameLog]:
+        """
+        Itera os turnos via cursor server-side, sem materializar o histórico inteiro.
+        """
+        statement = self._turns_keyset_statement(player_id, cursor).execution_options(yield_per=batch_size)
+        result = await self.session.stream(statement)
+        async for log in result.scalars():
+            yield log
     
     async def get_turns_by_location(
         self, 
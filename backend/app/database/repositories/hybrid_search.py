@@ -4,6 +4,8 @@ from sqlalchemy import text
 from pgvector.sqlalchemy import Vector
 from app.services.embedding_service import EmbeddingService
 from app.database.models.memory import Memory
+from app.core.memory.consolidation import memory_consolidator
+from app.core.chronos import world_clock
 
 class HybridSearchRepository:
 
@@ -23,13 +25,28 @@ class HybridSearchRepository:
             else:
                 vec = vec + [0.0] * (embedding_dim - len(vec))
 
-        mem = Memory(npc_id=npc_id, content=content)
+        # Texto livre do Director: episódica neutra, no tempo de jogo atual
+        mem = Memory(
+            npc_id=npc_id,
+            content=content,
+            memory_type="episodic",
+            event_type="combat" if content.startswith("[ATTACKED") else "unknown",
+            importance=0.5,
+            emotional_valence="negative" if "ATTACKED" in content else "neutral",
+            game_time=world_clock.get_current_datetime(),
+        )
         # Atribui vetor diretamente; pgvector trata a conversão
         setattr(mem, "embedding", vec)
 
         self.session.add(mem)
         await self.session.commit()
         await self.session.refresh(mem)
+
+        # Mantém o NPC dentro do orçamento de memórias quentes (digests + arquivo frio)
+        try:
+            await memory_consolidator.maybe_consolidate(self.session, npc_id)
+        except Exception as e:
+            print(f"[MEMORY] Consolidação falhou para NPC {npc_id}: {e}")
         return mem
 
     async def find_relevant_memories(
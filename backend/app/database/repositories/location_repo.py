@@ -17,6 +17,9 @@ from app.database.models.location import (
     Location, DynamicLocation, LocationAlias, LocationVisit,
     LocationType, BiomeType, DangerLevel
 )
+from app.core.world_version import world_version
+from app.core.world_graph import world_graph
+from app.core.location_index import location_index
 
 
 class LocationRepository:
@@ -32,6 +35,8 @@ class LocationRepository:
         self.session.add(location)
         await self.session.commit()
         await self.session.refresh(location)
+        world_graph.add_location(location)
+        location_index.invalidate_locations()
         return location
     
     async def create_many(self, locations: List[Location]) -> List[Location]:
@@ -41,6 +46,8 @@ class LocationRepository:
         await self.session.commit()
         for loc in locations:
             await self.session.refresh(loc)
+            world_graph.add_location(loc)
+        location_index.invalidate_locations()
         return locations
     
     async def get_by_id(self, location_id: int) -> Optional[Location]:
@@ -153,12 +160,15 @@ class LocationRepository:
     # ==================== NAVEGAÇÃO/GRAFO ====================
     
     async def get_connected_locations(self, location_name: str) -> List[Location]:
-        """Busca localizações conectadas a uma localização."""
-        location = await self.get_by_name(location_name)
-        if not location or not location.connections:
+        """Busca localizações conectadas a uma localização (vizinhos via WorldGraph, uma query)."""
+        if world_graph.has_location(location_name):
+            connected_names = world_graph.neighbors(location_name)
+        else:
+            location = await self.get_by_name(location_name)
+            connected_names = list((location.connections or {}).keys()) if location else []
+        if not connected_names:
             return []
         
-        connected_names = list(location.connections.keys())
         result = await self.session.exec(
             select(Location).where(Location.name.in_(connected_names))
         )
@@ -219,6 +229,11 @@ class LocationRepository:
             }
             await self.update(loc_to)
         
+        world_graph.add_edge(
+            from_location, to_location,
+            distance=distance, travel_time=travel_time, danger=danger,
+            bidirectional=bidirectional
+        )
         return True
 
     # ==================== FACÇÕES ====================
@@ -336,6 +351,8 @@ class DynamicLocationRepository:
         self.session.add(location)
         await self.session.commit()
         await self.session.refresh(location)
+        world_version.bump("world")
+        location_index.invalidate_locations()
         return location
     
     async def get_by_id(self, location_id: int) -> Optional[DynamicLocation]:
@@ -437,7 +454,10 @@ class DynamicLocationRepository:
         if location:
             location.is_destroyed = True
             location.destruction_event_id = event_id
-            return await self.update(location)
+            location = await self.update(location)
+            world_version.bump("world")
+            location_index.invalidate_locations()
+            return location
         return None
     
     async def record_visit(self, location_id: int) -> Optional[DynamicLocation]:
@@ -460,6 +480,7 @@ class LocationAliasRepository:
         self.session.add(alias)
         await self.session.commit()
         await self.session.refresh(alias)
+        location_index.invalidate_player(alias.player_id)
         return alias
     
     async def get_by_alias(self, alias: str, player_id: int) -> Optional[LocationAlias]:
@@ -497,6 +518,7 @@ class LocationAliasRepository:
             self.session.add(existing)
             await self.session.commit()
             await self.session.refresh(existing)
+            location_index.invalidate_player(player_id)
             return existing
         
         new_alias = LocationAlias(
@@ -514,6 +536,7 @@ class LocationAliasRepository:
         if existing:
             await self.session.delete(existing)
             await self.session.commit()
+            location_index.invalidate_player(player_id)
             return True
         return False
 
@@ -10,10 +10,12 @@ Repositório completo para operações com NPCs incluindo:
 - Gerenciamento de rotina diária
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
 from sqlmodel import select, or_, and_
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.database.models.npc import NPC
+from app.database.models.relationship import RelationshipAggregate
+from app.database.repositories.relationship_repo import RelationshipRepository, target_key
 
 
 class NpcRepository:
@@ -60,6 +62,33 @@ class NpcRepository:
         result = await self.session.exec(select(NPC))
         return list(result.all())
     
+    async def get_page(self, after_id: Optional[int] = None, limit: Optional[int] = 200) -> Tuple[List[NPC], Optional[int]]:
+        """
+        Página de NPCs ordenada por id (keyset pagination).
+        Retorna (npcs, next_cursor); next_cursor é None na última página.
+        Com limit=None retorna todos a partir do cursor.
+        """
+        statement = select(NPC).order_by(NPC.id)
+        if limit is not None:
+            statement = statement.limit(limit + 1)
+        if after_id is not None:
+            statement = statement.where(NPC.id > after_id)
+        result = await self.session.exec(statement)
+        npcs = list(result.all())
+        if limit is None:
+            return npcs, None
+        next_cursor = npcs[limit - 1].id if len(npcs) > limit else None
+        return npcs[:limit], next_cursor
+    
+    async def stream_all(self, after_id: Optional[int] = None, batch_size: int = 500) -> AsyncIterator[NPC]:
+        """Itera todos os NPCs via cursor server-side, sem materializar a tabela."""
+        statement = select(NPC).order_by(NPC.id).execution_options(yield_per=batch_size)
+        if after_id is not None:
+            statement = statement.where(NPC.id > after_id)
+        result = await self.session.stream(statement)
+        async for npc in result.scalars():
+            yield npc
+    
     async def get_all_active(self) -> List[NPC]:
         """Busca todos os NPCs ativos."""
         result = await self.session.exec(
@@ -299,32 +328,66 @@ class NpcRepository:
         stance: str, 
         history: str = ""
     ) -> Optional[NPC]:
-        """Adiciona ou atualiza um relacionamento."""
+        """
+        Adiciona ou atualiza um relacionamento.
+        A postura vai para relationship_aggregates (fonte única); o JSON do NPC
+        é mantido como espelho para o Architect/prompts.
+        """
         npc = await self.get_by_id(npc_id)
         if npc:
-            if npc.relationships is None:
-                npc.relationships = {}
-            npc.relationships[target_name] = {
+            await RelationshipRepository(self.session).set_stance(
+                npc_id, target_name, stance, history or None, commit=False
+            )
+            relationships = dict(npc.relationships or {})
+            relationships[target_name] = {
                 "stance": stance,  # friendly, neutral, hostile, fearful, respectful
                 "history": history
             }
+            npc.relationships = relationships
             return await self.update(npc)
         return None
     
     async def get_relationship(self, npc_id: int, target_name: str) -> Optional[Dict[str, Any]]:
-        """Obtém o relacionamento de um NPC com outro."""
+        """
+        Obtém o relacionamento de um NPC com outro (leitura por chave primária).
+        Postura explícita (stance_override ou JSON do seed/Architect) vence a
+        derivada das contagens.
+        """
+        aggregate = await RelationshipRepository(self.session).get(npc_id, target_name)
+        if aggregate and aggregate.stance_override is not None:
+            return RelationshipRepository.to_dict(aggregate)
+        
+        # Relacionamentos definidos só no JSON (seed/Architect)
         npc = await self.get_by_id(npc_id)
-        if npc and npc.relationships:
-            return npc.relationships.get(target_name)
-        return None
-    
-    async def get_npcs_with_relationship_to(self, target_name: str) -> List[NPC]:
-        """Busca NPCs que têm relacionamento com um alvo."""
-        all_npcs = await self.get_all_active()
-        return [
-            npc for npc in all_npcs 
-            if npc.relationships and target_name in npc.relationships
-        ]
+        explicit = (npc.relationships or {}).get(target_name) if npc else None
+        if aggregate is None:
+            return explicit
+        
+        relationship = RelationshipRepository.to_dict(aggregate)
+        if isinstance(explicit, dict) and explicit.get("stance"):
+            relationship["stance"] = explicit["stance"]
+            relationship["history"] = relationship["history"] or explicit.get("history")
+        return relationship
+    
+    async def get_npcs_with_relationship_to(
+        self,
+        target_name: str,
+        stances: Optional[List[str]] = None
+    ) -> List[NPC]:
+        """
+        Busca NPCs que têm relacionamento com um alvo (opcionalmente com certas posturas).
+        Usa o índice (target_key, stance) de relationship_aggregates.
+        """
+        stmt = (
+            select(NPC)
+            .join(RelationshipAggregate, RelationshipAggregate.entity_id == NPC.id)
+            .where(RelationshipAggregate.target_key == target_key(target_name))
+            .where(NPC.is_active == True, NPC.is_alive == True)
+        )
+        if stances:
+            stmt = stmt.where(RelationshipAggregate.stance.in_(stances))
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
 
     # ==================== ROTINA DIÁRIA ====================
     
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple, AsyncIterator
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm.attributes import flag_modified
@@ -79,6 +79,33 @@ class PlayerRepository:
         result = await self.session.exec(select(Player))
         return result.all()
 
+    async def get_page(self, after_id: Optional[int] = None, limit: Optional[int] = 100) -> Tuple[List[Player], Optional[int]]:
+        """
+        Página de jogadores ordenada por id (keyset pagination).
+        Retorna (players, next_cursor); next_cursor é None na última página.
+        Com limit=None retorna todos a partir do cursor.
+        """
+        statement = select(Player).order_by(Player.id)
+        if limit is not None:
+            statement = statement.limit(limit + 1)
+        if after_id is not None:
+            statement = statement.where(Player.id > after_id)
+        result = await self.session.exec(statement)
+        players = list(result.all())
+        if limit is None:
+            return players, None
+        next_cursor = players[limit - 1].id if len(players) > limit else None
+        return players[:limit], next_cursor
+
+    async def stream_all(self, after_id: Optional[int] = None, batch_size: int = 500) -> AsyncIterator[Player]:
+        """Itera todos os jogadores via cursor server-side."""
+        statement = select(Player).order_by(Player.id).execution_options(yield_per=batch_size)
+        if after_id is not None:
+            statement = statement.where(Player.id > after_id)
+        result = await self.session.stream(statement)
+        async for player in result.scalars():
+            yield player
+
     async def delete(self, player_id: int) -> bool:
         """Deleta um jogador pelo ID."""
         player = await self.get_by_id(player_id)
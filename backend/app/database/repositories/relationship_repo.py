@@ -0,0 +1,244 @@
+"""
+Relationship Repository - Agregados de relacionamento (entidade -> alvo)
+GEM RPG ORBIS - Arquitetura Cognitiva
+
+Todas as escritas são upserts atômicos (INSERT ... ON CONFLICT DO UPDATE),
+então nunca é preciso ler a linha antes de atualizá-la. A postura é uma
+coluna gerada pelo Postgres a partir dos contadores.
+"""
+
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+from sqlalchemy import text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.models.relationship import RelationshipAggregate
+
+
+# Valência (EmotionalValence.value) -> coluna de contagem
+VALENCE_COLUMNS = {
+    "very_negative": "very_negative_count",
+    "negative": "negative_count",
+    "neutral": "neutral_count",
+    "positive": "positive_count",
+    "very_positive": "very_positive_count",
+}
+
+SCORE_COLUMNS = ("hostility", "friendship", "respect")
+
+
+def target_key(name: str) -> str:
+    """Chave normalizada do alvo ('  Yi Fan ' -> 'yi fan')."""
+    return " ".join((name or "").lower().split())
+
+
+class RelationshipRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    # ==================== ESCRITA INCREMENTAL ====================
+
+    async def record_interaction(
+        self,
+        entity_id: int,
+        target_name: str,
+        valence: str,
+        event_type: Optional[str] = None,
+        game_time: Optional[str] = None,
+        target_id: Optional[int] = None,
+        commit: bool = True
+    ) -> None:
+        """Soma uma interação (com a valência dada) ao agregado entidade -> alvo."""
+        column = VALENCE_COLUMNS.get(valence, "neutral_count")
+        # Na inserção, só a coluna da valência começa em 1
+        initial = {c: int(c == column) for c in VALENCE_COLUMNS.values()}
+        await self.session.execute(
+            text(f"""
+                INSERT INTO relationship_aggregates (
+                    entity_id, target_key, target_name, target_id,
+                    very_negative_count, negative_count, neutral_count,
+                    positive_count, very_positive_count, total_interactions,
+                    hostility, friendship, respect,
+                    last_event_type, last_game_time, last_interaction_at
+                )
+                VALUES (
+                    :entity_id, :target_key, :target_name, :target_id,
+                    :very_negative_count, :negative_count, :neutral_count,
+                    :positive_count, :very_positive_count, 1,
+                    0, 0, 0,
+                    :event_type, :game_time, :now
+                )
+                ON CONFLICT (entity_id, target_key) DO UPDATE SET
+                    {column} = relationship_aggregates.{column} + 1,
+                    total_interactions = relationship_aggregates.total_interactions + 1,
+                    target_id = COALESCE(EXCLUDED.target_id, relationship_aggregates.target_id),
+                    last_event_type = EXCLUDED.last_event_type,
+                    last_game_time = EXCLUDED.last_game_time,
+                    last_interaction_at = EXCLUDED.last_interaction_at
+            """),
+            {
+                "entity_id": entity_id,
+                "target_key": target_key(target_name),
+                "target_name": target_name,
+                "target_id": target_id,
+                "event_type": event_type,
+                "game_time": game_time,
+                "now": datetime.utcnow(),
+                **initial,
+            }
+        )
+        if commit:
+            await self.session.commit()
+
+    async def adjust_scores(
+        self,
+        entity_id: int,
+        target_name: str,
+        target_id: Optional[int] = None,
+        commit: bool = True,
+        **deltas: int
+    ) -> None:
+        """Soma deltas aos scores do Profiler (hostility, friendship, respect)."""
+        deltas = {k: v for k, v in deltas.items() if k in SCORE_COLUMNS and v}
+        if not deltas:
+            return
+        values = {c: deltas.get(c, 0) for c in SCORE_COLUMNS}
+        updates = ", ".join(
+            f"{c} = relationship_aggregates.{c} + EXCLUDED.{c}" for c in deltas
+        )
+        await self.session.execute(
+            text(f"""
+                INSERT INTO relationship_aggregates (
+                    entity_id, target_key, target_name, target_id,
+                    very_negative_count, negative_count, neutral_count,
+                    positive_count, very_positive_count, total_interactions,
+                    hostility, friendship, respect
+                )
+                VALUES (
+                    :entity_id, :target_key, :target_name, :target_id,
+                    0, 0, 0, 0, 0, 0,
+                    :hostility, :friendship, :respect
+                )
+                ON CONFLICT (entity_id, target_key) DO UPDATE SET
+                    {updates},
+                    target_id = COALESCE(EXCLUDED.target_id, relationship_aggregates.target_id)
+            """),
+            {
+                "entity_id": entity_id,
+                "target_key": target_key(target_name),
+                "target_name": target_name,
+                "target_id": target_id,
+                **values,
+            }
+        )
+        if commit:
+            await self.session.commit()
+
+    async def set_stance(
+        self,
+        entity_id: int,
+        target_name: str,
+        stance: Optional[str],
+        history: Optional[str] = None,
+        commit: bool = True
+    ) -> None:
+        """Define (ou remove, com None) a postura explícita de uma entidade para um alvo."""
+        await self.session.execute(
+            text("""
+                INSERT INTO relationship_aggregates (
+                    entity_id, target_key, target_name,
+                    very_negative_count, negative_count, neutral_count,
+                    positive_count, very_positive_count, total_interactions,
+                    hostility, friendship, respect, stance_override, history
+                )
+                VALUES (
+                    :entity_id, :target_key, :target_name,
+                    0, 0, 0, 0, 0, 0, 0, 0, 0, :stance, :history
+                )
+                ON CONFLICT (entity_id, target_key) DO UPDATE SET
+                    stance_override = EXCLUDED.stance_override,
+                    history = COALESCE(EXCLUDED.history, relationship_aggregates.history)
+            """),
+            {
+                "entity_id": entity_id,
+                "target_key": target_key(target_name),
+                "target_name": target_name,
+                "stance": stance,
+                "history": history,
+            }
+        )
+        if commit:
+            await self.session.commit()
+
+    # ==================== LEITURA ====================
+
+    async def get(self, entity_id: int, target_name: str) -> Optional[RelationshipAggregate]:
+        """Leitura por chave primária."""
+        return await self.session.get(RelationshipAggregate, (entity_id, target_key(target_name)))
+
+    async def get_stance(self, entity_id: int, target_name: str) -> str:
+        """Postura da entidade para o alvo ('neutral' se nunca interagiram)."""
+        result = await self.session.execute(
+            text("""
+                SELECT stance FROM relationship_aggregates
+                WHERE entity_id = :entity_id AND target_key = :target_key
+            """),
+            {"entity_id": entity_id, "target_key": target_key(target_name)}
+        )
+        return result.scalar() or "neutral"
+
+    async def get_entities_with_stance(
+        self,
+        target_name: str,
+        stances: List[str],
+        limit: int = 100
+    ) -> List[RelationshipAggregate]:
+        """Quem tem uma das posturas dadas para o alvo (scan no índice target_key, stance)."""
+        stmt = (
+            select(RelationshipAggregate)
+            .where(RelationshipAggregate.target_key == target_key(target_name))
+            .where(RelationshipAggregate.stance.in_(stances))
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_all_for_entity(self, entity_id: int) -> List[RelationshipAggregate]:
+        """Todos os relacionamentos de uma entidade."""
+        stmt = select(RelationshipAggregate).where(RelationshipAggregate.entity_id == entity_id)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def delete(self, entity_id: int, target_name: str, commit: bool = True) -> None:
+        """Remove o agregado (forget_about)."""
+        await self.session.execute(
+            text("""
+                DELETE FROM relationship_aggregates
+                WHERE entity_id = :entity_id AND target_key = :target_key
+            """),
+            {"entity_id": entity_id, "target_key": target_key(target_name)}
+        )
+        if commit:
+            await self.session.commit()
+
+    @staticmethod
+    def to_dict(aggregate: RelationshipAggregate) -> Dict[str, Any]:
+        positive = aggregate.positive_count + aggregate.very_positive_count
+        negative = aggregate.negative_count + aggregate.very_negative_count
+        return {
+            "target": aggregate.target_name,
+            "target_id": aggregate.target_id,
+            "stance": aggregate.stance or "neutral",
+            "total_interactions": aggregate.total_interactions,
+            "positive_interactions": positive,
+            "negative_interactions": negative,
+            "hostility": aggregate.hostility,
+            "friendship": aggregate.friendship,
+            "respect": aggregate.respect,
+            "history": aggregate.history,
+            "last_event_type": aggregate.last_event_type,
+            "last_game_time": aggregate.last_game_time,
+            "last_interaction": aggregate.last_interaction_at.isoformat() if aggregate.last_interaction_at else None,
+        }
@@ -2,7 +2,7 @@
 WorldEventRepository - Gerencia eventos globais que afetam todos os players
 Permite criar eventos e investigá-los
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple, AsyncIterator
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -89,6 +89,42 @@ class WorldEventRepository:
         result = await self.session.execute(stmt)
         return result.scalars().all()
     
+    def _active_events_statement(self, location: Optional[str], after_id: Optional[int]):
+        stmt = select(WorldEvent).where(WorldEvent.is_active == True)
+        if location:
+            stmt = stmt.where(WorldEvent.location_affected == location)
+        if after_id is not None:
+            stmt = stmt.where(WorldEvent.id > after_id)
+        return stmt.order_by(WorldEvent.id)
+    
+    async def get_active_events_page(
+        self,
+        location: Optional[str] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100
+    ) -> Tuple[List[WorldEvent], Optional[int]]:
+        """
+        Página de eventos ativos ordenada por id (keyset pagination).
+        Retorna (events, next_cursor); next_cursor é None na última página.
+        """
+        stmt = self._active_events_statement(location, after_id).limit(limit + 1)
+        result = await self.session.execute(stmt)
+        events = list(result.scalars().all())
+        next_cursor = events[limit - 1].id if len(events) > limit else None
+        return events[:limit], next_cursor
+    
+    async def stream_active_events(
+        self,
+        location: Optional[str] = None,
+        after_id: Optional[int] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[WorldEvent]:
+        """Itera eventos ativos via cursor server-side."""
+        stmt = self._active_events_statement(location, after_id).execution_options(yield_per=batch_size)
+        result = await self.session.stream(stmt)
+        async for event in result.scalars():
+            yield event
+    
     async def get_events_by_player(self, player_id: int) -> List[WorldEvent]:
         """Busca eventos causados por um player específico"""
         stmt = select(WorldEvent).where(WorldEvent.caused_by_player_id == player_id)
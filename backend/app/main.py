@@ -1,11 +1,16 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from typing import Optional
 import asyncio
+import json
 from sqlmodel.ext.asyncio.session import AsyncSession
 from contextlib import asynccontextmanager
 
+from app.config import settings
 from app.database.db_connection import engine
+from app.database.instrumentation import SQLMetricsMiddleware, sql_metrics
+from app.database.checkpoint_retention import CheckpointRetentionPolicy, prune_checkpoints
 from app.database.init_db import seed_initial_npcs, ensure_pgvector_extension
 from sqlmodel import SQLModel
 from app.core.combat_engine import CombatEngine
@@ -23,6 +28,8 @@ from app.database.repositories.economy_repo import GlobalEconomyRepository
 from app.services.gemini_client import GeminiClient
 from app.services.embedding_service import EmbeddingService, embedding_service
 from app.services.lore_cache import lore_cache
+from app.services.npc_pool import npc_pool
+from app.services.response_cache import response_cache
 from app.agents.narrator import Narrator
 from app.agents.referee import Referee
 from app.agents.director import Director
@@ -32,11 +39,24 @@ from app.agents.architect import Architect
 from app.agents.villains.profiler import Profiler
 from app.agents.graph_core import SimpleGameGraph, GameGraph
 from app.agents.nodes.state import player_from_db, world_from_context, create_initial_state
+from app.agents.nodes.intent_classifier import intent_classifier
+from app.agents.prefetch import context_prefetcher
 from app.core.world_sim import WorldSimulator
 from sqlalchemy import text
 from app.core.simulation.daily_tick import DailyTickSimulator
 from app.services.quest_service import quest_service
 from app.core.chronos import world_clock
+from app.core.world_graph import world_graph
+from app.core.location_index import location_index
+from app.core.ruleset_registry import ruleset_registry
+from app.core.loot_manager import loot_manager
+from app.core.effect_scheduler import effect_scheduler
+from app.core.mass_combat import mass_combat_engine
+from app.core.memory.consolidation import memory_consolidator
+from app.core.memory.memory_cache import fact_cache, pattern_cache
+from app.core.session_context import TurnSummary
+from app.core.session_store import session_store
+from app.core.turn_snapshots import turn_snapshots
 
 # Armazenamento simples para as instâncias dos nossos serviços
 app_state = {}
@@ -49,6 +69,11 @@ async def lifespan(app: FastAPI):
     # Sprint 14: Pré-carregar lore cache (rápido, ~10ms)
     lore_cache.load()
     
+    # Mecânicas compiladas (loot tables em tabelas de alias) + watcher de alterações
+    ruleset_registry.load()
+    loot_manager.precompile()
+    ruleset_registry.start_watching(settings.RULESET_WATCH_INTERVAL_SECONDS)
+    
     # Garante pgvector e cria tabelas (se não existirem) com retry
     for attempt in range(10):
         try:
@@ -63,6 +88,20 @@ async def lifespan(app: FastAPI):
     # Popula o banco de dados com NPCs iniciais
     await seed_initial_npcs()
 
+    # Grafo de navegação do mundo (locations.connections)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await world_graph.load_from_db(session)
+    except Exception as e:
+        print(f"[WORLD GRAPH] Falha ao carregar do banco, usando conexões padrão: {e}")
+
+    # Efeitos de status ativos (DoT, regeneração) de todos os Players/NPCs
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await effect_scheduler.load_from_db(session)
+    except Exception as e:
+        print(f"[EFFECTS] Falha ao carregar efeitos ativos do banco: {e}")
+
     # Inicializar serviços
     try:
         print("[DEBUG] Inicializando GeminiClient...")
@@ -103,6 +142,14 @@ async def lifespan(app: FastAPI):
     
     # Cleanup no desligamento
     print("Encerrando a aplicação...")
+    ruleset_registry.stop_watching()
+    
+    # Deltas de contextos expulsos do LRU que ainda não foram gravados
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await session_store.flush_evicted(session)
+    except Exception as e:
+        print(f"[SESSION STORE] Falha ao gravar sessões expulsas: {e}")
     await engine.dispose()
 
 app = FastAPI(lifespan=lifespan)
@@ -122,6 +169,9 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# --- Métricas SQL por request (ASGI puro: cobre o corpo de respostas em streaming) ---
+app.add_middleware(SQLMetricsMiddleware)
+
 # --- Gestão de Dependências ---
 
 async def get_session():
@@ -162,6 +212,22 @@ async def get_stylizer() -> Stylizer:
 def get_hybrid_repo(session: AsyncSession) -> HybridSearchRepository:
     return HybridSearchRepository(session)
 
+
+def ndjson_response(iter_rows, serialize) -> StreamingResponse:
+    """
+    Resposta NDJSON (uma linha JSON por registro) lida via cursor server-side.
+
+    `iter_rows(session)` deve ser um async generator de um repositório
+    (ex: `NpcRepository(session).stream_all()`). A sessão é aberta dentro do
+    generator porque a sessão da dependência já foi fechada quando o corpo é enviado.
+    """
+    async def generator():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            async for row in iter_rows(session):
+                yield json.dumps(serialize(row), ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(generator(), media_type="application/x-ndjson")
+
 # --- Endpoints da API ---
 
 @app.get("/")
@@ -271,6 +337,158 @@ async def system_status():
     }
 
 
+
+@app.get("/system/npc-pool")
+async def npc_pool_status():
+    """
+    Métricas do pool de NPCs pré-gerados (hit rate, pendentes, tamanho por chave).
+    """
+    return npc_pool.get_stats()
+
+
+@app.get("/system/llm-cache")
+async def llm_cache_status():
+    """
+    Métricas do cache de respostas do LLM (hit rate e tokens economizados por tarefa).
+    """
+    gemini = app_state.get("gemini_client")
+    if not gemini:
+        raise HTTPException(status_code=503, detail="Gemini client not initialized")
+    return gemini.get_cache_stats()
+
+
+@app.get("/system/llm-json")
+async def llm_json_status():
+    """
+    Parse das respostas JSON do LLM por tarefa: limpas, reparadas, falhas e retries evitados.
+    """
+    gemini = app_state.get("gemini_client")
+    if not gemini:
+        raise HTTPException(status_code=503, detail="Gemini client not initialized")
+    return gemini.get_json_stats()
+
+
+@app.get("/system/response-cache")
+async def response_cache_status():
+    """
+    Métricas do cache versionado dos endpoints de leitura do mundo.
+    """
+    return response_cache.get_stats()
+
+
+@app.get("/system/world-graph")
+async def world_graph_status():
+    """
+    Estatísticas do grafo de navegação (nós, arestas, cache de caminhos mínimos).
+    """
+    return world_graph.get_stats()
+
+
+@app.get("/system/location-index")
+async def location_index_status():
+    """
+    Métricas do índice de resolução de locais (hits por tipo de match, rebuilds).
+    """
+    return location_index.get_stats()
+
+
+@app.get("/system/memory-consolidation")
+async def memory_consolidation_status():
+    """
+    Métricas da consolidação de memórias (digests criados, linhas arquivadas/recuperadas).
+    """
+    return memory_consolidator.get_stats()
+
+
+@app.get("/system/memory-cache")
+async def memory_cache_status():
+    """
+    Métricas do cache compartilhado de fatos e padrões (hit rate, bytes, despejos).
+    """
+    return {
+        "facts": fact_cache.get_stats(),
+        "patterns": pattern_cache.get_stats(),
+    }
+
+
+@app.get("/system/session-store")
+async def session_store_status():
+    """
+    Métricas do store de SessionContext (LRU, deltas gravados/reaplicados, compactações).
+    """
+    return session_store.get_stats()
+
+
+@app.get("/system/turn-snapshots")
+async def turn_snapshots_status():
+    """
+    Métricas do undo de turnos (diffs gravados, rewinds, linhas restauradas).
+    """
+    return turn_snapshots.get_stats()
+
+
+@app.get("/system/intent-classifier")
+async def intent_classifier_status():
+    """
+    Métricas do fast path do Planner: taxa de turnos sem LLM e motivos de fallback.
+    """
+    return intent_classifier.get_stats()
+
+
+@app.get("/system/ruleset")
+async def ruleset_status():
+    """
+    Versão do ruleset compilado, tempo da última carga e número de recargas a quente.
+    """
+    return ruleset_registry.get_stats()
+
+
+@app.get("/system/loot")
+async def loot_status():
+    """
+    Loot tables compiladas (tabelas de alias) e volume de abates/drops amostrados.
+    """
+    return loot_manager.get_stats()
+
+
+@app.get("/system/effects")
+async def effects_status():
+    """
+    Scheduler de efeitos de status (timing wheel): turno, entidades agendadas,
+    linhas gravadas em lote e tempo médio por tick.
+    """
+    return effect_scheduler.get_stats()
+
+
+@app.get("/system/mass-combat")
+async def mass_combat_status():
+    """
+    Motor de combate em massa (hordas e guerras de facção): batalhas
+    resolvidas, unidades simuladas e tempo médio por batalha.
+    """
+    return mass_combat_engine.get_stats()
+
+
+@app.get("/system/prefetch")
+async def prefetch_status(traces: int = 10):
+    """
+    Busca especulativa do contexto do Narrator: tempo sobreposto ao Planner,
+    buscas usadas/canceladas e os traces dos últimos turnos.
+    """
+    return context_prefetcher.get_stats(traces=traces)
+
+
+@app.get("/system/metrics")
+async def system_metrics(format: str = "prometheus"):
+    """
+    Métricas SQL: latência e linhas por statement, queries por request (N+1)
+    e amostras de queries lentas. `format=json` inclui o texto das queries e os EXPLAINs.
+    """
+    if format == "json":
+        return sql_metrics.to_dict()
+    return PlainTextResponse(sql_metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/player/create")
 async def create_player(name: str, session: AsyncSession = Depends(get_session)) -> Player:
     player_repo = PlayerRepository(session)
@@ -307,12 +525,30 @@ async def get_player_inventory(player_id: int, session: AsyncSession = Depends(g
 
 # [NEW] GET All Players (para seleção de personagens)
 @app.get("/player/list/all", response_model=list[Player])
-async def list_all_players(session: AsyncSession = Depends(get_session)):
+async def list_all_players(
+    response: Response,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    stream: bool = False,
+    session: AsyncSession = Depends(get_session)
+):
     """
-    Lista todos os personagens criados.
+    Lista os personagens criados, paginado por id (keyset).
+    
+    - `limit`: tamanho da página; sem ele retorna todos (CharacterSelector)
+    - `cursor`: id do último personagem da página anterior (header X-Next-Cursor)
+    - `stream=true`: retorna todos como NDJSON via cursor server-side
     """
+    if stream:
+        return ndjson_response(
+            lambda s: PlayerRepository(s).stream_all(after_id=cursor),
+            lambda player: player.model_dump(),
+        )
+    
     player_repo = PlayerRepository(session)
-    players = await player_repo.get_all()
+    players, next_cursor = await player_repo.get_page(after_id=cursor, limit=limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
     return players
 
 # [NEW] DELETE Player (para deletar personagem)
@@ -331,35 +567,55 @@ async def delete_player(player_id: int, session: AsyncSession = Depends(get_sess
     return {"success": True, "message": f"Personagem '{player.name}' deletado"}
 
 # [NEW] GET Player History - Lista histórico de turnos
+def _validate_log_cursor(cursor: Optional[str]) -> None:
+    """Cursor malformado é erro do cliente (400), não do servidor."""
+    try:
+        GameLogRepository.decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _history_entry(log: GameLog) -> dict:
+    return {
+        "id": log.id,
+        "turn_number": log.turn_number,
+        "player_input": log.player_input[:100] + "..." if len(log.player_input) > 100 else log.player_input,
+        "scene_description": log.scene_description,
+        "action_result": log.action_result,
+        "location": log.location,
+        "npcs_present": log.npcs_present,
+        "world_time": log.world_time,
+        "created_at": str(log.created_at) if log.created_at else None,
+    }
+
 @app.get("/player/{player_id}/history")
 async def get_player_history(
     player_id: int, 
-    limit: int = 5, 
+    response: Response,
+    limit: int = Query(5, ge=1, le=100), 
+    cursor: Optional[str] = None,
+    stream: bool = False,
     session: AsyncSession = Depends(get_session)
 ):
     """
     Retorna o histórico de turnos do jogador (para verificar persistência).
+    
+    Paginação keyset em (player_id, turn_number, id): a página vem em ordem
+    cronológica e o header X-Next-Cursor aponta para os turnos mais antigos.
+    Com `stream=true`, retorna o histórico inteiro (mais recente primeiro) como NDJSON.
     """
-    from app.database.repositories.gamelog_repo import GameLogRepository
-    from app.services.embedding_service import EmbeddingService
-    
-    gamelog_repo = GameLogRepository(session, embedding_service=EmbeddingService())
-    logs = await gamelog_repo.get_recent_turns(player_id, limit=limit)
-    
-    return [
-        {
-            "id": log.id,
-            "turn_number": log.turn_number,
-            "player_input": log.player_input[:100] + "..." if len(log.player_input) > 100 else log.player_input,
-            "scene_description": log.scene_description,
-            "action_result": log.action_result,
-            "location": log.location,
-            "npcs_present": log.npcs_present,
-            "world_time": log.world_time,
-            "created_at": str(log.created_at) if log.created_at else None,
-        }
-        for log in logs
-    ]
+    _validate_log_cursor(cursor)
+    if stream:
+        return ndjson_response(
+            lambda s: GameLogRepository(s).stream_turns(player_id, cursor=cursor),
+            _history_entry,
+        )
+    
+    gamelog_repo = GameLogRepository(session)
+    logs, next_cursor = await gamelog_repo.get_turns_page(player_id, cursor=cursor, limit=limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return [_history_entry(log) for log in reversed(logs)]
 
 @app.post("/game/turn")
 async def game_turn(player_id: int, player_input: str, director: Director = Depends(get_director)):
@@ -428,6 +684,12 @@ async def game_turn_v2(
         weather="clear"
     )
     
+    # Estado do início do turno para o undo (diff reverso gravado com o log)
+    capture = turn_snapshots.begin(player, npcs_in_scene)
+    
+    # SessionContext da sessão (cache LRU -> snapshot + deltas)
+    session_context = await session_store.open_turn(session, session_id, player, npcs_in_scene, current_location)
+    
     # Obter gemini client
     gemini_client = app_state.get("gemini_client")
     if not gemini_client:
@@ -459,7 +721,15 @@ async def game_turn_v2(
             world_time=world_clock.get_current_time_str()
         )
         session.add(game_log)
-        await session.commit()
+        await session.flush()
+        session_context.add_turn(TurnSummary.from_graph_result(
+            turn_number, player_input, result, current_location,
+            [npc.name for npc in npcs_in_scene], session_context.current_beat.value
+        ))
+        await session_store.save(session, session_context, commit=False)
+        # Log + snapshot do turno + deltas da sessão na mesma transação (record faz o commit)
+        await turn_snapshots.record(session, capture, turn_number, game_log.id)
+        await session_store.flush_evicted(session)
         
         return {
             "success": True,
@@ -520,6 +790,9 @@ async def game_turn_v2_persistent(
         weather="clear"
     )
     
+    capture = turn_snapshots.begin(player, npcs_in_scene)
+    session_context = await session_store.open_turn(session, session_id, player, npcs_in_scene, current_location)
+    
     game_graph = app_state.get("game_graph")
     if not game_graph:
         raise HTTPException(status_code=503, detail="GameGraph not initialized")
@@ -547,7 +820,15 @@ async def game_turn_v2_persistent(
             world_time=world_clock.get_current_time_str()
         )
         session.add(game_log)
-        await session.commit()
+        await session.flush()
+        session_context.add_turn(TurnSummary.from_graph_result(
+            turn_number, player_input, result, current_location,
+            [npc.name for npc in npcs_in_scene], session_context.current_beat.value
+        ))
+        await session_store.save(session, session_context, commit=False)
+        # Log + snapshot do turno + deltas da sessão na mesma transação (record faz o commit)
+        await turn_snapshots.record(session, capture, turn_number, game_log.id)
+        await session_store.flush_evicted(session)
         
         return {
             "success": True,
@@ -628,6 +909,8 @@ async def game_turn_stream_v2(
         
         # Capturar NPC names para log (antes de fechar session)
         npc_names = [npc.name for npc in npcs_in_scene]
+        capture = turn_snapshots.begin(player, npcs_in_scene)
+        session_context = await session_store.open_turn(session, session_id, player, npcs_in_scene, current_location)
     
     game_graph = app_state.get("game_graph")
     if not game_graph:
@@ -636,6 +919,7 @@ async def game_turn_stream_v2(
     async def event_generator():
         """Gera eventos SSE."""
         full_narration = ""
+        action_summary = ""
         
         async for event in game_graph.stream_turn(
             session_id=session_id,
@@ -652,6 +936,8 @@ async def game_turn_stream_v2(
             if event_type == "narrator_chunk":
                 data = json.loads(event_data)
                 full_narration += data.get("text", "")
+            elif event_type == "executor":
+                action_summary = json.loads(event_data).get("summary", "")
             
             # Formato SSE: event: <type>\ndata: <json>\n\n
             yield f"event: {event_type}\ndata: {event_data}\n\n"
@@ -671,7 +957,15 @@ async def game_turn_stream_v2(
                     world_time=world_clock.get_current_time_str()
                 )
                 log_session.add(game_log)
-                await log_session.commit()
+                await log_session.flush()
+                session_context.add_turn(TurnSummary.from_graph_result(
+                    turn_number, player_input,
+                    {"narration": full_narration, "action_summary": action_summary},
+                    current_location, npc_names, session_context.current_beat.value
+                ))
+                await session_store.save(log_session, session_context, commit=False)
+                await turn_snapshots.record(log_session, capture, turn_number, game_log.id)
+                await session_store.flush_evicted(log_session)
         except Exception as e:
             print(f"[SSE] Erro ao salvar log: {e}")
     
@@ -688,19 +982,21 @@ async def game_turn_stream_v2(
 
 @app.post("/v2/game/undo")
 async def game_undo_v2(
-    session_id: str = "default"
+    session_id: str = "default",
+    session: AsyncSession = Depends(get_session)
 ):
     """
     V2: Desfaz o último turno (time travel).
     
-    Restaura o checkpoint anterior da sessão.
+    Restaura o checkpoint anterior da sessão e aplica o diff reverso do
+    turno em Player/NPCs (HP, inventário, ouro, localização, NPCs criados).
     """
     game_graph = app_state.get("game_graph")
     if not game_graph:
         raise HTTPException(status_code=503, detail="GameGraph not initialized")
     
     try:
-        result = await game_graph.undo_turn(session_id)
+        result = await game_graph.undo_turn(session_id, db_session=session)
         
         if not result.get("success"):
             raise HTTPException(status_code=400, detail=result.get("error", "Undo failed"))
@@ -709,7 +1005,8 @@ async def game_undo_v2(
             "success": True,
             "message": "Turno desfeito com sucesso",
             "checkpoint_id": result.get("checkpoint_id"),
-            "restored_state": result.get("state", {})
+            "restored_state": result.get("state", {}),
+            "world": result.get("world")
         }
         
     except HTTPException:
@@ -746,6 +1043,19 @@ async def get_checkpoints_v2(session_id: str):
         raise HTTPException(status_code=500, detail=f"Error fetching checkpoints: {str(e)}")
 
 
+@app.post("/v2/game/checkpoints/prune")
+async def prune_checkpoints_v2(session_id: Optional[str] = None, keep_turns: int = 20):
+    """
+    V2: Poda checkpoints antigos (mantém os últimos `keep_turns` turnos e uma âncora por dia de jogo).
+    Sem `session_id`, aplica a todas as sessões.
+    """
+    policy = CheckpointRetentionPolicy(keep_turns=keep_turns)
+    result = await prune_checkpoints(session_id, policy)
+    if not result.get("success"):
+        raise HTTPException(status_code=500, detail=f"Prune error: {result.get('error')}")
+    return result
+
+
 @app.post("/game/turn/stream")
 async def game_turn_stream(
     player_id: int, 
@@ -869,24 +1179,44 @@ async def game_turn_stream(
 
 
 # --- NPC Endpoints ---
+def _npc_list_entry(npc) -> dict:
+    return {
+        "id": npc.id,
+        "name": npc.name,
+        "rank": npc.rank,
+        "current_hp": npc.current_hp,
+        "max_hp": npc.max_hp,
+        "current_location": npc.current_location,
+        "emotional_state": npc.emotional_state,
+        "personality_traits": npc.personality_traits,
+    }
+
 @app.get("/npc/list/all")
-async def list_all_npcs(session: AsyncSession = Depends(get_session)):
-    """Retorna todos os NPCs do banco de dados."""
+async def list_all_npcs(
+    response: Response,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    stream: bool = False,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Retorna os NPCs do banco de dados, paginados por id (keyset).
+    
+    - `limit`: tamanho da página; sem ele retorna todos
+    - `cursor`: id do último NPC da página anterior (header X-Next-Cursor)
+    - `stream=true`: retorna todos como NDJSON via cursor server-side
+    """
+    if stream:
+        return ndjson_response(
+            lambda s: NpcRepository(s).stream_all(after_id=cursor),
+            _npc_list_entry,
+        )
+    
     npc_repo = NpcRepository(session)
-    npcs = await npc_repo.get_all()
-    return [
-        {
-            "id": npc.id,
-            "name": npc.name,
-            "rank": npc.rank,
-            "current_hp": npc.current_hp,
-            "max_hp": npc.max_hp,
-            "current_location": npc.current_location,
-            "emotional_state": npc.emotional_state,
-            "personality_traits": npc.personality_traits,
-        }
-        for npc in npcs
-    ]
+    npcs, next_cursor = await npc_repo.get_page(after_id=cursor, limit=limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return [_npc_list_entry(npc) for npc in npcs]
 
 @app.post("/npc/{npc_id}/observe")
 async def observe_npc(
@@ -912,6 +1242,15 @@ async def add_npc_memory(
     mem = await repo.add_memory(npc_id=npc_id, content=content, embedding_dim=128)
     return {"id": mem.id, "npc_id": mem.npc_id, "content": mem.content}
 
+@app.post("/npc/{npc_id}/memories/consolidate")
+async def consolidate_npc_memories(
+    npc_id: int,
+    session: AsyncSession = Depends(get_session),
+):
+    """Força a consolidação das memórias episódicas antigas de um NPC."""
+    report = await memory_consolidator.consolidate(session, npc_id, force=True)
+    return report.to_dict()
+
 @app.get("/npc/{npc_id}/memories")
 async def search_npc_memories(
     npc_id: int,
@@ -985,32 +1324,36 @@ async def simulation_tick(session: AsyncSession = Depends(get_session)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/world/time")
-async def get_world_time():
+async def get_world_time(request: Request):
     """
     Retorna o tempo atual do mundo (Chronos)
     """
     from app.core.chronos import world_clock
-    dt = world_clock.get_current_datetime()
-    time_of_day = world_clock.get_time_of_day()
-    season = world_clock.get_season()
     
-    return {
-        "datetime": dt.isoformat(),  # Adicionado para compatibilidade com testes
-        "day": dt.day,
-        "month": dt.month,
-        "year": dt.year,
-        "hour": dt.hour,
-        "minute": dt.minute,
-        "time_of_day": time_of_day,
-        "season": season,
-        "timestamp": dt.isoformat()
-    }
+    async def build():
+        dt = world_clock.get_current_datetime()
+        time_of_day = world_clock.get_time_of_day()
+        season = world_clock.get_season()
+        
+        return {
+            "datetime": dt.isoformat(),  # Adicionado para compatibilidade com testes
+            "day": dt.day,
+            "month": dt.month,
+            "year": dt.year,
+            "hour": dt.hour,
+            "minute": dt.minute,
+            "time_of_day": time_of_day,
+            "season": season,
+            "timestamp": dt.isoformat()
+        }
+    
+    return await response_cache.respond(request, "world/time", build, scopes=("clock",))
 
 
 @app.get("/world/factions")
-async def get_world_factions(session: AsyncSession = Depends(get_session)):
+async def get_world_factions(request: Request, session: AsyncSession = Depends(get_session)):
     """Retorna todas as facções do mundo."""
-    try:
+    async def build():
         from app.database.repositories.faction_repo import FactionRepository
         faction_repo = FactionRepository(session)
         factions = await faction_repo.get_all()
@@ -1025,6 +1368,9 @@ async def get_world_factions(session: AsyncSession = Depends(get_session)):
             }
             for f in factions
         ]
+    
+    try:
+        return await response_cache.respond(request, "world/factions", build)
     except Exception as e:
         print(f"[ERROR] /world/factions: {e}")
         # Retorna lista vazia se não há facções ou erro
@@ -1032,9 +1378,9 @@ async def get_world_factions(session: AsyncSession = Depends(get_session)):
 
 
 @app.get("/world/economy")
-async def get_world_economy(session: AsyncSession = Depends(get_session)):
+async def get_world_economy(request: Request, session: AsyncSession = Depends(get_session)):
     """Retorna estado da economia global."""
-    try:
+    async def build():
         from app.database.repositories.economy_repo import GlobalEconomyRepository
         repo = GlobalEconomyRepository(session)
         economy = await repo.get_latest()
@@ -1046,15 +1392,18 @@ async def get_world_economy(session: AsyncSession = Depends(get_session)):
             "supply": economy.supply,
             "demand": economy.demand
         }
+    
+    try:
+        return await response_cache.respond(request, "world/economy", build)
     except Exception as e:
         print(f"[ERROR] /world/economy: {e}")
         return {"prices": {}, "trends": {}, "supply": {}, "demand": {}}
 
 
 @app.get("/locations/all")
-async def get_all_locations():
+async def get_all_locations(request: Request):
     """Retorna todas as locations dinâmicas registradas."""
-    try:
+    async def build():
         from app.core.location_manager import location_manager
         locations = location_manager.get_all_locations()
         return [
@@ -1068,6 +1417,9 @@ async def get_all_locations():
             }
             for loc in locations
         ]
+    
+    try:
+        return await response_cache.respond(request, "locations/all", build)
     except Exception as e:
         print(f"[ERROR] /locations/all: {e}")
         return []
@@ -1611,40 +1963,51 @@ async def get_active_quests(player_id: int):
         "count": len(active_quests)
     }
 
+def _game_log_entry(log: GameLog) -> dict:
+    return {
+        "turn_number": log.turn_number,
+        "player_input": log.player_input,
+        "scene_description": log.scene_description,
+        "action_result": log.action_result,
+        "location": log.location,
+        "npcs_present": log.npcs_present,
+        "world_time": log.world_time,
+        "created_at": log.created_at.isoformat() if log.created_at else None
+    }
+
 @app.get("/game/log/{player_id}")
-async def get_game_log(player_id: int, limit: int = 10):
-    """Retorna o histórico de turnos do jogador."""
+async def get_game_log(
+    player_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    stream: bool = False
+):
+    """
+    Retorna o histórico de turnos do jogador (mais recente primeiro).
+    
+    - `cursor`: valor de `next_cursor` da página anterior (keyset em turn_number, id)
+    - `stream=true`: retorna o histórico inteiro como NDJSON via cursor server-side
+    """
+    _validate_log_cursor(cursor)
+    if stream:
+        return ndjson_response(
+            lambda s: GameLogRepository(s).stream_turns(player_id, cursor=cursor),
+            _game_log_entry,
+        )
+    
     try:
         async with AsyncSession(engine) as session:
-            from sqlmodel import select
-            from app.database.models import GameLog
-            
-            statement = select(GameLog).where(
-                GameLog.player_id == player_id
-            ).order_by(GameLog.turn_number.desc()).limit(limit)
-            
-            results = await session.execute(statement)
-            logs = results.scalars().all()
+            gamelog_repo = GameLogRepository(session)
+            logs, next_cursor = await gamelog_repo.get_turns_page(player_id, cursor=cursor, limit=limit)
             
             return {
-                "logs": [
-                    {
-                        "turn_number": log.turn_number,
-                        "player_input": log.player_input,
-                        "scene_description": log.scene_description,
-                        "action_result": log.action_result,
-                        "location": log.location,
-                        "npcs_present": log.npcs_present,
-                        "world_time": log.world_time,
-                        "created_at": log.created_at.isoformat() if log.created_at else None
-                    }
-                    for log in logs
-                ],
-                "count": len(logs)
+                "logs": [_game_log_entry(log) for log in logs],
+                "count": len(logs),
+                "next_cursor": next_cursor
             }
     except Exception as e:
         print(f"[GAME LOG] Erro ao buscar histórico: {e}")
-        return {"logs": [], "count": 0}
+        return {"logs": [], "count": 0, "next_cursor": None}
 
 @app.post("/quest/complete")
 async def complete_quest(
@@ -1710,36 +2073,43 @@ class CreateWorldEventRequest(BaseModel):
     investigation_difficulty: int = 5
     clues: List[str] = []
 
+def _public_event_entry(e) -> dict:
+    # Apenas informação pública
+    return {
+        "id": e.id,
+        "type": e.event_type,
+        "public_description": e.public_description,
+        "location": e.location_affected,
+        "author_alias": e.author_alias,
+        "difficulty": e.investigation_difficulty,
+        "turn_occurred": e.turn_occurred
+    }
+
 @app.get("/world/events")
 async def get_world_events(
     location: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
+    stream: bool = False,
     session: AsyncSession = Depends(get_async_session)
 ):
     """
-    Retorna eventos globais ativos.
+    Retorna eventos globais ativos, paginados por id (keyset).
     Se location for passado, retorna só eventos daquele local.
+    Com `stream=true`, retorna todos como NDJSON via cursor server-side.
     """
-    event_repo = WorldEventRepository(session)
+    if stream:
+        return ndjson_response(
+            lambda s: WorldEventRepository(s).stream_active_events(location=location, after_id=cursor),
+            _public_event_entry,
+        )
     
-    if location:
-        events = await event_repo.get_events_for_location(location)
-    else:
-        events = await event_repo.get_active_events()
+    event_repo = WorldEventRepository(session)
+    events, next_cursor = await event_repo.get_active_events_page(location=location, after_id=cursor, limit=limit)
     
-    # Retornar apenas informação pública
     return {
-        "events": [
-            {
-                "id": e.id,
-                "type": e.event_type,
-                "public_description": e.public_description,
-                "location": e.location_affected,
-                "author_alias": e.author_alias,
-                "difficulty": e.investigation_difficulty,
-                "turn_occurred": e.turn_occurred
-            }
-            for e in events
-        ]
+        "events": [_public_event_entry(e) for e in events],
+        "next_cursor": next_cursor
     }
 
 @app.post("/world/investigate")
@@ -1826,7 +2196,7 @@ async def get_events_caused_by_player(
 # =====================================================
 
 @app.get("/economy/report")
-async def get_economy_report(session: AsyncSession = Depends(get_async_session)):
+async def get_economy_report(request: Request, session: AsyncSession = Depends(get_async_session)):
     """
     Retorna relatório completo da economia mundial.
     Mostra preços atuais, tendências e recursos.
@@ -1834,18 +2204,21 @@ async def get_economy_report(session: AsyncSession = Depends(get_async_session))
     from app.database.repositories.economy_repo import GlobalEconomyRepository
     from app.core.simulation.economy import EconomySimulator
     
-    economy_repo = GlobalEconomyRepository(session)
-    economy_sim = EconomySimulator(economy_repo=economy_repo)
-    
-    report = await economy_sim.get_market_report()
+    async def build():
+        economy_repo = GlobalEconomyRepository(session)
+        economy_sim = EconomySimulator(economy_repo=economy_repo)
+        
+        report = await economy_sim.get_market_report()
+        
+        return {
+            "status": "ok",
+            "trending_up": report.get("trending_up", []),
+            "trending_down": report.get("trending_down", []),
+            "stable": report.get("stable", []),
+            "prices": report.get("prices", {})
+        }
     
-    return {
-        "status": "ok",
-        "trending_up": report.get("trending_up", []),
-        "trending_down": report.get("trending_down", []),
-        "stable": report.get("stable", []),
-        "prices": report.get("prices", {})
-    }
+    return await response_cache.respond(request, "economy/report", build)
 
 
 @app.get("/economy/price/{resource_name}")
@@ -1908,28 +2281,31 @@ async def initialize_economy(session: AsyncSession = Depends(get_async_session))
 # =====================================================
 
 @app.get("/factions")
-async def get_all_factions(session: AsyncSession = Depends(get_async_session)):
+async def get_all_factions(request: Request, session: AsyncSession = Depends(get_async_session)):
     """
     Retorna todas as facções do jogo.
     """
     from app.database.repositories.faction_repo import FactionRepository
     
-    faction_repo = FactionRepository(session)
-    factions = await faction_repo.get_all()
+    async def build():
+        faction_repo = FactionRepository(session)
+        factions = await faction_repo.get_all()
+        
+        return {
+            "status": "ok",
+            "factions": [
+                {
+                    "id": f.id,
+                    "name": f.name,
+                    "power_level": f.power_level,
+                    "resources": f.resources,
+                    "relations": f.relations
+                }
+                for f in factions
+            ]
+        }
     
-    return {
-        "status": "ok",
-        "factions": [
-            {
-                "id": f.id,
-                "name": f.name,
-                "power_level": f.power_level,
-                "resources": f.resources,
-                "relations": f.relations
-            }
-            for f in factions
-        ]
-    }
+    return await response_cache.respond(request, "factions", build)
 
 
 @app.get("/factions/{faction_name}")
@@ -2005,23 +2381,26 @@ async def get_territory_owner(
 # =====================================================
 
 @app.get("/ecology/report")
-async def get_ecology_report():
+async def get_ecology_report(request: Request):
     """
     Retorna relatório de ecologia (populações de monstros).
     """
     from app.core.simulation.ecology import EcologySimulator
     
-    ecology_sim = EcologySimulator()
-    report = ecology_sim.get_ecology_report()
+    async def build():
+        ecology_sim = EcologySimulator()
+        report = ecology_sim.get_ecology_report()
+        
+        return {
+            "status": "ok",
+            "total_monsters": report["total_monsters"],
+            "most_populated": report["most_populated"],
+            "least_populated": report["least_populated"],
+            "high_pressure_regions": report["high_pressure_regions"],
+            "regions": report["regions"]
+        }
     
-    return {
-        "status": "ok",
-        "total_monsters": report["total_monsters"],
-        "most_populated": report["most_populated"],
-        "least_populated": report["least_populated"],
-        "high_pressure_regions": report["high_pressure_regions"],
-        "regions": report["regions"]
-    }
+    return await response_cache.respond(request, "ecology/report", build)
 
 
 @app.get("/ecology/encounter/{location}")
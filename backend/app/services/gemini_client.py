@@ -1,12 +1,41 @@
 from google import genai
+from google.genai import types as genai_types
 from app.config import settings
-import json
+from app.services.json_repair import parse_json
+from app.services.llm_cache import LLMResponseCache
+from collections import Counter
+from dataclasses import dataclass, field
 from typing import Literal, AsyncIterator
 
 
 GeminiTask = Literal["story", "combat", "fast", "default"]
 
 
+@dataclass
+class JsonTaskStats:
+    """Métricas de generate_json por tarefa (parse direto, reparos, falhas)."""
+    calls: int = 0
+    schema_calls: int = 0
+    clean: int = 0
+    repaired: int = 0
+    failures: int = 0
+    retries_avoided: int = 0
+    repairs: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> dict:
+        parsed = self.clean + self.repaired
+        return {
+            "calls": self.calls,
+            "schema_calls": self.schema_calls,
+            "clean": self.clean,
+            "repaired": self.repaired,
+            "failures": self.failures,
+            "parse_rate": round(parsed / (parsed + self.failures), 3) if parsed + self.failures else 0.0,
+            "retries_avoided": self.retries_avoided,
+            "repairs": dict(self.repairs),
+        }
+
+
 class GeminiClient:
     def __init__(self):
         self._ai_enabled = bool(settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != "YOUR_GEMINI_API_KEY")
@@ -29,6 +58,19 @@ class GeminiClient:
             "fast": getattr(settings, "GEMINI_MODEL_FAST", None) or self.model_name,
         }
 
+        # Cache de respostas: só chamadas com `cache_task` (ver DEFAULT_TASK_TTLS) são cacheadas
+        self.cache: LLMResponseCache | None = None
+        if getattr(settings, "LLM_CACHE_ENABLED", True):
+            self.cache = LLMResponseCache(
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                semantic_enabled=settings.LLM_CACHE_SEMANTIC,
+                semantic_threshold=settings.LLM_CACHE_SEMANTIC_THRESHOLD,
+            )
+
+        # Structured output (JSON mode + response_schema) e métricas de parse por tarefa
+        self.structured_output = getattr(settings, "GEMINI_STRUCTURED_OUTPUT", True)
+        self.json_stats: dict[str, JsonTaskStats] = {}
+
     def _resolve_model(self, model: str | None = None, task: GeminiTask | None = None) -> str:
         if model:
             return model
@@ -36,6 +78,34 @@ class GeminiClient:
             return self._task_models[task]
         return self.model_name
 
+    @staticmethod
+    def _usage_tokens(resp) -> int | None:
+        """Total de tokens informado pelo SDK (se disponível)."""
+        usage = getattr(resp, "usage_metadata", None)
+        total = getattr(usage, "total_token_count", None) if usage is not None else None
+        return total if isinstance(total, int) else None
+
+    def get_cache_stats(self) -> dict:
+        """Hit rate e tokens economizados pelo cache de respostas."""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
+
+    def get_json_stats(self) -> dict:
+        """Parse de JSON por tarefa: respostas limpas, reparadas, falhas e retries evitados."""
+        return {
+            "structured_output": self.structured_output,
+            "tasks": {task: stats.as_dict() for task, stats in self.json_stats.items()},
+        }
+
+    def _json_config(self, schema: dict | None):
+        """Config do SDK para saída JSON (response_schema restringe a decodificação)."""
+        if not self.structured_output:
+            return None
+        if schema is not None:
+            return genai_types.GenerateContentConfig(response_mime_type="application/json", response_schema=schema)
+        return genai_types.GenerateContentConfig(response_mime_type="application/json")
+
     def list_models(self) -> list[dict]:
         """Retorna os modelos disponíveis com seus métodos suportados."""
         models = []
@@ -51,8 +121,20 @@ class GeminiClient:
             print(f"Failed to list Gemini models: {e}")
         return models
 
-    def generate_text(self, prompt: str, *, model: str | None = None, task: GeminiTask | None = None) -> str:
-        """Gera texto a partir de um prompt usando o modelo Gemini (SDK google.genai)."""
+    def generate_text(
+        self,
+        prompt: str,
+        *,
+        model: str | None = None,
+        task: GeminiTask | None = None,
+        cache_task: str | None = None
+    ) -> str:
+        """
+        Gera texto a partir de um prompt usando o modelo Gemini (SDK google.genai).
+
+        `cache_task` (ex: "npc_description", "rumor") habilita o cache de respostas
+        com o TTL daquela tarefa. Sem ele a chamada nunca é cacheada.
+        """
         try:
             if self.client is None:
                 # Modo offline para testes locais
@@ -60,12 +142,19 @@ class GeminiClient:
                     return "(AI desativada) Você observa o ambiente, o vento corta as árvores e a floresta parece prender a respiração."
                 return "(AI desativada)"
             resolved_model = self._resolve_model(model=model, task=task)
+            if self.cache is not None and cache_task:
+                found, cached = self.cache.get(prompt, resolved_model, cache_task)
+                if found:
+                    return cached
             resp = self.client.models.generate_content(
                 model=resolved_model,
                 contents=prompt,
             )
             # Resposta do SDK já expõe .text
-            return getattr(resp, "text", "")
+            text = getattr(resp, "text", "")
+            if self.cache is not None and cache_task and text:
+                self.cache.put(prompt, resolved_model, cache_task, text, tokens=self._usage_tokens(resp))
+            return text
         except Exception as e:
             msg = str(e)
             print(f"An error occurred with the Gemini API: {e}")
@@ -85,7 +174,8 @@ class GeminiClient:
         prompt: str, 
         *, 
         model_type: str = "default",
-        model: str | None = None
+        model: str | None = None,
+        cache_task: str | None = None
     ) -> str:
         """
         Versão assíncrona de generate_text.
@@ -95,6 +185,7 @@ class GeminiClient:
             prompt: O texto do prompt
             model_type: "flash" para rápido, "story" para narrativa, "default" para padrão
             model: Nome específico do modelo (opcional)
+            cache_task: Tarefa para o cache de respostas (opcional)
         """
         import asyncio
         
@@ -112,7 +203,7 @@ class GeminiClient:
         loop = asyncio.get_event_loop()
         result = await loop.run_in_executor(
             None,  # Usa o executor padrão
-            lambda: self.generate_text(prompt, model=model, task=task)
+            lambda: self.generate_text(prompt, model=model, task=task, cache_task=cache_task)
         )
         return result
 
@@ -168,8 +259,41 @@ class GeminiClient:
             else:
                 yield "(IA instável) O mundo parece distorcido por um instante..."
 
-    def generate_json(self, prompt: str, *, model: str | None = None, task: GeminiTask | None = None) -> dict:
-        """Gera uma resposta em formato JSON; tenta parsear o texto retornado."""
+    @staticmethod
+    def _has_required_keys(result, schema: dict | None) -> bool:
+        """True se `result` tem todas as chaves `required` do schema (sem schema: False)."""
+        if not schema or not isinstance(result, dict):
+            return False
+        return all(key in result for key in schema.get("required", []))
+
+    def generate_json(
+        self,
+        prompt: str,
+        *,
+        model: str | None = None,
+        task: GeminiTask | None = None,
+        cache_task: str | None = None,
+        schema: dict | None = None,
+        metrics_task: str | None = None,
+        allow_truncated: bool = False
+    ) -> dict:
+        """
+        Gera uma resposta em formato JSON; tenta parsear o texto retornado.
+
+        `cache_task` (ex: "beast", "quest", "skill") habilita o cache de respostas.
+        Respostas com erro nunca são cacheadas.
+
+        Com GEMINI_STRUCTURED_OUTPUT o SDK devolve JSON (response_mime_type) e,
+        com `schema` (ver json_repair.schema_from_dataclass), restrito ao schema.
+        Saída malformada ou truncada passa pelo reparo local (json_repair)
+        antes de virar erro. `metrics_task` agrupa as métricas de parse
+        (padrão: cache_task ou task).
+
+        Saída truncada só é aceita com `allow_truncated` ou quando traz todas
+        as chaves `required` do `schema`; caso contrário vira {"error": ...}.
+        Resultados truncados nunca são cacheados.
+        """
+        stats = self.json_stats.setdefault(metrics_task or cache_task or task or "default", JsonTaskStats())
         try:
             if self.client is None:
                 # Modo offline para testes locais
@@ -178,17 +302,44 @@ class GeminiClient:
                 return {"error": "AI disabled"}
             json_prompt = f"{prompt}\n\nResponda apenas com um único objeto JSON válido, sem explicações."
             resolved_model = self._resolve_model(model=model, task=task)
+            if self.cache is not None and cache_task:
+                found, cached = self.cache.get(json_prompt, resolved_model, cache_task)
+                if found:
+                    return cached
+            config = self._json_config(schema)
+            stats.calls += 1
+            stats.schema_calls += bool(config is not None and schema is not None)
             resp = self.client.models.generate_content(
                 model=resolved_model,
                 contents=json_prompt,
+                config=config,
             )
-            text = getattr(resp, "text", "").strip()
-            cleaned = text.replace("```json", "").replace("```", "").strip()
-            return json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            print(f"Failed to decode JSON from Gemini response: {e}")
-            print(f"Raw response was: {text if 'text' in locals() else ''}")
-            return {"error": "Failed to parse JSON response."}
+            text = getattr(resp, "text", "") or ""
+            try:
+                result, repairs = parse_json(text)
+            except ValueError as e:
+                stats.failures += 1
+                print(f"Failed to decode JSON from Gemini response: {e}")
+                print(f"Raw response was: {text}")
+                return {"error": "Failed to parse JSON response."}
+            truncated = "truncated" in repairs
+            if truncated and not (allow_truncated or self._has_required_keys(result, schema)):
+                # Objeto parcial: chamadores indexam as chaves direto (ex: Architect)
+                stats.failures += 1
+                print(f"[GEMINI JSON] Resposta truncada descartada: {text[-80:]!r}")
+                return {"error": "Truncated JSON response."}
+            if repairs:
+                stats.repaired += 1
+                stats.repairs.update(repairs)
+                # Cercas de markdown o parse antigo já tirava; o resto teria virado erro
+                if set(repairs) - {"fence"}:
+                    stats.retries_avoided += 1
+                print(f"[GEMINI JSON] Resposta reparada ({', '.join(repairs)})")
+            else:
+                stats.clean += 1
+            if self.cache is not None and cache_task and not truncated and isinstance(result, dict) and "error" not in result:
+                self.cache.put(json_prompt, resolved_model, cache_task, result, tokens=self._usage_tokens(resp))
+            return result
         except Exception as e:
             msg = str(e)
             print(f"An error occurred with the Gemini API: {e}")
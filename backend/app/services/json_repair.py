@@ -0,0 +1,325 @@
+"""
+JSON Repair - Parse tolerante das respostas JSON do LLM.
+
+`generate_json` fazia só `json.loads` depois de tirar as cercas de markdown:
+qualquer desvio (texto antes do objeto, vírgula sobrando, resposta cortada
+pelo limite de tokens) virava {"error": ...}, e o planner caía na heurística
+ou o validator pedia outra rodada ao LLM.
+
+`parse_json` tenta, em ordem:
+1. json.loads direto (caminho normal com structured output)
+2. Primeiro valor JSON do texto (cercas ```json, prosa antes/depois)
+3. Parser incremental que repara: aspas simples, chaves sem aspas,
+   True/False/None, vírgulas sobrando, comentários, quebras de linha
+   cruas em strings e saída truncada (fecha os containers abertos e
+   descarta o último membro incompleto)
+
+O reparo de truncamento anota "truncated": generate_json só aceita esse
+resultado com opt-in do chamador ou schema completo, e nunca o cacheia.
+
+`schema_from_dataclass` gera o response_schema (subconjunto OpenAPI aceito
+pelo SDK do Gemini) a partir de um dataclass como PlannedAction.
+"""
+
+import dataclasses
+import json
+import re
+import typing
+from enum import Enum
+from typing import Any, Dict, List, Tuple
+
+
+_FENCE = re.compile(r"```[a-zA-Z]*\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_KEY = re.compile(r"[A-Za-z_$][\w$-]*")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+
+
+class _Truncated(Exception):
+    """O texto acabou no meio de um token que não dá para aproveitar."""
+
+
+class _RepairParser:
+    """Parser recursivo que aceita JSON malformado e anota cada reparo feito."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.repairs: List[str] = []
+
+    def _note(self, repair: str) -> None:
+        if repair not in self.repairs:
+            self.repairs.append(repair)
+
+    def _eof(self) -> bool:
+        return self.pos >= len(self.text)
+
+    def _skip(self) -> None:
+        """Pula espaços e comentários (// e /* */)."""
+        text = self.text
+        while self.pos < len(text):
+            if text[self.pos].isspace():
+                self.pos += 1
+            elif text.startswith("//", self.pos):
+                end = text.find("\n", self.pos)
+                self.pos = len(text) if end < 0 else end + 1
+                self._note("comment")
+            elif text.startswith("/*", self.pos):
+                end = text.find("*/", self.pos + 2)
+                self.pos = len(text) if end < 0 else end + 2
+                self._note("comment")
+            else:
+                break
+
+    def value(self) -> Any:
+        self._skip()
+        if self._eof():
+            raise _Truncated()
+        char = self.text[self.pos]
+        if char == "{":
+            return self._object()
+        if char == "[":
+            return self._array()
+        if char in "\"'":
+            return self._string()
+        if char == "-" or char.isdigit():
+            return self._number()
+        return self._bare_word()
+
+    def _object(self) -> Dict[str, Any]:
+        self.pos += 1
+        result: Dict[str, Any] = {}
+        while True:
+            self._skip()
+            if self._eof():
+                self._note("truncated")
+                return result
+            char = self.text[self.pos]
+            if char == "}":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1
+                self._skip()
+                if not self._eof() and self.text[self.pos] == "}":
+                    self._note("trailing_comma")
+                continue
+            if char == "]":
+                # Fechamento trocado: trata como fim do objeto
+                self._note("mismatched_bracket")
+                self.pos += 1
+                return result
+
+            try:
+                if char in "\"'":
+                    key = self._string()
+                else:
+                    key = self._bare_key()
+                self._skip()
+                if self._eof():
+                    raise _Truncated()
+                if self.text[self.pos] == ":":
+                    self.pos += 1
+                else:
+                    self._note("missing_colon")
+                result[key] = self.value()
+            except _Truncated:
+                # Membro incompleto no fim do texto: descartado
+                self._note("truncated")
+                return result
+
+    def _array(self) -> List[Any]:
+        self.pos += 1
+        result: List[Any] = []
+        while True:
+            self._skip()
+            if self._eof():
+                self._note("truncated")
+                return result
+            char = self.text[self.pos]
+            if char == "]":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1
+                self._skip()
+                if not self._eof() and self.text[self.pos] == "]":
+                    self._note("trailing_comma")
+                continue
+            if char == "}":
+                self._note("mismatched_bracket")
+                self.pos += 1
+                return result
+            try:
+                result.append(self.value())
+            except _Truncated:
+                self._note("truncated")
+                return result
+
+    def _string(self) -> str:
+        quote = self.text[self.pos]
+        if quote == "'":
+            self._note("single_quotes")
+        self.pos += 1
+        chars = []
+        text = self.text
+        while self.pos < len(text):
+            char = text[self.pos]
+            if char == quote:
+                self.pos += 1
+                return "".join(chars)
+            if char == "\\":
+                if self.pos + 1 >= len(text):
+                    break
+                escape = text[self.pos + 1]
+                if escape == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", text[self.pos + 2:self.pos + 6]):
+                    chars.append(chr(int(text[self.pos + 2:self.pos + 6], 16)))
+                    self.pos += 6
+                    continue
+                chars.append({"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}.get(escape, escape))
+                self.pos += 2
+                continue
+            if char in "\n\r":
+                self._note("raw_newline")
+            chars.append(char)
+            self.pos += 1
+        # String aberta no fim do texto: conteúdo parcial não é confiável
+        raise _Truncated()
+
+    def _number(self) -> Any:
+        match = _NUMBER.match(self.text, self.pos)
+        if not match:
+            # Só o sinal no fim do texto
+            if self.pos + 1 >= len(self.text):
+                raise _Truncated()
+            return self._bare_word()
+        self.pos = match.end()
+        rest = self.text[self.pos:]
+        if rest and not rest.strip(".eE+-"):
+            # Número cortado no meio ("0." / "1e"): fica a parte válida
+            self.pos = len(self.text)
+            self._note("truncated")
+        number = match.group()
+        return float(number) if any(c in number for c in ".eE") else int(number)
+
+    def _bare_key(self) -> str:
+        match = _KEY.match(self.text, self.pos)
+        if not match:
+            raise ValueError(f"Caractere inesperado {self.text[self.pos]!r} na posição {self.pos}")
+        self._note("unquoted_key")
+        self.pos = match.end()
+        if self._eof():
+            raise _Truncated()
+        return match.group()
+
+    def _bare_word(self) -> Any:
+        """Literais (true/True/None...) ou texto sem aspas até o próximo delimitador."""
+        end = self.pos
+        text = self.text
+        while end < len(text) and text[end] not in ",}]\n":
+            end += 1
+        word = text[self.pos:end].strip()
+        if end >= len(text):
+            # Literal possivelmente cortado ("tru"): só vale se estiver completo
+            if word not in _LITERALS:
+                raise _Truncated()
+        self.pos = end
+        if word in _LITERALS:
+            if word not in ("true", "false", "null"):
+                self._note("python_literal")
+            return _LITERALS[word]
+        self._note("unquoted_value")
+        return word
+
+
+def _first_value_start(text: str) -> int:
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    return min(starts) if starts else -1
+
+
+def parse_json(text: str) -> Tuple[Any, List[str]]:
+    """
+    Parseia a resposta do LLM, reparando o que for possível.
+
+    Returns:
+        (valor, reparos aplicados); lista vazia = JSON válido de primeira
+
+    Raises:
+        ValueError: nenhum objeto/array recuperável no texto
+    """
+    stripped = text.strip()
+    try:
+        return json.loads(stripped), []
+    except json.JSONDecodeError:
+        pass
+
+    repairs: List[str] = []
+    fence = _FENCE.search(stripped)
+    if fence:
+        stripped = fence.group(1).strip()
+        repairs.append("fence")
+
+    start = _first_value_start(stripped)
+    if start < 0:
+        raise ValueError("Nenhum objeto JSON na resposta")
+    if start > 0:
+        repairs.append("extracted")
+
+    try:
+        value, _ = json.JSONDecoder().raw_decode(stripped, start)
+        return value, repairs
+    except json.JSONDecodeError:
+        pass
+
+    parser = _RepairParser(stripped)
+    parser.pos = start
+    try:
+        value = parser.value()
+    except _Truncated:
+        raise ValueError("Resposta JSON truncada antes do primeiro valor")
+    return value, repairs + parser.repairs
+
+
+# ==================== SCHEMA ====================
+
+_SCALAR_TYPES = {str: "STRING", int: "INTEGER", float: "NUMBER", bool: "BOOLEAN"}
+
+
+def _field_schema(annotation: Any) -> Dict[str, Any]:
+    nullable = False
+    if typing.get_origin(annotation) is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        nullable = len(args) < len(typing.get_args(annotation))
+        annotation = args[0]
+
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        schema = {"type": "STRING", "enum": [member.value for member in annotation]}
+    elif typing.get_origin(annotation) in (list, List):
+        (item,) = typing.get_args(annotation) or (str,)
+        schema = {"type": "ARRAY", "items": _field_schema(item)}
+    else:
+        schema = {"type": _SCALAR_TYPES.get(annotation, "STRING")}
+    if nullable:
+        schema["nullable"] = True
+    return schema
+
+
+def schema_from_dataclass(cls: type) -> Dict[str, Any]:
+    """
+    response_schema (OpenAPI, formato do SDK google-genai) de um dataclass:
+    Enum vira STRING com `enum`, Optional vira `nullable` e campos sem
+    default entram em `required`. A ordem dos campos é mantida.
+    """
+    hints = typing.get_type_hints(cls)
+    properties = {}
+    required = []
+    for field in dataclasses.fields(cls):
+        properties[field.name] = _field_schema(hints[field.name])
+        if field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING:
+            required.append(field.name)
+    return {
+        "type": "OBJECT",
+        "properties": properties,
+        "required": required,
+        "propertyOrdering": list(properties),
+    }
@@ -0,0 +1,285 @@
+"""
+LLM Response Cache - Cache de respostas do Gemini por prompt.
+
+Muitas chamadas ao LLM são repetíveis (descrição do mesmo NPC, besta do
+mesmo tier/bioma, templates de quest, rumores de eventos idênticos, skills
+de epifania). Este cache guarda a resposta indexada por
+hash(prompt normalizado) + modelo + cache_task, com TTL por tarefa e
+despejo LRU limitado por número de entradas e bytes.
+
+Opcionalmente, para tarefas não-narrativas, reaproveita respostas de
+prompts quase idênticos via similaridade de embeddings.
+"""
+
+import copy
+import hashlib
+import math
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# TTL (segundos) por tarefa de cache. Tarefas fora deste mapa não são cacheadas.
+DEFAULT_TASK_TTLS: Dict[str, float] = {
+    "npc_description": 6 * 3600,
+    "beast": 24 * 3600,
+    "quest": 3600,
+    "rumor": 1800,
+    "skill": 24 * 3600,
+    "memory_digest": 24 * 3600,
+}
+
+# Tarefas onde reaproveitar prompts "quase iguais" não quebra a narrativa
+SEMANTIC_TASKS = {"beast", "quest", "skill"}
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    cache_task: str
+    model: str
+    value: Any
+    expires_at: float
+    size_bytes: int
+    tokens: int
+    embedding: Optional[List[float]] = None
+    hits: int = 0
+
+
+@dataclass
+class TaskStats:
+    hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    saved_tokens: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.semantic_hits) / lookups, 3) if lookups else 0.0,
+            "saved_tokens": self.saved_tokens,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normaliza espaços para que variações de formatação não gerem chaves distintas."""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa grosseira (~4 caracteres por token) quando o SDK não informa o uso."""
+    return max(1, len(text) // 4)
+
+
+class LLMResponseCache:
+    """
+    Cache LRU thread-safe (as chamadas ao Gemini rodam em thread pool).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        max_bytes: int = 16 * 1024 * 1024,
+        task_ttls: Optional[Dict[str, float]] = None,
+        semantic_enabled: bool = False,
+        semantic_threshold: float = 0.97,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.task_ttls = dict(DEFAULT_TASK_TTLS if task_ttls is None else task_ttls)
+        self.semantic_enabled = semantic_enabled
+        self.semantic_threshold = semantic_threshold
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, TaskStats] = {}
+
+    # ==================== CHAVES ====================
+
+    @staticmethod
+    def make_key(prompt: str, model: str, cache_task: str) -> str:
+        digest = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+        return f"{cache_task}:{model}:{digest}"
+
+    def is_cacheable(self, cache_task: Optional[str]) -> bool:
+        return bool(cache_task) and cache_task in self.task_ttls
+
+    def _task_stats(self, cache_task: str) -> TaskStats:
+        return self._stats.setdefault(cache_task, TaskStats())
+
+    # ==================== LOOKUP ====================
+
+    def get(self, prompt: str, model: str, cache_task: str) -> Tuple[bool, Any]:
+        """
+        Busca uma resposta cacheada.
+
+        Returns:
+            (found, value) - value é uma cópia, pois os agentes mutam os dicts retornados.
+        """
+        if not self.is_cacheable(cache_task):
+            return False, None
+
+        key = self.make_key(prompt, model, cache_task)
+        now = time.monotonic()
+        with self._lock:
+            stats = self._task_stats(cache_task)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    entry.hits += 1
+                    stats.hits += 1
+                    stats.saved_tokens += entry.tokens
+                    return True, copy.deepcopy(entry.value)
+                self._remove(key)
+                stats.expirations += 1
+
+        if self.semantic_enabled and cache_task in SEMANTIC_TASKS:
+            entry = self._semantic_lookup(prompt, model, cache_task, now)
+            if entry is not None:
+                with self._lock:
+                    if entry.key in self._entries:
+                        self._entries.move_to_end(entry.key)
+                    entry.hits += 1
+                    stats.semantic_hits += 1
+                    stats.saved_tokens += entry.tokens
+                return True, copy.deepcopy(entry.value)
+
+        with self._lock:
+            stats.misses += 1
+        return False, None
+
+    def _semantic_lookup(self, prompt: str, model: str, cache_task: str, now: float) -> Optional[CacheEntry]:
+        with self._lock:
+            candidates = [
+                e for e in self._entries.values()
+                if e.cache_task == cache_task and e.model == model
+                and e.embedding is not None and e.expires_at > now
+            ]
+        # Sem candidatos não vale pagar o embedding do prompt
+        if not candidates:
+            return None
+
+        query = self._embed(prompt)
+        if query is None:
+            return None
+
+        best, best_score = None, self.semantic_threshold
+        for entry in candidates:
+            score = _cosine(query, entry.embedding)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    # ==================== ESCRITA ====================
+
+    def put(self, prompt: str, model: str, cache_task: str, value: Any, tokens: Optional[int] = None):
+        """Guarda uma resposta bem-sucedida."""
+        if not self.is_cacheable(cache_task):
+            return
+
+        key = self.make_key(prompt, model, cache_task)
+        size = _approx_size(value) + len(key)
+        if size > self.max_bytes:
+            return
+
+        embedding = None
+        if self.semantic_enabled and cache_task in SEMANTIC_TASKS:
+            embedding = self._embed(prompt)
+
+        entry = CacheEntry(
+            key=key,
+            cache_task=cache_task,
+            model=model,
+            value=copy.deepcopy(value),
+            expires_at=time.monotonic() + self.task_ttls[cache_task],
+            size_bytes=size,
+            tokens=tokens if tokens is not None else estimate_tokens(prompt + str(value)),
+            embedding=embedding,
+        )
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                old_key, old_entry = next(iter(self._entries.items()))
+                self._remove(old_key)
+                self._task_stats(old_entry.cache_task).evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size_bytes
+
+    def invalidate(self, cache_task: Optional[str] = None):
+        """Remove todas as entradas (ou apenas as de uma tarefa)."""
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if cache_task is None or e.cache_task == cache_task]
+            for key in keys:
+                self._remove(key)
+
+    # ==================== EMBEDDINGS ====================
+
+    @staticmethod
+    def _embed(prompt: str) -> Optional[List[float]]:
+        try:
+            from app.services.embedding_service import embedding_service
+            return embedding_service.generate_embedding(normalize_prompt(prompt))
+        except Exception as e:
+            print(f"[LLM CACHE] Falha ao gerar embedding: {e}")
+            return None
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tasks = {task: stats.as_dict() for task, stats in self._stats.items()}
+            total = TaskStats()
+            for stats in self._stats.values():
+                total.hits += stats.hits
+                total.semantic_hits += stats.semantic_hits
+                total.misses += stats.misses
+                total.saved_tokens += stats.saved_tokens
+                total.evictions += stats.evictions
+                total.expirations += stats.expirations
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "semantic_enabled": self.semantic_enabled,
+                "total": total.as_dict(),
+                "tasks": tasks,
+            }
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    if len(a) != len(b):
+        return 0.0
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _approx_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_approx_size(v) for v in value)
+    return sys.getsizeof(value)
@@ -0,0 +1,202 @@
+"""
+NPC Pool - Pré-geração de NPCs para o spawning do Architect.
+
+Cada chamada a `Architect.generate_enemy` / `generate_friendly_npc` /
+`generate_neutral_npc` é uma chamada bloqueante ao Gemini. Em vez de pagar
+esse custo durante o turno do jogador, mantemos um pool de NPCs já gerados,
+indexado por (location_type, tier, role, disposition) — hostis só por
+(location_type, tier), já que generate_enemy não recebe o papel — e
+reabastecido em background a partir dos perfis do NPCPopulationManager.
+
+No turno, o spawn retira do pool; só gera na hora quando o pool está vazio.
+"""
+
+import asyncio
+import copy
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from app.core.npc_population import HOSTILE_POOL_ROLE, npc_population_manager
+
+
+# (location_type, tier, role, disposition)
+PoolKey = Tuple[str, int, str, str]
+
+
+class NPCPool:
+    """
+    Pool de NPCs pré-gerados com reabastecimento assíncrono.
+    """
+
+    def __init__(self, target_size: int = 1, max_size: int = 3, max_concurrent_refills: int = 1):
+        self.target_size = target_size
+        self.max_size = max_size
+        # Limita só as chamadas ao Gemini em background; as escritas do Architect
+        # (bestiário/loot tables) já são serializadas pelo lock do content_store
+        self.max_concurrent_refills = max_concurrent_refills
+
+        self._pools: Dict[PoolKey, Deque[Dict[str, Any]]] = {}
+        self._pending: Dict[PoolKey, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.failures = 0
+
+    @staticmethod
+    def make_key(location_type: str, tier: int, role: str, disposition: str) -> PoolKey:
+        """
+        Monta a chave do pool.
+        O tier só influencia a geração de hostis; para os demais é normalizado para 0.
+        O papel só influencia os não-hostis (generate_enemy não o recebe).
+        """
+        if disposition == "hostile":
+            return (location_type, int(tier or 1), HOSTILE_POOL_ROLE, disposition)
+        return (location_type, 0, role, disposition)
+
+    # ==================== POOL ====================
+
+    def take(self, key: PoolKey) -> Optional[Dict[str, Any]]:
+        """Retira um NPC do pool (ou None em caso de miss)."""
+        pool = self._pools.get(key)
+        if pool:
+            self.hits += 1
+            return pool.popleft()
+        self.misses += 1
+        return None
+
+    def put(self, key: PoolKey, npc_data: Dict[str, Any]) -> bool:
+        """Adiciona um NPC gerado ao pool. Retorna False se o pool estiver cheio."""
+        pool = self._pools.setdefault(key, deque())
+        if len(pool) >= self.max_size:
+            return False
+        pool.append(npc_data)
+        return True
+
+    def size(self, key: PoolKey) -> int:
+        return len(self._pools.get(key, ()))
+
+    def clear(self):
+        """Limpa o pool e as métricas (útil para testes)."""
+        self._pools.clear()
+        self._pending.clear()
+        self.hits = self.misses = self.generated = self.failures = 0
+
+    # ==================== GERAÇÃO ====================
+
+    @staticmethod
+    def _generate_sync(architect, key: PoolKey, location: str) -> Dict[str, Any]:
+        """Chamada bloqueante ao Architect correspondente à chave."""
+        location_type, tier, role, disposition = key
+        if disposition == "hostile":
+            return architect.generate_enemy(tier=tier, biome=location_type)
+        if disposition == "friendly":
+            return architect.generate_friendly_npc(location, role)
+        return architect.generate_neutral_npc(location, role)
+
+    @staticmethod
+    def _retarget(npc_data: Dict[str, Any], location: str) -> Dict[str, Any]:
+        """Ajusta um NPC do pool (gerado para outro local do mesmo tipo) ao local do spawn."""
+        npc_data = copy.deepcopy(npc_data)
+        if "current_location" in npc_data:
+            npc_data["current_location"] = location
+        if "home_location" in npc_data:
+            npc_data["home_location"] = location
+        return npc_data
+
+    async def acquire(
+        self,
+        architect,
+        location: str,
+        tier: int,
+        disposition: str,
+        role: str
+    ) -> Dict[str, Any]:
+        """
+        Obtém um NPC para spawn: do pool se houver, senão gera na hora.
+        Em ambos os casos agenda o reabastecimento da chave.
+        """
+        profile = npc_population_manager.get_location_profile(location)
+        key = self.make_key(profile.location_type, tier, role, disposition)
+
+        npc_data = self.take(key)
+        if npc_data is not None:
+            self._schedule_refill(architect, key, location)
+            return self._retarget(npc_data, location)
+
+        # Miss: gera na hora sem passar pelo semáforo dos refills (o jogador não
+        # espera na fila das gerações em background agendadas por top_up_location)
+        loop = asyncio.get_running_loop()
+        npc_data = await loop.run_in_executor(None, lambda: self._generate_sync(architect, key, location))
+        self._schedule_refill(architect, key, location)
+        return npc_data
+
+    def top_up_location(self, architect, location: str, tier: int):
+        """
+        Agenda o reabastecimento de todas as chaves do perfil da localização.
+        Chamado após o spawn para que a próxima cena do mesmo tipo já encontre NPCs prontos.
+        """
+        for key in npc_population_manager.get_pool_keys(location, tier):
+            self._schedule_refill(architect, key, location)
+
+    def _schedule_refill(self, architect, key: PoolKey, location: str):
+        missing = self.target_size - self.size(key) - self._pending.get(key, 0)
+        if missing <= 0 or architect is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Sem event loop (ex: chamada síncrona): sem reabastecimento em background
+
+        for _ in range(missing):
+            self._pending[key] = self._pending.get(key, 0) + 1
+            task = loop.create_task(self._refill_one(architect, key, location))
+            # Mantém referência para o task não ser coletado antes de terminar
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_refills)
+        return self._semaphore
+
+    async def _refill_one(self, architect, key: PoolKey, location: str):
+        try:
+            async with self._get_semaphore():
+                loop = asyncio.get_running_loop()
+                npc_data = await loop.run_in_executor(None, lambda: self._generate_sync(architect, key, location))
+            if "error" in npc_data:
+                self.failures += 1
+                return
+            self.generated += 1
+            self.put(key, npc_data)
+        except Exception as e:
+            self.failures += 1
+            print(f"[NPC POOL] Erro ao reabastecer {key}: {e}")
+        finally:
+            self._pending[key] = max(0, self._pending.get(key, 0) - 1)
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 3) if requests else 0.0,
+            "generated": self.generated,
+            "failures": self.failures,
+            "pending": sum(self._pending.values()),
+            "pools": {
+                "|".join(str(part) for part in key): len(pool)
+                for key, pool in self._pools.items()
+                if pool
+            },
+        }
+
+
+# Instância global
+npc_pool = NPCPool()
@@ -0,0 +1,106 @@
+"""
+Response Cache - Cache versionado para endpoints de leitura do mundo.
+
+O frontend faz polling constante de facções, economia, ecologia, locais e
+tempo. Este cache guarda o JSON já serializado (bytes) de cada endpoint
+junto com a assinatura de `world_version` usada para gerá-lo. Enquanto a
+versão não muda, a resposta sai da memória sem consultar o banco nem
+re-serializar; com If-None-Match igual ao ETag atual responde 304 direto.
+
+Os contadores de `world_version` são locais ao processo (zeram no restart e
+diferem entre workers), então o ETag leva também um id de instância sorteado
+no boot: um ETag de outro processo nunca casa e a resposta sai completa.
+"""
+
+import hashlib
+import json
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.world_version import world_version
+
+
+@dataclass
+class CachedResponse:
+    signature: str
+    etag: str
+    body: bytes
+
+
+class VersionedResponseCache:
+    """
+    Cache de respostas JSON indexado por chave de endpoint e invalidado
+    pela versão do estado do mundo.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CachedResponse] = {}
+        self._lock = threading.Lock()
+        # Época do processo: separa ETags de restarts e de outros workers
+        self.instance_id = uuid.uuid4().hex[:8]
+        self.hits = 0
+        self.not_modified = 0
+        self.misses = 0
+
+    def _etag(self, key: str, signature: str) -> str:
+        # O ETag depende só da chave, da instância e da versão: o 304 não precisa gerar o corpo
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        return f'"{digest}-{self.instance_id}-{signature}"'
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        build: Callable[[], Awaitable[Any]],
+        scopes: Iterable[str] = ("world",),
+    ) -> Response:
+        """
+        Serve o endpoint `key` do cache ou chama `build()` para regenerá-lo.
+        Exceções de `build` não são cacheadas (propagam para o endpoint).
+        """
+        signature = world_version.signature(scopes)
+        etag = self._etag(key, signature)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.signature == signature:
+            self.hits += 1
+            return Response(content=entry.body, media_type="application/json", headers=headers)
+
+        self.misses += 1
+        payload = await build()
+        body = json.dumps(jsonable_encoder(payload), ensure_ascii=False).encode("utf-8")
+        # Se a versão mudou durante o build, a assinatura antiga força rebuild na próxima leitura
+        with self._lock:
+            self._entries[key] = CachedResponse(signature=signature, etag=etag, body=body)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.hits + self.not_modified + self.misses
+        return {
+            "instance_id": self.instance_id,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.not_modified) / requests, 3) if requests else 0.0,
+            "versions": world_version.to_dict(),
+        }
+
+
+# Instância global
+response_cache = VersionedResponseCache()
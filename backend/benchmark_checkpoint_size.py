@@ -0,0 +1,113 @@
+"""
+Benchmark: bytes de checkpoint por turno numa sessão de 1000 turnos.
+
+Compara o histórico acumulado com operator.add (comportamento antigo) com o
+reducer de janela deslizante `bounded_messages`, e estima o volume total
+gravado nas tabelas checkpoint_* com e sem a política de retenção.
+
+Não precisa de banco nem do Gemini: simula o estado que o GameGraph grava
+(mensagem do jogador + narração por turno) e serializa o canal `messages`
+como o PostgresSaver faria a cada passo do grafo.
+
+Uso:
+    python benchmark_checkpoint_size.py [--turns 1000]
+"""
+import argparse
+import json
+import operator
+import time
+
+from app.agents.nodes.state import bounded_messages
+
+# planner, executor, validator, narrator + input: passos que gravam checkpoint por turno
+CHECKPOINTS_PER_TURN = 5
+KEEP_TURNS = 20
+NARRATION = (
+    "A névoa espiritual se adensa sobre o vale enquanto o jovem cultivador "
+    "avança, o Qi circulando pelos meridianos com um zumbido quase audível. "
+) * 4
+
+
+try:
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+    _serde = JsonPlusSerializer()
+
+    def serialize(value) -> int:
+        return len(_serde.dumps_typed(value)[1])
+except ImportError:
+    def serialize(value) -> int:
+        return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def turn_messages(turn: int):
+    user = {
+        "role": "user",
+        "content": f"Eu medito na caverna e tento absorver o Qi do ambiente (turno {turn})",
+        "timestamp": "1000-01-01T00:00:00",
+        "metadata": {"turn": turn},
+    }
+    assistant = {
+        "role": "assistant",
+        "content": NARRATION,
+        "timestamp": "1000-01-01T00:00:00",
+        "metadata": {"turn": turn, "action_summary": "Meditação"},
+    }
+    return [user], [assistant]
+
+
+def run(reducer, turns: int):
+    messages = []
+    sizes = []
+    total_written = 0
+    retained = []
+    start = time.perf_counter()
+    for turn in range(1, turns + 1):
+        user, assistant = turn_messages(turn)
+        messages = reducer(messages, user)
+        messages = reducer(messages, assistant)
+        size = serialize(messages)
+        sizes.append(size)
+        total_written += size * CHECKPOINTS_PER_TURN
+        retained.append(size * CHECKPOINTS_PER_TURN)
+    elapsed = time.perf_counter() - start
+    return {
+        "sizes": sizes,
+        "total_written": total_written,
+        "retained_no_prune": sum(retained),
+        "retained_with_prune": sum(retained[-KEEP_TURNS:]),
+        "messages": len(messages),
+        "elapsed": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=1000)
+    args = parser.parse_args()
+
+    results = {
+        "operator.add": run(operator.add, args.turns),
+        "bounded_messages": run(bounded_messages, args.turns),
+    }
+
+    print("=" * 60)
+    print(f" CHECKPOINT BYTES POR TURNO ({args.turns} turnos)")
+    print("=" * 60)
+    marks = [t for t in (1, 10, 100, 250, 500, 1000) if t <= args.turns]
+    header = "turno".ljust(8) + "".join(name.rjust(20) for name in results)
+    print(header)
+    for t in marks:
+        print(str(t).ljust(8) + "".join(f"{r['sizes'][t - 1]:>20,}" for r in results.values()))
+
+    print()
+    for name, r in results.items():
+        print(f"[{name}]")
+        print(f"    mensagens no estado final: {r['messages']}")
+        print(f"    bytes gravados (total):    {r['total_written']:,}")
+        print(f"    retidos sem poda:          {r['retained_no_prune']:,}")
+        print(f"    retidos com poda ({KEEP_TURNS} t):  {r['retained_with_prune']:,}")
+        print(f"    tempo de serialização:     {r['elapsed'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Benchmark: precisão/recall do classificador local de intenção (fast path do Planner).
+
+Roda um conjunto rotulado de inputs de jogador (com a cena de cada um) pelo
+IntentClassifier e mede:
+- precisão e recall por intenção (sobre os casos aceitos pelo fast path)
+- cobertura (% de turnos que pulariam o LLM) x precisão, para vários limiares
+- latência média por classificação
+
+`expected=None` marca inputs que DEVEM ir para o LLM (ambíguos ou intenções
+que o executor não trata); aceitá-los conta como erro.
+
+Não precisa de banco nem do Gemini (sem o modelo de embeddings carregado o
+classificador usa só trigramas).
+
+Uso:
+    python benchmark_intent_classifier.py [--threshold 0.65] [--verbose]
+"""
+import argparse
+import time
+from collections import Counter
+
+from app.agents.nodes.intent_classifier import IntentClassifier
+
+LOBO = {"name": "Lobo Cinzento", "species": "wolf", "can_speak": False, "is_hostile": True}
+BANDIDO = {"name": "Bandido Zhao", "species": "human", "can_speak": True, "is_hostile": True}
+MERCADOR = {"name": "Mercador Li", "species": "human", "can_speak": True, "is_hostile": False}
+ANCIAO = {"name": "Ancião Wei", "species": "human", "can_speak": True, "is_hostile": False}
+
+FLORESTA = {"current_location": "Floresta Sombria", "npcs_in_scene": [LOBO],
+            "available_exits": ["Vila Pedra Branca", "Caverna do Eco"]}
+ESTRADA = {"current_location": "Estrada Velha", "npcs_in_scene": [BANDIDO, LOBO],
+           "available_exits": ["Vila Pedra Branca"]}
+VILA = {"current_location": "Vila Pedra Branca", "npcs_in_scene": [MERCADOR, ANCIAO],
+        "available_exits": ["Floresta Sombria", "Pico da Nuvem Azul"]}
+VAZIO = {"current_location": "Pico da Nuvem Azul", "npcs_in_scene": [],
+         "available_exits": ["Vila Pedra Branca"]}
+
+PLAYER = {
+    "name": "Jin",
+    # Formato real do inventário (director/main.py); "Espada de Ferro" vem do nome no ruleset
+    "inventory": [
+        {"item_id": "pilula_de_cura", "quantity": 2},
+        {"item_id": "erva_espiritual", "quantity": 1},
+        {"item_id": "iron_sword", "quantity": 1},
+    ],
+    "learned_skills": ["palma_do_trovao", "passo_fantasma"],
+}
+
+# (input, cena, intenção esperada ou None, slot esperado)
+CASES = [
+    # Combate
+    ("ataco o lobo", FLORESTA, "attack", "Lobo Cinzento"),
+    ("atacar o Lobo Cinzento!", FLORESTA, "attack", "Lobo Cinzento"),
+    ("golpeio a fera com força", FLORESTA, "attack", "Lobo Cinzento"),
+    ("vou lutar contra o bandido", ESTRADA, "attack", "Bandido Zhao"),
+    ("mato o Zhao", ESTRADA, "attack", "Bandido Zhao"),
+    ("dou um chute no lobo", ESTRADA, "attack", "Lobo Cinzento"),
+    ("uso palma do trovao no bandido", ESTRADA, "use_skill", "Bandido Zhao"),
+    ("lanço a Palma do Trovão contra o lobo", FLORESTA, "use_skill", "Lobo Cinzento"),
+    ("ataco o Zhao com palma do trovão", ESTRADA, "use_skill", "Bandido Zhao"),
+    ("atacar", ESTRADA, None, None),  # dois hostis: alvo ambíguo
+    # Social
+    ("falo com o mercador", VILA, "talk", "Mercador Li"),
+    ("converso com o Ancião Wei sobre a seita", VILA, "talk", "Ancião Wei"),
+    ("pergunto ao ancião sobre o pico", VILA, "talk", "Ancião Wei"),
+    ('digo ao Li "bom dia, senhor"', VILA, "talk", "Mercador Li"),
+    ("cumprimento o velho Wei", VILA, "talk", "Ancião Wei"),
+    ("tento convencer o mercador a baixar o preço", VILA, "persuade", "Mercador Li"),
+    ("persuadir o Ancião a me ensinar", VILA, "persuade", "Ancião Wei"),
+    ("ameaço o bandido para ele ir embora", ESTRADA, "intimidate", "Bandido Zhao"),
+    ("intimidar o Zhao", ESTRADA, "intimidate", "Bandido Zhao"),
+    ("quero comprar uma pílula", VILA, "trade", None),
+    ("vender a Erva Espiritual ao mercador", VILA, "trade", "Mercador Li"),
+    # Movimento
+    ("vou para a Vila Pedra Branca", FLORESTA, "move", "Vila Pedra Branca"),
+    ("ir até a caverna", FLORESTA, "move", "Caverna do Eco"),
+    ("sigo para o pico", VILA, "move", "Pico da Nuvem Azul"),
+    ("viajar até a floresta", VILA, "move", "Floresta Sombria"),
+    ("volto para a vila", VAZIO, "move", "Vila Pedra Branca"),
+    ("vou para o norte", VILA, None, None),  # destino desconhecido
+    ("explorar os arredores", FLORESTA, "explore", None),
+    ("exploro a região", VAZIO, "explore", None),
+    ("fujo!", ESTRADA, "flee", None),
+    ("corro para longe do bandido", ESTRADA, "flee", None),
+    ("escapar do combate", ESTRADA, "flee", None),
+    # Cultivo
+    ("meditar", VAZIO, "meditate", None),
+    ("sento e medito em silêncio", VAZIO, "meditate", None),
+    ("cultivar o qi", VAZIO, "cultivate", None),
+    ("absorvo o qi do pico", VAZIO, "cultivate", None),
+    ("treino a espada por algumas horas", VILA, "train", None),
+    ("praticar artes marciais", VAZIO, "train", None),
+    # Observação / descanso
+    ("olho ao redor", FLORESTA, "observe", None),
+    ("observar o ambiente", VILA, "observe", None),
+    ("examino o lobo", FLORESTA, "observe", "Lobo Cinzento"),
+    ("procuro pistas no chão", FLORESTA, "search", None),
+    ("vasculhar a caverna", FLORESTA, "search", None),
+    ("descansar", VAZIO, "rest", None),
+    ("durmo até o amanhecer", VILA, "rest", None),
+    ("espero", VAZIO, "wait", None),
+    ("aguardo o mercador terminar", VILA, "wait", None),
+    # Itens
+    ("tomo a pílula de cura", FLORESTA, "use_item", "pilula_de_cura"),
+    ("tomo a pilula de cura", VILA, "use_item", "pilula_de_cura"),
+    ("como a erva espiritual", VAZIO, "use_item", "erva_espiritual"),
+    ("usar pílula", ESTRADA, "use_item", "pilula_de_cura"),
+    ("bebo uma poção", ESTRADA, None, None),  # item fora do inventário
+    # Intenções sem handler no executor: sempre LLM
+    ("me defendo do bandido", ESTRADA, None, None),
+    ("equipo a espada de ferro", VILA, None, None),
+    ("largo a erva espiritual", VILA, None, None),
+    # Negação, fingimento e modais: sempre LLM
+    ("não ataco o lobo", FLORESTA, None, None),
+    ("não quero atacar o lobo", FLORESTA, None, None),
+    ("finjo atacar o lobo", FLORESTA, None, None),
+    ("nunca fujo de uma luta", ESTRADA, None, None),
+    ("talvez eu vá para a vila", FLORESTA, None, None),
+    ("devo meditar agora?", VAZIO, None, None),
+    # Fala relatada, orações subordinadas e ações encadeadas: sempre LLM
+    ("digo ao mercador que vou matar o ancião", VILA, None, None),
+    ("falo para o bandido que vou fugir", ESTRADA, None, None),
+    ("se o lobo atacar, eu fujo", FLORESTA, None, None),
+    ("fujo do lobo e ataco o bandido", ESTRADA, None, None),
+    ("ataco o lobo e depois fujo", FLORESTA, None, None),
+    ("olho para o lobo e ataco", FLORESTA, None, None),
+    ("medito e depois treino", VAZIO, None, None),
+    ("ataco o bandido enquanto o lobo foge", ESTRADA, None, None),
+    # Mais de uma entidade do mesmo tipo: sempre LLM
+    ("ataco o lobo e o bandido", ESTRADA, None, None),
+    ("falo com o mercador e com o ancião", VILA, None, None),
+    ("vou para a vila ou para a caverna", FLORESTA, None, None),
+    # Alvo social que não fala: sempre LLM
+    ("converso com o lobo", FLORESTA, None, None),
+    ("pergunto ao lobo onde fica a vila", FLORESTA, None, None),
+    ("tento convencer o lobo a ir embora", FLORESTA, None, None),
+    # Palavras que só começam como um verbo
+    ("mato o tempo na mata", FLORESTA, None, None),
+    ("falta pouco para a vila", FLORESTA, None, None),
+    ("tomo coragem e avanço sobre o lobo", FLORESTA, "attack", "Lobo Cinzento"),
+    ("de olhos fechados, medito", VAZIO, "meditate", None),
+    # Ambíguos / livres
+    ("hmm", VILA, None, None),
+    ("o que aconteceu aqui?", FLORESTA, None, None),
+    ("escrevo uma carta para minha mãe", VILA, None, None),
+    ("tento subir na árvore mais alta", FLORESTA, None, None),
+]
+
+THRESHOLDS = [0.5, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9]
+
+
+def _state(text, world):
+    return {"user_input": text, "player": PLAYER, "world": world, "validation": {}}
+
+
+def _slot(action):
+    return action.target_name or action.destination or action.item_name
+
+
+def run(threshold: float, verbose: bool = False):
+    classifier = IntentClassifier(threshold=threshold)
+    tp, fp, fn = Counter(), Counter(), Counter()
+    accepted = correct = 0
+    elapsed = 0.0
+
+    for text, world, expected, slot in CASES:
+        start = time.perf_counter()
+        result = classifier.classify(_state(text, world))
+        elapsed += time.perf_counter() - start
+
+        got = result.action.intent.value
+        ok = result.accepted and got == expected and (slot is None or _slot(result.action) == slot)
+        if result.accepted:
+            accepted += 1
+            correct += ok
+            if ok:
+                tp[got] += 1
+            else:
+                fp[got] += 1
+                if expected:
+                    fn[expected] += 1
+        elif expected:
+            fn[expected] += 1
+
+        if verbose:
+            mark = "OK " if ok or (not result.accepted and expected is None) else ("LLM" if not result.accepted else "ERR")
+            print(f"  [{mark}] {text!r:50} -> {got:11} {result.confidence:.2f} {result.reason:18} {_slot(result.action)}")
+
+    return {
+        "accepted": accepted,
+        "correct": correct,
+        "tp": tp, "fp": fp, "fn": fn,
+        "avg_ms": elapsed * 1000 / len(CASES),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do classificador local de intenção")
+    parser.add_argument("--threshold", type=float, default=0.65, help="Limiar para o relatório por intenção")
+    parser.add_argument("--verbose", action="store_true", help="Mostra cada caso")
+    args = parser.parse_args()
+
+    total = len(CASES)
+    print(f"Casos rotulados: {total} ({sum(1 for c in CASES if c[2] is None)} devem ir para o LLM)\n")
+
+    print(f"{'limiar':>7} | {'skip rate':>9} | {'precisão':>8} | {'erros':>5}")
+    print("-" * 40)
+    for threshold in THRESHOLDS:
+        stats = run(threshold)
+        skip = stats["accepted"] / total
+        precision = stats["correct"] / stats["accepted"] if stats["accepted"] else 1.0
+        errors = stats["accepted"] - stats["correct"]
+        print(f"{threshold:>7.2f} | {skip:>8.1%} | {precision:>8.1%} | {errors:>5}")
+
+    print(f"\nPor intenção (limiar {args.threshold}):")
+    stats = run(args.threshold, verbose=args.verbose)
+    intents = sorted(set(stats["tp"]) | set(stats["fp"]) | set(stats["fn"]))
+    print(f"{'intenção':>12} | {'precisão':>8} | {'recall':>6}")
+    print("-" * 34)
+    for intent in intents:
+        tp, fp, fn = stats["tp"][intent], stats["fp"][intent], stats["fn"][intent]
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        print(f"{intent:>12} | {precision:>8.1%} | {recall:>6.1%}")
+
+    print(f"\nLatência média: {stats['avg_ms']:.3f} ms/classificação")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: combate em massa vetorizado x CombatEngine par a par.
+
+Para exércitos de tamanhos crescentes, resolve a mesma batalha (cada unidade
+viva golpeia um alvo vivo aleatório por rodada) de duas formas:
+- laço Python chamando CombatEngine.calculate_damage por par atacante/defensor
+- MassCombatEngine (arrays NumPy, todas as unidades por rodada)
+
+Antes, confere que o dano de um golpe é idêntico nos dois caminhos para
+algumas skills e constituições. Não precisa de banco nem do Gemini.
+
+Uso:
+    python benchmark_mass_combat.py [--sizes 10 100 1000 5000] [--skill basic_attack] [--seed 42]
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.core.combat_engine import CombatEngine
+from app.core.mass_combat import Army, MassCombatEngine
+
+PARITY_CASES = [
+    ("basic_attack", "Mortal", "Mortal", 1, 1),
+    ("meteor_soul", "Godfiend (Phoenix)", "Godfiend (Black Sand)", 1, 1),
+    ("silent_strike", "Taboo", "Mortal", 1, 2),
+    ("silent_strike", "Taboo", "Mortal", 1, 5),
+]
+
+
+def _unit(name, constitution_type=None, tier=1, defense=10.0, hp=100.0):
+    return SimpleNamespace(
+        name=name, constitution_type=constitution_type, cultivation_tier=tier,
+        defense=defense, max_hp=hp, current_hp=hp, status_effects=[],
+    )
+
+
+def check_parity() -> bool:
+    ok = True
+    engine = MassCombatEngine()
+    for skill_id, att_const, def_const, att_tier, def_tier in PARITY_CASES:
+        attacker = _unit("A", att_const, att_tier)
+        defender = _unit("D", def_const, def_tier, defense=40.0)
+        scalar = CombatEngine.calculate_damage(attacker, defender, skill_id)
+        vector = engine._strike(
+            Army.from_units("A", [attacker], skill_id),
+            Army.from_units("D", [defender]),
+            np.random.default_rng(0),
+        )[0]
+        match = abs(scalar - vector) < 0.01
+        ok &= match
+        print(f"  {skill_id:>14} {att_const:>22} -> {def_const:<22} "
+              f"escalar {scalar:8.2f} | vetorizado {vector:8.2f} {'OK' if match else 'DIFERENTE'}")
+    return ok
+
+
+def scalar_battle(size: int, skill_id: str, max_rounds: int, seed: int) -> int:
+    """A mesma batalha, um calculate_damage por golpe (como o combate de turno)."""
+    rng = random.Random(seed)
+    sides = [[_unit(f"A{i}") for i in range(size)], [_unit(f"B{i}") for i in range(size)]]
+    rounds = 0
+    while rounds < max_rounds and all(any(u.current_hp > 0 for u in side) for side in sides):
+        rounds += 1
+        hits = [[0.0] * size, [0.0] * size]
+        for s, (attackers, defenders) in enumerate(((sides[0], sides[1]), (sides[1], sides[0]))):
+            alive = [i for i, u in enumerate(defenders) if u.current_hp > 0]
+            for unit in attackers:
+                if unit.current_hp > 0:
+                    target = rng.choice(alive)
+                    hits[1 - s][target] += CombatEngine.calculate_damage(unit, defenders[target], skill_id)
+        for s, side in enumerate(sides):
+            for i, unit in enumerate(side):
+                unit.current_hp -= hits[s][i]
+    return rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do combate em massa vetorizado")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000], help="Unidades por lado")
+    parser.add_argument("--skill", default="basic_attack", help="Skill usada por todas as unidades")
+    parser.add_argument("--rounds", type=int, default=50, help="Limite de rodadas")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print("Paridade da fórmula de dano:")
+    if not check_parity():
+        print("\nATENÇÃO: o motor vetorizado diverge do CombatEngine")
+
+    engine = MassCombatEngine(max_rounds=args.rounds)
+    print(f"\n{'unidades/lado':>13} | {'rodadas':>7} | {'escalar (ms)':>12} | {'NumPy (ms)':>10} | {'speedup':>8}")
+    print("-" * 64)
+    for size in args.sizes:
+        start = time.perf_counter()
+        scalar_rounds = scalar_battle(size, args.skill, args.rounds, args.seed)
+        scalar_ms = (time.perf_counter() - start) * 1000
+
+        result = engine.simulate(
+            Army.uniform("A", size, skill_id=args.skill),
+            Army.uniform("B", size, skill_id=args.skill),
+            seed=args.seed,
+        )
+        print(f"{size:>13} | {result.rounds:>3}/{scalar_rounds:<3} | {scalar_ms:>12.1f} | "
+              f"{result.elapsed_ms:>10.2f} | {scalar_ms / result.elapsed_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: carga e latência de lookup do ruleset compilado.
+
+Compara os loaders antigos (reabrir e reparsear o JSON a cada chamada, como
+`CombatEngine.get_tier_data` e as game_tools faziam) com o RulesetRegistry:
+- tempo de carga/compilação de todos os arquivos de ruleset_source/mechanics
+- latência de get_tier_data, skill por id, item por nome e técnicas por elemento
+- custo de um reload a quente (troca atômica do snapshot)
+
+Não precisa de banco nem do Gemini.
+
+Uso:
+    python benchmark_ruleset.py [--iterations 2000]
+"""
+import argparse
+import json
+import time
+
+from app.core.ruleset_registry import MECHANICS_DIR, RulesetRegistry
+
+
+def _legacy_tier(tier: int):
+    with open(MECHANICS_DIR / "cultivation_ranks.json", "r", encoding="utf-8") as f:
+        ranks = json.load(f)
+    for tier_data in ranks.get("tiers", []):
+        if tier_data["tier"] == tier:
+            return tier_data
+    return None
+
+
+def _legacy_item(name: str):
+    with open(MECHANICS_DIR / "items.json", "r", encoding="utf-8") as f:
+        items = json.load(f)
+    for item in items:
+        if item.get("name", "").lower() == name.lower() or item.get("id", "").lower() == name.lower():
+            return item
+    return None
+
+
+def _legacy_techniques(element: str):
+    with open(MECHANICS_DIR / "techniques.json", "r", encoding="utf-8") as f:
+        techniques = json.load(f)
+    return [t for t in techniques if t.get("element", "").lower() == element.lower()]
+
+
+def _timeit(fn, iterations: int) -> float:
+    """Microssegundos por chamada."""
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do RulesetRegistry")
+    parser.add_argument("--iterations", type=int, default=2000, help="Chamadas por lookup")
+    args = parser.parse_args()
+    n = args.iterations
+
+    registry = RulesetRegistry()
+    loads = []
+    for _ in range(20):
+        start = time.perf_counter()
+        registry.load()
+        loads.append((time.perf_counter() - start) * 1000)
+    ruleset = registry.current
+
+    tiers = sorted(ruleset.tiers_by_number) or [1]
+    skill_ids = list(ruleset.skills) or ["basic_attack"]
+    item_names = [i.name for i in ruleset.items] or ["?"]
+    elements = list(ruleset.techniques_by_element) or ["fire"]
+
+    print(f"Ruleset v{ruleset.version}: {len(tiers)} tiers, {len(skill_ids)} skills, "
+          f"{len(item_names)} itens, {len(ruleset.techniques)} técnicas")
+    print(f"Carga completa (compilação de todos os arquivos): "
+          f"min {min(loads):.2f} ms | média {sum(loads) / len(loads):.2f} ms\n")
+
+    rows = [
+        ("get_tier_data",
+         _timeit(lambda i: _legacy_tier(tiers[i % len(tiers)]), n),
+         _timeit(lambda i: ruleset.tier(tiers[i % len(tiers)]), n)),
+        ("item por nome",
+         _timeit(lambda i: _legacy_item(item_names[i % len(item_names)]), n),
+         _timeit(lambda i: ruleset.item(item_names[i % len(item_names)]), n)),
+        ("técnicas por elemento",
+         _timeit(lambda i: _legacy_techniques(elements[i % len(elements)]), n),
+         _timeit(lambda i: ruleset.techniques_for(elements[i % len(elements)]), n)),
+        ("skill por id (registry.current)",
+         None,
+         _timeit(lambda i: registry.current.skill(skill_ids[i % len(skill_ids)]), n)),
+    ]
+
+    print(f"{'lookup':>32} | {'antigo (µs)':>11} | {'registry (µs)':>13} | {'speedup':>8}")
+    print("-" * 75)
+    for name, legacy, compiled in rows:
+        legacy_text = f"{legacy:>11.2f}" if legacy is not None else f"{'-':>11}"
+        speedup = f"{legacy / compiled:>7.0f}x" if legacy is not None and compiled else f"{'-':>8}"
+        print(f"{name:>32} | {legacy_text} | {compiled:>13.3f} | {speedup}")
+
+    start = time.perf_counter()
+    changed = registry.reload_if_changed()
+    check_ms = (time.perf_counter() - start) * 1000
+    print(f"\nVerificação de alterações (stat de {len(registry._signatures)} arquivos): "
+          f"{check_ms:.3f} ms (recarregou: {changed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Migração: conteúdo gerado pelo Architect para o content store (JSONL).
+
+Importa as entradas que o Architect gravava reescrevendo arquivos inteiros:
+- loot_tables.json -> chave "monsters" (loot gerado por monstro)
+- lore_library/bestiary.json (bestiário gerado)
+
+Idempotente: cada entrada é gravada pela sua chave e a última vence.
+Os arquivos originais não são alterados.
+
+Uso:
+    python migrate_content_store.py
+"""
+import json
+from pathlib import Path
+
+from app.core.content_store import content_store
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LOOT_TABLES = REPO_ROOT / "ruleset_source" / "mechanics" / "loot_tables.json"
+BESTIARY = REPO_ROOT / "lore_library" / "bestiary.json"
+
+
+def _read(path: Path):
+    if not path.exists() or path.stat().st_size == 0:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def migrate():
+    print("=== MIGRAÇÃO: Conteúdo gerado -> content store ===")
+
+    loot = _read(LOOT_TABLES) or {}
+    monsters = loot.get("monsters", {})
+    for monster_id, entry in monsters.items():
+        if content_store.get("loot_tables", monster_id) != entry:
+            content_store.put("loot_tables", monster_id, entry)
+    print(f"✓ {len(monsters)} loot tables de monstros importadas.")
+
+    bestiary = _read(BESTIARY) or []
+    for entry in bestiary:
+        key = entry.get("id") or entry.get("name", "").lower().replace(" ", "_")
+        if key and content_store.get("bestiary", key) != entry:
+            content_store.put("bestiary", key, entry)
+    print(f"✓ {len(bestiary)} entradas do bestiário importadas.")
+
+    print(f"=== MIGRAÇÃO CONCLUÍDA: {content_store.get_stats()['entries']} ===")
+
+
+if __name__ == "__main__":
+    migrate()
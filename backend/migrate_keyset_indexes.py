@@ -0,0 +1,22 @@
+"""Migração: índice composto para keyset pagination do histórico (game_logs)."""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.config import settings
+
+async def migrate():
+    print("=== MIGRAÇÃO: Índice (player_id, turn_number, id) em game_logs ===")
+    engine = create_async_engine(settings.DATABASE_URL, echo=False)
+    
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_game_logs_player_turn_id
+            ON game_logs (player_id, turn_number, id)
+        """))
+        print("✓ Índice 'ix_game_logs_player_turn_id' verificado/criado.")
+    
+    await engine.dispose()
+    print("Migração concluída!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
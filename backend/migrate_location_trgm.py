@@ -0,0 +1,31 @@
+"""Migração: pg_trgm + índices GIN de trigramas para resolução aproximada de nomes de locais."""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.config import settings
+
+async def migrate():
+    print("=== MIGRAÇÃO: pg_trgm e índices de trigramas em nomes de locais ===")
+    engine = create_async_engine(settings.DATABASE_URL, echo=False)
+    
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        print("✓ Extensão 'pg_trgm' verificada/habilitada.")
+        
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_dynamic_locations_name_trgm
+            ON dynamic_locations USING gin (lower(name) gin_trgm_ops)
+        """))
+        print("✓ Índice 'ix_dynamic_locations_name_trgm' verificado/criado.")
+        
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_locations_name_trgm
+            ON locations USING gin (lower(name) gin_trgm_ops)
+        """))
+        print("✓ Índice 'ix_locations_name_trgm' verificado/criado.")
+    
+    await engine.dispose()
+    print("Migração concluída!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
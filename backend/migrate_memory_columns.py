@@ -0,0 +1,92 @@
+"""Migração: colunas reais (tipo, evento, importância, valência, tempo de jogo) na tabela memory."""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.config import settings
+
+COLUMNS = [
+    ("memory_type", "VARCHAR"),
+    ("event_type", "VARCHAR"),
+    ("importance", "DOUBLE PRECISION"),
+    ("emotional_valence", "VARCHAR"),
+    ("game_time", "TIMESTAMP"),
+    ("created_at", "TIMESTAMP DEFAULT NOW()"),
+]
+
+async def migrate():
+    print("=== MIGRAÇÃO: Colunas de recall episódico em memory ===")
+    engine = create_async_engine(settings.DATABASE_URL, echo=False)
+    
+    async with engine.begin() as conn:
+        for column, column_type in COLUMNS:
+            await conn.execute(text(f"ALTER TABLE memory ADD COLUMN IF NOT EXISTS {column} {column_type}"))
+            print(f"✓ Coluna '{column}' verificada/criada.")
+        
+        # Cast tolerante: JSON inválido vira NULL em vez de abortar a migração inteira
+        await conn.execute(text("""
+            CREATE FUNCTION pg_temp.try_jsonb(value TEXT) RETURNS JSONB AS $$
+            BEGIN
+                RETURN value::jsonb;
+            EXCEPTION WHEN others THEN
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE
+        """))
+        
+        # Backfill a partir do JSON de content (formato estruturado)
+        result = await conn.execute(text("""
+            UPDATE memory SET
+                memory_type = parsed.doc->>'type',
+                event_type = parsed.doc->>'event_type',
+                importance = CASE
+                    WHEN parsed.doc->>'importance' ~ '^-?\\d+(\\.\\d+)?$'
+                    THEN (parsed.doc->>'importance')::double precision END,
+                emotional_valence = parsed.doc->>'emotional_valence'
+            FROM (
+                SELECT id, pg_temp.try_jsonb(content) AS doc
+                FROM memory
+                WHERE memory_type IS NULL AND content LIKE '{%'
+            ) AS parsed
+            WHERE memory.id = parsed.id AND parsed.doc IS NOT NULL
+        """))
+        print(f"✓ {result.rowcount} memórias estruturadas preenchidas.")
+        
+        result = await conn.execute(text("""
+            UPDATE memory SET
+                game_time = to_timestamp(pg_temp.try_jsonb(content)->>'game_time', 'DD-MM-YYYY HH24:MI')
+            WHERE game_time IS NULL
+              AND memory_type = 'episodic'
+              AND pg_temp.try_jsonb(content)->>'game_time' ~ '^\\d{2}-\\d{2}-\\d{4} \\d{2}:\\d{2}$'
+        """))
+        print(f"✓ {result.rowcount} tempos de jogo convertidos.")
+        
+        # Formato antigo (texto puro do Director) ou JSON corrompido: episódica neutra
+        result = await conn.execute(text("""
+            UPDATE memory SET
+                memory_type = 'episodic',
+                event_type = CASE
+                    WHEN content LIKE '[ATTACKED%' THEN 'combat'
+                    WHEN content LIKE '[DIALOGUE%' THEN 'dialogue'
+                    WHEN content LIKE '[OBSERVATION%' THEN 'observation'
+                    ELSE 'unknown' END,
+                importance = 0.5,
+                emotional_valence = CASE WHEN content LIKE '%ATTACKED%' THEN 'negative' ELSE 'neutral' END
+            WHERE memory_type IS NULL
+              AND (content NOT LIKE '{%' OR pg_temp.try_jsonb(content) IS NULL)
+        """))
+        print(f"✓ {result.rowcount} memórias em texto puro (ou JSON inválido) marcadas como episódicas.")
+        
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_memory_memory_type ON memory (memory_type)
+        """))
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_memory_npc_type_game_time
+            ON memory (npc_id, memory_type, game_time)
+        """))
+        print("✓ Índices 'ix_memory_memory_type' e 'ix_memory_npc_type_game_time' verificados/criados.")
+    
+    await engine.dispose()
+    print("Migração concluída!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
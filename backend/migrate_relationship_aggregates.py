@@ -0,0 +1,61 @@
+"""Migração: tabela relationship_aggregates + backfill a partir de npc.relationships (JSON)."""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from sqlmodel import SQLModel
+from app.config import settings
+from app.database.models.relationship import RelationshipAggregate, STANCE_EXPRESSION
+
+async def migrate():
+    print("=== MIGRAÇÃO: Agregados de relacionamento ===")
+    engine = create_async_engine(settings.DATABASE_URL, echo=False)
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: SQLModel.metadata.create_all(
+                sync_conn, tables=[RelationshipAggregate.__table__]
+            )
+        )
+        print("✓ Tabela 'relationship_aggregates' verificada/criada.")
+        
+        # Coluna gerada com a expressão atual (tabelas antigas: 'hostile' com uma única interação negativa)
+        await conn.execute(text("ALTER TABLE relationship_aggregates DROP COLUMN IF EXISTS stance"))
+        await conn.execute(text(
+            f"ALTER TABLE relationship_aggregates ADD COLUMN stance VARCHAR "
+            f"GENERATED ALWAYS AS ({STANCE_EXPRESSION}) STORED"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_relationship_aggregates_target_stance "
+            "ON relationship_aggregates (target_key, stance)"
+        ))
+        print("✓ Coluna 'stance' recriada com a expressão atual.")
+        
+        # Posturas definidas no JSON do NPC viram stance_override
+        result = await conn.execute(text("""
+            INSERT INTO relationship_aggregates (
+                entity_id, target_key, target_name,
+                very_negative_count, negative_count, neutral_count,
+                positive_count, very_positive_count, total_interactions,
+                hostility, friendship, respect, stance_override, history
+            )
+            SELECT n.id,
+                   lower(regexp_replace(trim(r.key), '\\s+', ' ', 'g')),
+                   r.key,
+                   0, 0, 0, 0, 0, 0, 0, 0, 0,
+                   NULLIF(r.value->>'stance', ''),
+                   NULLIF(r.value->>'history', '')
+            FROM npc n, json_each(n.relationships::json) r
+            WHERE n.relationships IS NOT NULL
+              AND json_typeof(n.relationships::json) = 'object'
+              AND json_typeof(r.value) = 'object'
+            ON CONFLICT (entity_id, target_key) DO UPDATE SET
+                stance_override = COALESCE(relationship_aggregates.stance_override, EXCLUDED.stance_override),
+                history = COALESCE(relationship_aggregates.history, EXCLUDED.history)
+        """))
+        print(f"✓ {result.rowcount} relacionamentos importados de npc.relationships.")
+    
+    await engine.dispose()
+    print("Migração concluída!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
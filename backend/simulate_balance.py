@@ -0,0 +1,418 @@
+"""
+Simulador de balanceamento offline (Monte Carlo) das fórmulas de combate.
+
+Roda lotes vetorizados (NumPy, um núcleo) com seed fixa, reaproveitando as
+fórmulas do jogo em vez de reimplementá-las:
+
+- combat: duelos por tier x constituição x skill contra um oponente de
+  referência do mesmo tier (NPC sem constituição, basic_attack). Dano de
+  CombatEngine.calculate_damage (app/core/mass_combat.damage_formula),
+  multiplicadores de ConstitutionEffects, DoT e regeneração de
+  process_turn_effects. Relata taxa de vitória e distribuição do
+  time-to-kill (rodadas).
+- tribulation: breakthrough para cada tier x constituição com
+  TribulationEngine.trigger_chance e calculate_tribulation_damage_batch.
+  Relata chance de tribulação, sobrevivência e dano.
+- loot: tabelas de monstros do ruleset (base + geradas pelo Architect)
+  amostradas por LootManager.sample_kills, valoradas pelo `value` dos itens.
+  Relata valor esperado (simulado e analítico) e taxa de drop vazio.
+
+Modelo dos duelos (o mesmo do jogo, salvo as opções):
+- Stats do tier como em check_for_rank_up: a cada breakthrough HP e
+  Quintessence multiplicam por max_hp_multiplier e Shadow Chi/Yuan Qi por
+  qi_multiplier (--hp-scaling tier usa só o multiplicador do próprio tier)
+- Constituição aplicada como em apply_constitution_effects (HP e defesa) e de
+  novo dentro de calculate_damage, como acontece no jogo
+- Iniciativa 1d20 x 1d20 por luta (empate: cultivador); quem tem a
+  iniciativa golpeia primeiro em toda rodada e o outro só revida se sobreviver
+- O jogo não cobra custo nem cooldown de skill; --enforce-costs aplica os
+  valores de skills.json (sem recurso ou em cooldown: basic_attack)
+- DoT não acumula: um novo DoT renova o anterior
+- --damage-variance 0 (padrão) é a fórmula exata, sem rolagem de dano
+
+Saída: <out>_combat, <out>_tribulation e <out>_loot em CSV ou Parquet
+(Parquet precisa de pandas + pyarrow; sem eles grava CSV).
+
+Uso:
+    python simulate_balance.py [--fights 2000] [--seed 42] [--tiers 1 5 9]
+                               [--only combat loot] [--format parquet] [--out balance_report]
+"""
+import argparse
+import csv
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from app.core.constitution_effects import ConstitutionEffects
+from app.core.content_store import content_store
+from app.core.dice_roller import DiceRoller
+from app.core.loot_manager import loot_manager
+from app.core.mass_combat import constitution_profile, damage_formula, skill_profile
+from app.core.ruleset_registry import ruleset_registry
+from app.core.tribulation_engine import tribulation_engine
+
+REPORTS = ("combat", "tribulation", "loot")
+
+# Linhas (lutas) por lote vetorizado nos duelos
+MAX_ROWS_PER_BATCH = 500_000
+
+# Stats base de Player/NPC novos (app/database/models)
+BASE_HP = 100.0
+BASE_DEFENSE = 10.0
+BASE_RESOURCE = 100.0
+
+
+# ==================== STATS POR TIER ====================
+
+def tier_multipliers(tier: int, scaling: str) -> Tuple[float, float]:
+    """(mult. de HP, mult. de Qi) de um cultivador que chegou ao tier."""
+    ruleset = ruleset_registry.current
+    if scaling == "tier":
+        data = ruleset.tier(tier) or {}
+        return data.get("max_hp_multiplier", 1.0), data.get("qi_multiplier", 1.0)
+
+    hp_mult = qi_mult = 1.0
+    for number in range(2, tier + 1):
+        data = ruleset.tier(number) or {}
+        hp_mult *= data.get("max_hp_multiplier", 1.0)
+        qi_mult *= data.get("qi_multiplier", 1.0)
+    return hp_mult, qi_mult
+
+
+def resource_pool(cost_type: str, hp_mult: float, qi_mult: float, constitution_type: str) -> float:
+    """Recurso máximo usado pela skill (0 para skills sem custo)."""
+    if cost_type in ("shadow_chi", "yuan_qi"):
+        return BASE_RESOURCE * qi_mult
+    if cost_type == "quintessential_essence":
+        modifiers = ConstitutionEffects.get_modifiers(constitution_type)
+        return BASE_RESOURCE * hp_mult * modifiers.get("quintessence_regen", 1.0)
+    return 0.0
+
+
+# ==================== DUELOS ====================
+
+def build_combos(tiers, constitutions, skills, scaling) -> List[Dict[str, Any]]:
+    combos = []
+    for tier in tiers:
+        hp_mult, qi_mult = tier_multipliers(tier, scaling)
+        for constitution_type in constitutions:
+            modifiers = ConstitutionEffects.get_modifiers(constitution_type)
+            for skill_id in skills:
+                skill = skill_profile(skill_id)
+                if skill["tier_requirement"] > tier:
+                    continue
+                combos.append({
+                    "tier": tier,
+                    "constitution": constitution_type,
+                    "skill": skill_id,
+                    "hp_mult": hp_mult,
+                    "qi_mult": qi_mult,
+                    "hp_multiplier": modifiers.get("hp_multiplier", 1.0),
+                    "skill_profile": skill,
+                })
+    return combos
+
+
+def _combo_arrays(combos: List[Dict[str, Any]], fights: int) -> Dict[str, np.ndarray]:
+    """Parâmetros por luta (cada combo repetido `fights` vezes, contíguo)."""
+    basic = skill_profile("basic_attack")
+    columns: Dict[str, List[float]] = {key: [] for key in (
+        "p_hp", "p_defense", "p_defense_mult", "p_damage_mult", "p_regen", "tier",
+        "skill_base", "skill_stealth", "skill_pen", "skill_dot", "skill_dot_turns",
+        "skill_cost", "skill_cooldown", "pool", "chi_bonus", "o_hp",
+    )}
+    for combo in combos:
+        skill = combo["skill_profile"]
+        damage_mult, defense_mult, regen = constitution_profile(combo["constitution"])
+        pool = resource_pool(skill["cost_type"], combo["hp_mult"], combo["qi_mult"], combo["constitution"])
+        cost_mult = ConstitutionEffects.get_cost_modifier(combo["constitution"], skill["cost_type"])
+        columns["p_hp"].append(BASE_HP * combo["hp_mult"] * combo["hp_multiplier"])
+        # apply_constitution_effects já multiplicou a defesa; calculate_damage multiplica de novo
+        columns["p_defense"].append(BASE_DEFENSE * defense_mult)
+        columns["p_defense_mult"].append(defense_mult)
+        columns["p_damage_mult"].append(damage_mult)
+        columns["p_regen"].append(regen)
+        columns["tier"].append(combo["tier"])
+        columns["skill_base"].append(skill["base"])
+        columns["skill_stealth"].append(skill["stealth"])
+        columns["skill_pen"].append(skill["penetration"])
+        columns["skill_dot"].append(skill["dot_damage"])
+        columns["skill_dot_turns"].append(skill["dot_turns"])
+        columns["skill_cost"].append(skill["cost_amount"] * cost_mult)
+        columns["skill_cooldown"].append(skill["cooldown"])
+        columns["pool"].append(pool)
+        # Bônus de Shadow Chi: 2% do shadow_chi atual
+        columns["chi_bonus"].append(0.02 if skill["cost_type"] == "shadow_chi" else 0.0)
+        columns["o_hp"].append(BASE_HP * combo["hp_mult"])
+    arrays = {key: np.repeat(np.asarray(values, dtype=np.float64), fights) for key, values in columns.items()}
+    arrays["basic_base"] = np.full(len(arrays["p_hp"]), basic["base"])
+    return arrays
+
+
+def run_duels(
+    combos: List[Dict[str, Any]],
+    fights: int,
+    rng: np.random.Generator,
+    max_rounds: int,
+    enforce_costs: bool,
+    variance: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Resolve `fights` duelos por combo; retorna (resultado, rodadas, fração de HP restante)."""
+    a = _combo_arrays(combos, fights)
+    rows = len(a["p_hp"])
+
+    # A defesa dos dois lados não muda durante a luta: o dano de cada golpe é
+    # constante, exceto pelo bônus de Shadow Chi (linear no recurso atual)
+    zeros, ones, tier = np.zeros(rows), np.ones(rows), a["tier"]
+    opponent_defense = np.full(rows, BASE_DEFENSE)
+    mult = a["p_damage_mult"]
+    a["o_damage"] = damage_formula(a["basic_base"], zeros, zeros, tier, a["p_defense"], a["p_defense_mult"], tier)
+    a["basic_damage"] = damage_formula(a["basic_base"] * mult, zeros, zeros, tier, opponent_defense, ones, tier)
+    a["skill_damage"] = damage_formula(
+        (a["skill_base"] + a["pool"] * a["chi_bonus"]) * mult, a["skill_stealth"] * mult, a["skill_pen"],
+        tier, opponent_defense, ones, tier,
+    )
+    a["chi_damage"] = damage_formula(a["chi_bonus"] * mult, zeros, a["skill_pen"], tier, opponent_defense, ones, tier)
+    a["pool_start"] = a["pool"].copy()
+    a["p_max_hp"] = a["p_hp"].copy()
+    a["o_dot"] = np.zeros(rows)
+    a["o_dot_turns"] = np.zeros(rows)
+    a["cooldown_left"] = np.zeros(rows)
+    a["row"] = np.arange(rows)
+    # Iniciativa 1d20 x 1d20 (DiceRoller.roll_initiative), empate favorece o cultivador
+    a["p_first"] = DiceRoller.roll_batch("1d20", rows, rng) >= DiceRoller.roll_batch("1d20", rows, rng)
+
+    outcome = np.zeros(rows, dtype=np.int8)  # 1 vitória, -1 derrota, 0 tempo esgotado
+    rounds = np.full(rows, max_rounds, dtype=np.int32)
+    hp_left = np.zeros(rows)
+
+    for round_number in range(1, max_rounds + 1):
+        n = len(a["row"])
+        if n == 0:
+            break
+
+        # Início do turno: DoT no oponente, regeneração do cultivador (process_turn_effects)
+        ticking = a["o_dot_turns"] > 0
+        a["o_hp"] -= np.where(ticking, a["o_dot"], 0.0)
+        a["o_dot_turns"] -= ticking
+        a["p_hp"] = np.minimum(a["p_hp"] + a["p_max_hp"] * 0.05 * a["p_regen"], a["p_max_hp"])
+
+        # Skill ou basic_attack
+        if enforce_costs:
+            use_skill = (a["cooldown_left"] <= 0) & (a["pool"] >= a["skill_cost"])
+        else:
+            use_skill = np.ones(n, dtype=bool)
+        skill_damage = a["skill_damage"] - (a["pool_start"] - a["pool"]) * a["chi_damage"]
+        p_damage = np.where(use_skill, skill_damage, a["basic_damage"])
+        o_damage = a["o_damage"]
+        if variance > 0:
+            p_damage = p_damage * rng.uniform(1 - variance, 1 + variance, size=n)
+            o_damage = o_damage * rng.uniform(1 - variance, 1 + variance, size=n)
+
+        # Quem tem a iniciativa golpeia; o outro só revida se sobreviver
+        both_alive = (a["p_hp"] > 0) & (a["o_hp"] > 0)
+        p_acts = both_alive & (a["p_first"] | (a["p_hp"] - o_damage > 0))
+        o_acts = both_alive & (~a["p_first"] | (a["o_hp"] - p_damage > 0))
+        a["o_hp"] -= np.where(p_acts, p_damage, 0.0)
+        a["p_hp"] -= np.where(o_acts, o_damage, 0.0)
+
+        # Efeitos e custos da skill usada
+        used = p_acts & use_skill
+        dotted = used & (a["skill_dot_turns"] > 0)
+        a["o_dot"] = np.where(dotted, a["skill_dot"], a["o_dot"])
+        a["o_dot_turns"] = np.where(dotted, a["skill_dot_turns"], a["o_dot_turns"])
+        if enforce_costs:
+            a["pool"] -= np.where(used, a["skill_cost"], 0.0)
+            a["cooldown_left"] = np.where(used, a["skill_cooldown"], a["cooldown_left"] - 1)
+
+        lost = a["p_hp"] <= 0
+        won = ~lost & (a["o_hp"] <= 0)
+        ended = won | lost
+        if ended.any():
+            finished = a["row"][ended]
+            outcome[finished] = np.where(won[ended], 1, -1)
+            rounds[finished] = round_number
+            hp_left[finished] = np.clip(a["p_hp"][ended], 0, None) / a["p_max_hp"][ended]
+            # Só as lutas em andamento seguem para a próxima rodada
+            a = {key: value[~ended] for key, value in a.items()}
+
+    hp_left[a["row"]] = np.clip(a["p_hp"], 0, None) / a["p_max_hp"]
+    return outcome, rounds, hp_left
+
+
+def simulate_combat(args, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    skills = args.skills or [s for s in ruleset_registry.current.skills if skill_profile(s)["base"] > 0]
+    combos = build_combos(args.tiers, args.constitutions, skills, args.hp_scaling)
+    per_batch = max(1, MAX_ROWS_PER_BATCH // args.fights)
+
+    rows = []
+    for start in range(0, len(combos), per_batch):
+        batch = combos[start:start + per_batch]
+        outcome, rounds, hp_left = run_duels(
+            batch, args.fights, rng, args.max_rounds, args.enforce_costs, args.damage_variance
+        )
+        outcome = outcome.reshape(len(batch), args.fights)
+        rounds = rounds.reshape(len(batch), args.fights)
+        hp_left = hp_left.reshape(len(batch), args.fights)
+        for i, combo in enumerate(batch):
+            wins = outcome[i] == 1
+            ttk = rounds[i][wins]
+            rows.append({
+                "tier": combo["tier"],
+                "constitution": combo["constitution"],
+                "skill": combo["skill"],
+                "fights": args.fights,
+                "win_rate": round(float(wins.mean()), 4),
+                "loss_rate": round(float((outcome[i] == -1).mean()), 4),
+                "timeout_rate": round(float((outcome[i] == 0).mean()), 4),
+                "ttk_mean": round(float(ttk.mean()), 2) if len(ttk) else None,
+                "ttk_p10": int(np.percentile(ttk, 10)) if len(ttk) else None,
+                "ttk_p50": int(np.percentile(ttk, 50)) if len(ttk) else None,
+                "ttk_p90": int(np.percentile(ttk, 90)) if len(ttk) else None,
+                "hp_left_on_win": round(float(hp_left[i][wins].mean()), 4) if len(ttk) else None,
+            })
+    return rows
+
+
+# ==================== TRIBULAÇÕES ====================
+
+def simulate_tribulations(args, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    rows = []
+    n = args.tribulations
+    for tier in [t for t in args.tiers if t >= 2]:
+        hp_mult, qi_mult = tier_multipliers(tier, args.hp_scaling)
+        for constitution_type in args.constitutions:
+            modifiers = ConstitutionEffects.get_modifiers(constitution_type)
+            chance = tribulation_engine.trigger_chance(constitution_type, tier)
+            # check_for_rank_up restaura o HP antes da tribulação
+            hp = BASE_HP * hp_mult * modifiers.get("hp_multiplier", 1.0)
+            quintessence = BASE_RESOURCE * hp_mult * modifiers.get("quintessence_regen", 1.0)
+            yuan_qi = BASE_RESOURCE * qi_mult
+
+            triggered = rng.random(n) < chance
+            raw_damage, damage = tribulation_engine.calculate_tribulation_damage_batch(
+                tier, np.full(n, quintessence + yuan_qi / 2), rng
+            )
+            died = triggered & (hp - damage <= 0)
+            hit = damage[triggered]
+            rows.append({
+                "tier": tier,
+                "constitution": constitution_type,
+                "category": tribulation_engine.constitution_category(constitution_type),
+                "breakthroughs": n,
+                "trigger_rate": round(float(triggered.mean()), 4),
+                "survival_rate": round(1 - float(died.sum()) / max(1, int(triggered.sum())), 4),
+                "death_rate": round(float(died.mean()), 4),
+                "hp": round(hp, 1),
+                "raw_damage": raw_damage,
+                "damage_mean": round(float(hit.mean()), 2) if len(hit) else 0.0,
+                "damage_p90": round(float(np.percentile(hit, 90)), 2) if len(hit) else 0.0,
+            })
+    return rows
+
+
+# ==================== LOOT ====================
+
+def _item_value(item_id: str) -> Tuple[float, bool]:
+    item = ruleset_registry.current.item(item_id)
+    if not item:
+        return 0.0, False
+    return float(item.get("value", 0) or 0), True
+
+
+def simulate_loot(args, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """Abates amostrados em lote pelas tabelas compiladas do LootManager."""
+    ruleset = ruleset_registry.current
+    monster_ids = sorted(set(ruleset.loot.get("monsters", {})) | set(content_store.keys("loot_tables")))
+
+    rows = []
+    n = args.kills
+    for monster_id in monster_ids:
+        table = loot_manager.compiled(monster_id)
+        unpriced = set()
+
+        def priced(item_id):
+            value, known = _item_value(item_id)
+            if not known:
+                unpriced.add(item_id)
+            return value
+
+        for luck in args.luck:
+            batch = loot_manager.sample_kills(monster_id, n, luck, rng)
+            value = batch.per_kill(np.array([priced(item_id) for item_id in batch.item_ids]))
+            items = batch.per_kill()
+            analytic = sum(q * priced(item_id) for item_id, q in table.expected_quantities(luck).items())
+
+            rows.append({
+                "monster_id": monster_id,
+                "luck": luck,
+                "kills": n,
+                "expected_value": round(float(value.mean()), 2),
+                "analytic_value": round(analytic, 2),
+                "value_p50": round(float(np.percentile(value, 50)), 2),
+                "value_p90": round(float(np.percentile(value, 90)), 2),
+                "items_mean": round(float(items.mean()), 3),
+                "empty_rate": round(float((items == 0).mean()), 4),
+                "unpriced_items": ";".join(sorted(unpriced)),
+            })
+    return rows
+
+
+# ==================== SAÍDA ====================
+
+def write_report(rows: List[Dict[str, Any]], path_base: str, fmt: str) -> str:
+    if fmt == "parquet":
+        try:
+            import pandas as pd
+            path = f"{path_base}.parquet"
+            pd.DataFrame(rows).to_parquet(path, index=False)
+            return path
+        except ImportError:
+            print("[BALANCE] pandas/pyarrow não instalados; gravando CSV")
+
+    path = f"{path_base}.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if rows:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return path
+
+
+def main():
+    ruleset = ruleset_registry.current
+    parser = argparse.ArgumentParser(description="Simulador Monte Carlo de balanceamento")
+    parser.add_argument("--only", nargs="+", choices=REPORTS, default=list(REPORTS), help="Relatórios a gerar")
+    parser.add_argument("--fights", type=int, default=2000, help="Duelos por tier x constituição x skill")
+    parser.add_argument("--tribulations", type=int, default=100_000, help="Breakthroughs por tier x constituição")
+    parser.add_argument("--kills", type=int, default=100_000, help="Abates por tabela de loot e sorte")
+    parser.add_argument("--tiers", type=int, nargs="+", default=sorted(ruleset.tiers_by_number))
+    parser.add_argument("--constitutions", nargs="+", default=list(ConstitutionEffects.CONSTITUTION_MODIFIERS))
+    parser.add_argument("--skills", nargs="+", default=None, help="Padrão: todas as skills com dano")
+    parser.add_argument("--luck", type=float, nargs="+", default=[1.0, 1.5], help="Multiplicadores de sorte do loot")
+    parser.add_argument("--max-rounds", type=int, default=200)
+    parser.add_argument("--hp-scaling", choices=["cumulative", "tier"], default="cumulative")
+    parser.add_argument("--enforce-costs", action="store_true", help="Aplica custo e cooldown das skills")
+    parser.add_argument("--damage-variance", type=float, default=0.0, help="Variação uniforme do dano (0.1 = ±10%%)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--out", default="balance_report", help="Prefixo dos arquivos de saída")
+    args = parser.parse_args()
+
+    # Um gerador independente por relatório: rodar só parte deles não muda os resultados
+    seeds = dict(zip(REPORTS, np.random.SeedSequence(args.seed).spawn(len(REPORTS))))
+    simulators = {"combat": simulate_combat, "tribulation": simulate_tribulations, "loot": simulate_loot}
+
+    for report in args.only:
+        start = time.perf_counter()
+        rows = simulators[report](args, np.random.default_rng(seeds[report]))
+        elapsed = time.perf_counter() - start
+        path = write_report(rows, f"{args.out}_{report}", args.format)
+        samples = sum(r.get("fights") or r.get("breakthroughs") or r.get("kills") or 0 for r in rows)
+        print(f"[BALANCE] {report}: {len(rows)} linhas, {samples:,} simulações em {elapsed:.2f}s "
+              f"({samples / elapsed if elapsed else 0:,.0f}/s) -> {path}")
+
+
+if __name__ == "__main__":
+    main()
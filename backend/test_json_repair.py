@@ -0,0 +1,95 @@
+"""
+SCRIPT DE VALIDAÇÃO: Reparo de JSON do LLM (json_repair + generate_json)
+Não precisa do servidor nem da API key: o cliente do SDK é substituído por um fake.
+
+Uso:
+    python test_json_repair.py
+"""
+from types import SimpleNamespace
+
+from app.services.gemini_client import GeminiClient
+from app.services.json_repair import parse_json
+from app.services.llm_cache import LLMResponseCache
+
+
+class FakeModels:
+    """Devolve sempre o mesmo texto e conta as chamadas."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        return SimpleNamespace(text=self.text, usage_metadata=None)
+
+
+def make_client(text: str) -> GeminiClient:
+    client = GeminiClient.__new__(GeminiClient)
+    client.client = SimpleNamespace(models=FakeModels(text))
+    client.model_name = "models/test"
+    client._task_models = {"default": "models/test", "story": "models/test", "combat": "models/test", "fast": "models/test"}
+    client.cache = LLMResponseCache()
+    client.structured_output = False
+    client.json_stats = {}
+    return client
+
+
+def test_parse_json_repairs():
+    assert parse_json('{"a": 1}') == ({"a": 1}, [])
+    assert parse_json('```json\n{"a": 1}\n```') == ({"a": 1}, ["fence"])
+    value, repairs = parse_json("{'a': 'x', b: True, c: None,}")
+    assert value == {"a": "x", "b": True, "c": None}
+    assert "trailing_comma" in repairs and "python_literal" in repairs
+    print("✅ parse_json repara aspas simples, literais Python e vírgulas")
+
+
+def test_parse_json_truncated():
+    value, repairs = parse_json('{"name": "Lobo", "descrip')
+    assert value == {"name": "Lobo"}
+    assert "truncated" in repairs
+    print("✅ parse_json descarta o membro truncado e anota 'truncated'")
+
+
+def test_generate_json_rejects_truncated():
+    truncated = '{"name": "Lobo", "description": "Um lobo", "drops": [{"item_id": "pele", "quantity_min": 1'
+    client = make_client(truncated)
+
+    result = client.generate_json("besta tier 1", task="story", cache_task="beast")
+    assert "error" in result, f"❌ FALHA: objeto parcial devolvido: {result}"
+
+    # Não foi cacheado: a segunda chamada vai de novo ao modelo
+    client.generate_json("besta tier 1", task="story", cache_task="beast")
+    assert client.client.models.calls == 2, "❌ FALHA: resultado truncado foi cacheado!"
+    assert client.json_stats["beast"].failures == 2
+    print("✅ generate_json devolve erro para saída truncada e não cacheia")
+
+
+def test_generate_json_truncated_opt_in():
+    client = make_client('{"intent": "attack", "target_name": "Lobo", "reasoning": "o jog')
+    schema = {"type": "OBJECT", "properties": {}, "required": ["intent"]}
+
+    # Com schema: aceito porque as chaves obrigatórias vieram
+    result = client.generate_json("ataco o lobo", task="combat", schema=schema, cache_task="beast")
+    assert result == {"intent": "attack", "target_name": "Lobo"}
+    assert client.cache.get_stats()["entries"] == 0, "❌ FALHA: resultado truncado foi cacheado!"
+
+    # Schema sem a chave obrigatória: erro
+    missing = {"type": "OBJECT", "properties": {}, "required": ["intent", "reasoning"]}
+    assert "error" in client.generate_json("ataco o lobo", task="combat", schema=missing)
+
+    # Opt-in explícito sem schema
+    assert client.generate_json("ataco o lobo", task="combat", allow_truncated=True)["intent"] == "attack"
+    print("✅ saída truncada aceita só com schema completo ou allow_truncated")
+
+
+def main():
+    test_parse_json_repairs()
+    test_parse_json_truncated()
+    test_generate_json_rejects_truncated()
+    test_generate_json_truncated_opt_in()
+    print("\nTodos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
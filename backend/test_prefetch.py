@@ -0,0 +1,90 @@
+"""
+SCRIPT DE VALIDAÇÃO: Prefetch do contexto do Narrator com jogadores concorrentes
+Não precisa do servidor nem do banco: as buscas são substituídas por fakes.
+
+Uso:
+    python test_prefetch.py
+"""
+import asyncio
+
+from app.agents.nodes.state import NPCContext, PlayerContext, WorldContext, create_initial_state
+from app.agents.prefetch import ContextPrefetcher
+
+
+class FakePrefetcher(ContextPrefetcher):
+    """Buscas com atraso que devolvem dados marcados com o jogador/NPC."""
+
+    async def _recall_npc(self, npc_id, name, query):
+        await asyncio.sleep(0.01)
+        return {"name": name, "stance": "neutral", "context": f"memória de {name} sobre '{query}'"}
+
+    async def _previous_turn(self, player_id):
+        await asyncio.sleep(0.01)
+        return {"turn_number": 4, "player_input": f"input do jogador {player_id}", "summary": ""}
+
+    async def _select_lore(self, location):
+        return f"lore de {location}"
+
+
+def make_state(player_id: int, npc_name: str, location: str):
+    return create_initial_state(
+        session_id="default",
+        player_id=player_id,
+        user_input=f"olho para {npc_name}",
+        player_context=PlayerContext(id=player_id, name=f"Jogador {player_id}", current_location=location),
+        world_context=WorldContext(
+            current_location=location,
+            npcs_in_scene=[NPCContext(id=player_id * 10, name=npc_name)],
+        ),
+        turn_number=5,
+    )
+
+
+async def test_concurrent_players_same_turn():
+    prefetcher = FakePrefetcher(grace_ms=200)
+    state_a = make_state(1, "Mercador Li", "Vila Inicial")
+    state_b = make_state(2, "Lobo Cinzento", "Floresta Nublada")
+    assert state_a["run_id"] != state_b["run_id"]
+
+    # Mesma sessão e mesmo turno: antes um handle sobrescrevia o outro
+    prefetcher.start(state_a)
+    prefetcher.start(state_b)
+    assert prefetcher.get_stats()["in_flight"] == 2, "❌ FALHA: um handle sobrescreveu o outro!"
+
+    context_b, context_a = await asyncio.gather(
+        prefetcher.collect(state_b["run_id"]),
+        prefetcher.collect(state_a["run_id"]),
+    )
+
+    assert [m["name"] for m in context_a["npc_memories"]] == ["Mercador Li"]
+    assert [m["name"] for m in context_b["npc_memories"]] == ["Lobo Cinzento"]
+    assert context_a["lore"] == "lore de Vila Inicial"
+    assert context_b["lore"] == "lore de Floresta Nublada"
+    assert context_a["previous_turn"]["player_input"] == "input do jogador 1"
+    assert context_b["previous_turn"]["player_input"] == "input do jogador 2"
+    print("✅ dois jogadores no mesmo turno recebem cada um o próprio contexto")
+
+
+async def test_discard_only_own_run():
+    prefetcher = FakePrefetcher(grace_ms=200)
+    state_a = make_state(1, "Mercador Li", "Vila Inicial")
+    state_b = make_state(2, "Lobo Cinzento", "Floresta Nublada")
+    prefetcher.start(state_a)
+    prefetcher.start(state_b)
+
+    # Turno de A falhou antes do narrador: B continua com as buscas dele
+    prefetcher.discard(state_a["run_id"])
+    assert await prefetcher.collect(state_a["run_id"]) == {}
+    context_b = await prefetcher.collect(state_b["run_id"])
+    assert [m["name"] for m in context_b["npc_memories"]] == ["Lobo Cinzento"]
+    print("✅ discard de um turno não cancela as buscas do outro jogador")
+
+
+def main():
+    asyncio.run(test_concurrent_players_same_turn())
+    asyncio.run(test_discard_only_own_run())
+    print("\nTodos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()
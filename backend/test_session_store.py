@@ -0,0 +1,130 @@
+"""
+SCRIPT DE VALIDAÇÃO: Persistência incremental do SessionContext (snapshot + deltas)
+O replay dos deltas roda sem banco; o round-trip pelo SessionContextStore usa o
+Postgres de settings.DATABASE_URL (é pulado se o banco não estiver no ar).
+
+Uso:
+    python test_session_store.py
+"""
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+from app.core.session_context import (
+    HookType, NarrativeHook, SessionContext, TurnSummary, get_current_session,
+)
+from app.core.session_store import SessionContextStore
+
+
+PLAYER = SimpleNamespace(id=1, name="Cultivador", current_hp=80, max_hp=100, cultivation_tier=2)
+NPCS = [
+    SimpleNamespace(
+        id=10, name="Mercador Li", emotional_state="friendly", current_hp=50, max_hp=50,
+        rank=1, personality_traits=["astuto"], species="human", can_speak=True, gender="male",
+    ),
+]
+
+
+def play_turn(context: SessionContext, turn_number: int) -> None:
+    context.add_turn(TurnSummary.from_graph_result(
+        turn_number, f"falo com o mercador ({turn_number})",
+        {
+            "narration": f"O mercador responde ({turn_number}).",
+            "action_summary": "talk Mercador Li",
+            "action_result": {"success": True, "message": "Conversa amigável"},
+        },
+        "Vila Inicial", ["Mercador Li"], context.current_beat.value,
+    ))
+
+
+def test_delta_replay():
+    context = SessionContext(session_id="replay", player_id=1, player_name="Cultivador", current_location="Vila Inicial")
+    snapshot = json.loads(json.dumps(context.serialize()))
+    context.pop_deltas()
+
+    play_turn(context, 1)
+    context.plant_hook(NarrativeHook.create(HookType.PROMISE, "Prometeu voltar com ervas", 1, "Vila Inicial"))
+    play_turn(context, 2)
+    deltas = json.loads(json.dumps(context.pop_deltas()))
+    assert [kind for kind, _ in deltas] == ["turn", "turn", "hook", "state"]
+
+    restored = SessionContext.deserialize(snapshot)
+    for kind, payload in deltas:
+        restored.apply_delta(kind, payload)
+
+    assert restored.serialize() == context.serialize(), "❌ FALHA: replay dos deltas divergiu do contexto!"
+    print("✅ snapshot + deltas reconstroem o contexto")
+
+
+async def test_store_roundtrip():
+    from sqlmodel import SQLModel
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from sqlalchemy import text
+    from app.database.db_connection import engine
+    from app.database.models.session_context import SessionContextDelta, SessionContextSnapshot
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                SQLModel.metadata.create_all,
+                tables=[SessionContextSnapshot.__table__, SessionContextDelta.__table__],
+            )
+    except Exception as e:
+        print(f"⚠️  Postgres indisponível, round-trip pelo banco pulado: {e}")
+        return
+
+    session_id = f"test-{uuid.uuid4().hex}"
+    writer = SessionContextStore(compact_every=100)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            # Turno 1: sessão nova vira snapshot
+            context = await writer.open_turn(db, session_id, PLAYER, NPCS, "Vila Inicial")
+            assert get_current_session() is not None
+            play_turn(context, 1)
+            assert await writer.save(db, context) == 1
+
+            # Turno 2: só o delta é gravado
+            context = await writer.open_turn(db, session_id, PLAYER, NPCS, "Vila Inicial")
+            play_turn(context, 2)
+            assert await writer.save(db, context) == 2  # turn + state
+            assert writer.snapshots_written == 1
+
+        # Outro processo (store vazio) carrega snapshot + delta
+        reader = SessionContextStore()
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            loaded = await reader.load(db, session_id)
+        assert loaded is not None
+        assert reader.deltas_replayed == 2
+        assert [t.turn_number for t in loaded.turn_history] == [1, 2]
+        assert loaded.serialize() == context.serialize(), "❌ FALHA: contexto carregado difere do gravado!"
+        print("✅ delta gravado pelo store é reaplicado na carga")
+
+        # Expulso do LRU com delta pendente: flush_evicted grava
+        small = SessionContextStore(max_sessions=1)
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            context = await small.load(db, session_id)
+            play_turn(context, 3)
+            small.put(SessionContext(session_id="outra", player_id=2, player_name="X", current_location="Y"))
+            assert small.get_stats()["evicted_dirty"] == 1
+            assert await small.flush_evicted(db) == 2
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            loaded = await SessionContextStore().load(db, session_id)
+        assert [t.turn_number for t in loaded.turn_history] == [1, 2, 3]
+        print("✅ contexto expulso do LRU tem os deltas gravados no flush")
+    finally:
+        async with AsyncSession(engine) as db:
+            await db.execute(text("DELETE FROM session_context_deltas WHERE session_id = :s"), {"s": session_id})
+            await db.execute(text("DELETE FROM session_context_snapshots WHERE session_id = :s"), {"s": session_id})
+            await db.commit()
+        await engine.dispose()
+
+
+def main():
+    test_delta_replay()
+    asyncio.run(test_store_roundtrip())
+    print("\nTodos os testes passaram.")
+
+
+if __name__ == "__main__":
+    main()